@@ -0,0 +1,250 @@
+"""
+Benchmark rozsyłania wiadomości pokoju przez serwer czatu (Socket.IO).
+
+Dla każdej liczby klientów:
+
+1. tworzy w katalogu tymczasowym bazę z N+1 użytkownikami w jednym pokoju,
+2. uruchamia ``chat_server.py`` w wybranym trybie (``CHAT_ASYNC_MODE``),
+3. łączy N klientów asyncio (python-socketio) i jednego nadawcę,
+4. w każdej rundzie nadawca wysyła wiadomość do pokoju, a mierzony jest
+   czas do ``group_message_received`` u każdego odbiorcy.
+
+Klienci i serwer działają na tej samej maszynie, więc przy małej liczbie
+rdzeni wynik obejmuje także koszt klientów. Każde uwierzytelnienie rozsyła
+``user_online`` do wszystkich połączonych, więc samo łączenie N klientów
+kosztuje O(N^2) wiadomości - przy 5000 klientów trwa kilkadziesiąt minut.
+
+Uruchomienie z katalogu repozytorium (wymaga ``python-socketio[asyncio_client]``):
+
+    python bench/bench_chat_fanout.py --mode gevent --clients 100 1000 5000
+"""
+
+import argparse
+import asyncio
+import os
+import pty
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(REPO_DIR, "chat_server.py")
+CONNECT_BATCH = 100
+
+
+def seed_database(client_count):
+    """Wywoływane w podprocesie, w katalogu serwera (baza w ./data/chat)."""
+    sys.path.insert(0, REPO_DIR)
+    import chat_server as cs
+
+    with cs.app.app_context():
+        cs.db.create_all()
+        cs.ensure_message_indexes()
+        cs.db.session.execute(
+            cs.User.__table__.insert(),
+            [
+                dict(
+                    username=f"bench{i}",
+                    email=f"bench{i}@example.com",
+                    password_hash="x",
+                    is_banned=False,
+                    is_admin=False,
+                )
+                for i in range(client_count + 1)
+            ],
+        )
+        cs.db.session.execute(cs.ChatRoom.__table__.insert(), [dict(name="bench", creator_id=1)])
+        cs.db.session.execute(
+            cs.RoomMembership.__table__.insert(),
+            [dict(user_id=i + 1, room_id=1) for i in range(client_count + 1)],
+        )
+        cs.db.session.commit()
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Serwer czatu zakończył się z kodem {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Serwer czatu nie nasłuchuje na porcie {port}")
+
+
+def start_server(workdir, mode, port, log_file):
+    env = dict(
+        os.environ,
+        CHAT_ASYNC_MODE=mode,
+        CHAT_HOST="127.0.0.1",
+        CHAT_PORT=str(port),
+        CHAT_LOG_LEVEL="WARNING",
+    )
+    # Serwer Werkzeug (tryb threading) odmawia startu bez terminala na stdin.
+    master_fd, slave_fd = pty.openpty()
+    process = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT],
+        cwd=workdir,
+        env=env,
+        stdin=slave_fd,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+    os.close(slave_fd)
+    return process, master_fd
+
+
+async def run_clients(url, client_count, rounds, round_timeout, stop_server):
+    import socketio
+
+    latencies = []
+    sent_at = {}
+
+    async def connect(user_id, receiver):
+        client = socketio.AsyncClient(reconnection=False)
+        authenticated = asyncio.Event()
+        client.on("authenticated", lambda _data: authenticated.set())
+        if receiver:
+
+            async def on_group_message(data):
+                started = sent_at.get(data.get("content"))
+                if started is not None:
+                    latencies.append(time.perf_counter() - started)
+
+            client.on("group_message_received", on_group_message)
+        # Domyślne 1 s na potwierdzenie przestrzeni nazw nie wystarcza przy tysiącach połączeń.
+        await client.connect(url, transports=["websocket"], wait_timeout=60)
+        await client.emit("authenticate", {"user_id": user_id})
+        await asyncio.wait_for(authenticated.wait(), 120)
+        return client
+
+    started = time.perf_counter()
+    receivers = []
+    # Użytkownik 1 nadaje, 2..N+1 odbierają.
+    try:
+        for first in range(2, client_count + 2, CONNECT_BATCH):
+            last = min(first + CONNECT_BATCH, client_count + 2)
+            receivers += await asyncio.gather(*(connect(uid, True) for uid in range(first, last)))
+            if len(receivers) % 1000 == 0:
+                print(
+                    f"  połączono {len(receivers)} klientów po "
+                    f"{time.perf_counter() - started:.0f} s",
+                    flush=True,
+                )
+        sender = await connect(1, False)
+    except Exception as error:
+        stop_server()
+        await asyncio.gather(
+            *(client.disconnect() for client in receivers), return_exceptions=True
+        )
+        raise RuntimeError(
+            f"przerwano po {len(receivers)} połączeniach "
+            f"({time.perf_counter() - started:.0f} s): {error!r}"
+        ) from error
+    connect_s = time.perf_counter() - started
+
+    delivered = []
+    for round_no in range(rounds):
+        before = len(latencies)
+        content = f"bench-{round_no}"
+        sent_at[content] = time.perf_counter()
+        await sender.emit("send_message", {"sender_id": 1, "room_id": 1, "content": content})
+        deadline = time.perf_counter() + round_timeout
+        while len(latencies) - before < client_count and time.perf_counter() < deadline:
+            await asyncio.sleep(0.005)
+        delivered.append(len(latencies) - before)
+        await asyncio.sleep(0.2)
+
+    # Rozłączanie po kolei rozsyła user_offline do wszystkich (O(N^2)) - najpierw
+    # zatrzymujemy serwer, potem zamykamy klientów.
+    stop_server()
+    await asyncio.gather(
+        *(client.disconnect() for client in receivers + [sender]), return_exceptions=True
+    )
+    return connect_s, delivered, latencies
+
+
+def bench(mode, client_count, rounds, round_timeout):
+    workdir = tempfile.mkdtemp(prefix="bench_fanout_")
+    log_path = os.path.join(workdir, "server.log")
+    process = master_fd = None
+    try:
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--seed-only", str(client_count)],
+            cwd=workdir,
+            check=True,
+        )
+        port = _free_port()
+        with open(log_path, "wb") as log_file:
+            process, master_fd = start_server(workdir, mode, port, log_file)
+        _wait_for_port(port, process, 60)
+        connect_s, delivered, latencies = asyncio.run(
+            run_clients(
+                f"http://127.0.0.1:{port}",
+                client_count,
+                rounds,
+                round_timeout,
+                stop_server=process.terminate,
+            )
+        )
+    except Exception as error:
+        print(f"{mode:<9} {client_count:>6} klientów: błąd - {error!r}")
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as log_file:
+                tail = log_file.read()[-2000:].decode("utf-8", "replace")
+            print("  koniec logu serwera:\n" + tail)
+        return
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if master_fd is not None:
+            os.close(master_fd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    line = (
+        f"{mode:<9} {client_count:>6} klientów: połączenie {connect_s:6.1f} s, "
+        f"dostarczono {sum(delivered)}/{client_count * rounds}"
+    )
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100)
+        line += (
+            f", p50 {quantiles[49] * 1000:7.1f} ms, p99 {quantiles[98] * 1000:7.1f} ms,"
+            f" max {max(latencies) * 1000:7.1f} ms"
+        )
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["threading", "eventlet", "gevent"], default="gevent")
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--round-timeout", type=float, default=60, help="sekundy na rundę")
+    parser.add_argument("--seed-only", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed_only is not None:
+        seed_database(args.seed_only)
+        return
+    for client_count in args.clients:
+        bench(args.mode, client_count, args.rounds, args.round_timeout)
+
+
+if __name__ == "__main__":
+    main()
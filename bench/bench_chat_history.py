@@ -0,0 +1,172 @@
+"""
+Benchmark stronicowania historii czatu na dużej bazie SQLite.
+
+Tworzy bazę serwera czatu (chat_server.py) w katalogu tymczasowym i wypełnia
+ją wiadomościami - jedna trzecia w pokojach, reszta prywatna. Następnie mierzy
+pobranie strony historii (50 wiadomości):
+
+- ``stare`` - dotychczasowe zapytania: OR po parach nadawca/odbiorca i
+  sortowanie po samym timestamp, bez indeksów historii,
+- ``nowe``  - ``_paginate_history`` po ``conversation_key`` / ``room_id``
+  z kursorem (timestamp, id), po migracji ``ensure_message_indexes``.
+
+Czas migracji (uzupełnienie conversation_key i budowa indeksów) jest
+raportowany osobno - to jednorazowy koszt przy starcie serwera.
+
+Uruchomienie z katalogu repozytorium:
+
+    python bench/bench_chat_history.py --messages 10000000
+"""
+
+import argparse
+import datetime
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+PAGE_SIZE = 50
+USERS = 1000
+ROOMS = 50
+# Mierzona rozmowa: co setna wiadomość, żeby strona historii była pełna.
+FIRST_USER, SECOND_USER, ROOM_ID = 3, 7, 5
+_HISTORY_INDEXES = ("ix_message_conversation_ts", "ix_message_room_ts", "ix_message_unread")
+
+
+def fill_messages(db_path, message_count, seed=1):
+    """Wiadomości jak w starej bazie: bez conversation_key i indeksów historii."""
+    rng = random.Random(seed)
+    base = datetime.datetime(2020, 1, 1)
+
+    def rows():
+        for i in range(message_count):
+            timestamp = (base + datetime.timedelta(seconds=i // 4)).isoformat(" ", "microseconds")
+            sender = rng.randint(1, USERS)
+            if i % 100 == 1:
+                pair = (FIRST_USER, SECOND_USER) if i % 200 == 1 else (SECOND_USER, FIRST_USER)
+                yield (*pair, None, "x", timestamp, 0)
+            elif i % 3 == 0:
+                yield (sender, None, rng.randint(1, ROOMS), "x", timestamp, 0)
+            else:
+                yield (sender, rng.randint(1, USERS), None, "x", timestamp, 0)
+
+    connection = sqlite3.connect(db_path)
+    for index_name in _HISTORY_INDEXES:
+        connection.execute(f"DROP INDEX IF EXISTS {index_name}")
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.executemany(
+        "INSERT INTO message (sender_id, receiver_id, room_id, content, timestamp, "
+        "is_read_by_receiver) VALUES (?, ?, ?, ?, ?, ?)",
+        rows(),
+    )
+    connection.commit()
+    connection.close()
+
+
+def timed_ms(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5, help="powtórzeń zapytania")
+    args = parser.parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_chat_")
+    os.chdir(workdir)
+    try:
+        run(args)
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args):
+    os.environ.setdefault("CHAT_LOG_LEVEL", "WARNING")
+    import chat_server as cs
+
+    Message = cs.Message
+    with cs.app.app_context():
+        cs.db.create_all()
+    started = time.perf_counter()
+    fill_messages(cs.CHAT_DB_PATH, args.messages)
+    print(
+        f"{args.messages} wiadomości wstawione w {time.perf_counter() - started:.0f} s "
+        f"({os.path.getsize(cs.CHAT_DB_PATH) / 1e6:.0f} MB)"
+    )
+
+    first, second, room_id = FIRST_USER, SECOND_USER, ROOM_ID
+    with cs.app.app_context():
+        old_private = (
+            Message.query.filter(
+                ((Message.sender_id == first) & (Message.receiver_id == second))
+                | ((Message.sender_id == second) & (Message.receiver_id == first))
+            )
+            .order_by(Message.timestamp.desc())
+            .limit(PAGE_SIZE + 1)
+        )
+        old_room = (
+            Message.query.filter(Message.room_id == room_id)
+            .order_by(Message.timestamp.desc())
+            .limit(PAGE_SIZE + 1)
+        )
+        old_private_ms, old_private_page = timed_ms(old_private.all, args.repeat)
+        old_room_ms, old_room_page = timed_ms(old_room.all, args.repeat)
+
+        started = time.perf_counter()
+        cs.ensure_message_indexes()
+        migration_s = time.perf_counter() - started
+
+        key = Message.make_conversation_key(first, second)
+        new_private_ms, (new_private_page, _more, _cursor) = timed_ms(
+            lambda: cs._paginate_history(
+                Message.query.filter(Message.conversation_key == key), None, PAGE_SIZE
+            ),
+            args.repeat,
+        )
+        new_room_ms, (new_room_page, _more, cursor) = timed_ms(
+            lambda: cs._paginate_history(
+                Message.query.filter(Message.room_id == room_id), None, PAGE_SIZE
+            ),
+            args.repeat,
+        )
+        older_room_ms, _page = timed_ms(
+            lambda: cs._paginate_history(
+                Message.query.filter(Message.room_id == room_id), cursor, PAGE_SIZE
+            ),
+            args.repeat,
+        )
+        plan = cs.db.session.execute(
+            cs.db.text(
+                "EXPLAIN QUERY PLAN SELECT id FROM message WHERE conversation_key = :key "
+                "ORDER BY timestamp DESC, id DESC LIMIT 51"
+            ),
+            {"key": key},
+        ).fetchall()
+
+    # Strony muszą się zgadzać (z dokładnością do remisów timestampu na granicy).
+    pages = ((old_private_page, new_private_page), (old_room_page, new_room_page))
+    for old_page, new_page in pages:
+        old_ids = {m.id for m in old_page[:PAGE_SIZE]}
+        if len(new_page) != PAGE_SIZE or len(old_ids ^ {m.id for m in new_page}) > 4:
+            sys.exit("Stare i nowe zapytanie zwróciły różne strony!")
+
+    print(f"strona prywatna, stare OR:          {old_private_ms:10.2f} ms")
+    print(f"strona prywatna, klucz + kursor:    {new_private_ms:10.2f} ms   ({plan[0][-1]})")
+    print(f"strona pokoju, stare:               {old_room_ms:10.2f} ms")
+    print(f"strona pokoju, nowe:                {new_room_ms:10.2f} ms")
+    print(f"starsza strona pokoju (kursor):     {older_room_ms:10.2f} ms")
+    print(f"migracja ensure_message_indexes:    {migration_s:10.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark zapisu konfiguracji: dziennik delt vs pełny zapis config.json.
+
+Dla bibliotek 1k/10k/50k gier mierzy czas pojedynczego zapisu po zmianie
+jednej gry (nowa sesja gry):
+
+- ``full``    - dotychczasowa ścieżka ``save_config``: cały config przez
+  ``json.dump(..., indent=4)`` do config.json,
+- ``journal`` - ``ConfigJournal.save`` z fsync (jak w launcherze),
+- ``journal-nofsync`` - to samo bez fsync, dla porównania z ``full``,
+  który fsync nie robił.
+
+Uruchomienie z katalogu repozytorium:
+
+    python bench/bench_config_save.py --games 1000 10000 50000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launcher.config_journal import ConfigJournal  # noqa: E402
+
+GENRES = ["RPG", "Akcja", "Strategia", "Przygodowa", "Symulacja", "Wyścigi", "Indie"]
+TAGS = ["singleplayer", "coop", "retro", "open-world", "pixel-art", "horror"]
+
+
+def make_config(game_count, sessions_per_game, seed=1):
+    """Syntetyczny config o kształcie zbliżonym do prawdziwej biblioteki."""
+    rng = random.Random(seed)
+    games = {}
+    base = 1_600_000_000
+    for i in range(game_count):
+        sessions = []
+        for _ in range(sessions_per_game):
+            start = base + rng.randint(0, 3 * 365 * 86_400)
+            sessions.append({"start": start, "end": start + rng.randint(300, 4 * 3600)})
+        games[f"Gra {i:05d}"] = {
+            "exe_path": f"C:\\Gry\\Gra {i:05d}\\game.exe",
+            "cover_image": f"covers/gra_{i:05d}.jpg",
+            "genres": rng.sample(GENRES, 2),
+            "tags": rng.sample(TAGS, 2),
+            "play_time": sum(s["end"] - s["start"] for s in sessions),
+            "play_sessions": sessions,
+            "launch_profiles": [{"name": "Default", "exe_path": None, "arguments": ""}],
+            "screenshots": [],
+            "autoscan_screenshots": [],
+            "checklist": [],
+            "completion": rng.randint(0, 100),
+        }
+    return {
+        "version": "1.0.0",
+        "games": games,
+        "settings": {"news_post_limit": 10},
+        "groups": {},
+        "user": {"achievements": {}},
+        "emulators": {},
+        "saved_filters": {},
+    }
+
+
+def touch_game(config, step):
+    """Zmiana jak po zakończonej sesji: jedna gra dostaje nową sesję."""
+    names = list(config["games"])
+    game = config["games"][names[(step * 7919) % len(names)]]
+    start = 1_700_000_000 + step * 3600
+    game["play_sessions"].append({"start": start, "end": start + 1800})
+    game["play_time"] += 1800
+
+
+def save_full(path, data):
+    """Dotychczasowy zapis: cały config z wcięciami przy każdej zmianie."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=4, ensure_ascii=False)
+
+
+def measure(label, config, saves, save):
+    timings = []
+    for step in range(saves):
+        touch_game(config, step)
+        started = time.perf_counter()
+        save(config)
+        timings.append(time.perf_counter() - started)
+    return {
+        "variant": label,
+        "median_ms": statistics.median(timings) * 1000,
+        "max_ms": max(timings) * 1000,
+    }
+
+
+def run(game_count, sessions_per_game, saves):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_config_") as workdir:
+        config = make_config(game_count, sessions_per_game)
+        full_path = os.path.join(workdir, "full", "config.json")
+        os.makedirs(os.path.dirname(full_path))
+        results.append(
+            measure("full", config, saves, lambda data: save_full(full_path, data))
+        )
+        full_size = os.path.getsize(full_path)
+
+        for label, fsync in (("journal", True), ("journal-nofsync", False)):
+            config = make_config(game_count, sessions_per_game)
+            path = os.path.join(workdir, label, "config.json")
+            os.makedirs(os.path.dirname(path))
+            journal = ConfigJournal(path, fsync=fsync)
+            # Pierwszy zapis tworzy snapshot - nie wchodzi do pomiaru.
+            journal.save(config)
+            results.append(measure(label, config, saves, journal.save))
+            journal.close()
+    return full_size, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    parser.add_argument("--sessions", type=int, default=20, help="sesji na grę")
+    parser.add_argument("--saves", type=int, default=20, help="zapisów na wariant")
+    args = parser.parse_args()
+
+    for game_count in args.games:
+        full_size, results = run(game_count, args.sessions, args.saves)
+        print(f"{game_count} gier, config.json {full_size / 1e6:.1f} MB")
+        for row in results:
+            print(
+                f"  {row['variant']:<16} mediana {row['median_ms']:9.2f} ms"
+                f"   max {row['max_ms']:9.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
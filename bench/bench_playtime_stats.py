@@ -0,0 +1,149 @@
+"""
+Benchmark danych wykresów statystyk czasu gry.
+
+Dla każdego widoku i okresu (7/365/1100 dni) porównuje czas i wynik
+``_prepare_chart_data``:
+
+- ``sesje``   - dotychczasowa wersja liczona wprost z ``play_sessions``
+  (bench/legacy_stats_data.py),
+- ``rollups`` - agregaty dzienne (``PlaytimeRollups``, domyślny backend),
+- ``numpy``   - tablice sesji (``stats_backend = "numpy"``).
+
+Uruchomienie z katalogu repozytorium:
+
+    python bench/bench_playtime_stats.py --games 300
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import random
+import sys
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import legacy_stats_data  # noqa: E402
+from launcher import stats_data  # noqa: E402
+from launcher.playtime_rollups import get_playtime_rollups  # noqa: E402
+from launcher.stats_numpy import STATS_BACKEND_NUMPY, STATS_BACKEND_ROLLUPS  # noqa: E402
+
+VIEWS = [
+    "Playtime per Day",
+    "Games Played per Day",
+    "Playtime per Game",
+    "Playtime per Game (Selected)",
+    "Playtime by Genre (Pie)",
+    "Most Launched Games",
+    "Average Session Time",
+]
+GENRES = ["RPG", "FPS", "Strategia", "Indie", "Wyścigi"]
+
+
+def make_games(game_count, max_sessions, seed=1):
+    """Sesje z ostatnich 3 lat; część trwa dłużej niż dzień."""
+    rng = random.Random(seed)
+    now = time.time()
+    games = {}
+    for i in range(game_count):
+        sessions = []
+        for _ in range(rng.randint(0, max_sessions)):
+            start = now - rng.uniform(0, 3 * 365 * 86_400)
+            end = start + rng.uniform(0, 6 * 3600) * rng.choice([1, 1, 1, 8])
+            sessions.append({"start": start, "end": end})
+        games[f"Gra {i}"] = {
+            "play_sessions": sessions,
+            "genres": rng.sample(GENRES, 2),
+            "tags": [f"tag{i % 7}"],
+        }
+    return games
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def make_launcher(games, view, start_date, end_date, backend):
+    """Minimalny obiekt z atrybutami, których używa ``_prepare_chart_data``."""
+    launcher = types.SimpleNamespace(
+        games=games,
+        local_settings={"stats_backend": backend},
+        launcher_start_time=time.time(),
+        stats_page_frame=None,
+        stats_view_var=_Var(view),
+        stats_game_var=_Var("Gra 5"),
+        TRANSLATED_TO_STATS_VIEW={name: name for name in VIEWS},
+    )
+    launcher._get_time_period_dates = lambda: (start_date, end_date)
+    return launcher
+
+
+def same_chart(expected, actual):
+    if expected is None or actual is None:
+        return expected is actual
+    return (
+        expected["x_labels"] == actual["x_labels"]
+        and len(expected["y_values"]) == len(actual["y_values"])
+        and all(abs(a - b) < 0.011 for a, b in zip(expected["y_values"], actual["y_values"]))
+    )
+
+
+def timed(prepare, launcher):
+    started = time.perf_counter()
+    chart = prepare(launcher)
+    return (time.perf_counter() - started) * 1000, chart
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=300)
+    parser.add_argument("--max-sessions", type=int, default=60, help="maks. sesji na grę")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 365, 1100])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    games = make_games(args.games, args.max_sessions)
+    session_count = sum(len(g["play_sessions"]) for g in games.values())
+    print(f"{len(games)} gier, {session_count} sesji")
+
+    today = datetime.date.today()
+    started = time.perf_counter()
+    get_playtime_rollups().rebuild(games)
+    print(f"budowa agregatów: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    mismatches = 0
+    print(f"{'widok':<30} {'dni':>5} {'sesje':>10} {'rollups':>10} {'numpy':>10}")
+    for view in VIEWS:
+        for days in args.days:
+            start_date = today - datetime.timedelta(days=days)
+            row = []
+            legacy_ms, expected = timed(
+                legacy_stats_data._prepare_chart_data,
+                make_launcher(games, view, start_date, today, STATS_BACKEND_ROLLUPS),
+            )
+            row.append(legacy_ms)
+            for backend in (STATS_BACKEND_ROLLUPS, STATS_BACKEND_NUMPY):
+                backend_ms, chart = timed(
+                    stats_data._prepare_chart_data,
+                    make_launcher(games, view, start_date, today, backend),
+                )
+                row.append(backend_ms)
+                if not same_chart(expected, chart):
+                    mismatches += 1
+                    print(f"  ROZBIEŻNOŚĆ: {view}, {days} dni, backend {backend}")
+            print(f"{view:<30} {days:>5} " + " ".join(f"{ms:8.2f}ms" for ms in row))
+    if mismatches:
+        sys.exit(f"{mismatches} rozbieżnych wykresów")
+    print("wszystkie wykresy zgodne z dotychczasową wersją")
+
+
+if __name__ == "__main__":
+    main()
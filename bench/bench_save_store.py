@@ -0,0 +1,134 @@
+"""
+Benchmark migawek zapisów: magazyn kawałków vs pełne kopie folderu.
+
+Tworzy folder zapisów (domyślnie ok. 12 MB w 41 plikach), a następnie
+robi serię migawek. Między migawkami część dwóch plików jest nadpisywana,
+tak jak przy zwykłym zapisie gry.
+
+- ``kopie``   - dotychczasowy układ: ``shutil.copytree`` folderu na migawkę,
+- ``magazyn`` - ``SaveStore.snapshot`` (kawałki z deduplikacją i zlib).
+
+Zajętość liczona jest z ``st_blocks``, jak ``du``.
+
+Uruchomienie z katalogu repozytorium:
+
+    python bench/bench_save_store.py --snapshots 20
+"""
+
+import argparse
+import filecmp
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launcher.save_store import SaveStore  # noqa: E402
+
+GAME_NAME = "Gra Testowa"
+
+
+def _payload(rng, size):
+    """Połowa losowa, połowa powtarzalna - zapisy gier zwykle częściowo się kompresują."""
+    half = size // 2
+    pattern = rng.randbytes(64)
+    return rng.randbytes(half) + (pattern * (size // 64 + 1))[: size - half]
+
+
+def make_save_folder(path, rng, big_files, small_files):
+    os.makedirs(os.path.join(path, "profiles"))
+    files = []
+    for i in range(big_files):
+        files.append((os.path.join(path, f"world_{i}.sav"), 2 * 1024 * 1024))
+    for i in range(small_files):
+        files.append((os.path.join(path, "profiles", f"slot_{i:02d}.dat"), 48 * 1024))
+    for file_path, size in files:
+        with open(file_path, "wb") as file:
+            file.write(_payload(rng, size))
+    return [file_path for file_path, _size in files]
+
+
+def modify_saves(files, rng, step):
+    """Nadpisuje fragment dużego pliku i cały mały plik."""
+    big = files[step % 4]
+    with open(big, "r+b") as file:
+        file.seek(rng.randrange(0, os.path.getsize(big) - 64 * 1024))
+        file.write(rng.randbytes(64 * 1024))
+    small = files[-1 - step % 8]
+    with open(small, "wb") as file:
+        file.write(_payload(rng, 48 * 1024))
+
+
+def disk_usage(path):
+    total = 0
+    for dir_path, _dir_names, file_names in os.walk(path):
+        for file_name in file_names:
+            total += os.stat(os.path.join(dir_path, file_name)).st_blocks * 512
+    return total
+
+
+def run(variant, workdir, snapshots, big_files, small_files):
+    rng = random.Random(1)
+    source = os.path.join(workdir, variant, "saves")
+    target = os.path.join(workdir, variant, "games")
+    files = make_save_folder(source, rng, big_files, small_files)
+    source_size = disk_usage(source)
+    store = SaveStore(GAME_NAME, games_folder=target)
+    elapsed = 0.0
+    for step in range(snapshots):
+        if step:
+            modify_saves(files, rng, step)
+        name = f"zapis_{step:03d}"
+        started = time.perf_counter()
+        if variant == "kopie":
+            shutil.copytree(source, os.path.join(target, GAME_NAME, "saves", name))
+        else:
+            store.snapshot(name, source)
+        elapsed += time.perf_counter() - started
+
+    result = {"source": source_size, "disk": disk_usage(target), "time": elapsed}
+    if variant == "magazyn":
+        started = time.perf_counter()
+        SaveStore(GAME_NAME, games_folder=target).list_snapshots()
+        result["list_ms"] = (time.perf_counter() - started) * 1000
+        restored = os.path.join(workdir, variant, "restored")
+        started = time.perf_counter()
+        store.restore(f"zapis_{snapshots - 1:03d}", restored)
+        result["restore"] = time.perf_counter() - started
+        for file_path in files:
+            restored_path = os.path.join(restored, os.path.relpath(file_path, source))
+            if not filecmp.cmp(file_path, restored_path, shallow=False):
+                sys.exit(f"Przywrócony plik różni się od zapisu: {restored_path}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--snapshots", type=int, default=20)
+    parser.add_argument("--big-files", type=int, default=5, help="pliki po 2 MiB")
+    parser.add_argument("--small-files", type=int, default=36, help="pliki po 48 KiB")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory(prefix="bench_saves_") as workdir:
+        for variant in ("kopie", "magazyn"):
+            result = run(variant, workdir, args.snapshots, args.big_files, args.small_files)
+            line = (
+                f"{variant:<8} folder {result['source'] / 1e6:5.1f} MB, "
+                f"{args.snapshots} migawek: {result['disk'] / 1e6:7.1f} MB na dysku, "
+                f"{result['time']:.2f} s"
+            )
+            if "list_ms" in result:
+                line += (
+                    f", lista migawek {result['list_ms']:.1f} ms, "
+                    f"przywrócenie {result['restore']:.2f} s"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
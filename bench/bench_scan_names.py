@@ -0,0 +1,92 @@
+"""
+Benchmark sprawdzeń nazw przy skanowaniu folderów z grami.
+
+Symuluje pętlę ``scan_folders_for_games``: dla każdego folderu sprawdza, czy
+zgadnięta nazwa jest już w bibliotece albo wśród zaakceptowanych kandydatów.
+
+- ``liniowo`` - dotychczasowe sprawdzenia: generator po ``self.games`` i
+  ``any()`` po liście kandydatów,
+- ``indeks``  - ``GameNameIndex`` (jak obecnie w scan_pipeline).
+
+Uruchomienie z katalogu repozytorium:
+
+    python bench/bench_scan_names.py --folders 50000 --games 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launcher.name_index import GameNameIndex  # noqa: E402
+
+
+def make_names(folder_count, game_count, seed=1):
+    """Nazwy folderów; część z nich (w innej wielkości liter) jest już w bibliotece."""
+    rng = random.Random(seed)
+    games = {f"Gra Testowa {i:06d}": {} for i in range(game_count)}
+    folders = [f"gra testowa {i:06d}" for i in range(min(game_count, folder_count // 5))]
+    folders += [f"Nowa Gra {i:06d}" for i in range(folder_count - len(folders))]
+    # Duplikaty folderów (ta sama gra w dwóch miejscach) trafiają do kandydatów raz.
+    folders += rng.sample(folders, folder_count // 50)
+    rng.shuffle(folders)
+    return games, folders
+
+
+def scan_linear(games, folders):
+    potential_new_games = []
+    for guessed_name in folders:
+        if guessed_name.lower() in (name.lower() for name in games.keys()):
+            continue
+        if any(
+            g["guessed_name"].lower() == guessed_name.lower()
+            for g in potential_new_games
+        ):
+            continue
+        potential_new_games.append({"guessed_name": guessed_name})
+    return potential_new_games
+
+
+def scan_indexed(games, folders):
+    potential_new_games = []
+    library_names = GameNameIndex(list(games.keys()))
+    candidate_names = GameNameIndex()
+    for guessed_name in folders:
+        if guessed_name in library_names or guessed_name in candidate_names:
+            continue
+        potential_new_games.append({"guessed_name": guessed_name})
+        candidate_names.add(guessed_name)
+    return potential_new_games
+
+
+def timed(scan, games, folders):
+    started = time.perf_counter()
+    found = scan(games, folders)
+    return time.perf_counter() - started, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, default=50_000)
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument(
+        "--skip-linear", action="store_true", help="pomiń wolny wariant liniowy"
+    )
+    args = parser.parse_args()
+
+    games, folders = make_names(args.folders, args.games)
+    print(f"{len(folders)} folderów, {len(games)} gier w bibliotece")
+    indexed_time, indexed_found = timed(scan_indexed, games, folders)
+    print(f"  indeks   {indexed_time:8.3f} s   nowych gier: {len(indexed_found)}")
+    if not args.skip_linear:
+        linear_time, linear_found = timed(scan_linear, games, folders)
+        print(f"  liniowo  {linear_time:8.3f} s   nowych gier: {len(linear_found)}")
+        if linear_found != indexed_found:
+            sys.exit("Warianty znalazły różne gry!")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,58 @@
 # http://127.0.0.1:5000/admin/
 # d8f3b5f6a9c1e2d7b8f3c5a6b7d8e9f0a1b2c3d4e5f6a7b8c9d0e1f2a3b4c5d6
 import os
+import json
+
+
+# --- Tryb pracy serwera ---
+# Ustawienia z data/chat/server.json, nadpisywane zmiennymi środowiskowymi:
+#   CHAT_ASYNC_MODE  - "threading" (domyślnie, serwer Werkzeug), "eventlet"
+#                      albo "gevent" (zielone wątki - tysiące połączeń)
+#   CHAT_HOST, CHAT_PORT - adres nasłuchiwania (domyślnie 127.0.0.1:5000)
+#   CHAT_SOCKET_LOG  - "1" włącza logowanie każdego pakietu Socket.IO/Engine.IO
+#   CHAT_LOG_LEVEL   - poziom logów serwera (domyślnie INFO)
+# eventlet/gevent muszą podmienić moduły standardowe przed importem Flaska,
+# dlatego ta sekcja jest na samym początku pliku.
+def _load_server_settings():
+    settings = {
+        "async_mode": "threading",
+        "host": "127.0.0.1",
+        "port": 5000,
+        "socket_log": False,
+        "log_level": "INFO",
+    }
+    settings_path = os.path.join(os.getcwd(), "data", "chat", "server.json")
+    if os.path.exists(settings_path):
+        with open(settings_path, "r", encoding="utf-8") as f:
+            settings.update(json.load(f))
+    env_overrides = {
+        "async_mode": "CHAT_ASYNC_MODE",
+        "host": "CHAT_HOST",
+        "port": "CHAT_PORT",
+        "socket_log": "CHAT_SOCKET_LOG",
+        "log_level": "CHAT_LOG_LEVEL",
+    }
+    for key, env_name in env_overrides.items():
+        if os.environ.get(env_name):
+            settings[key] = os.environ[env_name]
+    settings["async_mode"] = str(settings["async_mode"]).lower()
+    settings["port"] = int(settings["port"])
+    settings["socket_log"] = str(settings["socket_log"]).lower() in ("1", "true", "yes")
+    if settings["async_mode"] not in ("threading", "eventlet", "gevent"):
+        raise ValueError(f"Nieobsługiwany CHAT_ASYNC_MODE: {settings['async_mode']}")
+    return settings
+
+
+SERVER_SETTINGS = _load_server_settings()
+if SERVER_SETTINGS["async_mode"] == "eventlet":
+    import eventlet
+
+    eventlet.monkey_patch()
+elif SERVER_SETTINGS["async_mode"] == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
 from flask import (
     Flask,
     request,
@@ -22,15 +74,16 @@ import logging
 from flask import render_template_string  # Potrzebne do serwowania HTML jako string
 
 from flask_socketio import disconnect as socketio_disconnect_client  # Dodaj ten import
-from flask import session  # Dodaj 'session'
+from flask import g, session  # Dodaj 'session'
 from functools import wraps  # Do tworzenia dekoratorów
+from collections import namedtuple
 
 # Globalny słownik do mapowania SID na user_id dla śledzenia użytkowników online
 connected_sids_to_user_id = {}  # Deklaracja globalna
 
 # --- Konfiguracja Logowania Serwera ---
 logging.basicConfig(
-    level=logging.INFO,
+    level=SERVER_SETTINGS["log_level"].upper(),
     format="%(asctime)s - %(levelname)s - (%(filename)s:%(lineno)d) - %(message)s",
 )
 logger = logging.getLogger(__name__)
@@ -144,8 +197,11 @@ db = SQLAlchemy(app)
 socketio = SocketIO(
     app,
     cors_allowed_origins="*",
-    logger=True,
-    engineio_logger=True,
+    async_mode=SERVER_SETTINGS["async_mode"],
+    # Logowanie każdego pakietu tylko na żądanie - przy wielu połączeniach
+    # samo pisanie logów staje się wąskim gardłem.
+    logger=SERVER_SETTINGS["socket_log"],
+    engineio_logger=SERVER_SETTINGS["socket_log"],
     # --- ZMIANY Z POPRZEDNIEJ ITERACJI (ZACHOWANE) ---
     ping_interval=60,  # Wysyłaj ping co 60 sekund (domyślnie 25)
     ping_timeout=120,  # Oczekuj na pong przez 120 sekund (domyślnie 60)
@@ -837,6 +893,7 @@ def admin_ban_user(user_id):
 
         user_to_ban.is_banned = True
         db.session.commit()  # Zatwierdź zmiany
+        invalidate_socket_user(user_id)
         logger.info(
             f"Admin banned user ID: {user_id} (Username: {user_to_ban.username})"
         )
@@ -968,6 +1025,7 @@ def admin_delete_user(user_id):
 
         db.session.delete(user_to_delete)
         db.session.commit()
+        invalidate_socket_user(user_id)
 
         sids_for_deleted_user = [
             sid for sid, uid in connected_sids_to_user_id.items() if uid == user_id
@@ -1131,6 +1189,10 @@ class Message(db.Model):
         db.Boolean, default=False, nullable=False
     )  # Dotyczy tylko prywatnych wiadomości, nie grup
 
+    # Klucz rozmowy prywatnej "min_id:max_id" (NULL dla pokoi) - jedna kolumna
+    # zamiast warunku OR na parach (sender_id, receiver_id), więc działa indeks.
+    conversation_key = db.Column(db.String(32), nullable=True)
+
     sender = db.relationship("User", foreign_keys=[sender_id], backref="sent_messages")
     receiver = db.relationship(
         "User", foreign_keys=[receiver_id], backref="received_messages"
@@ -1139,7 +1201,27 @@ class Message(db.Model):
         "ChatRoom", foreign_keys=[room_id], backref="messages"
     )  # Relacja do pokoju
 
+    # Historia jest stronicowana po (timestamp, id) - indeksy pokrywają filtr i sortowanie
+    __table_args__ = (
+        db.Index("ix_message_conversation_ts", "conversation_key", "timestamp", "id"),
+        db.Index("ix_message_room_ts", "room_id", "timestamp", "id"),
+        db.Index(
+            "ix_message_unread", "receiver_id", "sender_id", "is_read_by_receiver"
+        ),
+    )
+
+    @staticmethod
+    def make_conversation_key(user1_id, user2_id):
+        """Klucz rozmowy niezależny od kierunku wiadomości."""
+        low, high = sorted((int(user1_id), int(user2_id)))
+        return f"{low}:{high}"
+
     def to_dict(self):
+        """Słownik jednej wiadomości; listy serializuj przez ``serialize_messages``."""
+        return serialize_messages([self])[0]
+
+    def _to_dict(self, usernames, replied_to_message=None):
+        """Słownik wiadomości bez leniwych relacji - nazwy i cytat podaje wywołujący."""
         data = {
             "id": self.id,
             "sender_id": self.sender_id,
@@ -1147,9 +1229,7 @@ class Message(db.Model):
             "room_id": self.room_id,  # Dodajemy room_id
             "content": self.content,
             "timestamp": self.timestamp.isoformat(),
-            "sender_username": (
-                self.sender.username if self.sender else "Nieznany Nadawca"
-            ),
+            "sender_username": usernames.get(self.sender_id, "Nieznany Nadawca"),
             "attachment_server_filename": self.attachment_server_filename,
             "attachment_original_filename": self.attachment_original_filename,
             "attachment_mimetype": self.attachment_mimetype,
@@ -1159,24 +1239,20 @@ class Message(db.Model):
         }
         # Opcjonalnie, jeśli chcesz, aby do dictu była dołączana treść cytowanej wiadomości:
         # Pamiętaj, że to zwiększy rozmiar przesyłanych danych.
-        if self.replied_to_message:
+        if replied_to_message is not None:
             # Aby uniknąć rekurencji (wiadomość cytuje wiadomość, która cytuje...),
             # zwracamy tylko podstawowe informacje o cytowanej wiadomości.
             data["replied_to_message_preview"] = {
-                "id": self.replied_to_message.id,
-                "sender_id": self.replied_to_message.sender_id,
-                "sender_username": (
-                    self.replied_to_message.sender.username
-                    if self.replied_to_message.sender
-                    else "Nieznany"
-                ),
+                "id": replied_to_message.id,
+                "sender_id": replied_to_message.sender_id,
+                "sender_username": usernames.get(replied_to_message.sender_id, "Nieznany"),
                 "content": (
-                    self.replied_to_message.content[:50] + "..."
-                    if self.replied_to_message.content
-                    and len(self.replied_to_message.content) > 50
-                    else self.replied_to_message.content
+                    replied_to_message.content[:50] + "..."
+                    if replied_to_message.content
+                    and len(replied_to_message.content) > 50
+                    else replied_to_message.content
                 ),
-                "attachment_original_filename": self.replied_to_message.attachment_original_filename,
+                "attachment_original_filename": replied_to_message.attachment_original_filename,
             }
         return data
 
@@ -1195,13 +1271,16 @@ class ChatRoom(db.Model):
     creator = db.relationship("User", foreign_keys=[creator_id])  # Relacja do twórcy
 
     def to_dict(self):
-        member_ids = [membership.user_id for membership in self.memberships]
+        """Słownik jednego pokoju; listy serializuj przez ``serialize_rooms``."""
+        return serialize_rooms([self])[0]
+
+    def _to_dict(self, usernames, member_ids):
         return {
             "id": self.id,
             "name": self.name,
             "creator_id": self.creator_id,  # Dodaj creator_id
-            "creator_username": (
-                self.creator.username if self.creator else "Nieznany"
+            "creator_username": usernames.get(
+                self.creator_id, "Nieznany"
             ),  # Dodaj username twórcy
             "created_at": self.created_at.isoformat(),
             "has_password": self.password_hash is not None,
@@ -1243,6 +1322,174 @@ class RoomMembership(db.Model):
         return {"id": self.id, "user_id": self.user_id, "room_id": self.room_id}
 
 
+# --- Serializacja zbiorcza ---
+# Lista wiadomości/pokoi serializowana jest stałą liczbą zapytań (cytaty,
+# nazwy użytkowników, członkostwa pobierane zbiorczo przez IN), zamiast
+# leniwego ładowania relacji osobno dla każdego elementu (N+1).
+
+
+def lookup_usernames(user_ids):
+    """Mapa user_id -> username; wyniki są pamiętane do końca żądania/eventu (``g``).
+
+    Najpierw sprawdzany jest katalog użytkowników procesu (``_user_directory``),
+    dopiero brakujące nazwy są pobierane z bazy.
+    """
+    cache = g.setdefault("_username_cache", {})
+    missing = {uid for uid in user_ids if uid is not None and uid not in cache}
+    for uid in [uid for uid in missing if uid in _user_directory]:
+        cache[uid] = _user_directory[uid].username
+        missing.discard(uid)
+    if missing:
+        rows = db.session.query(User.id, User.username).filter(User.id.in_(missing)).all()
+        cache.update(rows)
+        _user_directory.update((uid, CachedUser(uid, name)) for uid, name in rows)
+    return cache
+
+
+def serialize_messages(messages):
+    """Słowniki wiadomości: 1 zapytanie o cytowane wiadomości + 1 o nazwy nadawców."""
+    reply_ids = {m.replied_to_message_id for m in messages if m.replied_to_message_id}
+    replies = {}
+    if reply_ids:
+        replies = {
+            reply.id: reply
+            for reply in Message.query.filter(Message.id.in_(reply_ids)).all()
+        }
+    usernames = lookup_usernames(
+        {m.sender_id for m in messages} | {r.sender_id for r in replies.values()}
+    )
+    return [m._to_dict(usernames, replies.get(m.replied_to_message_id)) for m in messages]
+
+
+def serialize_rooms(rooms):
+    """Słowniki pokoi: 1 zapytanie o członkostwa + 1 o nazwy twórców."""
+    member_ids = {room.id: [] for room in rooms}
+    if member_ids:
+        memberships = (
+            db.session.query(RoomMembership.room_id, RoomMembership.user_id)
+            .filter(RoomMembership.room_id.in_(member_ids))
+            .order_by(RoomMembership.id)
+            .all()
+        )
+        for room_id, user_id in memberships:
+            member_ids[room_id].append(user_id)
+    usernames = lookup_usernames({room.creator_id for room in rooms})
+    return [room._to_dict(usernames, member_ids[room.id]) for room in rooms]
+
+
+# --- Stan połączeń Socket.IO ---
+# Przy 'authenticate' dla SID ładowany jest użytkownik, jego pokoje i blokady
+# (w obie strony). Handlery typing/send/leave korzystają z tego stanu zamiast
+# odpytywać bazę przy każdym evencie; endpointy blokowania, członkostwa, bana,
+# zmiany nazwy i usuwania konta aktualizują go przez invalidate_socket_*.
+
+CachedUser = namedtuple("CachedUser", "id username")
+CachedRoom = namedtuple("CachedRoom", "id name")
+
+
+class SocketSession:
+    """Stan uwierzytelnionego połączenia (SID)."""
+
+    __slots__ = ("id", "username", "rooms", "blocking", "blocked_by", "batched_read_receipts")
+
+    def __init__(self, user_id, username, rooms, blocking, blocked_by):
+        self.id = user_id
+        self.username = username
+        self.rooms = rooms  # room_id -> CachedRoom
+        self.blocking = blocking  # ID użytkowników zablokowanych przez tego użytkownika
+        self.blocked_by = blocked_by  # ID użytkowników, którzy go zablokowali
+        # Klient rozumie zbiorcze 'message_read_update' (message_ids / up_to_message_id);
+        # starsze klienty czytają tylko 'message_id' i dostają zdarzenie na wiadomość.
+        self.batched_read_receipts = False
+
+
+socket_sessions = {}  # SID -> SocketSession
+_user_directory = {}  # user_id -> CachedUser (odbiorcy DM, nazwy nadawców)
+
+
+def load_socket_session(user):
+    """Buduje stan połączenia użytkownika (3 zapytania); None dla zbanowanego."""
+    if user is None or user.is_banned:
+        return None
+    rooms = {
+        room_id: CachedRoom(room_id, name)
+        for room_id, name in db.session.query(ChatRoom.id, ChatRoom.name)
+        .join(RoomMembership, RoomMembership.room_id == ChatRoom.id)
+        .filter(RoomMembership.user_id == user.id)
+        .all()
+    }
+    blocking = {
+        row[0]
+        for row in db.session.query(BlockedRelationship.blocked_id).filter_by(
+            blocker_id=user.id
+        )
+    }
+    blocked_by = {
+        row[0]
+        for row in db.session.query(BlockedRelationship.blocker_id).filter_by(
+            blocked_id=user.id
+        )
+    }
+    _user_directory[user.id] = CachedUser(user.id, user.username)
+    return SocketSession(user.id, user.username, rooms, blocking, blocked_by)
+
+
+def socket_session_for(user_id):
+    """Stan połączenia bieżącego SID, jeśli należy do ``user_id``.
+
+    Dla SID bez 'authenticate' (albo z innym user_id) stan jest budowany
+    z bazy jednorazowo, bez zapamiętywania.
+    """
+    conn = socket_sessions.get(request.sid)
+    if conn is not None and conn.id == user_id:
+        return conn
+    return load_socket_session(User.query.get(user_id)) if user_id is not None else None
+
+
+def cached_user(user_id):
+    """CachedUser z katalogu procesu (przy braku - z bazy) albo None."""
+    cached = _user_directory.get(user_id)
+    if cached is None and user_id is not None:
+        user = User.query.get(user_id)
+        if user is not None:
+            cached = _user_directory[user.id] = CachedUser(user.id, user.username)
+    return cached
+
+
+def _socket_sessions_of(user_id):
+    return [conn for conn in list(socket_sessions.values()) if conn.id == user_id]
+
+
+def invalidate_socket_block(blocker_id, blocked_id, is_blocked):
+    """Aktualizuje zbiory blokad połączeń obu użytkowników."""
+    for conn in _socket_sessions_of(blocker_id):
+        (conn.blocking.add if is_blocked else conn.blocking.discard)(blocked_id)
+    for conn in _socket_sessions_of(blocked_id):
+        (conn.blocked_by.add if is_blocked else conn.blocked_by.discard)(blocker_id)
+
+
+def invalidate_socket_membership(user_id, room, is_member):
+    """Dodaje/usuwa pokój (ChatRoom) w stanie połączeń użytkownika."""
+    for conn in _socket_sessions_of(user_id):
+        if is_member:
+            conn.rooms[room.id] = CachedRoom(room.id, room.name)
+        else:
+            conn.rooms.pop(room.id, None)
+
+
+def invalidate_socket_user(user_id, username=None):
+    """Zmiana nazwy (``username``) albo usunięcie/ban (None) użytkownika."""
+    if username is not None:
+        _user_directory[user_id] = CachedUser(user_id, username)
+        for conn in _socket_sessions_of(user_id):
+            conn.username = username
+        return
+    _user_directory.pop(user_id, None)
+    for sid, conn in list(socket_sessions.items()):
+        if conn.id == user_id:
+            socket_sessions.pop(sid, None)
+
+
 @app.route("/")
 def index():
     return "Chat Server is running!"
@@ -1282,6 +1529,7 @@ def block_user_endpoint(user_to_block_id):
         )
         db.session.add(new_block)
         db.session.commit()
+        invalidate_socket_block(blocker_id, user_to_block_id, True)
         logger.info(f"User {blocker_id} blocked user {user_to_block_id}.")
         # Opcjonalnie: Poinformuj zablokowanego użytkownika (jeśli chcemy taką funkcjonalność)
         # socketio.emit('you_were_blocked_by', {'blocker_id': blocker_id, 'blocker_username': blocker.username}, room=str(user_to_block_id))
@@ -1316,6 +1564,7 @@ def unblock_user_endpoint(user_to_unblock_id):
     try:
         db.session.delete(block_to_remove)
         db.session.commit()
+        invalidate_socket_block(unblocker_id, user_to_unblock_id, False)
         logger.info(f"User {unblocker_id} unblocked user {user_to_unblock_id}.")
         # Opcjonalnie: Poinformuj odblokowanego użytkownika
         # unblocked_user_obj = User.query.get(user_to_unblock_id)
@@ -1378,6 +1627,7 @@ def delete_user_account(user_id):
         else:
             logger.info(f"Email '{email_to_blacklist}' was already on the blacklist.")
         db.session.commit()
+        invalidate_socket_user(user_id)
         logger.info(
             f"User account deleted: User ID {user_id} (Username: {user_to_delete.username})"
         )
@@ -1427,6 +1677,7 @@ def create_room():
         db.session.add(membership)
 
         db.session.commit()
+        invalidate_socket_membership(creator.id, new_room, True)
         logger.info(
             f"New chat room created: '{name}' by User ID {creator.id}. Creator set to {new_room.creator_id}. Has password: {new_room.password_hash is not None}"
         )
@@ -1454,7 +1705,7 @@ def create_room():
 @app.route("/rooms", methods=["GET"])
 def get_all_rooms():
     rooms = ChatRoom.query.all()
-    return jsonify([room.to_dict() for room in rooms]), 200
+    return jsonify(serialize_rooms(rooms)), 200
 
 
 @app.route("/rooms/<int:room_id>/members", methods=["POST"])
@@ -1497,6 +1748,7 @@ def add_room_member(room_id):
         membership = RoomMembership(user_id=user_id, room_id=room_id)
         db.session.add(membership)
         db.session.commit()
+        invalidate_socket_membership(user_id, room, True)
         logger.info(f"User {user_id} added to room '{room.name}' (ID: {room_id}).")
         # Możesz wysłać event Socket.IO, aby poinformować o nowym członku pokoju.
         return jsonify({"message": "User added to room successfully"}), 201
@@ -1575,6 +1827,8 @@ def remove_room_member(room_id, user_id_to_leave):
                 room_to_manage
             )  # To powinno usunąć pokój i kaskadowo resztę
             db.session.commit()
+            for member_id in member_ids_before_delete:
+                invalidate_socket_membership(member_id, room_to_manage, False)
 
             logger.info(
                 f"Room '{room_name_for_log}' (ID: {room_id_for_event}) was deleted by its creator (ID: {user_id_to_leave})."
@@ -1622,6 +1876,7 @@ def remove_room_member(room_id, user_id_to_leave):
         try:
             db.session.delete(membership)
             db.session.commit()
+            invalidate_socket_membership(user_id_to_leave, room_to_manage, False)
 
             user_left_obj = User.query.get(user_id_to_leave)
             user_left_username = (
@@ -1713,6 +1968,71 @@ def unblock_user_stub(user_to_unblock_id):
     )  # 204 No Content jest typowe dla DELETE
 
 
+def _parse_history_cursor(before):
+    """Kursor stronicowania "ISO_timestamp|id"; sam timestamp (stary klient) też działa."""
+    if not before:
+        return None, None
+    timestamp_part, _sep, id_part = before.partition("|")
+    before_dt = datetime.datetime.fromisoformat(timestamp_part)
+    return before_dt, int(id_part) if id_part else None
+
+
+def _paginate_history(query, before, limit):
+    """Strona historii (rosnąco), flaga has_more i kursor następnej (starszej) strony.
+
+    Kursor to para (timestamp, id), więc wiadomości z tym samym znacznikiem
+    czasu nie giną ani nie powtarzają się na granicy stron.
+    """
+    before_dt, before_id = _parse_history_cursor(before)
+    if before_dt is not None:
+        if before_id is None:
+            query = query.filter(Message.timestamp < before_dt)
+        else:
+            query = query.filter(
+                (Message.timestamp < before_dt)
+                | ((Message.timestamp == before_dt) & (Message.id < before_id))
+            )
+
+    msgs = (
+        query.order_by(Message.timestamp.desc(), Message.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(msgs) > limit
+    msgs = msgs[:limit]
+    msgs.reverse()
+
+    next_before = f"{msgs[0].timestamp.isoformat()}|{msgs[0].id}" if msgs else None
+    return msgs, has_more, next_before
+
+
+def ensure_message_indexes():
+    """Dodaje kolumnę conversation_key i indeksy historii do istniejącej bazy.
+
+    ``db.create_all`` tworzy tylko brakujące tabele - starsze bazy trzeba
+    uzupełnić ręcznie (jednorazowo, przy starcie serwera).
+    """
+    columns = {
+        row[1] for row in db.session.execute(db.text("PRAGMA table_info(message)"))
+    }
+    if "conversation_key" not in columns:
+        logger.info("Migracja bazy czatu: dodawanie kolumny message.conversation_key.")
+        db.session.execute(
+            db.text("ALTER TABLE message ADD COLUMN conversation_key VARCHAR(32)")
+        )
+    db.session.execute(
+        db.text(
+            "UPDATE message SET conversation_key = CASE WHEN sender_id < receiver_id "
+            "THEN sender_id || ':' || receiver_id ELSE receiver_id || ':' || sender_id END "
+            "WHERE conversation_key IS NULL AND room_id IS NULL "
+            "AND sender_id IS NOT NULL AND receiver_id IS NOT NULL"
+        )
+    )
+    db.session.commit()
+    for index in Message.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
+
 @app.route("/rooms/<int:room_id>/messages", methods=["GET"])
 def get_room_messages(room_id):
     user_id = request.args.get("user_id", type=int)
@@ -1735,21 +2055,12 @@ def get_room_messages(room_id):
         return jsonify({"error": "You are not a member of this room"}), 403
 
     q = Message.query.filter(Message.room_id == room_id)
-    if before:
-        before_dt = datetime.datetime.fromisoformat(before)
-        q = q.filter(Message.timestamp < before_dt)
-
-    msgs = q.order_by(Message.timestamp.desc()).limit(limit + 1).all()
-    has_more = len(msgs) > limit
-    msgs = msgs[:limit]
-    msgs.reverse()
-
-    next_before = msgs[0].timestamp.isoformat() if msgs else None
+    msgs, has_more, next_before = _paginate_history(q, before, limit)
 
     return (
         jsonify(
             {
-                "messages": [m.to_dict() for m in msgs],
+                "messages": serialize_messages(msgs),
                 "has_more": has_more,
                 "next_before": next_before,
             }
@@ -1789,6 +2100,7 @@ def update_username(user_id):
     try:
         user_to_update.username = new_username
         db.session.commit()
+        invalidate_socket_user(user_id, new_username)
         logger.info(f"User {user_id} username updated to: {new_username}")
         # Możemy również poinformować SocketIO o zmianie nazwy użytkownika,
         # ale na razie klient będzie odświeżał swoją nazwę po sukcesie.
@@ -1895,29 +2207,18 @@ def get_all_users():
 def get_message_history(user1_id, user2_id):
     # Parametry paginacji
     limit = min(int(request.args.get("limit", 50)), 100)  # maks. 100 na raz
-    before = request.args.get("before")  # ISO timestamp
+    before = request.args.get("before")  # kursor "ISO timestamp|id" z next_before
 
-    # Podstawowy filtr konwersacji
+    # Filtr konwersacji po znormalizowanym kluczu pary (indeks ix_message_conversation_ts)
     q = Message.query.filter(
-        ((Message.sender_id == user1_id) & (Message.receiver_id == user2_id))
-        | ((Message.sender_id == user2_id) & (Message.receiver_id == user1_id))
+        Message.conversation_key == Message.make_conversation_key(user1_id, user2_id)
     )
-    if before:
-        before_dt = datetime.datetime.fromisoformat(before)
-        q = q.filter(Message.timestamp < before_dt)
-
-    # Pobierz limit+1 rekordów (żeby sprawdzić, czy jest więcej)
-    msgs = q.order_by(Message.timestamp.desc()).limit(limit + 1).all()
-    has_more = len(msgs) > limit
-    msgs = msgs[:limit]  # obetnij do parametru limit
-    msgs.reverse()  # odwróć, by były rosnąco po czasie
-
-    next_before = msgs[0].timestamp.isoformat() if msgs else None
+    msgs, has_more, next_before = _paginate_history(q, before, limit)
 
     return (
         jsonify(
             {
-                "messages": [m.to_dict() for m in msgs],
+                "messages": serialize_messages(msgs),
                 "has_more": has_more,
                 "next_before": next_before,
             }
@@ -2042,6 +2343,7 @@ def handle_disconnect():
     """Obsługuje rozłączenia klientów Socket.IO."""
     logger.info(f"Client disconnected: {request.sid}")
     user_id = connected_sids_to_user_id.pop(request.sid, None)
+    socket_sessions.pop(request.sid, None)
     if user_id:
         # Poinformuj innych (oprócz rozłączającego się), że użytkownik jest offline.
         # Używamy argumentu `to=None` (domyślny broadcast) i `skip_sid`.
@@ -2061,11 +2363,8 @@ def handle_leave_specific_room(data):
 
     # Pobierz ID użytkownika powiązanego z tym SID, dla logowania
     user_id_leaving = connected_sids_to_user_id.get(user_sid)
-    username_leaving = "Nieznany (SID)"
-    if user_id_leaving:
-        user_obj = User.query.get(user_id_leaving)
-        if user_obj:
-            username_leaving = user_obj.username
+    conn = socket_sessions.get(user_sid)
+    username_leaving = conn.username if conn else "Nieznany (SID)"
 
     logger.info(
         f"Użytkownik '{username_leaving}' (ID: {user_id_leaving}, SID: {user_sid}) opuszcza pokój Socket.IO: {room_id_to_leave}"
@@ -2080,7 +2379,10 @@ def handle_leave_specific_room(data):
 def handle_authentication(data):
     user_id = data.get("user_id")
     user = User.query.get(user_id)
-    if user:
+    conn = load_socket_session(user)
+    if conn:
+        conn.batched_read_receipts = bool(data.get("batched_read_receipts"))
+        socket_sessions[request.sid] = conn
         connected_sids_to_user_id[request.sid] = user.id
         join_room(user.id)  # Użytkownik dołącza do swojego prywatnego roomu (ID)
 
@@ -2104,14 +2406,11 @@ def handle_authentication(data):
             f"Emitting 'online_users_list' to new client ({request.sid}) with {len(online_users_ids_at_connect)} users."
         )
 
-        # Dołącz do pokoi, których jest członkiem
-        memberships = RoomMembership.query.filter_by(user_id=user.id).all()
-        for membership in memberships:
-            join_room(
-                membership.room_id
-            )  # Dołącz do roomu grupowego (nazwa to ID pokoju)
+        # Dołącz do pokoi, których jest członkiem (wczytanych do stanu połączenia)
+        for room_id in conn.rooms:
+            join_room(room_id)  # Dołącz do roomu grupowego (nazwa to ID pokoju)
             logger.info(
-                f"User {user.username} (ID: {user.id}) joined group room {membership.room_id}."
+                f"User {user.username} (ID: {user.id}) joined group room {room_id}."
             )
 
         session_data = {
@@ -2140,7 +2439,7 @@ def handle_typing_start(data):
     sender_id = data.get("sender_id")
     receiver_id = data.get("receiver_id")
 
-    sender = User.query.get(sender_id)
+    sender = socket_session_for(sender_id)
     if not sender:
         logger.warning(f"Typing start failed: Invalid sender_id ({sender_id})")
         return
@@ -2440,63 +2739,82 @@ def handle_mark_as_read(data):
         logger.warning("Mark as read: Brak reader_id.")
         return  # Nie emituj błędu, aby nie spamować klienta
 
-    updated_message_ids_for_sender_notification = []
-
+    # Nieprzeczytane wiadomości do czytelnika: jeden UPDATE zamiast flagowania
+    # obiektów ORM po kolei, potem jedno zbiorcze powiadomienie na nadawcę.
+    unread_filter = [
+        Message.receiver_id == reader_user_id,  # Czytelnik musi być odbiorcą
+        Message.is_read_by_receiver == False,
+    ]
     if message_ids_to_mark and isinstance(message_ids_to_mark, list):
-        messages_to_update = Message.query.filter(
-            Message.id.in_(message_ids_to_mark),
-            Message.receiver_id == reader_user_id,  # Czytelnik musi być odbiorcą
-            Message.is_read_by_receiver == False,
-        ).all()
+        unread_filter.append(Message.id.in_(message_ids_to_mark))
     elif (
         conversation_partner_id is not None
     ):  # Oznacz wszystkie od tego partnera dla tego czytelnika
-        messages_to_update = Message.query.filter(
-            Message.sender_id == conversation_partner_id,
-            Message.receiver_id == reader_user_id,
-            Message.is_read_by_receiver == False,
-        ).all()
+        unread_filter.append(Message.sender_id == conversation_partner_id)
     else:
         logger.warning("Mark as read: Brak message_ids lub conversation_partner_id.")
         return
 
-    if not messages_to_update:
+    # Tylko kolumny (id, sender_id) - do pogrupowania powiadomień według nadawcy
+    unread_rows = db.session.query(Message.id, Message.sender_id).filter(*unread_filter).all()
+    if not unread_rows:
         logger.debug(
             f"Mark as read: Brak wiadomości do oznaczenia jako przeczytane dla czytelnika {reader_user_id}."
         )
         return
 
-    for msg in messages_to_update:
-        msg.is_read_by_receiver = True
-        updated_message_ids_for_sender_notification.append(msg.id)
-        # Poinformuj oryginalnego nadawcę wiadomości (jeśli jest online), że wiadomość została przeczytana
-        if msg.sender_id != reader_user_id:  # Nie wysyłaj do siebie samego
-            logger.debug(
-                f"Mark as read: Wysyłanie 'message_read_update' do nadawcy {msg.sender_id} dla wiadomości {msg.id}"
-            )
-            # Wysyłamy do pokoju oryginalnego nadawcy
-            socketio.emit(
-                "message_read_update",
-                {
-                    "message_id": msg.id,
+    ids_by_sender = {}
+    for message_id, sender_id in unread_rows:
+        ids_by_sender.setdefault(sender_id, []).append(message_id)
+    high_water_mark = max(message_id for message_id, _sender_id in unread_rows)
+
+    try:
+        # id <= znacznik: wiadomości, które doszły po SELECT, zostają na następny raz
+        updated_count = (
+            Message.query.filter(*unread_filter, Message.id <= high_water_mark)
+            .update({Message.is_read_by_receiver: True}, synchronize_session=False)
+        )
+        db.session.commit()
+        logger.info(
+            f"Mark as read: Oznaczono {updated_count} wiadomości jako przeczytane przez użytkownika {reader_user_id}."
+        )
+    except Exception as e_db_commit:
+        db.session.rollback()
+        logger.error(
+            f"Mark as read: Błąd bazy danych przy oznaczaniu wiadomości jako przeczytanych: {e_db_commit}"
+        )
+        return
+
+    # Jedno zdarzenie na nadawcę dla klientów ze zbiorczymi potwierdzeniami
+    # (zgłaszają 'batched_read_receipts' w 'authenticate'). Przy całej rozmowie
+    # wystarczy znacznik 'up_to_message_id' (wszystkie jego wiadomości do
+    # czytelnika o ID <= znacznik są przeczytane), przy liście ID - 'message_ids'.
+    # Starsze klienty znają tylko 'message_id' - dostają zdarzenie na wiadomość.
+    for sender_id, message_ids in ids_by_sender.items():
+        if sender_id is None or sender_id == reader_user_id:  # Nie wysyłaj do siebie samego
+            continue
+        message_ids.sort()
+        payload = {"read_by_user_id": reader_user_id, "is_read": True}
+        if conversation_partner_id is not None and not message_ids_to_mark:
+            payload["up_to_message_id"] = message_ids[-1]
+        else:
+            payload["message_ids"] = message_ids
+        for sid, conn in list(socket_sessions.items()):
+            if conn.id != sender_id:
+                continue
+            if conn.batched_read_receipts:
+                socketio.emit("message_read_update", payload, to=sid)
+                continue
+            for message_id in message_ids:
+                legacy_payload = {
+                    "message_id": message_id,
                     "read_by_user_id": reader_user_id,
                     "is_read": True,
-                },
-                room=msg.sender_id,
-            )
-
-    if updated_message_ids_for_sender_notification:
-        try:
-            db.session.commit()
-            logger.info(
-                f"Mark as read: Oznaczono {len(updated_message_ids_for_sender_notification)} wiadomości jako przeczytane przez użytkownika {reader_user_id}."
-            )
-            # Możemy też wysłać potwierdzenie do klienta, który wysłał 'mark_messages_as_read', ale to mniej krytyczne
-        except Exception as e_db_commit:
-            db.session.rollback()
-            logger.error(
-                f"Mark as read: Błąd bazy danych przy oznaczaniu wiadomości jako przeczytanych: {e_db_commit}"
-            )
+                }
+                socketio.emit("message_read_update", legacy_payload, to=sid)
+        logger.debug(
+            f"Mark as read: Wysłano 'message_read_update' do nadawcy {sender_id} ({len(message_ids)} wiadomości)"
+        )
 
 
 @socketio.on("typing_stop")
@@ -2509,7 +2827,7 @@ def handle_typing_stop(data):
     sender_id = data.get("sender_id")
     receiver_id = data.get("receiver_id")
 
-    sender = User.query.get(sender_id)
+    sender = socket_session_for(sender_id)
     if not sender:
         logger.warning(f"Typing stop failed: Invalid sender_id ({sender_id})")
         return
@@ -2556,7 +2874,7 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
             )
             return
 
-    sender = User.query.get(sender_id)
+    sender = socket_session_for(sender_id)  # stan połączenia - bez zapytań do bazy
     receiver = None
     room = None
 
@@ -2575,8 +2893,10 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
     if (
         room_id is not None
     ):  # Jeśli room_id jest obecne, traktujemy jako wiadomość grupową
-        room = ChatRoom.query.get(room_id)
-        if not room:
+        # Pokoje nadawcy są w stanie połączenia; spoza nich trzeba tylko odróżnić
+        # nieistniejący pokój od braku członkostwa
+        room = sender.rooms.get(room_id)
+        if not room and not db.session.query(ChatRoom.id).filter_by(id=room_id).first():
             logger.warning(
                 f"[handle_send_message] Message send failed: Invalid room_id ({room_id}) for group message."
             )
@@ -2587,11 +2907,9 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
             )
             return
         # Weryfikacja członkostwa dla wiadomości grupowej
-        if not RoomMembership.query.filter_by(
-            user_id=sender_id, room_id=room.id
-        ).first():
+        if not room:
             logger.warning(
-                f"[handle_send_message] Message send failed: Sender {sender_id} is not a member of room {room.id}."
+                f"[handle_send_message] Message send failed: Sender {sender_id} is not a member of room {room_id}."
             )
             emit(
                 "message_error",
@@ -2605,7 +2923,7 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
     elif (
         receiver_id is not None
     ):  # Jeśli room_id jest None, ale receiver_id jest, to wiadomość prywatna
-        receiver = User.query.get(receiver_id)
+        receiver = cached_user(receiver_id)
         if not receiver:
             logger.warning(
                 f"[handle_send_message] Message send failed: Invalid receiver_id ({receiver_id}) for private message."
@@ -2617,11 +2935,7 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
             )
             return
         # Sprawdź, czy ODBIORCA (receiver) zablokował NADAWCĘ (sender)
-        is_sender_blocked_by_receiver = BlockedRelationship.query.filter_by(
-            blocker_id=receiver.id, blocked_id=sender.id
-        ).first()
-
-        if is_sender_blocked_by_receiver:
+        if receiver.id in sender.blocked_by:
             logger.warning(
                 f"[handle_send_message] Message send failed (DM): Sender {sender.id} ({sender.username}) is blocked by receiver {receiver.id} ({receiver.username})."
             )
@@ -2634,11 +2948,8 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
             )
             return
 
-        # Opcjonalne: Sprawdź, czy NADAWCA (sender) zablokował ODBIORCĘ (receiver)
-        is_receiver_blocked_by_sender = BlockedRelationship.query.filter_by(
-            blocker_id=sender.id, blocked_id=receiver.id
-        ).first()
-        if is_receiver_blocked_by_sender:
+        # Sprawdź, czy NADAWCA (sender) zablokował ODBIORCĘ (receiver)
+        if receiver.id in sender.blocking:
             logger.warning(
                 f"[handle_send_message] Message send failed (DM): Sender {sender.id} ({sender.username}) has blocked receiver {receiver.id} ({receiver.username}). Client should handle this."
             )
@@ -2651,33 +2962,6 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
             )
             return
 
-        if is_sender_blocked_by_receiver:
-            logger.warning(
-                f"[handle_send_message] Message send failed: Sender {sender.id} ({sender.username}) is blocked by receiver {receiver.id} ({receiver.username})."
-            )
-            emit(
-                "message_error",
-                {
-                    "message": f"Nie możesz wysłać wiadomości do {receiver.username}, ponieważ zablokował(a) Cię."
-                },
-                room=request.sid,
-            )
-            return  # Nie zapisuj i nie wysyłaj wiadomości
-
-        # Opcjonalnie, możesz też sprawdzić, czy nadawca zablokował odbiorcę,
-        # chociaż klient powinien to obsłużyć. Dodanie tego na serwerze jest dodatkowym zabezpieczeniem.
-        is_receiver_blocked_by_sender = BlockedRelationship.query.filter_by(
-            blocker_id=sender.id, blocked_id=receiver.id
-        ).first()
-        if is_receiver_blocked_by_sender:
-            logger.warning(
-                f"[handle_send_message] Message send failed: Sender {sender.id} ({sender.username}) has blocked receiver {receiver.id} ({receiver.username}). Client should have prevented this."
-            )
-            # Możemy tu zdecydować, czy informować klienta. Jeśli klient działa poprawnie, ten warunek nie powinien być spełniony.
-            # emit('message_error', {"message": f"Zablokowałeś użytkownika {receiver.username}. Odblokuj, aby wysłać wiadomość."}, room=request.sid)
-            # Na razie załóżmy, że jeśli nadawca kogoś blokuje, to jego klient i tak uniemożliwi wysłanie.
-            # return
-
         logger.debug(
             f"[handle_send_message] Determined message type: PRIVATE (Receiver: {receiver.username})"
         )
@@ -2723,6 +3007,9 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
         attachment_original_filename=attachment_original_filename,
         attachment_mimetype=attachment_mimetype,
         replied_to_message_id=replied_to_message_id,
+        conversation_key=(
+            Message.make_conversation_key(sender.id, receiver.id) if receiver else None
+        ),
     )
     db.session.add(new_message)
     db.session.commit()
@@ -2738,23 +3025,23 @@ def handle_send_message(data):  # <-- ZMIANA NAZWY FUNKCJI
         log_msg_prefix = (
             f"PRIVATE message from {sender.username} to {receiver.username}:"
         )
-        logger.info(
+        logger.debug(
             f"[EMIT] Sending 'private_message_sent' to sender's SID: {request.sid}"
         )
         emit("private_message_sent", msg_data, room=request.sid)
 
-        logger.info(
+        logger.debug(
             f"[EMIT] Sending 'private_message_received' to receiver's room (user ID): {receiver.id}"
         )
         socketio.emit("private_message_received", msg_data, room=receiver.id)
     elif room:  # Wiadomość grupowa
         log_msg_prefix = f"GROUP message from {sender.username} to room '{room.name}' (ID: {room.id}):"
-        logger.info(
+        logger.debug(
             f"[EMIT] Sending 'group_message_sent' to sender's SID: {request.sid} for room {room.id}"
         )
         emit("group_message_sent", msg_data, room=request.sid)
 
-        logger.info(
+        logger.debug(
             f"[EMIT] Sending 'group_message_received' to Socket.IO room_id: {room.id}, skipping sender's SID: {request.sid}"
         )
         socketio.emit(
@@ -2784,7 +3071,17 @@ if __name__ == "__main__":
             os.makedirs(app.config["UPLOAD_FOLDER"])
             logger.info(f"Created upload folder: {app.config['UPLOAD_FOLDER']}")
         db.create_all()
+        ensure_message_indexes()
         logger.info("Database tables ensured to be created.")
 
-    logger.info("Starting Flask-SocketIO Chat Server on port 5000.")
-    socketio.run(app, debug=False, port=5000, use_reloader=False)
+    logger.info(
+        f"Starting Flask-SocketIO Chat Server on {SERVER_SETTINGS['host']}:{SERVER_SETTINGS['port']} "
+        f"(async_mode: {socketio.async_mode})."
+    )
+    socketio.run(
+        app,
+        host=SERVER_SETTINGS["host"],
+        port=SERVER_SETTINGS["port"],
+        debug=False,
+        use_reloader=False,
+    )
@@ -79,6 +79,8 @@ _LAUNCHER_MODULE_ALIASES = {
     "gl_stats_controls": "launcher.stats_controls",
     "gl_stats_page": "launcher.stats_page",
     "gl_stats_data": "launcher.stats_data",
+    "gl_playtime_rollups": "launcher.playtime_rollups",
+    "gl_stats_numpy": "launcher.stats_numpy",
     "gl_stats_chart": "launcher.stats_chart",
     "gl_stats_runtime": "launcher.stats_runtime",
     "gl_usage_runtime": "launcher.usage_runtime",
@@ -93,6 +95,7 @@ _LAUNCHER_MODULE_ALIASES = {
     "gl_achievements_page": "launcher.achievements_page",
     "gl_rawg_cover": "launcher.rawg_cover",
     "gl_library_lazy_load": "launcher.library_lazy_load",
+    "gl_library_virtual_grid": "launcher.library_virtual_grid",
     "gl_discord_runtime": "launcher.discord_runtime",
     "gl_settings_avatar": "launcher.settings_avatar",
     "gl_library_tile_actions": "launcher.library_tile_actions",
@@ -101,9 +104,11 @@ _LAUNCHER_MODULE_ALIASES = {
     "gl_library_grid_runtime": "launcher.library_grid_runtime",
     "gl_remote_server_runtime": "launcher.remote_server_runtime",
     "gl_screenshot_scan_runtime": "launcher.screenshot_scan_runtime",
+    "gl_fs_watcher": "launcher.fs_watcher",
     "gl_duplicates_ui": "launcher.duplicates_ui",
     "gl_advanced_filter_eval": "launcher.advanced_filter_eval",
     "gl_library_list_sort": "launcher.library_list_sort",
+    "gl_library_db": "launcher.library_db",
     "gl_file_ops_runtime": "launcher.file_ops_runtime",
     "gl_roadmap_archive_runtime": "launcher.roadmap_archive_runtime",
     "gl_game_process_runtime": "launcher.game_process_runtime",
@@ -135,6 +140,7 @@ globals().update(
     }
 )
 from launcher.config_store import (
+    checkpoint_config,
     load_local_settings as config_load_local_settings,
     save_local_settings as config_save_local_settings,
     load_config as config_load_config,
@@ -144,7 +150,7 @@ from launcher.utils import (
     INTERNAL_MUSIC_DIR, CUSTOM_THEMES_DIR, LOCAL_SETTINGS_FILE,
     DEFAULT_MUSIC_HOTKEYS, RESAMPLING, get_contrast_color,
     MONTH_COLORS, MONTH_NAMES_PL,
-    create_default_cover, load_photoimage_from_path,
+    create_default_cover, invalidate_photoimage,
     _load_theme_from_file, save_config, DummyTranslator
 )
 
@@ -861,6 +867,9 @@ class GameLauncher:
     def _prepare_chart_data(self):
         return gl_stats_data._prepare_chart_data(self)
 
+    def rebuild_playtime_rollups(self):
+        return gl_playtime_rollups.rebuild_playtime_rollups(self)
+
     def _generate_matplotlib_figure(self, chart_data, view_type_display):
         return gl_stats_chart._generate_matplotlib_figure(
             self,
@@ -1065,11 +1074,6 @@ class GameLauncher:
     def _create_or_overwrite_autosave(self, game_name):
         return gl_autosave_runtime._create_or_overwrite_autosave(self, game_name)
 
-    def _copy_with_progress_thread(self, src, dst, total_files):
-        return gl_autosave_runtime._copy_with_progress_thread(
-            self, src, dst, total_files
-        )
-
     def _update_copy_progress_ui(self, percent, text):
         """Aktualizuje pasek postępu i etykietę (wywoływane przez root.after)."""
         if hasattr(self, "progress_window") and self.progress_window.winfo_exists():
@@ -1355,6 +1359,7 @@ class GameLauncher:
         self.games[game_name].setdefault("play_sessions", []).append(
             {"start": start_time, "end": end_time}
         )
+        gl_playtime_rollups.record_playtime_session(self, game_name, start_time, end_time)
 
         save_config(self.config)
         # Schedule GUI update in the main thread
@@ -1810,6 +1815,7 @@ class GameLauncher:
         if not hasattr(self, "google_drive_creds"):
             self.setup_google_drive()
         service = build("drive", "v3", credentials=self.google_drive_creds)
+        checkpoint_config()
         file_metadata = {"name": os.path.basename(CONFIG_FILE)}
         media = MediaFileUpload(CONFIG_FILE, mimetype="application/json")
         file = (
@@ -2299,8 +2305,32 @@ class GameLauncher:
     def _save_autoscan_startup_setting(self):
         return gl_screenshot_scan_runtime._save_autoscan_startup_setting(self)
 
+    def start_folder_watcher(self):
+        return gl_fs_watcher.start_folder_watcher(self)
+
+    def stop_folder_watcher(self):
+        return gl_fs_watcher.stop_folder_watcher(self)
+
+    def _save_folder_watch_setting(self):
+        return gl_fs_watcher._save_folder_watch_setting(self)
+
+    def _save_library_index_setting(self):
+        return gl_library_db._save_library_index_setting(self)
+
+    def _save_virtual_grid_setting(self):
+        return gl_library_virtual_grid._save_virtual_grid_setting(self)
+
+    def _save_stats_backend_setting(self):
+        return gl_stats_numpy._save_stats_backend_setting(self)
+
     def _perform_file_operation_thread(
-        self, operation_type, src, dst, total_files, callback_on_success=None
+        self,
+        operation_type,
+        src,
+        dst,
+        total_files=None,
+        callback_on_success=None,
+        cancel_event=None,
     ):
         return gl_file_ops_runtime._perform_file_operation_thread(
             self,
@@ -2309,6 +2339,7 @@ class GameLauncher:
             dst,
             total_files,
             callback_on_success=callback_on_success,
+            cancel_event=cancel_event,
         )
 
     def add_to_roadmap(self):
@@ -2333,7 +2364,7 @@ class GameLauncher:
             game_data["cover_image"] = cover_path
             game_data["_auto_cover"] = True  # zapisz w pamięci
             save_config(self.config)  # zapisz na dysku
-            load_photoimage_from_path.cache_clear()  # odśwież mini‑cache
+            invalidate_photoimage(cover_path)  # odśwież cache PhotoImage
             logging.info(f"Utworzono domyślną okładkę dla '{game_name}': {cover_path}")
         return cover_path
 
@@ -2607,6 +2638,11 @@ class GameLauncher:
     def _load_visible_tiles(self):
         return gl_library_lazy_load._load_visible_tiles(self)
 
+    def _on_tile_image_ready(self, tile_frame, game_name, photo, tile_width, tile_height):
+        return gl_library_lazy_load._on_tile_image_ready(
+            self, tile_frame, game_name, photo, tile_width, tile_height
+        )
+
 
     def _create_tile_placeholder(
         self,
@@ -2677,10 +2713,10 @@ class GameLauncher:
         )
 
     def _populate_game_tile(
-        self, tile_frame, game_name, game_data, tile_width, tile_height
+        self, tile_frame, game_name, game_data, tile_width, tile_height, photo=None
     ):
         return gl_library_tile_actions._populate_game_tile(
-            self, tile_frame, game_name, game_data, tile_width, tile_height
+            self, tile_frame, game_name, game_data, tile_width, tile_height, photo=photo
         )
 
     def _show_tile_context_menu(self, event, game_name):
@@ -1,162 +1,329 @@
 import datetime
+import json
 import logging
 import re
+import threading
+import time
 
+from launcher.config_journal import get_config_journal
+from launcher.utils import CONFIG_FILE, config_changes_pending
 
-def _check_game_against_rules(self, game_data, rules):
-    """Sprawdza, czy dane gry spełniają podaną listę reguł filtra (logika AND)."""
-    if not rules:
-        return True
+# Typy pól filtra zaawansowanego (klucz w danych gry -> typ), zgodne z RuleEditor.FIELDS.
+FIELD_TYPES = {
+    "name": "text",
+    "genres": "list",
+    "tags": "list",
+    "rating": "number",
+    "play_time": "number",
+    "date_added": "date",
+    "last_played": "date",
+    "game_type": "choice",
+    "emulator_name": "choice",
+    "completion": "number",
+}
+
+SET_OPERATORS = ("jest ustawione", "nie jest ustawione")
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_TEXT_OPS = {
+    "zawiera": lambda val, field: val in field,
+    "nie zawiera": lambda val, field: val not in field,
+    "równa się": lambda val, field: field == val,
+    "zaczyna się od": lambda val, field: field.startswith(val),
+    "kończy się na": lambda val, field: field.endswith(val),
+}
+
+_NUMBER_OPS = {
+    "==": lambda val, field: field == val,
+    "!=": lambda val, field: field != val,
+    ">": lambda val, field: field > val,
+    "<": lambda val, field: field < val,
+    ">=": lambda val, field: field >= val,
+    "<=": lambda val, field: field <= val,
+}
+
+
+def _never(game_name, game_data):
+    return False
+
+
+def _guess_field_type(field_value):
+    if isinstance(field_value, list):
+        return "list"
+    if isinstance(field_value, (int, float)):
+        return "number"
+    if isinstance(field_value, str) and _DATE_RE.match(field_value):
+        return "date"
+    return "text"
+
+
+def _day_bounds(date_str):
+    """Zwraca (początek dnia, początek następnego dnia) jako timestampy czasu lokalnego."""
+    day = datetime.datetime.strptime(str(date_str), "%Y-%m-%d").date()
+    next_day = day + datetime.timedelta(days=1)
+    return time.mktime(day.timetuple()), time.mktime(next_day.timetuple())
+
+
+def _field_getter(field_key):
+    if field_key == "name":
+        return lambda game_name, game_data: game_data.get("name") or game_name
+    if field_key == "play_time":
+        return lambda game_name, game_data: round(game_data.get("play_time", 0) / 3600, 2)
+    if field_key == "game_type":
+        return lambda game_name, game_data: game_data.get("game_type", "pc")
+    return lambda game_name, game_data: game_data.get(field_key)
+
+
+def _compile_set_check(get_field, operator_key, field_type):
+    if field_type == "number":
+        is_set = lambda value: value is not None
+    else:
+        is_set = bool
+    if operator_key == "jest ustawione":
+        return lambda game_name, game_data: is_set(get_field(game_name, game_data))
+    return lambda game_name, game_data: not is_set(get_field(game_name, game_data))
 
-    ops = {
-        "text": {
-            "zawiera": lambda val, field: str(val).lower() in str(field).lower(),
-            "nie zawiera": lambda val, field: str(val).lower() not in str(field).lower(),
-            "równa się": lambda val, field: str(field).lower() == str(val).lower(),
-            "zaczyna się od": lambda val, field: str(field).lower().startswith(str(val).lower()),
-            "kończy się na": lambda val, field: str(field).lower().endswith(str(val).lower()),
-            "jest ustawione": lambda val, field: bool(field),
-            "nie jest ustawione": lambda val, field: not field,
-        },
-        "list": {
-            "zawiera": lambda val, field: (str(val) in field if isinstance(field, list) else False),
-            "nie zawiera": lambda val, field: (
-                str(val) not in field if isinstance(field, list) else True
-            ),
-            "jest ustawione": lambda val, field: bool(field),
-            "nie jest ustawione": lambda val, field: not field,
-        },
-        "number": {
-            "==": lambda val, field: (float(field) == float(val) if field is not None else False),
-            "!=": lambda val, field: (float(field) != float(val) if field is not None else True),
-            ">": lambda val, field: (float(field) > float(val) if field is not None else False),
-            "<": lambda val, field: (float(field) < float(val) if field is not None else False),
-            ">=": lambda val, field: (float(field) >= float(val) if field is not None else False),
-            "<=": lambda val, field: (float(field) <= float(val) if field is not None else False),
-            "jest ustawione": lambda val, field: field is not None,
-            "nie jest ustawione": lambda val, field: field is None,
-        },
-        "date": {
-            "jest równe": lambda val, field: (str(field) == str(val) if field else False),
-            "jest przed": lambda val, field: (str(field) < str(val) if field and val else False),
-            "jest po": lambda val, field: (str(field) > str(val) if field and val else False),
-            "jest ustawione": lambda val, field: bool(field),
-            "nie jest ustawione": lambda val, field: not field,
-        },
-        "choice": {
-            "jest": lambda val, field: str(field) == str(val),
-            "nie jest": lambda val, field: str(field) != str(val),
-            "jest ustawione": lambda val, field: bool(field),
-            "nie jest ustawione": lambda val, field: not field,
-        },
-    }
-
-    for rule in rules:
-        field_key = rule.get("field")
-        operator_key = rule.get("operator")
-        rule_value = rule.get("value")
-
-        if not field_key or not operator_key:
-            logging.warning(f"Pominięto niekompletną regułę: {rule}")
-            continue
-
-        field_value = game_data.get(field_key)
-        field_type = None
-        for _, data in self.FIELDS.items():
-            if data["db_field"] == field_key:
-                field_type = data["type"]
-                break
-
-        if field_type is None:
-            if isinstance(field_value, list):
-                field_type = "list"
-            elif isinstance(field_value, (int, float)):
-                field_type = "number"
-            elif isinstance(field_value, str) and re.match(r"^\d{4}-\d{2}-\d{2}$", field_value):
-                field_type = "date"
-            else:
-                field_type = "text"
-            logging.debug(
-                f"Nie znaleziono typu dla pola '{field_key}', zgadnięto: {field_type}"
-            )
-
-        if field_key == "play_time":
-            field_value = round(game_data.get("play_time", 0) / 3600, 2)
-            field_type = "number"
-        elif field_key in ["date_added", "last_played"]:
-            timestamp = game_data.get(field_key)
-            field_value = (
-                datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
-                if timestamp
-                else None
-            )
-            field_type = "date"
-        elif field_key == "game_type":
-            field_value = game_data.get("game_type", "pc")
-            field_type = "choice"
-        elif field_key == "emulator_name":
-            field_value = game_data.get("emulator_name")
-            field_type = "choice"
-
-        operator_set = ops.get(field_type)
-        if not operator_set:
-            logging.warning(
-                f"Brak zdefiniowanych operatorów dla typu pola '{field_type}' (pole: {field_key})"
-            )
-            return False
+
+def _compile_rule(rule, field_type=None):
+    """Kompiluje pojedynczą regułę do funkcji ``(nazwa, dane) -> bool``."""
+    field_key = rule.get("field")
+    operator_key = rule.get("operator")
+    rule_value = rule.get("value")
+
+    if not field_key or not operator_key:
+        logging.warning(f"Pominięto niekompletną regułę: {rule}")
+        return None
+
+    field_type = field_type or FIELD_TYPES.get(field_key)
+    if field_type is None:
+        return _compile_dynamic_rule(rule)
+
+    get_field = _field_getter(field_key)
+
+    if operator_key in SET_OPERATORS:
+        return _compile_set_check(get_field, operator_key, field_type)
+
+    try:
+        if field_type == "text":
+            op = _TEXT_OPS[operator_key]
+            value = str(rule_value).lower()
+
+            def predicate(game_name, game_data):
+                field = get_field(game_name, game_data)
+                return op(value, "" if field is None else str(field).lower())
+
+            return predicate
 
         if field_type == "list":
+            value = str(rule_value)
             if operator_key == "zawiera":
-                op_func = operator_set.get("zawiera (lista)")
-            elif operator_key == "nie zawiera":
-                op_func = operator_set.get("nie zawiera (lista)")
-            else:
-                op_func = operator_set.get(operator_key)
-        else:
-            op_func = operator_set.get(operator_key)
-
-        if not op_func:
-            logging.warning(
-                f"Nieznany lub nieobsługiwany operator '{operator_key}' dla typu '{field_type}' w regule: {rule}"
-            )
-            return False
-
-        try:
-            rule_met = False
-            if operator_key in ["jest ustawione", "nie jest ustawione"]:
-                rule_met = op_func(None, field_value)
-            elif field_value is not None or field_type == "text":
-                compare_value = rule_value
-                if field_type == "number":
-                    try:
-                        compare_value = float(rule_value)
-                    except (ValueError, TypeError) as conv_err:
-                        raise ValueError(
-                            f"Wartość reguły '{rule_value}' nie jest poprawną liczbą: {conv_err}"
-                        )
-
-                rule_met = op_func(compare_value, field_value)
+                return lambda game_name, game_data: (
+                    isinstance(field := get_field(game_name, game_data), list)
+                    and value in field
+                )
+            if operator_key == "nie zawiera":
+                return lambda game_name, game_data: not (
+                    isinstance(field := get_field(game_name, game_data), list)
+                    and value in field
+                )
+            raise KeyError(operator_key)
+
+        if field_type == "number":
+            op = _NUMBER_OPS[operator_key]
+            try:
+                value = float(rule_value)
+            except (ValueError, TypeError) as conv_err:
+                raise ValueError(
+                    f"Wartość reguły '{rule_value}' nie jest poprawną liczbą: {conv_err}"
+                )
+
+            def predicate(game_name, game_data):
+                field = get_field(game_name, game_data)
+                if field is None:
+                    return False
+                try:
+                    return op(value, float(field))
+                except (ValueError, TypeError):
+                    return False
+
+            return predicate
+
+        if field_type == "date":
+            value = str(rule_value)
+            day_start, next_day_start = _day_bounds(value)
+            if operator_key == "jest równe":
+                check = lambda ts: day_start <= ts < next_day_start
+                check_str = lambda text: text == value
+            elif operator_key == "jest przed":
+                check = lambda ts: ts < day_start
+                check_str = lambda text: text < value
+            elif operator_key == "jest po":
+                check = lambda ts: ts >= next_day_start
+                check_str = lambda text: text > value
             else:
-                rule_met = False
+                raise KeyError(operator_key)
+
+            def predicate(game_name, game_data):
+                field = game_data.get(field_key)
+                if not field:
+                    return False
+                if isinstance(field, str):
+                    return check_str(field)
+                try:
+                    return check(float(field))
+                except (ValueError, TypeError, OverflowError):
+                    return False
+
+            return predicate
 
-            if not rule_met:
-                logging.debug(
-                    f"Gra '{game_data.get('name')}' nie spełnia reguły: {rule} (wartość pola: {field_value})"
+        if field_type == "choice":
+            value = str(rule_value)
+            if operator_key == "jest":
+                return lambda game_name, game_data: str(get_field(game_name, game_data)) == value
+            if operator_key == "nie jest":
+                return lambda game_name, game_data: str(get_field(game_name, game_data)) != value
+            raise KeyError(operator_key)
+
+    except KeyError:
+        logging.warning(
+            f"Nieznany lub nieobsługiwany operator '{operator_key}' dla typu '{field_type}' w regule: {rule}"
+        )
+        return _never
+    except ValueError as ve:
+        logging.error(f"Błąd wartości w regule {rule}: {ve}")
+        return _never
+
+    return _never
+
+
+def _compile_dynamic_rule(rule):
+    """Reguła dla pola spoza FIELD_TYPES - typ zgadywany z wartości w grze."""
+    field_key = rule.get("field")
+    compiled_by_type = {}
+
+    def predicate(game_name, game_data):
+        field_type = _guess_field_type(game_data.get(field_key))
+        if field_type not in compiled_by_type:
+            compiled_by_type[field_type] = _compile_rule(rule, field_type)
+        return compiled_by_type[field_type](game_name, game_data)
+
+    return predicate
+
+
+class CompiledFilter:
+    """Filtr zaawansowany skompilowany do listy predykatów (logika AND).
+
+    Wyniki dla poszczególnych gier są zapamiętywane; wpis gry unieważnia
+    się, gdy jej dane zmienią się w dzienniku konfiguracji.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules or []
+        self.fingerprint = _rules_fingerprint(self.rules)
+        compiled = [_compile_rule(rule) for rule in self.rules]
+        self._predicates = [p for p in compiled if p is not None]
+        self._results = {}
+
+    def matches(self, game_name, game_data):
+        for predicate in self._predicates:
+            try:
+                if not predicate(game_name, game_data):
+                    return False
+            except Exception as e:
+                logging.exception(
+                    f"Błąd podczas stosowania filtra do gry {game_name}: {e}"
                 )
                 return False
-        except ValueError as ve:
-            logging.error(
-                f"Błąd wartości w regule {rule} dla gry {game_data.get('name')}: {ve}"
-            )
-            return False
-        except Exception as e:
-            logging.exception(
-                f"Błąd podczas stosowania reguły {rule} do gry {game_data.get('name')}: {e}"
-            )
-            return False
-
-    logging.debug(f"Gra '{game_data.get('name')}' spełnia wszystkie reguły filtra.")
-    return True
-
-
-__all__ = ["_check_game_against_rules"]
+        return True
+
+    def filter_names(self, games, names, use_cache=True):
+        """Zwraca nazwy (w zadanej kolejności) gier spełniających filtr.
+
+        Przy ``use_cache=False`` wszystkie gry są sprawdzane od nowa, a wyniki
+        nie trafiają do cache.
+        """
+        results = self._results if use_cache else {}
+        matched = []
+        for name in names:
+            result = results.get(name)
+            if result is None:
+                game_data = games.get(name)
+                if not game_data:
+                    continue
+                result = self.matches(name, game_data)
+                results[name] = result
+            if result:
+                matched.append(name)
+        return matched
+
+    def invalidate(self, names=None):
+        if names is None:
+            self._results.clear()
+            return
+        for name in names:
+            self._results.pop(name, None)
+
+
+def _rules_fingerprint(rules):
+    return json.dumps(rules, sort_keys=True, ensure_ascii=False, default=str)
+
+
+_compiled_filters = {}
+_compiled_filters_lock = threading.Lock()
+_listener_registered = False
+
+
+def _on_games_changed(changed_games, full):
+    with _compiled_filters_lock:
+        for compiled in _compiled_filters.values():
+            compiled.invalidate(None if full else changed_games.keys())
+
+
+def _ensure_invalidation_listener():
+    global _listener_registered
+    if _listener_registered:
+        return
+    _listener_registered = True
+    get_config_journal(CONFIG_FILE).add_listener(_on_games_changed)
+
+
+def get_compiled_filter(filter_name, rules):
+    """Zwraca skompilowany filtr; kompiluje ponownie tylko po zmianie reguł."""
+    _ensure_invalidation_listener()
+    fingerprint = _rules_fingerprint(rules or [])
+    with _compiled_filters_lock:
+        compiled = _compiled_filters.get(filter_name)
+        if compiled is None or compiled.fingerprint != fingerprint:
+            compiled = CompiledFilter(rules)
+            _compiled_filters[filter_name] = compiled
+        return compiled
+
+
+def apply_saved_filter(self, filter_name, names):
+    """Filtruje listę nazw gier zapisanym filtrem zaawansowanym (wsadowo, z cache)."""
+    filter_data = self.config.get("saved_filters", {}).get(filter_name) or {}
+    rules = filter_data.get("rules", [])
+    if not rules:
+        return [name for name in names if self.games.get(name)]
+    compiled = get_compiled_filter(filter_name, rules)
+    # Cache wyników jest unieważniany dopiero po zapisie w tle - do tego czasu
+    # filtr liczy wyniki z bieżących danych.
+    return compiled.filter_names(self.games, names, use_cache=not config_changes_pending())
+
+
+def _check_game_against_rules(self, game_data, rules):
+    """Sprawdza, czy dane gry spełniają podaną listę reguł filtra (logika AND)."""
+    if not rules:
+        return True
+    compiled = get_compiled_filter(None, rules)
+    return compiled.matches(game_data.get("name"), game_data)
+
+
+__all__ = [
+    "FIELD_TYPES",
+    "CompiledFilter",
+    "get_compiled_filter",
+    "apply_saved_filter",
+    "_check_game_against_rules",
+]
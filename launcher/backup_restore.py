@@ -8,10 +8,12 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
 from launcher.config_store import (
+    checkpoint_config,
     load_config as config_load_config,
     load_local_settings as config_load_local_settings,
     save_local_settings as config_save_local_settings,
 )
+from launcher.copy_engine import CopyEngine
 from launcher.utils import (
     ACHIEVEMENTS_DEFINITIONS_FILE,
     CONFIG_FILE,
@@ -30,6 +32,17 @@ def _destroy_progress_window(self):
         self.progress_window.destroy()
 
 
+def _report_copy_progress(self, step_index, step_count, description, progress):
+    """Postęp kopiowania folderu w ramach etapu backupu/przywracania (z wątku roboczego)."""
+    text = f"Etap {step_index + 1}/{step_count}: {description}\n{progress.describe()}"
+
+    def update():
+        if hasattr(self, "progress_window") and self.progress_window.winfo_exists():
+            self.progress_label.config(text=text)
+
+    self.root.after(0, update)
+
+
 def show_progress_window(self, title):
     if hasattr(self, "progress_window") and self.progress_window.winfo_exists():
         self.progress_window.title(title)
@@ -65,6 +78,8 @@ def backup_to_local_folder(self):
     if not backup_dir_base:
         return
 
+    checkpoint_config()
+
     timestamp_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_main_folder_name = f"GameLauncher_Backup_{timestamp_str}"
     backup_destination_root = os.path.join(backup_dir_base, backup_main_folder_name)
@@ -170,11 +185,11 @@ def backup_to_local_folder(self):
                     elif item_type == "dir":
                         if os.path.exists(full_dest_path_in_backup):
                             shutil.rmtree(full_dest_path_in_backup)
-                        shutil.copytree(
-                            full_source_path_app,
-                            full_dest_path_in_backup,
-                            dirs_exist_ok=False,
-                        )
+                        CopyEngine(
+                            progress=lambda p, i=idx, d=description: _report_copy_progress(
+                                self, i, len(items_to_backup), d, p
+                            )
+                        ).copy_tree(full_source_path_app, full_dest_path_in_backup)
                         logging.info(
                             f"Backup: Skopiowano folder '{full_source_path_app}' do '{full_dest_path_in_backup}'."
                         )
@@ -340,11 +355,11 @@ def load_local_backup(self):
                     elif item_type == "dir":
                         if os.path.exists(destination_path_in_app):
                             shutil.rmtree(destination_path_in_app)
-                        shutil.copytree(
-                            source_path_in_backup,
-                            destination_path_in_app,
-                            dirs_exist_ok=False,
-                        )
+                        CopyEngine(
+                            progress=lambda p, i=idx, d=description: _report_copy_progress(
+                                self, i, len(items_to_restore), d, p
+                            )
+                        ).copy_tree(source_path_in_backup, destination_path_in_app)
                 except Exception as e_copy_item_restore:
                     logging.error(
                         "Przywracanie: Błąd podczas kopiowania "
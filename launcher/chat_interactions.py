@@ -149,15 +149,11 @@ def _check_and_mark_read(self):
             # zanim serwer zdąży odpowiedzieć i zaktualizować nasz widok przez `message_read_update`
             # (które de facto nie jest używane do aktualizacji wskaźnika "oko" dla wiadomości OD PARTNERA,
             # bo "oko" jest tylko dla naszych wysłanych wiadomości).
-            for msg_id_marked in messages_from_partner_to_mark:
-                for i, msg_in_hist in enumerate(
-                    self.chat_messages.get(active_partner_id, [])
-                ):
-                    if msg_in_hist.get("id") == msg_id_marked:
-                        self.chat_messages[active_partner_id][i][
-                            "is_read_by_receiver"
-                        ] = True  # Oznaczamy, że my jako odbiorca przeczytaliśmy
-                        break
+            marked_ids = set(messages_from_partner_to_mark)
+            for msg_in_hist in self.chat_messages.get(active_partner_id, []):
+                if msg_in_hist.get("id") in marked_ids:
+                    # Oznaczamy, że my jako odbiorca przeczytaliśmy
+                    msg_in_hist["is_read_by_receiver"] = True
 
             # Odświeżenie UI nie jest tu bezpośrednio potrzebne, bo nie dodajemy "oka" do wiadomości partnera.
             # Jednak jeśli usuwamy np. licznik nieprzeczytanych wiadomości z listy użytkowników, to tutaj
@@ -7,7 +7,7 @@ from io import BytesIO
 from tkinter import ttk
 
 from ui.components import ToolTip
-from launcher.utils import THEMES
+from launcher.utils import THEMES, photo_cache
 
 def _parse_text_for_links(self, text_content):
         """
@@ -151,30 +151,22 @@ def _load_and_display_chat_image_thumbnail(
             )
             return
 
-        if not hasattr(self, "_chat_image_thumbnail_cache"):
-            self._chat_image_thumbnail_cache = {}
-
         thumbnail_max_width = 200
         thumbnail_max_height = 150
         cache_key = f"{image_url}_{thumbnail_max_width}x{thumbnail_max_height}"
 
-        if cache_key in self._chat_image_thumbnail_cache:
-            cached_photo = self._chat_image_thumbnail_cache[cache_key]
-            if cached_photo:
-                logging.debug(
-                    f"{log_prefix}Miniaturka znaleziona w cache. Aktualizowanie UI."
-                )
-                self.root.after(
-                    0,
-                    lambda: self._update_image_label(
-                        target_label_widget, cached_photo, image_url, log_prefix
-                    ),
-                )
-                return
-            else:
-                logging.debug(
-                    f"{log_prefix}Miniaturka była w cache jako None (poprzedni błąd). Próba ponownego załadowania."
-                )
+        cached_photo = photo_cache.get("chat", cache_key)
+        if cached_photo:
+            logging.debug(
+                f"{log_prefix}Miniaturka znaleziona w cache. Aktualizowanie UI."
+            )
+            self.root.after(
+                0,
+                lambda: self._update_image_label(
+                    target_label_widget, cached_photo, image_url, log_prefix
+                ),
+            )
+            return
 
         # Ustawienie tekstu "Ładowanie..." przed próbą pobrania
         self.root.after(
@@ -215,7 +207,7 @@ def _load_and_display_chat_image_thumbnail(
                 photo_image = ImageTk.PhotoImage(img)
                 logging.debug(f"{log_prefix}ImageTk.PhotoImage utworzony.")
 
-            self._chat_image_thumbnail_cache[cache_key] = photo_image
+            photo_cache.put("chat", cache_key, photo_image)
             self.root.after(
                 0,
                 lambda: self._update_image_label(
@@ -228,25 +220,21 @@ def _load_and_display_chat_image_thumbnail(
 
         except requests.exceptions.RequestException as e:
             logging.error(f"{log_prefix}Błąd sieciowy: {e}")
-            self._chat_image_thumbnail_cache[cache_key] = None
             self.root.after(0, lambda: target_label_widget.config(text="[Błąd sieci]"))
         except UnidentifiedImageError:
             logging.error(
                 f"{log_prefix}Nie można zidentyfikować obrazka (nieprawidłowy format?)"
             )
-            self._chat_image_thumbnail_cache[cache_key] = None
             self.root.after(
                 0, lambda: target_label_widget.config(text="[Zły format obrazka]")
             )
         except ValueError as ve:  # Dla pustych danych obrazu
             logging.error(f"{log_prefix}Błąd wartości (np. puste dane): {ve}")
-            self._chat_image_thumbnail_cache[cache_key] = None
             self.root.after(
                 0, lambda: target_label_widget.config(text="[Błąd danych obrazka]")
             )
         except Exception:
             logging.exception(f"{log_prefix}Nieoczekiwany błąd")
-            self._chat_image_thumbnail_cache[cache_key] = None
             self.root.after(
                 0, lambda: target_label_widget.config(text="[Błąd ładowania]")
             )
@@ -338,58 +338,56 @@ def _connect_to_chat_server(self):
         @self.sio.event
         def message_read_update(data):
             """
-            Odebrano informację od serwera, że wiadomość (którą my wysłaliśmy)
-            została przeczytana przez odbiorcę.
-            Data: {'message_id': ..., 'read_by_user_id': ..., 'is_read': True}
+            Odebrano informację od serwera, że wiadomości (które my wysłaliśmy)
+            zostały przeczytane przez odbiorcę - jedno zdarzenie na całą partię.
+            Data: {'message_ids': [...]} albo {'up_to_message_id': ...}
+                  + 'read_by_user_id', 'is_read' (zgłaszamy 'batched_read_receipts'
+                  w 'authenticate'); sam 'message_id' od starszego serwera.
             """
-            message_id = data.get("message_id")
-            is_read = data.get("is_read", False)
+            if not data.get("is_read", False):
+                return
+            reader_id = data.get("read_by_user_id")
+            read_ids = set(data.get("message_ids") or ())
+            up_to_message_id = data.get("up_to_message_id")
+            if not read_ids and up_to_message_id is None and data.get("message_id"):
+                read_ids.add(data["message_id"])
 
             logging.debug(
-                f"Chat: Odebrano 'message_read_update' dla wiadomości ID {message_id}, is_read={is_read}"
+                f"Chat: Odebrano 'message_read_update' od {reader_id}: "
+                f"{len(read_ids)} ID, do ID {up_to_message_id}"
             )
 
-            if message_id and is_read:
-                # Zaktualizuj status tej wiadomości w naszej lokalnej historii (self.chat_messages)
-                # To jest ważne, aby przy ponownym renderowaniu historii (np. po przełączeniu czatu)
-                # status "przeczytane" był poprawnie wyświetlany.
-                message_updated_in_local_history = False
-                for partner, messages_list in self.chat_messages.items():
-                    for i, msg_data_local in enumerate(messages_list):
-                        if msg_data_local.get("id") == message_id:
-                            # Upewnijmy się, że to wiadomość WYSŁANA przez nas
-                            if (
-                                msg_data_local.get("sender_id")
-                                == self.chat_logged_in_user["user_id"]
-                            ):
-                                if msg_data_local.get("is_read_by_receiver") != True:
-                                    self.chat_messages[partner][i][
-                                        "is_read_by_receiver"
-                                    ] = True
-                                    message_updated_in_local_history = True
-                                    logging.info(
-                                        f"Chat: Zaktualizowano lokalny status 'is_read_by_receiver' dla wiadomości ID {message_id}"
-                                    )
-                                break  # Znaleziono wiadomość
-                    if message_updated_in_local_history:
-                        break
-
-                # Jeśli aktualnie wyświetlamy czat, w którym jest ta wiadomość, odśwież widok,
-                # aby pokazać wskaźnik "przeczytane".
-                # Sprawdzamy self.active_chat_partner_id - jeśli jest to odbiorca tej wiadomości, odśwież.
-                if (
-                    message_updated_in_local_history
-                ):  # Tylko jeśli faktycznie zaktualizowaliśmy lokalny stan
-                    # Partner to odbiorca wiadomości, którą MY wysłaliśmy
-                    partner_of_this_message = data.get("read_by_user_id")
-                    if self.active_chat_partner_id == partner_of_this_message:
-                        logging.debug(
-                            f"Chat: Wiadomość ID {message_id} była w aktywnym czacie, odświeżanie."
-                        )
-                        # Wymuś ponowne wyświetlenie historii aktywnego czatu
-                        # Użyj _force_history_reload_for_partner, aby _on_chat_user_select wiedziało, że ma przeładować
-                        setattr(self, "_force_history_reload_for_partner", True)
-                        self._display_active_chat_history(self.active_chat_partner_id)
+            # Jedno przejście po lokalnej historii (self.chat_messages) - status
+            # "przeczytane" musi być poprawny przy ponownym renderowaniu historii.
+            my_user_id = self.chat_logged_in_user["user_id"]
+            updated_count = 0
+            for messages_list in self.chat_messages.values():
+                for msg_data_local in messages_list:
+                    if (
+                        msg_data_local.get("is_read_by_receiver")
+                        or msg_data_local.get("sender_id") != my_user_id
+                        or msg_data_local.get("receiver_id") != reader_id
+                    ):
+                        continue
+                    message_id = msg_data_local.get("id")
+                    if message_id in read_ids or (
+                        up_to_message_id is not None
+                        and message_id is not None
+                        and message_id <= up_to_message_id
+                    ):
+                        msg_data_local["is_read_by_receiver"] = True
+                        updated_count += 1
+
+            if updated_count:
+                logging.info(
+                    f"Chat: Zaktualizowano lokalny status 'is_read_by_receiver' dla {updated_count} wiadomości"
+                )
+                # Jeśli aktualnie wyświetlamy czat z czytelnikiem, odśwież widok raz,
+                # aby pokazać wskaźniki "przeczytane".
+                if self.active_chat_partner_id == reader_id:
+                    # Użyj _force_history_reload_for_partner, aby _on_chat_user_select wiedziało, że ma przeładować
+                    setattr(self, "_force_history_reload_for_partner", True)
+                    self._display_active_chat_history(self.active_chat_partner_id)
 
 
         # Definicja event handlerów
@@ -409,7 +407,11 @@ def _connect_to_chat_server(self):
             self.root.after(
                 100,
                 lambda: self.sio.emit(
-                    "authenticate", {"user_id": self.chat_logged_in_user["user_id"]}
+                    "authenticate",
+                    {
+                        "user_id": self.chat_logged_in_user["user_id"],
+                        "batched_read_receipts": True,
+                    },
                 ),
             )
 
@@ -5,6 +5,10 @@ import tkinter as tk
 from tkinter import messagebox
 
 from launcher.config_store import save_local_settings
+from launcher.library_db import close_library_index
+from launcher.thumbnail_cache import get_thumbnail_cache
+from launcher.tile_image_pipeline import stop_tile_pipeline
+from launcher.utils import config_save_scheduler, photo_cache
 
 
 def on_closing(self):
@@ -103,6 +107,27 @@ def on_closing(self):
         except Exception as e_save:
             logging.error(f"Błąd zapisu ustawień lokalnych przy zamykaniu: {e_save}")
 
+        try:
+            if not config_save_scheduler.flush_sync(timeout=10):
+                logging.warning(
+                    "Zapis konfiguracji nie powiódł się lub nie zakończył przed zamknięciem."
+                )
+            save_stats = config_save_scheduler.stats()
+            logging.info(
+                f"Zapis konfiguracji: {save_stats['requests']} żądań, "
+                f"{save_stats['writes']} zapisów, {save_stats['coalesced']} połączonych."
+            )
+        except Exception as e_config_save:
+            logging.error(f"Błąd zapisu konfiguracji przy zamykaniu: {e_config_save}")
+        self.stop_folder_watcher()
+        close_library_index(self)
+        stop_tile_pipeline(self)
+        photo_cache.log_stats()
+        try:
+            get_thumbnail_cache().flush(timeout=5)
+        except Exception as e_thumbs:
+            logging.error(f"Błąd zapisu manifestu miniatur: {e_thumbs}")
+
         if hasattr(self, "_server_running") and self._server_running:
             self._stop_flask_server()
 
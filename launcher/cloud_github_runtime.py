@@ -3,6 +3,7 @@ import os
 from tkinter import messagebox
 
 from launcher.config_store import (
+    checkpoint_config,
     load_config as config_load_config,
     load_local_settings as config_load_local_settings,
 )
@@ -82,6 +83,7 @@ def do_upload_to_github(self):
             logging.info(f"Repozytorium '{repo_name}' nie istnieje. Tworzenie nowego.")
             repo = user.create_repo(repo_name)
 
+        checkpoint_config()
         if not self._upload_single_file_to_github(
             repo,
             CONFIG_FILE,
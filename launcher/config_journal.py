@@ -0,0 +1,441 @@
+"""
+Dziennikowany zapis config.json.
+
+Zamiast przepisywać cały plik przy każdej zmianie, zapis porównuje bieżące
+dane z ostatnio utrwalonym stanem i dopisuje do dziennika (write-ahead
+journal) tylko zmienione sekcje: pojedyncze gry z ``games`` oraz pozostałe
+klucze najwyższego poziomu. Gdy dziennik urośnie, wątek w tle składa nowy
+snapshot i podmienia go atomowo (``os.replace``).
+
+Snapshot pozostaje zwykłym plikiem JSON, więc backupy i synchronizacja
+w chmurze działają jak dotąd (po wcześniejszym ``checkpoint()``).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+GAMES_KEY = "games"
+JOURNAL_SUFFIX = ".journal"
+_NEXT_JOURNAL_SUFFIX = ".journal.next"
+_SNAPSHOT_TMP_SUFFIX = ".tmp"
+_MIN_COMPACT_BYTES = 1024 * 1024
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _file_signature(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _snapshot_tmp_path(config_file: str) -> str:
+    # Osobny plik dla każdego wątku: kompaktacja pisze snapshot bez blokady,
+    # równolegle z pełnym zapisem w save().
+    return f"{config_file}.{threading.get_ident()}{_SNAPSHOT_TMP_SUFFIX}"
+
+
+def _fsync_write(path: str, payload: bytes):
+    with open(path, "wb") as file:
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class ConfigJournal:
+    """Silnik zapisu config.json: dziennik delt + atomowe snapshoty."""
+
+    def __init__(self, config_file: str, fsync: bool = True):
+        self.config_file = config_file
+        self.journal_file = config_file + JOURNAL_SUFFIX
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._order = []
+        self._sections = {}
+        self._games = {}
+        self._loaded = False
+        self._needs_rewrite = True
+        self._snapshot_signature = None
+        self._snapshot_bytes = 0
+        self._journal = None
+        self._journal_valid = False
+        self._journal_bytes = 0
+        self._base_digest = None
+        self._generation = 0
+        self._tail = None
+        self._compaction_thread = None
+        self._listeners = []
+
+    # --- Odczyt -------------------------------------------------------------
+
+    def load(self):
+        """Wczytuje snapshot i odtwarza dziennik. Zwraca dane lub None."""
+        with self._lock:
+            self._close_journal()
+            self._loaded = True
+            self._needs_rewrite = True
+            self._journal_valid = False
+            self._journal_bytes = 0
+
+            try:
+                with open(self.config_file, "rb") as file:
+                    raw = file.read()
+            except FileNotFoundError:
+                raw = None
+
+            data = None
+            self._base_digest = None
+            self._snapshot_signature = None
+            if raw is not None:
+                data = json.loads(raw.decode("utf-8"))
+                self._base_digest = hashlib.sha1(raw).hexdigest()
+                self._snapshot_bytes = len(raw)
+                self._snapshot_signature = _file_signature(self.config_file)
+                if isinstance(data, dict):
+                    self._needs_rewrite = False
+                    data = self._replay_journals(data)
+
+            self._remember_state(data if isinstance(data, dict) else {})
+            self._notify(dict(self._games), full=True)
+            return data
+
+    def _replay_journals(self, data):
+        next_journal = self.config_file + _NEXT_JOURNAL_SUFFIX
+        for path in (next_journal, self.journal_file):
+            if not os.path.exists(path):
+                continue
+            applied = self._replay_file(path, data)
+            if applied is None:
+                continue
+            if path == next_journal:
+                # Przerwana kompaktacja: snapshot już podmieniony, dziennik nie.
+                os.replace(next_journal, self.journal_file)
+            self._journal_valid = True
+            self._journal_bytes = os.path.getsize(self.journal_file)
+            if applied:
+                logging.info(
+                    f"Odtworzono {applied} wpisów dziennika konfiguracji z '{path}'."
+                )
+            return data
+
+        if os.path.exists(self.journal_file):
+            logging.warning(
+                f"Dziennik '{self.journal_file}' nie pasuje do snapshotu "
+                f"(plik nadpisany z zewnątrz?). Pomijam go."
+            )
+        return data
+
+    def _replay_file(self, path: str, data: dict):
+        """Nakłada wpisy dziennika na dane. None, gdy dziennik jest z innego snapshotu."""
+        with open(path, "rb") as file:
+            raw = file.read()
+        lines = raw.split(b"\n")
+        try:
+            header = json.loads(lines[0])
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not isinstance(header, dict) or header.get("base") != self._base_digest:
+            return None
+
+        applied = 0
+        offset = len(lines[0]) + 1
+        # Ostatni element to fragment po ostatnim "\n" - pusty, gdy zapis był pełny.
+        for line in lines[1:-1]:
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            if "g" in record:
+                games = data.setdefault(GAMES_KEY, {})
+                if "v" in record:
+                    games[record["g"]] = record["v"]
+                else:
+                    games.pop(record["g"], None)
+            elif "s" in record:
+                if "v" in record:
+                    data[record["s"]] = record["v"]
+                else:
+                    data.pop(record["s"], None)
+            applied += 1
+            offset += len(line) + 1
+
+        if offset < len(raw):
+            # Urwany wpis (awaria w trakcie dopisywania) - obcinamy, by kolejne
+            # wpisy nie skleiły się z uszkodzonym fragmentem.
+            logging.warning(f"Uszkodzony wpis na końcu dziennika '{path}'. Obcinam.")
+            with open(path, "r+b") as file:
+                file.truncate(offset)
+        return applied
+
+    def _remember_state(self, data: dict):
+        self._order = list(data.keys())
+        self._sections = {}
+        self._games = {}
+        for key, value in list(data.items()):
+            if key == GAMES_KEY and isinstance(value, dict):
+                for name, game in list(value.items()):
+                    self._games[name] = _dumps(game)
+            else:
+                self._sections[key] = _dumps(value)
+
+    # --- Zapis --------------------------------------------------------------
+
+    def save(self, data: dict):
+        """Utrwala zmiany względem poprzedniego zapisu."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            if _file_signature(self.config_file) != self._snapshot_signature:
+                self._needs_rewrite = True
+
+            if self._needs_rewrite:
+                self._remember_state(data)
+                self._write_full_snapshot()
+                self._notify(dict(self._games), full=True)
+                return
+
+            try:
+                records, changed_games = self._diff(data)
+                if records:
+                    self._append(records)
+            except Exception:
+                # Stan w pamięci mógł rozjechać się z dyskiem - następny zapis pełny.
+                self._needs_rewrite = True
+                raise
+            if changed_games:
+                self._notify(changed_games, full=False)
+
+        self._maybe_compact()
+
+    def _diff(self, data: dict):
+        records = []
+        changed_games = {}
+        seen_sections = set()
+        seen_games = set()
+        # list() - dane mogą być modyfikowane równolegle z wątku Tk.
+        for key, value in list(data.items()):
+            if key == GAMES_KEY and isinstance(value, dict):
+                for name, game in list(value.items()):
+                    seen_games.add(name)
+                    text = _dumps(game)
+                    if self._games.get(name) != text:
+                        self._games[name] = text
+                        changed_games[name] = text
+                        records.append(f'{{"g": {_dumps(name)}, "v": {text}}}')
+            else:
+                seen_sections.add(key)
+                text = _dumps(value)
+                if self._sections.get(key) != text:
+                    self._sections[key] = text
+                    records.append(f'{{"s": {_dumps(key)}, "v": {text}}}')
+
+        for name in [n for n in self._games if n not in seen_games]:
+            del self._games[name]
+            changed_games[name] = None
+            records.append(f'{{"g": {_dumps(name)}}}')
+        for key in [k for k in self._sections if k not in seen_sections]:
+            del self._sections[key]
+            records.append(f'{{"s": {_dumps(key)}}}')
+
+        self._order = list(data.keys())
+        return records, changed_games
+
+    # --- Obserwatorzy -------------------------------------------------------
+
+    def add_listener(self, listener):
+        """Rejestruje ``listener(changed_games, full)`` wołany po każdym zapisie.
+
+        ``changed_games`` mapuje nazwę gry na jej JSON (``None`` = usunięta).
+        Przy ``full=True`` mapa zawiera całą bibliotekę. Nowy obserwator od razu
+        dostaje pełny stan.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if self._loaded:
+                self._call_listener(listener, dict(self._games), True)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, changed_games: dict, full: bool):
+        for listener in list(self._listeners):
+            self._call_listener(listener, changed_games, full)
+
+    def _call_listener(self, listener, changed_games: dict, full: bool):
+        try:
+            listener(changed_games, full)
+        except Exception as e:
+            logging.error(f"Błąd obserwatora dziennika konfiguracji: {e}")
+
+    def _append(self, records):
+        payload = ("\n".join(records) + "\n").encode("utf-8")
+        if self._journal is None:
+            self._open_journal()
+        self._journal.write(payload)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_bytes += len(payload)
+        if self._tail is not None:
+            self._tail.append(payload)
+
+    def _journal_header(self, digest: str) -> bytes:
+        return (_dumps({"base": digest}) + "\n").encode("utf-8")
+
+    def _open_journal(self):
+        if self._journal_valid:
+            self._journal = open(self.journal_file, "ab")
+            return
+        header = self._journal_header(self._base_digest)
+        _fsync_write(self.journal_file, header)
+        self._journal = open(self.journal_file, "ab")
+        self._journal_valid = True
+        self._journal_bytes = len(header)
+
+    def _close_journal(self):
+        if self._journal is not None:
+            try:
+                self._journal.close()
+            except OSError as e:
+                logging.warning(f"Błąd zamykania dziennika konfiguracji: {e}")
+            self._journal = None
+
+    # --- Snapshoty ----------------------------------------------------------
+
+    def _render_snapshot(self) -> bytes:
+        parts = []
+        for key in self._order:
+            if key == GAMES_KEY and key not in self._sections:
+                if self._games:
+                    games_text = (
+                        "{\n"
+                        + ",\n".join(
+                            f"        {_dumps(name)}: {text}"
+                            for name, text in self._games.items()
+                        )
+                        + "\n    }"
+                    )
+                else:
+                    games_text = "{}"
+                parts.append(f"    {_dumps(key)}: {games_text}")
+            elif key in self._sections:
+                parts.append(f"    {_dumps(key)}: {self._sections[key]}")
+        return ("{\n" + ",\n".join(parts) + "\n}\n").encode("utf-8")
+
+    def _write_full_snapshot(self):
+        """Synchroniczny zapis całego snapshotu i nowego, pustego dziennika."""
+        payload = self._render_snapshot()
+        config_dir = os.path.dirname(self.config_file)
+        if config_dir:
+            os.makedirs(config_dir, exist_ok=True)
+        tmp_path = _snapshot_tmp_path(self.config_file)
+        _fsync_write(tmp_path, payload)
+        self._swap_snapshot(tmp_path, payload, tail=())
+        self._needs_rewrite = False
+
+    def _swap_snapshot(self, tmp_path: str, payload: bytes, tail):
+        """Podmienia snapshot i dziennik. Wywoływane z założoną blokadą."""
+        digest = hashlib.sha1(payload).hexdigest()
+        next_journal = self.config_file + _NEXT_JOURNAL_SUFFIX
+        journal_payload = self._journal_header(digest) + b"".join(tail)
+        _fsync_write(next_journal, journal_payload)
+
+        self._close_journal()
+        os.replace(tmp_path, self.config_file)
+        os.replace(next_journal, self.journal_file)
+
+        self._base_digest = digest
+        self._snapshot_bytes = len(payload)
+        self._snapshot_signature = _file_signature(self.config_file)
+        self._journal_valid = True
+        self._journal_bytes = len(journal_payload)
+        self._generation += 1
+
+    def _maybe_compact(self):
+        with self._lock:
+            threshold = max(_MIN_COMPACT_BYTES, self._snapshot_bytes // 2)
+            if self._journal_bytes < threshold:
+                return
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(
+                target=self._compact_safely, daemon=True
+            )
+            self._compaction_thread.start()
+
+    def _compact_safely(self):
+        try:
+            self._compact()
+        except Exception as e:
+            logging.error(f"Błąd kompaktacji dziennika konfiguracji: {e}")
+
+    def _compact(self):
+        with self._lock:
+            if self._needs_rewrite or not self._loaded:
+                return
+            payload = self._render_snapshot()
+            generation = self._generation
+            self._tail = []
+
+        tmp_path = _snapshot_tmp_path(self.config_file)
+        try:
+            try:
+                _fsync_write(tmp_path, payload)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            with self._lock:
+                if self._generation != generation or self._needs_rewrite:
+                    os.remove(tmp_path)
+                    return
+                self._swap_snapshot(tmp_path, payload, tail=self._tail)
+                logging.debug(
+                    f"Skompaktowano dziennik konfiguracji ({len(payload)} B snapshotu)."
+                )
+        finally:
+            with self._lock:
+                self._tail = None
+
+    def checkpoint(self):
+        """Synchronicznie składa snapshot, aby config.json był kompletny na dysku."""
+        thread = self._compaction_thread
+        if thread and thread.is_alive():
+            thread.join()
+        with self._lock:
+            if not self._loaded:
+                return
+            if self._journal_bytes <= len(self._journal_header(self._base_digest or "")):
+                return
+        self._compact()
+
+    def close(self):
+        with self._lock:
+            self._close_journal()
+
+
+def get_config_journal(config_file: str) -> ConfigJournal:
+    """Zwraca współdzieloną instancję dziennika dla danego pliku konfiguracji."""
+    key = os.path.abspath(config_file)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = ConfigJournal(config_file)
+            _journals[key] = journal
+        return journal
+
+
+__all__ = ["ConfigJournal", "get_config_journal"]
@@ -7,12 +7,14 @@ import uuid
 
 from packaging import version
 
+from launcher.config_journal import get_config_journal
 from launcher.utils import (
     CONFIG_FILE,
     GAMES_FOLDER,
     LOCAL_SETTINGS_FILE,
     DEFAULT_MUSIC_HOTKEYS,
     PROGRAM_VERSION,
+    flush_config,
 )
 
 
@@ -143,6 +145,9 @@ def load_local_settings():
     data.setdefault("window_geometry", "1024x768+100+100")
     data.setdefault("library_view_mode", "tiles")
     data.setdefault("tiles_per_row", 3)
+    data.setdefault("virtual_grid", False)
+    data.setdefault("stats_backend", "rollups")
+    data.setdefault("mod_deploy_hardlinks", False)
     data.setdefault("discord_rpc_enabled", False)
     data.setdefault("discord_status_text", "Korzysta z Game Launcher")
     data.setdefault("ui_font", "Segoe UI")
@@ -196,14 +201,12 @@ def load_config():
     _migrate_legacy_file("config.json", CONFIG_FILE)
     _migrate_legacy_directory("games_saves", GAMES_FOLDER)
 
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r", encoding="utf-8") as file:
-            try:
-                data = json.load(file)
-            except json.JSONDecodeError as e:
-                logging.error(f"Blad odczytu pliku {CONFIG_FILE}: {e}. Tworzenie nowego.")
-                return _default_config()
-    else:
+    try:
+        data = get_config_journal(CONFIG_FILE).load()
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        logging.error(f"Blad odczytu pliku {CONFIG_FILE}: {e}. Tworzenie nowego.")
+        return _default_config()
+    if data is None:
         data = _default_config()
 
     data.setdefault("version", "0.0.0")
@@ -252,6 +255,9 @@ def load_config():
     settings.setdefault("scan_recursively", True)
     settings.setdefault("autoscan_screenshot_folders", [])
     settings.setdefault("autoscan_on_startup", False)
+    settings.setdefault("folder_watch_enabled", False)
+    settings.setdefault("save_snapshot_verify_hash", False)
+    settings.setdefault("library_sqlite_index", False)
     settings.setdefault(
         "screenshot_scan_ignore_folders", ["thumb_cache", "cache", "temp", "thumbnails"]
     )
@@ -307,3 +313,12 @@ def load_config():
     user_data.setdefault("achievements", {})
 
     return data
+
+
+def checkpoint_config():
+    """Sklada dziennik zmian w pelny config.json (np. przed backupem)."""
+    flush_config()
+    try:
+        get_config_journal(CONFIG_FILE).checkpoint()
+    except OSError as e:
+        logging.error(f"Blad kompaktacji dziennika {CONFIG_FILE}: {e}")
@@ -1,7 +1,6 @@
 import datetime
 import logging
 import os
-import re
 import shutil
 import subprocess
 import sys
@@ -9,14 +8,13 @@ import threading
 import tkinter as tk
 from tkinter import messagebox, ttk
 
+from launcher.name_index import GameNameIndex, normalize_game_name
 from launcher.utils import GAMES_FOLDER, IMAGES_FOLDER, save_config
 
 
 def _normalize_game_name_for_duplicates(self, name):
     """Tworzy 'klucz' do porównywania nazw gier, ignorując drobne różnice."""
-    normalized = name.lower()
-    normalized = re.sub(r"[^a-z]", "", normalized)
-    return normalized
+    return normalize_game_name(name)
 
 
 def start_duplicate_scan_thread(self):
@@ -37,27 +35,15 @@ def start_duplicate_scan_thread(self):
 def find_potential_duplicates(self):
     """Logika wyszukiwania potencjalnych duplikatów."""
     logging.info("Rozpoczynanie wyszukiwania duplikatów...")
-    potential_duplicates = {}
     processed_count = 0
     total_games = len(self.games)
 
     try:
-        for original_name in list(self.games.keys()):
-            normalized = self._normalize_game_name_for_duplicates(original_name)
-            if not normalized:
-                continue
-
-            if normalized not in potential_duplicates:
-                potential_duplicates[normalized] = []
-            potential_duplicates[normalized].append(original_name)
+        name_index = GameNameIndex(list(self.games.keys()))
 
         _ = processed_count
         _ = total_games
-        duplicate_groups = {
-            norm_name: games_list
-            for norm_name, games_list in potential_duplicates.items()
-            if len(games_list) > 1
-        }
+        duplicate_groups = name_index.groups(min_size=2)
 
         logging.info(
             f"Znaleziono {len(duplicate_groups)} grup potencjalnych duplikatów."
@@ -2,9 +2,19 @@ import logging
 import os
 import shutil
 import threading
-import time
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
+
+from launcher.copy_engine import (
+    CopyCancelled,
+    CopyEngine,
+    estimate_copy,
+    format_size,
+    plan_tree_copy,
+)
+
+# Od tego rozmiaru kopiowanie wymaga potwierdzenia (dry-run ``estimate_copy``).
+CONFIRM_COPY_BYTES = 1024 * 1024 * 1024
 
 
 def _copy_or_delete_with_progress(
@@ -16,7 +26,7 @@ def _copy_or_delete_with_progress(
     parent_window=None,
     callback_on_success=None,
 ):
-    """Wykonuje kopiowanie (copytree) lub usuwanie (rmtree) w tle z paskiem postępu."""
+    """Wykonuje kopiowanie (równoległe, ``CopyEngine``) lub usuwanie (rmtree) w tle z paskiem postępu."""
     if parent_window is None:
         parent_window = self.root
 
@@ -39,31 +49,33 @@ def _copy_or_delete_with_progress(
         )
         return False
 
-    try:
-        total_files = 0
-        if os.path.isdir(source_path) and operation_type == "copy":
-            for _, _, files_in_dir_count in os.walk(source_path):
-                total_files += len(files_in_dir_count)
-        elif os.path.isfile(source_path) and operation_type == "copy":
-            total_files = 1
-        elif operation_type == "delete":
-            total_files = 1
-
-        if total_files == 0 and operation_type == "copy":
-            if dest_path:
-                os.makedirs(dest_path, exist_ok=True)
-            messagebox.showinfo(
-                "Informacja", "Folder źródłowy jest pusty.", parent=parent_window
-            )
-            if callback_on_success:
-                self.root.after(0, callback_on_success)
-            return True
+    if operation_type == "copy":
+        try:
+            file_count, total_bytes = estimate_copy(source_path)
+        except OSError as e:
+            logging.warning(f"Nie można oszacować rozmiaru '{source_path}': {e}")
+        else:
+            logging.info(f"Do skopiowania: {file_count} plików, {format_size(total_bytes)}")
+            if total_bytes >= CONFIRM_COPY_BYTES and not messagebox.askyesno(
+                operation_title,
+                f"Skopiować {file_count} plików ({format_size(total_bytes)})?\n\n"
+                f"{source_path}\n-> {dest_path}",
+                parent=parent_window,
+            ):
+                logging.info(f"Operacja '{operation_type}' anulowana przed rozpoczęciem.")
+                return False
 
+    try:
         self.show_progress_window(operation_title)
-        self.progress_bar["maximum"] = total_files
+        self.progress_bar["maximum"] = 100
         self.progress_bar["value"] = 0
         self.progress_bar["mode"] = "determinate"
-        self.progress_label.config(text=f"0 / {total_files}")
+        self.progress_label.config(
+            text="Obliczanie rozmiaru..." if operation_type == "copy" else "Usuwanie..."
+        )
+        cancel_event = threading.Event()
+        if operation_type == "copy":
+            _add_progress_cancel_button(self, cancel_event)
 
         op_thread = threading.Thread(
             target=self._perform_file_operation_thread,
@@ -71,8 +83,9 @@ def _copy_or_delete_with_progress(
                 "operation_type": operation_type,
                 "src": source_path,
                 "dst": dest_path,
-                "total_files": total_files,
+                "total_files": None,
                 "callback_on_success": callback_on_success,
+                "cancel_event": cancel_event,
             },
             daemon=True,
         )
@@ -91,47 +104,49 @@ def _copy_or_delete_with_progress(
         return False
 
 
+def _add_progress_cancel_button(self, cancel_event):
+    """Dodaje do okna postępu przycisk przerywający operację."""
+    button = getattr(self, "_progress_cancel_button", None)
+    if button is not None and button.winfo_exists():
+        button.config(command=cancel_event.set, state=tk.NORMAL)
+        return
+    self.progress_window.geometry("350x150")
+    self._progress_cancel_button = ttk.Button(
+        self.progress_window, text="Anuluj", command=cancel_event.set
+    )
+    self._progress_cancel_button.pack(pady=(5, 0))
+
+
 def _perform_file_operation_thread(
-    self, operation_type, src, dst, total_files, callback_on_success=None
+    self, operation_type, src, dst, total_files=None, callback_on_success=None, cancel_event=None
 ):
     """Wykonuje kopiowanie lub usuwanie plików w osobnym wątku."""
     processed_files = 0
-    last_update_time = time.time()
     operation_completed_successfully = False
+    cancelled = False
+
+    def report(progress):
+        self.root.after(0, self._update_copy_progress_ui, progress.percent, progress.describe())
 
     try:
         if operation_type == "copy":
-            os.makedirs(dst, exist_ok=True)
-            for root_dir, dirs, files_in_dir_loop in os.walk(src):
-                relative_path_loop = os.path.relpath(root_dir, src)
-                dest_root_loop = os.path.join(dst, relative_path_loop)
-                os.makedirs(dest_root_loop, exist_ok=True)
-
-                for file_item_loop in files_in_dir_loop:
-                    source_file_loop = os.path.join(root_dir, file_item_loop)
-                    dest_file_loop = os.path.join(dest_root_loop, file_item_loop)
-                    try:
-                        shutil.copy2(source_file_loop, dest_file_loop)
-                        processed_files += 1
-                        now = time.time()
-                        if now - last_update_time > 0.1 or processed_files == total_files:
-                            percent = (
-                                int((processed_files / total_files) * 100)
-                                if total_files > 0
-                                else 100
-                            )
-                            progress_text = f"{processed_files} / {total_files}"
-                            if hasattr(self, "_update_copy_progress_ui"):
-                                self.root.after(
-                                    0,
-                                    self._update_copy_progress_ui,
-                                    percent,
-                                    progress_text,
-                                )
-                            last_update_time = now
-                    except Exception as copy_e:
-                        logging.error(f"Błąd kopiowania {source_file_loop}: {copy_e}")
-                        raise copy_e
+            engine = CopyEngine(progress=report, cancel_event=cancel_event)
+            if os.path.isfile(src):
+                dest_file = os.path.join(dst, os.path.basename(src)) if os.path.isdir(dst) else dst
+                stats = engine.copy_files(
+                    [(src, dest_file, os.path.getsize(src))], workers_hint=(src,)
+                )
+            else:
+                files, dirs = plan_tree_copy(src, dst)
+                for dest_dir in dirs:
+                    os.makedirs(dest_dir, exist_ok=True)
+                if not files:
+                    self.root.after(
+                        0,
+                        lambda: messagebox.showinfo("Informacja", "Folder źródłowy jest pusty."),
+                    )
+                stats = engine.copy_files(files, workers_hint=(src, dst))
+            processed_files = stats.files_done
             operation_completed_successfully = True
 
         elif operation_type == "delete":
@@ -139,7 +154,7 @@ def _perform_file_operation_thread(
                 if hasattr(self, "_update_copy_progress_ui"):
                     self.root.after(0, self._update_copy_progress_ui, 50, "Usuwanie...")
             shutil.rmtree(src)
-            processed_files = total_files
+            processed_files = 1
             if hasattr(self, "progress_window") and self.progress_window.winfo_exists():
                 if hasattr(self, "_update_copy_progress_ui"):
                     self.root.after(0, self._update_copy_progress_ui, 100, "Zakończono")
@@ -152,6 +167,9 @@ def _perform_file_operation_thread(
         if operation_completed_successfully and callback_on_success:
             self.root.after(0, callback_on_success)
 
+    except CopyCancelled:
+        cancelled = True
+        logging.info(f"Operacja '{operation_type}' dla '{src}' przerwana przez użytkownika.")
     except Exception as thread_e:
         operation_completed_successfully = False
         logging.exception(
@@ -161,7 +179,7 @@ def _perform_file_operation_thread(
         if hasattr(self, "progress_window") and self.progress_window.winfo_exists():
             self.root.after(150, self._destroy_progress_window)
 
-        if not operation_completed_successfully:
+        if not operation_completed_successfully and not cancelled:
             parent_for_error = self.root
             active_toplevels = [
                 win
@@ -0,0 +1,491 @@
+"""
+Obserwowanie folderów screenshotów i folderów gier.
+
+Backend zgłasza nowe pliki i foldery w obserwowanych drzewach:
+``InotifyBackend`` (Linux, przez ctypes) albo ``PollingBackend`` (wszędzie -
+porównuje mtime folderów i listuje tylko te, które się zmieniły).
+``FolderWatcher`` kieruje zdarzenia dalej:
+
+* nowe obrazy w ``autoscan_screenshot_folders`` trafiają prosto do
+  ``ScreenshotMatcher`` (paczkami co kilka sekund), a otwarte okno
+  szczegółów gry odświeża zakładkę screenshotów;
+* nowe foldery w ``scan_folders`` czekają, aż przestaną się zmieniać
+  (instalacja/rozpakowywanie), po czym są sprawdzane jak przy skanowaniu
+  i pasujące gry trafiają do okna weryfikacji skanowania.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from launcher.name_index import GameNameIndex
+from launcher.scan_engine import DirectoryIndex, ScanEngine
+from launcher.screenshot_index import SCREENSHOT_EXTENSIONS, ScreenshotMatcher
+from launcher.utils import save_config
+
+POLL_INTERVAL = 10.0
+SCREENSHOT_BATCH_DELAY = 2.0
+# Nowy folder gry jest sprawdzany, gdy przez tyle sekund nic się w nim nie zmieniło.
+GAME_FOLDER_SETTLE_SECONDS = 30.0
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE_SELF
+_IN_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _WatchRoot:
+    __slots__ = ("path", "ignored_names", "max_depth")
+
+    def __init__(self, path, ignored_names=(), max_depth=None):
+        self.path = os.path.abspath(path)
+        self.ignored_names = {name.lower() for name in ignored_names}
+        self.max_depth = max_depth
+
+    def depth_of(self, dir_path):
+        rel = os.path.relpath(dir_path, self.path)
+        return 0 if rel == "." else rel.count(os.sep) + 1
+
+    def should_descend(self, dir_path):
+        if os.path.basename(dir_path).lower() in self.ignored_names:
+            return False
+        return self.max_depth is None or self.depth_of(dir_path) <= self.max_depth
+
+
+def _iter_tree(root, start_path):
+    """Foldery drzewa od ``start_path`` (z pominięciem ignorowanych) i ich listingi."""
+    stack = [start_path]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        subdirs, files = [], []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                else:
+                    files.append(entry.path)
+            except OSError:
+                continue
+        yield dir_path, subdirs, files
+        stack.extend(d for d in subdirs if root.should_descend(d))
+
+
+class PollingBackend:
+    """Wykrywanie zmian przez porównanie mtime folderów co ``interval`` sekund."""
+
+    name = "polling"
+
+    def __init__(self, interval=POLL_INTERVAL):
+        self.interval = interval
+        self._dirs = {}  # ścieżka -> (root, mtime_ns, nazwy wpisów)
+        self._next_poll = time.monotonic() + interval
+
+    def add_root(self, root):
+        for dir_path, subdirs, files in _iter_tree(root, root.path):
+            self._remember(root, dir_path, subdirs + files)
+
+    def _remember(self, root, dir_path, entries):
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return
+        self._dirs[dir_path] = (root, mtime_ns, {os.path.basename(p) for p in entries})
+
+    def read(self, timeout):
+        remaining = self._next_poll - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            if time.monotonic() < self._next_poll:
+                return []
+        self._next_poll = time.monotonic() + self.interval
+        events = []
+        for dir_path, (root, mtime_ns, names) in list(self._dirs.items()):
+            try:
+                current_mtime = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                self._dirs.pop(dir_path, None)
+                continue
+            if current_mtime == mtime_ns:
+                continue
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = {entry.name: entry for entry in it}
+            except OSError:
+                continue
+            self._dirs[dir_path] = (root, current_mtime, set(entries))
+            for name in set(entries) - names:
+                entry = entries[name]
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                events.append((entry.path, is_dir))
+                if is_dir and root.should_descend(entry.path):
+                    for sub_path, subdirs, files in _iter_tree(root, entry.path):
+                        self._remember(root, sub_path, subdirs + files)
+                        events.extend((d, True) for d in subdirs)
+                        events.extend((f, False) for f in files)
+        return events
+
+    def close(self):
+        self._dirs.clear()
+
+
+class InotifyBackend:
+    """Powiadomienia jądra Linux (inotify) - bez okresowego przeglądania folderów."""
+
+    name = "inotify"
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify jest dostępne tylko na Linuksie")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._watches = {}  # wd -> (root, ścieżka folderu)
+
+    def _add_watch(self, root, dir_path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _IN_WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOSPC, errno.ENOMEM):
+                # Wyczerpany limit fs.inotify.max_user_watches - przejdziemy na polling.
+                raise OSError(err, os.strerror(err), dir_path)
+            logging.debug(f"inotify: pominięto '{dir_path}': {os.strerror(err)}")
+            return
+        self._watches[wd] = (root, dir_path)
+
+    def add_root(self, root):
+        for dir_path, _subdirs, _files in _iter_tree(root, root.path):
+            self._add_watch(root, dir_path)
+
+    def _add_tree(self, root, dir_path, events):
+        """Obserwuje nowy folder; pliki utworzone przed dodaniem obserwacji też zgłasza."""
+        for sub_path, subdirs, files in _iter_tree(root, dir_path):
+            self._add_watch(root, sub_path)
+            if sub_path != dir_path:
+                events.append((sub_path, True))
+            events.extend((f, False) for f in files)
+
+    def read(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _IN_EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = _IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += _IN_EVENT_HEADER.size
+            name = data[offset : offset + name_len].split(b"\0", 1)[0]
+            offset += name_len
+
+            if mask & _IN_Q_OVERFLOW:
+                logging.warning("inotify: przepełniona kolejka zdarzeń - część zmian pominięta.")
+                continue
+            if mask & (_IN_IGNORED | _IN_DELETE_SELF):
+                self._watches.pop(wd, None)
+                continue
+            watch = self._watches.get(wd)
+            if watch is None or not name:
+                continue
+            root, dir_path = watch
+            path = os.path.join(dir_path, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    events.append((path, True))
+                    if root.should_descend(path):
+                        self._add_tree(root, path, events)
+            elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                events.append((path, False))
+        return events
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches.clear()
+
+
+def create_watch_backend(roots):
+    """Backend z dodanymi folderami: inotify, jeśli dostępne, inaczej polling."""
+    try:
+        backend = InotifyBackend()
+    except (OSError, AttributeError) as e:
+        logging.info(f"Obserwowanie folderów: inotify niedostępne ({e}), używam pollingu.")
+    else:
+        try:
+            for root in roots:
+                backend.add_root(root)
+            return backend
+        except OSError as e:
+            logging.warning(f"Obserwowanie folderów: inotify nie wystarcza ({e}), używam pollingu.")
+            backend.close()
+    backend = PollingBackend()
+    for root in roots:
+        backend.add_root(root)
+    return backend
+
+
+def _is_under(path, prefixes):
+    return any(path == p or path.startswith(os.path.join(p, "")) for p in prefixes)
+
+
+class FolderWatcher:
+    """Wątek obserwujący foldery screenshotów i gier z ustawień launchera."""
+
+    def __init__(self, launcher):
+        self.launcher = launcher
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._backend = None
+        self._config_key = None
+        self._screenshot_roots = ()
+        self._scan_roots = ()
+        self._pending_screenshots = []
+        self._screenshots_since = None
+        self._pending_game_dirs = {}  # folder -> czas ostatniej zmiany
+        # Własny indeks w pamięci - scan_index.json należy do ręcznego skanowania,
+        # które może działać w tym samym czasie.
+        self._scan_index = DirectoryIndex(index_file=None)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="FolderWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    # --- Konfiguracja ---
+
+    def _read_config(self):
+        settings = self.launcher.settings
+        return (
+            tuple(settings.get("autoscan_screenshot_folders", [])),
+            tuple(sorted(n.lower() for n in settings.get("screenshot_scan_ignore_folders", []))),
+            tuple(settings.get("scan_folders", [])),
+            tuple(sorted(n.lower() for n in settings.get("scan_ignore_folders", []))),
+            bool(settings.get("scan_recursively", True)),
+        )
+
+    def _ensure_backend(self):
+        """(Re)buduje backend po zmianie listy obserwowanych folderów w ustawieniach."""
+        config_key = self._read_config()
+        if config_key == self._config_key and self._backend is not None:
+            return
+        ss_folders, ss_ignored, scan_folders, scan_ignored, recursive = config_key
+        roots = [_WatchRoot(f, ss_ignored) for f in ss_folders if os.path.isdir(f)]
+        roots += [
+            _WatchRoot(f, scan_ignored, None if recursive else 0)
+            for f in scan_folders
+            if os.path.isdir(f)
+        ]
+        if self._backend is not None:
+            self._backend.close()
+        self._backend = create_watch_backend(roots)
+        self._config_key = config_key
+        self._screenshot_roots = tuple(os.path.abspath(f) for f in ss_folders)
+        self._scan_roots = tuple(os.path.abspath(f) for f in scan_folders)
+        logging.info(
+            f"Obserwowanie folderów ({self._backend.name}): {len(ss_folders)} screenshotów, "
+            f"{len(scan_folders)} gier."
+        )
+
+    # --- Pętla ---
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._ensure_backend()
+                for path, is_dir in self._backend.read(timeout=1.0):
+                    self._route(path, is_dir)
+                now = time.monotonic()
+                if (
+                    self._pending_screenshots
+                    and now - self._screenshots_since >= SCREENSHOT_BATCH_DELAY
+                ):
+                    self._flush_screenshots()
+                self._check_settled_game_dirs(now)
+            except Exception:
+                logging.exception("Błąd w wątku obserwowania folderów.")
+                self._stop_event.wait(5)
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+        self._config_key = None
+
+    def _route(self, path, is_dir):
+        if (
+            not is_dir
+            and path.lower().endswith(SCREENSHOT_EXTENSIONS)
+            and _is_under(path, self._screenshot_roots)
+        ):
+            if not self._pending_screenshots:
+                self._screenshots_since = time.monotonic()
+            self._pending_screenshots.append(path)
+        if _is_under(path, self._scan_roots):
+            self._note_game_folder_activity(path, is_dir)
+
+    # --- Screenshoty ---
+
+    def _flush_screenshots(self):
+        paths, self._pending_screenshots = self._pending_screenshots, []
+        matcher = ScreenshotMatcher(self.launcher.games)
+        matched_games = set()
+        for path in paths:
+            game_name = matcher.match(path)
+            if game_name is not None:
+                matched_games.add(game_name)
+        if not matched_games:
+            return
+        save_config(self.launcher.config)
+        from launcher.screenshot_scan_runtime import _refresh_details_screenshots
+
+        for game_name in matched_games:
+            self.launcher.root.after(
+                0, lambda gn=game_name: _refresh_details_screenshots(self.launcher, gn)
+            )
+
+    # --- Nowe foldery gier ---
+
+    def _note_game_folder_activity(self, path, is_dir):
+        now = time.monotonic()
+        for pending in self._pending_game_dirs:
+            if _is_under(path, (pending,)):
+                self._pending_game_dirs[pending] = now
+                return
+        if is_dir:
+            self._pending_game_dirs[path] = now
+
+    def _check_settled_game_dirs(self, now):
+        settled = [
+            path
+            for path, last_change in self._pending_game_dirs.items()
+            if now - last_change >= GAME_FOLDER_SETTLE_SECONDS
+        ]
+        if not settled:
+            return
+        for path in settled:
+            del self._pending_game_dirs[path]
+        existing = [p for p in settled if os.path.isdir(p)]
+        if existing:
+            self._offer_game_candidates(existing)
+
+    def _folders_by_scan_depth(self, folders, recursive):
+        """Grupuje nowe foldery po głębokości względem folderu skanowania (jak przy skanowaniu)."""
+        by_depth = {}
+        for folder in folders:
+            folder = os.path.abspath(folder)
+            containing = [r for r in self._scan_roots if folder != r and _is_under(folder, (r,))]
+            if not containing:
+                continue
+            root = max(containing, key=len)
+            depth = os.path.relpath(folder, root).count(os.sep) + 1
+            # Bez rekurencji skanowanie sprawdza tylko bezpośrednie podfoldery.
+            if not recursive and depth > 1:
+                continue
+            by_depth.setdefault(depth, []).append(folder)
+        return by_depth
+
+    def _offer_game_candidates(self, folders):
+        from launcher.scan_pipeline import build_game_candidate, offer_watched_game_candidates
+
+        settings = self.launcher.settings
+        recursive = settings.get("scan_recursively", True)
+        library_names = GameNameIndex(list(self.launcher.games.keys()))
+        candidate_names = GameNameIndex()
+        candidates = []
+
+        def on_folder(folder_path, potential_exes):
+            game_info = build_game_candidate(
+                self.launcher, folder_path, potential_exes, library_names, candidate_names
+            )
+            if game_info:
+                candidates.append(game_info)
+
+        for depth, depth_folders in sorted(self._folders_by_scan_depth(folders, recursive).items()):
+            ScanEngine(
+                depth_folders,
+                recursive=recursive,
+                ignored_folder_names=[n.lower() for n in settings.get("scan_ignore_folders", [])],
+                ignored_exe_names=self.launcher.find_likely_executable.ignore_files,
+                index=self._scan_index,
+                workers=2,
+                root_depth=depth,
+            ).run(on_folder, cancel_event=self._stop_event)
+        if candidates:
+            logging.info(
+                f"Obserwowanie folderów: {len(candidates)} nowych gier w {folders}"
+            )
+            self.launcher.root.after(
+                0, lambda c=candidates: offer_watched_game_candidates(self.launcher, c)
+            )
+
+
+def start_folder_watcher(self):
+    """Uruchamia obserwowanie folderów, jeśli jest włączone w ustawieniach."""
+    if not self.settings.get("folder_watch_enabled", False):
+        return
+    watcher = getattr(self, "_folder_watcher", None)
+    if watcher is None:
+        watcher = FolderWatcher(self)
+        self._folder_watcher = watcher
+    watcher.start()
+
+
+def stop_folder_watcher(self):
+    watcher = getattr(self, "_folder_watcher", None)
+    if watcher is not None:
+        watcher.stop()
+        self._folder_watcher = None
+
+
+def _save_folder_watch_setting(self):
+    """Włącza/wyłącza obserwowanie folderów z poziomu ustawień."""
+    enabled = self.folder_watch_var.get()
+    self.settings["folder_watch_enabled"] = enabled
+    save_config(self.config)
+    logging.info(f"Ustawienie folder_watch_enabled zmienione na: {enabled}")
+    if enabled:
+        start_folder_watcher(self)
+    else:
+        stop_folder_watcher(self)
+
+
+__all__ = [
+    "PollingBackend",
+    "InotifyBackend",
+    "create_watch_backend",
+    "FolderWatcher",
+    "start_folder_watcher",
+    "stop_folder_watcher",
+    "_save_folder_watch_setting",
+]
@@ -9,6 +9,7 @@ from tkinter import messagebox
 
 import psutil
 
+from launcher.process_watcher import get_process_watcher
 from launcher.utils import save_config
 from ui.components import ToolTip
 
@@ -115,6 +116,7 @@ def launch_game(self, game_name, profile=None):
         try:
             process = subprocess.Popen(command)
             self.processes[game_name] = process
+            get_process_watcher(self).track_launch(game_name, process)
         except OSError as e:
             if e.winerror == 740:
                 logging.error(
@@ -201,98 +203,14 @@ def launch_game(self, game_name, profile=None):
 
 
 def is_game_running(self, game_name):
-    """Sprawdza, czy proces gry (PC lub emulowanej) jest uruchomiony."""
-    game_data = self.games.get(game_name)
-    if not game_data:
-        return False
-
-    game_type = game_data.get("game_type", "pc")
-
-    if game_type == "pc":
-        exe_paths_to_check = set()
-        if game_data.get("exe_path"):
-            exe_paths_to_check.add(os.path.abspath(game_data["exe_path"]))
-        for profile in game_data.get("launch_profiles", []):
-            if profile.get("exe_path"):
-                exe_paths_to_check.add(os.path.abspath(profile["exe_path"]))
-
-        if not exe_paths_to_check:
-            return False
-
-        exe_names_to_check = {os.path.basename(p).lower() for p in exe_paths_to_check}
+    """Sprawdza, czy proces gry (PC lub emulowanej) jest uruchomiony.
 
-        for proc in psutil.process_iter(["name", "exe"]):
-            try:
-                proc_name_lower = proc.info["name"].lower()
-                proc_exe_abs = (
-                    os.path.abspath(proc.info["exe"]) if proc.info["exe"] else None
-                )
-
-                if proc_name_lower in exe_names_to_check:
-                    return True
-                if proc_exe_abs and proc_exe_abs in exe_paths_to_check:
-                    return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError, OSError):
-                continue
-        return False
-
-    elif game_type == "emulator":
-        emulator_name = game_data.get("emulator_name")
-        if not emulator_name:
-            return False
-
-        emulator_config = self.config.get("emulators", {}).get(emulator_name)
-        if not emulator_config or not emulator_config.get("path"):
-            return False
-
-        emulator_exe_path = emulator_config["path"]
-        if not emulator_exe_path:
-            return False
-
-        emulator_exe_path_abs = os.path.abspath(emulator_exe_path)
-        emulator_exe_name_lower = os.path.basename(emulator_exe_path_abs).lower()
-
-        for proc in psutil.process_iter(["name", "exe", "cmdline"]):
-            try:
-                proc_name_lower = proc.info["name"].lower()
-                proc_exe_abs = (
-                    os.path.abspath(proc.info["exe"]) if proc.info["exe"] else None
-                )
-
-                if proc_name_lower == emulator_exe_name_lower or (
-                    proc_exe_abs and proc_exe_abs == emulator_exe_path_abs
-                ):
-                    rom_path = game_data.get("rom_path")
-                    if rom_path and proc.info["cmdline"]:
-                        norm_rom_path = os.path.normcase(os.path.abspath(rom_path))
-                        if any(
-                            norm_rom_path in os.path.normcase(arg)
-                            for arg in proc.info["cmdline"]
-                        ):
-                            logging.debug(
-                                f"Znaleziono proces emulatora ({proc.pid}) z pasującą ścieżką ROM dla '{game_name}'."
-                            )
-                            return True
-                        else:
-                            logging.debug(
-                                f"Znaleziono proces emulatora ({proc.pid}), ale linia komend nie pasuje do ROMu '{game_name}'."
-                            )
-                            continue
-                    else:
-                        logging.warning(
-                            f"Znaleziono proces emulatora dla '{game_name}', ale nie można zweryfikować ROMu w linii komend."
-                        )
-                        return True
-
-            except (psutil.NoSuchProcess, psutil.AccessDenied, TypeError, OSError):
-                continue
-        return False
-
-    else:
-        logging.error(
-            f"Nieznany typ gry '{game_type}' w is_game_running dla '{game_name}'."
-        )
+    Odpowiedź pochodzi ze wspólnego zrzutu procesów (co najwyżej sekundowego),
+    więc seria wywołań - np. przy rysowaniu siatki - skanuje procesy raz.
+    """
+    if game_name not in self.games:
         return False
+    return get_process_watcher(self).is_running(game_name)
 
 
 def close_game(self, game_name):
@@ -302,6 +220,12 @@ def close_game(self, game_name):
         logging.error(f"Próba zamknięcia nieistniejącej gry: {game_name}")
         return
 
+    if get_process_watcher(self).kill_launched(game_name):
+        messagebox.showinfo("Informacja", f"Gra '{game_name}' została zamknięta.")
+        self.root.after(50, self.update_game_grid)
+        return
+
+    # Gra uruchomiona poza launcherem - szukamy procesu po nazwie/ścieżce .exe.
     game_type = game_data.get("game_type", "pc")
     process_found_and_killed = False
 
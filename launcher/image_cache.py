@@ -0,0 +1,197 @@
+"""
+Cache zdekodowanych obrazów (PhotoImage) z budżetem bajtów.
+
+Wpisy są pogrupowane w przestrzenie nazw (np. ``grid``, ``details``,
+``chat``), każdy ma szacowany rozmiar w bajtach (szer. x wys. x 4). Po
+przekroczeniu budżetu - globalnego albo przestrzeni - usuwane są najdawniej
+użyte wpisy. Obrazy z plików są walidowane (mtime, rozmiar pliku), więc
+podmieniona okładka nie jest serwowana z cache.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+BYTES_PER_PIXEL = 4
+
+
+def estimate_image_bytes(image):
+    """Szacowany rozmiar zdekodowanego obrazu (PhotoImage lub obraz PIL)."""
+    try:
+        width = image.width() if callable(image.width) else image.width
+        height = image.height() if callable(image.height) else image.height
+        return int(width) * int(height) * BYTES_PER_PIXEL
+    except Exception:
+        return 0
+
+
+class _NamespaceStats:
+    __slots__ = ("hits", "misses", "evictions", "invalidations", "bytes", "entries")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self.entries = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ImageCache:
+    """LRU z budżetem bajtów, przestrzeniami nazw i walidacją wpisów."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        # (namespace, key) -> (obraz, bajty, walidator)
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._namespace_budgets = {}
+        self._stats = {}
+
+    def set_namespace_budget(self, namespace, max_bytes):
+        """Dodatkowy limit bajtów dla jednej przestrzeni nazw (None - brak limitu)."""
+        with self._lock:
+            if max_bytes is None:
+                self._namespace_budgets.pop(namespace, None)
+            else:
+                self._namespace_budgets[namespace] = max_bytes
+                self._evict(namespace)
+
+    def _ns(self, namespace):
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = _NamespaceStats()
+        return stats
+
+    def get(self, namespace, key, validator=None):
+        """Zwraca obraz z cache albo None. Wpis z innym walidatorem jest usuwany."""
+        entry_key = (namespace, key)
+        with self._lock:
+            stats = self._ns(namespace)
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                stats.misses += 1
+                return None
+            if entry[2] != validator:
+                self._remove(entry_key)
+                stats.invalidations += 1
+                stats.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            stats.hits += 1
+            return entry[0]
+
+    def put(self, namespace, key, image, nbytes=None, validator=None):
+        if image is None:
+            return
+        if nbytes is None:
+            nbytes = estimate_image_bytes(image)
+        entry_key = (namespace, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._remove(entry_key)
+            self._entries[entry_key] = (image, nbytes, validator)
+            self._total_bytes += nbytes
+            stats = self._ns(namespace)
+            stats.bytes += nbytes
+            stats.entries += 1
+            self._evict(namespace)
+
+    def get_file(self, namespace, path, size, loader):
+        """Obraz pliku ``path`` w rozmiarze ``size``; ``loader(path, size)`` przy braku w cache."""
+        try:
+            st = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            # Brak pliku - loader zwróci obraz błędu; takiego wyniku nie cache'ujemy.
+            return loader(path, size)
+        key = (os.path.abspath(path), tuple(size))
+        validator = (st.st_mtime_ns, st.st_size)
+        image = self.get(namespace, key, validator)
+        if image is None:
+            image = loader(path, size)
+            self.put(namespace, key, image, validator=validator)
+        return image
+
+    def invalidate_path(self, path):
+        """Usuwa wszystkie warianty (rozmiary, przestrzenie) obrazu z pliku ``path``."""
+        if not path:
+            return 0
+        abs_path = os.path.abspath(path)
+        with self._lock:
+            doomed = [
+                entry_key
+                for entry_key in self._entries
+                if isinstance(entry_key[1], tuple) and entry_key[1][:1] == (abs_path,)
+            ]
+            for entry_key in doomed:
+                self._remove(entry_key)
+                self._ns(entry_key[0]).invalidations += 1
+        return len(doomed)
+
+    def invalidate(self, namespace, key=None):
+        """Usuwa jeden wpis albo (``key=None``) całą przestrzeń nazw."""
+        with self._lock:
+            if key is not None:
+                doomed = [(namespace, key)] if (namespace, key) in self._entries else []
+            else:
+                doomed = [k for k in self._entries if k[0] == namespace]
+            for entry_key in doomed:
+                self._remove(entry_key)
+                self._ns(namespace).invalidations += 1
+        return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            for entry_key in list(self._entries):
+                self._remove(entry_key)
+                self._ns(entry_key[0]).invalidations += 1
+
+    def _remove(self, entry_key):
+        _image, nbytes, _validator = self._entries.pop(entry_key)
+        self._total_bytes -= nbytes
+        stats = self._ns(entry_key[0])
+        stats.bytes -= nbytes
+        stats.entries -= 1
+
+    def _evict(self, namespace):
+        budget = self._namespace_budgets.get(namespace)
+        if budget is not None and self._ns(namespace).bytes > budget:
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                if self._ns(namespace).bytes <= budget or self._ns(namespace).entries <= 1:
+                    break
+                self._remove(entry_key)
+                self._ns(namespace).evictions += 1
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            entry_key = next(iter(self._entries))
+            self._remove(entry_key)
+            self._ns(entry_key[0]).evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "namespaces": {ns: s.as_dict() for ns, s in self._stats.items()},
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        logging.info(
+            f"Cache obrazów: {stats['entries']} wpisów, "
+            f"{stats['bytes'] / (1024 * 1024):.1f}/{stats['max_bytes'] / (1024 * 1024):.0f} MB"
+        )
+        for namespace, ns_stats in stats["namespaces"].items():
+            logging.info(
+                f"  [{namespace}] trafienia={ns_stats['hits']} chybienia={ns_stats['misses']} "
+                f"usunięte={ns_stats['evictions']} unieważnione={ns_stats['invalidations']}"
+            )
+
+
+__all__ = ["ImageCache", "estimate_image_bytes"]
@@ -15,6 +15,7 @@ from launcher.config_store import (
     load_local_settings as config_load_local_settings,
     save_local_settings as config_save_local_settings,
 )
+from launcher.library_db import open_library_index
 from launcher.utils import (
     CUSTOM_THEMES_DIR,
     GAMES_FOLDER,
@@ -261,6 +262,7 @@ def initialize(self, root):
     self.archive = self.config.setdefault("archive", [])
     self.mods_data = self.config.setdefault("mods_data", {})
     self.reminders = self.config.setdefault("reminders", [])
+    open_library_index(self)
 
     self.user.setdefault("achievements", {})
     self.user.setdefault("theme_change_count", 0)
@@ -529,6 +531,9 @@ def _post_init_heavy_jobs(self):
         self.root.after(3000, self.start_scan_screenshots_thread)
         self.record_startup_time("post_init_screenshot_scan")
 
+    if self.settings.get("folder_watch_enabled", False):
+        self.root.after(5000, self.start_folder_watcher)
+
     threading.Thread(target=_warm_up_optional_modules, daemon=True).start()
     self.root.after(1200, self.preload_library_view)
     self.root.after(2000, self.preload_roadmap_view)
@@ -0,0 +1,386 @@
+"""
+Opcjonalny indeks SQLite biblioteki gier.
+
+Źródłem prawdy pozostaje ``self.games`` (zwykły słownik z config.json) -
+cały launcher modyfikuje dane gier w miejscu. Indeks jest lustrem tych
+danych: dziennik konfiguracji (``config_journal``) po każdym zapisie
+przekazuje zmienione gry, a indeks aktualizuje tylko ich wiersze. Widoki
+biblioteki mogą wtedy filtrować i sortować zapytaniem po indeksach zamiast
+przechodzić całą bibliotekę w Pythonie.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from launcher.config_journal import get_config_journal
+from launcher.utils import CONFIG_FILE, LIBRARY_DB_FILE, config_changes_pending, save_config
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS games (
+    name TEXT PRIMARY KEY,
+    name_lower TEXT NOT NULL,
+    doc_hash TEXT NOT NULL,
+    game_type TEXT NOT NULL,
+    emulator_name TEXT,
+    play_time REAL NOT NULL DEFAULT 0,
+    rating_sort REAL NOT NULL DEFAULT -1,
+    date_added REAL NOT NULL DEFAULT 0,
+    last_played REAL,
+    completion REAL,
+    version_lower TEXT NOT NULL DEFAULT '',
+    genres_sort TEXT NOT NULL DEFAULT '',
+    tags_sort TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_games_name_lower ON games(name_lower);
+CREATE INDEX IF NOT EXISTS idx_games_play_time ON games(play_time);
+CREATE INDEX IF NOT EXISTS idx_games_last_played ON games(last_played);
+CREATE INDEX IF NOT EXISTS idx_games_date_added ON games(date_added);
+CREATE INDEX IF NOT EXISTS idx_games_rating ON games(rating_sort);
+CREATE INDEX IF NOT EXISTS idx_games_type ON games(game_type);
+CREATE TABLE IF NOT EXISTS game_tags (
+    tag_lower TEXT NOT NULL,
+    game TEXT NOT NULL,
+    PRIMARY KEY (tag_lower, game)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_game_tags_game ON game_tags(game);
+CREATE TABLE IF NOT EXISTS game_genres (
+    genre TEXT NOT NULL,
+    game TEXT NOT NULL,
+    PRIMARY KEY (genre, game)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_game_genres_game ON game_genres(game);
+CREATE TABLE IF NOT EXISTS play_sessions (
+    game TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_play_sessions_game ON play_sessions(game, start);
+CREATE INDEX IF NOT EXISTS idx_play_sessions_start ON play_sessions(start);
+CREATE TABLE IF NOT EXISTS screenshots (
+    game TEXT NOT NULL,
+    path TEXT NOT NULL,
+    autoscan INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (game, path)
+) WITHOUT ROWID;
+"""
+
+# Sortowanie siatki: opcja z UI -> (kolumna indeksu, malejąco).
+GRID_SORT_COLUMNS = {
+    "Nazwa": ("name_lower", False),
+    "Data Dodania": ("date_added", True),
+    "Czas Gry": ("play_time", True),
+    "Ocena": ("rating_sort", True),
+}
+
+LIST_SORT_COLUMNS = {
+    "Nazwa": "name_lower",
+    "Czas Gry": "play_time",
+    "Ocena": "rating_sort",
+    "Data Dodania": "date_added",
+    "Wersja": "version_lower",
+    "Gatunki": "genres_sort",
+    "Tagi": "tags_sort",
+}
+
+GAME_TYPE_FILTERS = {
+    "Gry PC": "pc",
+    "Gry Emulowane": "emulator",
+}
+
+
+def _number(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _string_list(value):
+    if not isinstance(value, list):
+        return []
+    return [str(item) for item in value]
+
+
+class LibraryIndex:
+    """Lustro biblioteki gier w SQLite z indeksami do filtrowania i sortowania."""
+
+    def __init__(self, db_path: str = LIBRARY_DB_FILE):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+        self._journal = None
+
+    # --- Synchronizacja ----------------------------------------------------
+
+    def attach(self, journal=None):
+        """Podpina indeks pod dziennik konfiguracji (od razu migruje bieżący stan)."""
+        self._journal = journal or get_config_journal(CONFIG_FILE)
+        self._journal.add_listener(self._on_games_changed)
+
+    def detach(self):
+        if self._journal is not None:
+            self._journal.remove_listener(self._on_games_changed)
+            self._journal = None
+
+    def close(self):
+        self.detach()
+        with self._lock:
+            self._conn.close()
+
+    def _on_games_changed(self, changed_games: dict, full: bool):
+        with self._lock, self._conn:
+            if full:
+                self._sync_full(changed_games)
+            else:
+                for name, text in changed_games.items():
+                    if text is None:
+                        self._delete_game(name)
+                    else:
+                        self._upsert_game(name, text)
+
+    def _sync_full(self, game_texts: dict):
+        """Migracja/resynchronizacja: aktualizuje tylko gry o zmienionym hashu."""
+        stored = dict(self._conn.execute("SELECT name, doc_hash FROM games"))
+        updated = 0
+        for name, text in game_texts.items():
+            if stored.pop(name, None) != self._hash(text):
+                self._upsert_game(name, text)
+                updated += 1
+        for name in stored:
+            self._delete_game(name)
+        if updated or stored:
+            logging.info(
+                f"Indeks biblioteki: zaktualizowano {updated} gier, usunięto {len(stored)}."
+            )
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _delete_game(self, name: str):
+        for table, column in (
+            ("games", "name"),
+            ("game_tags", "game"),
+            ("game_genres", "game"),
+            ("play_sessions", "game"),
+            ("screenshots", "game"),
+        ):
+            self._conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (name,))
+
+    def _upsert_game(self, name: str, text: str):
+        try:
+            game = json.loads(text)
+        except json.JSONDecodeError:
+            return
+        if not isinstance(game, dict):
+            return
+
+        self._delete_game(name)
+        genres = _string_list(game.get("genres"))
+        tags = _string_list(game.get("tags"))
+        rating = game.get("rating", 0) or -1
+        self._conn.execute(
+            "INSERT INTO games(name, name_lower, doc_hash, game_type, emulator_name,"
+            " play_time, rating_sort, date_added, last_played, completion,"
+            " version_lower, genres_sort, tags_sort)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                name,
+                name.lower(),
+                self._hash(text),
+                game.get("game_type", "pc") or "pc",
+                game.get("emulator_name"),
+                _number(game.get("play_time"), 0.0),
+                _number(rating, -1.0),
+                _number(game.get("date_added"), 0.0),
+                _number(game.get("last_played")),
+                _number(game.get("completion")),
+                str(game.get("version", "") or "").lower(),
+                ", ".join(genres).lower(),
+                ", ".join(tags).lower(),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO game_tags(tag_lower, game) VALUES (?, ?)",
+            [(tag.lower(), name) for tag in tags],
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO game_genres(genre, game) VALUES (?, ?)",
+            [(genre, name) for genre in genres],
+        )
+        sessions = [
+            (name, _number(s.get("start"), 0.0), _number(s.get("end"), 0.0))
+            for s in game.get("play_sessions", []) or []
+            if isinstance(s, dict)
+        ]
+        self._conn.executemany(
+            "INSERT INTO play_sessions(game, start, end) VALUES (?, ?, ?)", sessions
+        )
+        screenshots = [(name, str(p), 0) for p in game.get("screenshots", []) or []]
+        screenshots += [
+            (name, str(p), 1) for p in game.get("autoscan_screenshots", []) or []
+        ]
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO screenshots(game, path, autoscan) VALUES (?, ?, ?)",
+            screenshots,
+        )
+
+    # --- Zapytania ---------------------------------------------------------
+
+    def query_names(
+        self,
+        search_query: str = "",
+        genre: str | None = None,
+        tag: str | None = None,
+        game_type: str | None = None,
+        order_by: str = "name_lower",
+        descending: bool = False,
+    ) -> list:
+        """Zwraca nazwy gier spełniających filtry, posortowane po kolumnie indeksu."""
+        where = []
+        params = []
+        if game_type:
+            where.append("g.game_type = ?")
+            params.append(game_type)
+        if search_query:
+            escaped = (
+                search_query.lower()
+                .replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            where.append("g.name_lower LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if genre:
+            where.append(
+                "EXISTS (SELECT 1 FROM game_genres gg WHERE gg.genre = ? AND gg.game = g.name)"
+            )
+            params.append(genre)
+        if tag:
+            where.append(
+                "EXISTS (SELECT 1 FROM game_tags gt WHERE gt.tag_lower = ? AND gt.game = g.name)"
+            )
+            params.append(tag.lower())
+
+        if order_by not in LIST_SORT_COLUMNS.values():
+            order_by = "name_lower"
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT g.name FROM games g"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY g.{order_by} {direction}, g.name_lower ASC"
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+
+def open_library_index(self):
+    """Otwiera indeks SQLite, jeśli jest włączony w ustawieniach."""
+    if not self.settings.get("library_sqlite_index", False):
+        self.library_index = None
+        return None
+    try:
+        index = LibraryIndex()
+        index.attach()
+        self.library_index = index
+        logging.info(f"Włączono indeks SQLite biblioteki: {index.db_path}")
+    except (sqlite3.Error, OSError) as e:
+        logging.error(f"Nie udało się otworzyć indeksu biblioteki: {e}")
+        self.library_index = None
+    return self.library_index
+
+
+def close_library_index(self):
+    index = getattr(self, "library_index", None)
+    if index is not None:
+        try:
+            index.close()
+        except sqlite3.Error as e:
+            logging.error(f"Błąd zamykania indeksu biblioteki: {e}")
+    self.library_index = None
+
+
+def _save_library_index_setting(self):
+    """Włącza/wyłącza indeks SQLite biblioteki z poziomu ustawień."""
+    enabled = self.library_sqlite_index_var.get()
+    self.settings["library_sqlite_index"] = enabled
+    save_config(self.config)
+    if enabled:
+        open_library_index(self)
+    else:
+        close_library_index(self)
+    logging.info(f"Ustawienie library_sqlite_index zmienione na: {enabled}")
+
+
+def query_library_names(self, names_subset=None, sort_by=None, list_column=None, reverse=False):
+    """Filtruje bibliotekę zapytaniem do indeksu. None, gdy indeks jest wyłączony.
+
+    Uwzględnia wyszukiwarkę, gatunek, tag i typ gry z nagłówka biblioteki.
+    ``names_subset`` zawęża wynik (np. do grupy statycznej), zachowując
+    kolejność z zapytania.
+    """
+    index = getattr(self, "library_index", None)
+    if index is None:
+        return None
+    if list_column is not None and list_column not in LIST_SORT_COLUMNS:
+        return None
+
+    # Zmiany czekające na zapis w tle nie dotarły jeszcze do indeksu -
+    # do tego czasu widok filtruje bieżący słownik gier.
+    if config_changes_pending():
+        return None
+
+    selected_genre = self.filter_var.get()
+    selected_tag = self.tag_filter_var.get().strip()
+    if list_column is not None:
+        order_by, descending = LIST_SORT_COLUMNS[list_column], reverse
+    else:
+        order_by, descending = GRID_SORT_COLUMNS.get(sort_by, ("name_lower", False))
+
+    try:
+        names = index.query_names(
+            search_query=self.search_var.get().lower(),
+            genre=None if selected_genre == "Wszystkie Gatunki" else selected_genre,
+            tag=None if not selected_tag or selected_tag == "Wszystkie Tagi" else selected_tag,
+            game_type=GAME_TYPE_FILTERS.get(self.game_type_filter_var.get()),
+            order_by=order_by,
+            descending=descending,
+        )
+    except sqlite3.Error as e:
+        logging.error(f"Błąd zapytania do indeksu biblioteki: {e}")
+        return None
+
+    if names_subset is not None:
+        allowed = set(names_subset)
+        names = [name for name in names if name in allowed]
+    return [name for name in names if name in self.games]
+
+
+__all__ = [
+    "LibraryIndex",
+    "open_library_index",
+    "close_library_index",
+    "_save_library_index_setting",
+    "query_library_names",
+]
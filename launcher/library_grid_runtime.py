@@ -1,11 +1,20 @@
 import datetime
 import logging
-import os
 import tkinter as tk
 from tkinter import ttk
 
 from PIL import Image, ImageDraw, ImageFont, ImageTk
 
+from launcher.advanced_filter_eval import apply_saved_filter
+from launcher.library_db import query_library_names
+from launcher.library_tile_actions import _tile_image_size
+from launcher.library_virtual_grid import (
+    disable_virtual_grid,
+    is_virtual_grid_enabled,
+    render_virtual_grid,
+)
+from launcher.thumbnail_cache import get_cover_thumbnail, warm_grid_thumbnails
+from launcher.tile_image_pipeline import get_tile_pipeline
 from launcher.utils import load_photoimage_from_path
 
 
@@ -137,16 +146,11 @@ def create_game_grid(self):
 
 def create_game_tile(self, parent, game_name, game_data, tile_width=200, tile_height=300):
     target_size = (tile_width, tile_height)
-    original_cover_path = game_data.get("cover_image")
 
-    thumbnail_path = self.get_or_create_thumbnail(original_cover_path, game_name, target_size)
+    cover_path = self._ensure_cover(game_name, game_data, target_size)
+    thumbnail_path = get_cover_thumbnail(self, cover_path, target_size)
 
-    if thumbnail_path != original_cover_path and "default_cover" in thumbnail_path:
-        if not original_cover_path or not os.path.exists(original_cover_path):
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                pass
-
-    photo = load_photoimage_from_path(thumbnail_path, target_size)
+    photo = load_photoimage_from_path(thumbnail_path, target_size, namespace="grid")
 
     frame = ttk.Frame(parent, style="Game.TFrame")
     frame.pack(fill="both", expand=True)
@@ -273,45 +277,53 @@ def update_game_grid(self):
         )
         logging.debug(f"Stosowanie filtra zaawansowanego: {selected_filter_or_group}")
 
-    filtered_games = []
-    for game_name in games_to_filter:
-        game_data = self.games.get(game_name)
-        if not game_data:
-            continue
-
+    filtered_games = query_library_names(
+        self,
+        names_subset=games_to_filter if is_static_group else None,
+        sort_by=sort_by,
+    )
+    if filtered_games is not None and active_filter_rules:
+        filtered_games = apply_saved_filter(self, selected_filter_or_group, filtered_games)
+    if filtered_games is None:
         if active_filter_rules:
-            if not self._check_game_against_rules(game_data, active_filter_rules):
+            games_to_filter = apply_saved_filter(
+                self, selected_filter_or_group, games_to_filter
+            )
+        filtered_games = []
+        for game_name in games_to_filter:
+            game_data = self.games.get(game_name)
+            if not game_data:
                 continue
 
-        game_type = game_data.get("game_type", "pc")
-        type_match = False
-        if selected_game_type_filter == "Wszystkie Typy":
-            type_match = True
-        elif selected_game_type_filter == "Gry PC" and game_type == "pc":
-            type_match = True
-        elif selected_game_type_filter == "Gry Emulowane" and game_type == "emulator":
-            type_match = True
-        if not type_match:
-            continue
-
-        if search_query and search_query not in game_name.lower():
-            continue
-        if selected_genre != "Wszystkie Gatunki" and selected_genre not in game_data.get("genres", []):
-            continue
-        if selected_tag and selected_tag != "Wszystkie Tagi":
-            if not any(selected_tag.lower() == tag.lower() for tag in game_data.get("tags", [])):
+            game_type = game_data.get("game_type", "pc")
+            type_match = False
+            if selected_game_type_filter == "Wszystkie Typy":
+                type_match = True
+            elif selected_game_type_filter == "Gry PC" and game_type == "pc":
+                type_match = True
+            elif selected_game_type_filter == "Gry Emulowane" and game_type == "emulator":
+                type_match = True
+            if not type_match:
                 continue
 
-        filtered_games.append(game_name)
+            if search_query and search_query not in game_name.lower():
+                continue
+            if selected_genre != "Wszystkie Gatunki" and selected_genre not in game_data.get("genres", []):
+                continue
+            if selected_tag and selected_tag != "Wszystkie Tagi":
+                if not any(selected_tag.lower() == tag.lower() for tag in game_data.get("tags", [])):
+                    continue
+
+            filtered_games.append(game_name)
 
-    if sort_by == "Nazwa":
-        filtered_games.sort(key=str.lower)
-    elif sort_by == "Data Dodania":
-        filtered_games.sort(key=lambda x: self.games[x].get("date_added", 0), reverse=True)
-    elif sort_by == "Czas Gry":
-        filtered_games.sort(key=lambda x: self.games[x].get("play_time", 0), reverse=True)
-    elif sort_by == "Ocena":
-        filtered_games.sort(key=lambda x: self.games[x].get("rating", 0) or -1, reverse=True)
+        if sort_by == "Nazwa":
+            filtered_games.sort(key=str.lower)
+        elif sort_by == "Data Dodania":
+            filtered_games.sort(key=lambda x: self.games[x].get("date_added", 0), reverse=True)
+        elif sort_by == "Czas Gry":
+            filtered_games.sort(key=lambda x: self.games[x].get("play_time", 0), reverse=True)
+        elif sort_by == "Ocena":
+            filtered_games.sort(key=lambda x: self.games[x].get("rating", 0) or -1, reverse=True)
 
     view_mode = self.library_view_mode.get()
     logging.debug(f"Aktualizowanie widoku: {view_mode}")
@@ -356,11 +368,26 @@ def update_game_grid(self):
             f"Grid (z ustawień): tile_width={self.current_tile_width}, num_columns={num_columns}"
         )
 
+        # Najpierw bieżąca strona, potem reszta przefiltrowanej listy.
+        warm_grid_thumbnails(
+            self,
+            games_on_this_page + filtered_games[end_index:] + filtered_games[:start_index],
+            _tile_image_size(self.current_tile_width, self.tile_height),
+        )
+
         for widget in self.games_frame.winfo_children():
             if hasattr(widget, "game_info") and "name" in widget.game_info:
                 self._clear_launch_button_ref(widget.game_info["name"])
             widget.destroy()
         self._loaded_tile_ids.clear()
+        get_tile_pipeline(self).cancel_all()
+
+        if is_virtual_grid_enabled(self):
+            self.pagination_frame.grid_remove()
+            render_virtual_grid(self, filtered_games, num_columns)
+            logging.debug("Zakończono update_game_grid (wirtualna siatka).")
+            return
+        disable_virtual_grid(self)
 
         row, col = 0, 0
         default_padding_x = 10
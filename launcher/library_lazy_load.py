@@ -2,6 +2,17 @@ import logging
 import tkinter as tk
 from tkinter import ttk
 
+from launcher.library_tile_actions import _tile_image_size
+from launcher.library_virtual_grid import update_virtual_grid
+from launcher.tile_image_pipeline import (
+    PRIORITY_PREFETCH,
+    PRIORITY_VISIBLE,
+    get_tile_pipeline,
+)
+
+# Ile rzędów poza widocznym obszarem dekodujemy z wyprzedzeniem.
+PREFETCH_ROWS = 2
+
 
 def _on_search_change(self, *args):
     """Obsługuje zmianę w polu wyszukiwania z opóźnieniem (debouncing)."""
@@ -62,14 +73,22 @@ def _trigger_lazy_load(self, event=None):
 
 
 def _load_visible_tiles(self):
-    """Ładuje zawartość tylko dla widocznych kafelków-placeholderów."""
+    """Zleca dekodowanie okładek widocznych kafelków-placeholderów (i rzędów tuż obok).
+
+    Dekodowanie odbywa się w tle; kafelki, które wyjechały poza obszar
+    widoku i prefetchu, mają swoje oczekujące zlecenia anulowane.
+    """
     if (
         not hasattr(self, "canvas")
         or not self.canvas.winfo_exists()
         or not hasattr(self, "games_frame")
     ):
         return
+    if getattr(self, "_virtual_grid", None) is not None:
+        update_virtual_grid(self)
+        return
 
+    pipeline = get_tile_pipeline(self)
     try:
         _canvas_height = self.canvas.winfo_height()
         scroll_region = self.canvas.yview()
@@ -77,10 +96,13 @@ def _load_visible_tiles(self):
         visible_bottom = scroll_region[1] * self.games_frame.winfo_reqheight()
 
         buffer = self.tile_height
+        prefetch = PREFETCH_ROWS * self.tile_height
 
         current_width = getattr(self, "current_tile_width", 200)
         current_height = self.tile_height
+        image_size = _tile_image_size(current_width, current_height)
 
+        wanted_keys = set()
         for tile_frame in self.games_frame.winfo_children():
             if hasattr(tile_frame, "game_info") and not tile_frame.game_info["loaded"]:
                 frame_y = tile_frame.winfo_y()
@@ -88,27 +110,39 @@ def _load_visible_tiles(self):
                 if frame_height == 1:
                     frame_height = current_height
 
-                is_visible = (
-                    frame_y + frame_height > visible_top - buffer
-                    and frame_y < visible_bottom + buffer
+                frame_bottom = frame_y + frame_height
+                if frame_bottom > visible_top - buffer and frame_y < visible_bottom + buffer:
+                    priority = PRIORITY_VISIBLE
+                elif (
+                    frame_bottom > visible_top - buffer - prefetch
+                    and frame_y < visible_bottom + buffer + prefetch
+                ):
+                    priority = PRIORITY_PREFETCH
+                else:
+                    continue
+
+                game_name = tile_frame.game_info["name"]
+                game_data = self.games.get(game_name)
+                if not game_data:
+                    logging.warning(
+                        f"Nie znaleziono danych dla gry '{game_name}' podczas lazy loadingu."
+                    )
+                    continue
+
+                key = str(tile_frame)
+                wanted_keys.add(key)
+                cover_path = self._ensure_cover(game_name, game_data, image_size)
+                pipeline.submit(
+                    key,
+                    cover_path,
+                    image_size,
+                    lambda photo, tf=tile_frame, gn=game_name: self._on_tile_image_ready(
+                        tf, gn, photo, current_width, current_height
+                    ),
+                    priority,
                 )
 
-                if is_visible:
-                    game_name = tile_frame.game_info["name"]
-                    game_data = self.games.get(game_name)
-                    if game_data:
-                        self._populate_game_tile(
-                            tile_frame,
-                            game_name,
-                            game_data,
-                            current_width,
-                            current_height,
-                        )
-                        tile_frame.game_info["loaded"] = True
-                    else:
-                        logging.warning(
-                            f"Nie znaleziono danych dla gry '{game_name}' podczas lazy loadingu."
-                        )
+        pipeline.retain(wanted_keys)
 
     except tk.TclError as e:
         logging.warning(f"Błąd TclError podczas lazy loadingu: {e}")
@@ -116,6 +150,25 @@ def _load_visible_tiles(self):
         logging.exception("Nieoczekiwany błąd podczas lazy loadingu")
 
 
+def _on_tile_image_ready(self, tile_frame, game_name, photo, tile_width, tile_height):
+    """Wątek Tk: wypełnia kafelek okładką zdekodowaną w tle."""
+    try:
+        if not tile_frame.winfo_exists() or tile_frame.game_info["loaded"]:
+            return
+        # Kafelek z puli wirtualnej siatki mógł zostać w międzyczasie przepięty.
+        if tile_frame.game_info.get("name") != game_name:
+            return
+    except tk.TclError:
+        return
+    game_data = self.games.get(game_name)
+    if not game_data:
+        return
+    self._populate_game_tile(
+        tile_frame, game_name, game_data, tile_width, tile_height, photo=photo
+    )
+    tile_frame.game_info["loaded"] = True
+
+
 def _create_tile_placeholder(
     self,
     parent,
@@ -148,5 +201,6 @@ __all__ = [
     "_on_mouse_wheel_and_lazy_load",
     "_trigger_lazy_load",
     "_load_visible_tiles",
+    "_on_tile_image_ready",
     "_create_tile_placeholder",
 ]
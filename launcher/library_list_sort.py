@@ -1,6 +1,9 @@
 import datetime
 import logging
 
+from launcher.advanced_filter_eval import apply_saved_filter
+from launcher.library_db import query_library_names
+
 
 def _sort_list_view_by_column(self, column_name):
     """Sortuje dane w widoku listy po kliknięciu nagłówka kolumny."""
@@ -29,58 +32,72 @@ def _sort_list_view_by_column(self, column_name):
         games_to_sort = list(self.groups.get(selected_filter_or_group, []))
     elif is_advanced_filter:
         logging.debug(
-            f"Sortowanie listy dla filtra zaawansowanego '{selected_filter_or_group}' (logika filtrowania TODO)."
+            f"Sortowanie listy dla filtra zaawansowanego '{selected_filter_or_group}'."
         )
         games_to_sort = list(self.games.keys())
     else:
         games_to_sort = list(self.games.keys())
 
-    filtered_names = []
-    for game_name in games_to_sort:
-        game_data = self.games.get(game_name)
-        if not game_data:
-            continue
-
-        game_type = game_data.get("game_type", "pc")
-        type_match = False
-        if selected_game_type_filter == "Wszystkie Typy":
-            type_match = True
-        elif selected_game_type_filter == "Gry PC" and game_type == "pc":
-            type_match = True
-        elif selected_game_type_filter == "Gry Emulowane" and game_type == "emulator":
-            type_match = True
-        if not type_match:
-            continue
-
-        if search_query and search_query not in game_name.lower():
-            continue
-        if selected_genre != "Wszystkie Gatunki" and selected_genre not in game_data.get("genres", []):
-            continue
-        if selected_tag and selected_tag != "Wszystkie Tagi":
-            if not any(selected_tag.lower() == tag.lower() for tag in game_data.get("tags", [])):
+    sorted_games = query_library_names(
+        self,
+        names_subset=games_to_sort if is_static_group else None,
+        list_column=column_name,
+        reverse=reverse_sort,
+    )
+    if sorted_games is not None and is_advanced_filter:
+        sorted_games = apply_saved_filter(self, selected_filter_or_group, sorted_games)
+    if sorted_games is None:
+        if is_advanced_filter:
+            games_to_sort = apply_saved_filter(
+                self, selected_filter_or_group, games_to_sort
+            )
+        filtered_names = []
+        for game_name in games_to_sort:
+            game_data = self.games.get(game_name)
+            if not game_data:
                 continue
 
-        filtered_names.append(game_name)
-
-    key_func = None
-    if column_name == "Nazwa":
-        key_func = lambda name: name.lower()
-    elif column_name == "Czas Gry":
-        key_func = lambda name: self.games.get(name, {}).get("play_time", 0)
-    elif column_name == "Ocena":
-        key_func = lambda name: self.games.get(name, {}).get("rating") or -1
-    elif column_name == "Data Dodania":
-        key_func = lambda name: self.games.get(name, {}).get("date_added", 0)
-    elif column_name == "Wersja":
-        key_func = lambda name: self.games.get(name, {}).get("version", "").lower()
-    elif column_name == "Gatunki":
-        key_func = lambda name: ", ".join(self.games.get(name, {}).get("genres", [])).lower()
-    elif column_name == "Tagi":
-        key_func = lambda name: ", ".join(self.games.get(name, {}).get("tags", [])).lower()
-
-    if key_func:
-        sorted_games = sorted(filtered_names, key=key_func, reverse=reverse_sort)
+            game_type = game_data.get("game_type", "pc")
+            type_match = False
+            if selected_game_type_filter == "Wszystkie Typy":
+                type_match = True
+            elif selected_game_type_filter == "Gry PC" and game_type == "pc":
+                type_match = True
+            elif selected_game_type_filter == "Gry Emulowane" and game_type == "emulator":
+                type_match = True
+            if not type_match:
+                continue
 
+            if search_query and search_query not in game_name.lower():
+                continue
+            if selected_genre != "Wszystkie Gatunki" and selected_genre not in game_data.get("genres", []):
+                continue
+            if selected_tag and selected_tag != "Wszystkie Tagi":
+                if not any(selected_tag.lower() == tag.lower() for tag in game_data.get("tags", [])):
+                    continue
+
+            filtered_names.append(game_name)
+
+        key_func = None
+        if column_name == "Nazwa":
+            key_func = lambda name: name.lower()
+        elif column_name == "Czas Gry":
+            key_func = lambda name: self.games.get(name, {}).get("play_time", 0)
+        elif column_name == "Ocena":
+            key_func = lambda name: self.games.get(name, {}).get("rating") or -1
+        elif column_name == "Data Dodania":
+            key_func = lambda name: self.games.get(name, {}).get("date_added", 0)
+        elif column_name == "Wersja":
+            key_func = lambda name: self.games.get(name, {}).get("version", "").lower()
+        elif column_name == "Gatunki":
+            key_func = lambda name: ", ".join(self.games.get(name, {}).get("genres", [])).lower()
+        elif column_name == "Tagi":
+            key_func = lambda name: ", ".join(self.games.get(name, {}).get("tags", [])).lower()
+
+        if key_func:
+            sorted_games = sorted(filtered_names, key=key_func, reverse=reverse_sort)
+
+    if sorted_games is not None:
         self.list_view_tree.delete(*self.list_view_tree.get_children())
         for game_name in sorted_games:
             game_data = self.games.get(game_name)
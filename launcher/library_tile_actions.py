@@ -5,22 +5,35 @@ from tkinter import messagebox, ttk
 
 from PIL import Image, ImageDraw, ImageFont, ImageTk
 
+from launcher.thumbnail_cache import get_cover_thumbnail
 from launcher.utils import load_photoimage_from_path, save_config
 from ui.components import ToolTip
 
 
-def _populate_game_tile(self, tile_frame, game_name, game_data, tile_width, tile_height):
-    """Wypełnia ramkę o STAŁYM rozmiarze zawartością kafelka gry."""
+def _tile_image_size(tile_width, tile_height):
+    """Rozmiar okładki w kafelku o podanych wymiarach."""
+    return (int(tile_width), int(tile_height * 0.60))
+
+
+def _populate_game_tile(
+    self, tile_frame, game_name, game_data, tile_width, tile_height, photo=None
+):
+    """Wypełnia ramkę o STAŁYM rozmiarze zawartością kafelka gry.
+
+    ``photo`` - okładka zdekodowana wcześniej (np. przez pipeline w tle);
+    bez niej okładka jest ładowana synchronicznie.
+    """
     logging.debug(f"Populating tile for {game_name} with size {tile_width}x{tile_height}")
 
-    target_image_height = int(tile_height * 0.60)
-    target_image_size = (tile_width, target_image_height)
+    target_image_size = _tile_image_size(tile_width, tile_height)
     _target_info_height = int(tile_height * 0.18)
 
-    _original_cover_path = self.games[game_name].get("cover_image")
-    cover_path_to_load = self._ensure_cover(game_name, self.games[game_name], target_image_size)
-
-    photo = load_photoimage_from_path(cover_path_to_load, target_image_size)
+    if photo is None:
+        cover_path_to_load = self._ensure_cover(
+            game_name, self.games[game_name], target_image_size
+        )
+        thumbnail_path = get_cover_thumbnail(self, cover_path_to_load, target_image_size)
+        photo = load_photoimage_from_path(thumbnail_path, target_image_size, namespace="grid")
 
     for widget in tile_frame.winfo_children():
         widget.destroy()
@@ -390,6 +403,7 @@ def _clear_launch_button_ref(self, game_name):
 
 
 __all__ = [
+    "_tile_image_size",
     "_populate_game_tile",
     "_show_tile_context_menu",
     "_remove_from_group_from_menu",
@@ -0,0 +1,231 @@
+"""
+Wirtualizowana siatka biblioteki.
+
+Zamiast jednej ramki na grę utrzymywana jest pula kafelków wielkości
+(widoczne rzędy + 2) x kolumny. Widoczny zakres liczony jest arytmetycznie
+z wysokości rzędu i położenia suwaka, a kafelki spoza niego są
+przepinane do gier, które właśnie wjeżdżają w widok. Liczba widżetów i
+koszt przewijania nie zależą od wielkości biblioteki.
+"""
+
+import logging
+import math
+import tkinter as tk
+from tkinter import ttk
+
+from launcher.config_store import save_local_settings
+from launcher.library_tile_actions import _tile_image_size
+from launcher.tile_image_pipeline import (
+    PRIORITY_PREFETCH,
+    PRIORITY_VISIBLE,
+    get_tile_pipeline,
+)
+
+TILE_PADDING_X = 10
+TILE_PADDING_Y = 10
+MIN_TILE_WIDTH = 200
+
+
+def is_virtual_grid_enabled(self):
+    return bool(self.local_settings.get("virtual_grid", False))
+
+
+def _save_virtual_grid_setting(self):
+    """Włącza/wyłącza wirtualizowaną siatkę z poziomu ustawień."""
+    enabled = self.virtual_grid_var.get()
+    if self.local_settings.get("virtual_grid", False) == enabled:
+        return
+    self.local_settings["virtual_grid"] = enabled
+    save_local_settings(self.local_settings)
+    logging.info(f"Ustawienie virtual_grid zmienione na: {enabled}")
+    if self.current_frame == self.main_frame and self.library_view_mode.get() == "tiles":
+        self.reset_and_update_grid()
+
+
+def _layout(self, num_columns):
+    canvas_width = max(1, self.canvas.winfo_width())
+    column_pitch = canvas_width / num_columns
+    tile_width = max(MIN_TILE_WIDTH, int(column_pitch) - 2 * TILE_PADDING_X)
+    if tile_width + 2 * TILE_PADDING_X > column_pitch:
+        column_pitch = tile_width + 2 * TILE_PADDING_X
+    return canvas_width, column_pitch, tile_width
+
+
+def render_virtual_grid(self, game_names, num_columns):
+    """Przygotowuje wirtualną siatkę dla listy gier (bez paginacji)."""
+    num_columns = max(1, num_columns)
+    self.canvas.update_idletasks()
+    canvas_width, column_pitch, tile_width = _layout(self, num_columns)
+    row_height = self.tile_height + 2 * TILE_PADDING_Y
+    total_rows = math.ceil(len(game_names) / num_columns)
+    total_height = max(1, total_rows * row_height)
+
+    self._virtual_grid = {
+        "names": list(game_names),
+        "columns": num_columns,
+        "canvas_width": canvas_width,
+        "column_pitch": column_pitch,
+        "tile_width": tile_width,
+        "row_height": row_height,
+        "total_rows": total_rows,
+        "total_height": total_height,
+        "tiles": {},
+        "free": [],
+    }
+    self.current_tile_width = tile_width
+
+    self.canvas.itemconfig(self.games_frame_id, height=total_height)
+    self.canvas.config(scrollregion=(0, 0, canvas_width, total_height))
+    self.canvas.yview_moveto(0)
+    logging.debug(
+        f"Wirtualna siatka: {len(game_names)} gier, {total_rows} rzędów, kafelek {tile_width}px"
+    )
+    update_virtual_grid(self)
+
+
+def disable_virtual_grid(self):
+    """Przywraca zwykły układ siatki (wysokość ramki wynikająca z zawartości)."""
+    if getattr(self, "_virtual_grid", None) is None:
+        return
+    self._virtual_grid = None
+    if hasattr(self, "canvas") and self.canvas.winfo_exists():
+        self.canvas.itemconfig(self.games_frame_id, height=0)
+
+
+def _create_pool_tile(self, tile_width):
+    tile_frame = ttk.Frame(
+        self.games_frame,
+        width=tile_width,
+        height=self.tile_height,
+        style="Game.TFrame",
+        borderwidth=1,
+        relief="solid",
+    )
+    tile_frame.grid_propagate(False)
+    return tile_frame
+
+
+def _release_tile(self, tile_frame):
+    game_info = getattr(tile_frame, "game_info", None)
+    if game_info and game_info.get("name"):
+        self._clear_launch_button_ref(game_info["name"])
+    tile_frame.game_info = {"name": None, "loaded": False}
+    tile_frame.unbind("<Button-3>")
+    tile_frame.place_forget()
+
+
+def _bind_tile(self, tile_frame, index, game_name):
+    state = self._virtual_grid
+    row, col = divmod(index, state["columns"])
+    x = int(col * state["column_pitch"] + (state["column_pitch"] - state["tile_width"]) / 2)
+    y = row * state["row_height"] + TILE_PADDING_Y
+
+    for widget in tile_frame.winfo_children():
+        widget.destroy()
+    ttk.Label(tile_frame, text="Ładowanie...", anchor="center").place(
+        relx=0.5, rely=0.5, anchor="center"
+    )
+    tile_frame.game_info = {"name": game_name, "loaded": False}
+    # Ramka z puli ma jeszcze menu kontekstowe poprzedniej gry (_populate_game_tile).
+    tile_frame.bind(
+        "<Button-3>",
+        lambda event, gn=game_name: self._show_tile_context_menu(event, gn),
+    )
+    tile_frame.place(x=x, y=y, width=state["tile_width"], height=self.tile_height)
+
+
+def update_virtual_grid(self):
+    """Przepina kafelki z puli do gier w widocznym zakresie (+1 rząd z każdej strony)."""
+    state = getattr(self, "_virtual_grid", None)
+    if state is None or not hasattr(self, "canvas") or not self.canvas.winfo_exists():
+        return
+
+    try:
+        if abs(self.canvas.winfo_width() - state["canvas_width"]) > 1:
+            # Zmiana szerokości okna - przelicz układ i zbuduj pulę od nowa.
+            _clear_virtual_tiles(self)
+            render_virtual_grid(self, state["names"], state["columns"])
+            return
+
+        names = state["names"]
+        columns = state["columns"]
+        row_height = state["row_height"]
+        view_start, view_end = self.canvas.yview()
+        top_px = view_start * state["total_height"]
+        bottom_px = view_end * state["total_height"]
+
+        first_visible_row = int(top_px // row_height)
+        last_visible_row = int(bottom_px // row_height)
+        first_row = max(0, first_visible_row - 1)
+        last_row = min(state["total_rows"] - 1, last_visible_row + 1)
+        needed = range(first_row * columns, min(len(names), (last_row + 1) * columns))
+
+        tiles = state["tiles"]
+        for index in [i for i in tiles if i not in needed]:
+            tile_frame = tiles.pop(index)
+            _release_tile(self, tile_frame)
+            state["free"].append(tile_frame)
+
+        pipeline = get_tile_pipeline(self)
+        image_size = _tile_image_size(state["tile_width"], self.tile_height)
+        wanted_keys = set()
+        for index in needed:
+            game_name = names[index]
+            tile_frame = tiles.get(index)
+            if tile_frame is None:
+                if state["free"]:
+                    tile_frame = state["free"].pop()
+                else:
+                    tile_frame = _create_pool_tile(self, state["tile_width"])
+                _bind_tile(self, tile_frame, index, game_name)
+                tiles[index] = tile_frame
+            if tile_frame.game_info["loaded"]:
+                continue
+
+            game_data = self.games.get(game_name)
+            if not game_data:
+                continue
+            row = index // columns
+            priority = (
+                PRIORITY_VISIBLE
+                if first_visible_row <= row <= last_visible_row
+                else PRIORITY_PREFETCH
+            )
+            key = str(tile_frame)
+            wanted_keys.add(key)
+            cover_path = self._ensure_cover(game_name, game_data, image_size)
+            pipeline.submit(
+                key,
+                cover_path,
+                image_size,
+                lambda photo, tf=tile_frame, gn=game_name: self._on_tile_image_ready(
+                    tf, gn, photo, state["tile_width"], self.tile_height
+                ),
+                priority,
+            )
+        pipeline.retain(wanted_keys)
+
+    except tk.TclError as e:
+        logging.warning(f"Błąd TclError podczas aktualizacji wirtualnej siatki: {e}")
+
+
+def _clear_virtual_tiles(self):
+    state = getattr(self, "_virtual_grid", None)
+    if state is None:
+        return
+    for tile_frame in list(state["tiles"].values()) + state["free"]:
+        _release_tile(self, tile_frame)
+        tile_frame.destroy()
+    state["tiles"].clear()
+    state["free"].clear()
+    get_tile_pipeline(self).cancel_all()
+
+
+__all__ = [
+    "is_virtual_grid_enabled",
+    "_save_virtual_grid_setting",
+    "render_virtual_grid",
+    "disable_virtual_grid",
+    "update_virtual_grid",
+    "_clear_virtual_tiles",
+]
@@ -0,0 +1,409 @@
+"""
+Wdrażanie modów do folderu gry.
+
+Mody zainstalowane z folderu pozostają w swoim folderze źródłowym; do
+folderu gry trafiają tylko pliki "wygrywające" według kolejności ładowania
+profilu (``load_order`` - mod wyżej na liście wygrywa konflikt o ścieżkę).
+Stan wdrożenia gry jest w ``GAMES_FOLDER/<gra>/mod_deployment.json``:
+
+* ``sources`` - pliki każdego folderu moda (ścieżki względne),
+* ``owners`` - dla profilu: ścieżka -> mody, które ją dostarczają,
+* ``deployed`` - ścieżka -> [mod, folder moda] aktualnie w folderze gry,
+* ``originals`` - ścieżki oryginalnych plików gry odłożonych do
+  ``<folder gry>/_mod_originals`` na czas, gdy zastępuje je mod.
+
+``deploy`` porównuje stan docelowy z wdrożonym i dotyka tylko różniących
+się ścieżek, więc przełączenie profilu kosztuje tyle, ile wynosi różnica.
+Nowe pliki są najpierw przygotowywane w ``<folder gry>/_mod_staging``
+(reflink, a gdy się nie da - kopia), a dopiero potem podmieniane przez
+``os.replace``; błąd na którymkolwiek etapie cofa wykonane zmiany.
+
+Zanim cokolwiek w folderze gry zostanie przeniesione, plan zmian trafia do
+``_mod_staging/journal.json`` (faza ``apply``), a przed zatwierdzeniem -
+docelowy stan (faza ``commit``). Jeśli launcher padnie w trakcie, następne
+otwarcie wdrożenia wycofuje niedokończone zmiany albo kończy zatwierdzenie,
+zamiast usuwać ``_mod_staging`` razem z odłożonymi oryginałami gry.
+
+Hardlink dzieliłby i-węzeł z plikiem w folderze moda, więc zapis w miejscu
+(gra, patcher, edytor konfiguracji) zmieniłby źródło moda bez śladu. Jest
+używany tylko po włączeniu ``allow_hardlinks`` (ustawienie lokalne
+``mod_deploy_hardlinks``) i tylko dla plików moda tylko do odczytu.
+"""
+
+import json
+import logging
+import os
+import shutil
+import stat
+import sys
+import threading
+
+from launcher.copy_engine import CopyEngine
+from launcher.utils import GAMES_FOLDER
+
+MOD_DEPLOYMENT_FILE = "mod_deployment.json"
+MOD_DEPLOYMENT_VERSION = 1
+ORIGINALS_DIRNAME = "_mod_originals"
+STAGING_DIRNAME = "_mod_staging"
+JOURNAL_FILENAME = "journal.json"
+
+_FICLONE = 0x40049409  # ioctl(FICLONE) - reflink na btrfs/XFS
+
+
+class ModDeploymentError(Exception):
+    """Wdrożenie nie powiodło się; folder gry został przywrócony."""
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _is_read_only(path):
+    return not os.stat(path).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _hardlink(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        return False
+    return True
+
+
+def list_mod_files(mod_dir):
+    """Ścieżki względne (z ``/``) wszystkich plików w folderze moda."""
+    files = []
+    for dir_path, _dir_names, file_names in os.walk(mod_dir):
+        rel_dir = os.path.relpath(dir_path, mod_dir)
+        for file_name in file_names:
+            rel_path = file_name if rel_dir == "." else os.path.join(rel_dir, file_name)
+            files.append(rel_path.replace(os.sep, "/"))
+    return files
+
+
+def _is_managed(mod_info):
+    return bool(mod_info.get("managed")) and bool(mod_info.get("location"))
+
+
+class ModDeployment:
+    """Stan wdrożenia modów jednej gry."""
+
+    _locks = {}
+    _locks_guard = threading.Lock()
+
+    def __init__(
+        self, game_name, game_folder, games_folder=GAMES_FOLDER, allow_hardlinks=False
+    ):
+        self.game_name = game_name
+        self.allow_hardlinks = allow_hardlinks
+        self.game_folder = os.path.abspath(game_folder)
+        self.state_file = os.path.join(games_folder, game_name, MOD_DEPLOYMENT_FILE)
+        self.originals_dir = os.path.join(self.game_folder, ORIGINALS_DIRNAME)
+        self.staging_dir = os.path.join(self.game_folder, STAGING_DIRNAME)
+        self.journal_file = os.path.join(self.staging_dir, JOURNAL_FILENAME)
+        with self._locks_guard:
+            self.lock = self._locks.setdefault(self.state_file, threading.Lock())
+        self.state = self._load_state()
+        with self.lock:
+            try:
+                self._recover()
+            except ModDeploymentError as e:
+                logging.error(str(e))
+
+    # --- Stan ---
+
+    def _load_state(self):
+        state = {"version": MOD_DEPLOYMENT_VERSION, "sources": {}, "owners": {}}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MOD_DEPLOYMENT_VERSION:
+                state.update(data)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.error(f"Nie można wczytać stanu wdrożenia modów '{self.game_name}': {e}")
+        state.setdefault("deployed", {})
+        state.setdefault("originals", [])
+        return state
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp_path, self.state_file)
+
+    def register_source(self, mod_dir):
+        """Zapamiętuje (lub odświeża) listę plików folderu moda."""
+        mod_dir = os.path.abspath(mod_dir)
+        files = list_mod_files(mod_dir)
+        self.state["sources"][mod_dir] = files
+        self._save_state()
+        return files
+
+    def _source_files(self, mod_dir):
+        mod_dir = os.path.abspath(mod_dir)
+        files = self.state["sources"].get(mod_dir)
+        if files is None:
+            files = self.state["sources"][mod_dir] = list_mod_files(mod_dir)
+        return files
+
+    # --- Plan ---
+
+    def build_owners(self, profile_name, profile_data):
+        """Indeks ścieżka -> [mody w kolejności ładowania] dla zarządzanych modów profilu."""
+        owners = {}
+        mods = profile_data.get("mods", {})
+        for mod_name in profile_data.get("load_order", []):
+            mod_info = mods.get(mod_name)
+            if not mod_info or not _is_managed(mod_info):
+                continue
+            for rel_path in self._source_files(mod_info["location"]):
+                owners.setdefault(rel_path, []).append(mod_name)
+        self.state["owners"][profile_name] = owners
+        return owners
+
+    def desired_files(self, profile_name, profile_data):
+        """Ścieżka -> [mod, folder moda] dla aktywnych modów (wygrywa pierwszy w ``load_order``)."""
+        mods = profile_data.get("mods", {})
+        desired = {}
+        for rel_path, owners in self.build_owners(profile_name, profile_data).items():
+            for mod_name in owners:
+                if mods[mod_name].get("active", False):
+                    desired[rel_path] = [mod_name, os.path.abspath(mods[mod_name]["location"])]
+                    break
+        return desired
+
+    def file_summary(self, profile_name):
+        """Mod -> (ścieżki wygrane, wszystkie ścieżki) według indeksu właścicieli."""
+        summary = {}
+        for owners in self.state["owners"].get(profile_name, {}).values():
+            for position, mod_name in enumerate(owners):
+                won, total = summary.get(mod_name, (0, 0))
+                summary[mod_name] = (won + (position == 0), total + 1)
+        return summary
+
+    # --- Wdrożenie ---
+
+    def _target(self, rel_path):
+        return os.path.join(self.game_folder, *rel_path.split("/"))
+
+    def _stage(self, changes):
+        """Przygotowuje pliki w folderze tymczasowym; zwraca liczniki metod."""
+        methods = {"reflink": 0, "hardlink": 0, "copy": 0}
+        copies = []
+        for rel_path, (_mod_name, mod_dir) in changes:
+            src = os.path.join(mod_dir, *rel_path.split("/"))
+            staged = os.path.join(self.staging_dir, "new", *rel_path.split("/"))
+            os.makedirs(os.path.dirname(staged), exist_ok=True)
+            if _reflink(src, staged):
+                methods["reflink"] += 1
+            elif self.allow_hardlinks and _is_read_only(src) and _hardlink(src, staged):
+                methods["hardlink"] += 1
+            else:
+                copies.append((src, staged, os.path.getsize(src)))
+        if copies:
+            CopyEngine().copy_files(copies, workers_hint=(copies[0][0], self.game_folder))
+            methods["copy"] = len(copies)
+        return methods
+
+    def deploy(self, profile_name, profile_data):
+        """Doprowadza folder gry do stanu profilu; zwraca statystyki zmian."""
+        with self.lock:
+            self._recover()
+            desired = self.desired_files(profile_name, profile_data)
+            deployed = self.state["deployed"]
+            originals = set(self.state["originals"])
+
+            changes = [
+                (rel_path, owner)
+                for rel_path, owner in desired.items()
+                if deployed.get(rel_path) != owner or not os.path.exists(self._target(rel_path))
+            ]
+            removals = [rel_path for rel_path in deployed if rel_path not in desired]
+            stats = {"deployed": len(changes), "removed": len(removals), "unchanged": 0}
+            stats["unchanged"] = len(desired) - len(changes)
+            if not changes and not removals:
+                self._save_state()
+                return stats
+
+            try:
+                stats.update(self._stage(changes))
+            except Exception as e:
+                shutil.rmtree(self.staging_dir, ignore_errors=True)
+                raise ModDeploymentError(f"Przygotowanie plików modów nie powiodło się: {e}") from e
+
+            journal = {
+                "phase": "apply",
+                "removals": removals,
+                "changes": [rel_path for rel_path, _owner in changes],
+                "originals": sorted(originals),
+            }
+            old_dir = os.path.join(self.staging_dir, "old")
+            try:
+                self._write_journal(journal)
+                for rel_path in removals:
+                    target = self._target(rel_path)
+                    self._park(target, old_dir, rel_path)
+                    if rel_path in originals:
+                        os.replace(os.path.join(self.originals_dir, *rel_path.split("/")), target)
+                for rel_path, _owner in changes:
+                    target = self._target(rel_path)
+                    self._park(target, old_dir, rel_path)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(os.path.join(self.staging_dir, "new", *rel_path.split("/")), target)
+            except Exception as e:
+                if self._rollback(journal):
+                    shutil.rmtree(self.staging_dir, ignore_errors=True)
+                raise ModDeploymentError(f"Wdrożenie modów nie powiodło się: {e}") from e
+
+            # Oryginały gry (odłożone pliki spoza wdrożenia) idą do _mod_originals.
+            new_deployed = {rel: owner for rel, owner in deployed.items() if rel not in removals}
+            new_deployed.update(changes)
+            keep = [
+                rel_path
+                for rel_path, _owner in changes
+                if rel_path not in deployed
+                and rel_path not in originals
+                and os.path.lexists(os.path.join(old_dir, *rel_path.split("/")))
+            ]
+            journal = {
+                "phase": "commit",
+                "keep": keep,
+                "deployed": new_deployed,
+                "originals": sorted((originals - set(removals)) | set(keep)),
+                "profile": profile_name,
+            }
+            self._write_journal(journal)
+            self._commit(journal)
+        logging.info(
+            f"Wdrożono mody '{self.game_name}' (profil {profile_name}): {stats}"
+        )
+        return stats
+
+    def undeploy(self):
+        """Usuwa wszystkie wdrożone pliki modów i przywraca oryginały gry."""
+        return self.deploy(self.state.get("profile", ""), {"mods": {}, "load_order": []})
+
+    def _park(self, target, old_dir, rel_path):
+        if not os.path.lexists(target):
+            return None
+        parked = os.path.join(old_dir, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(parked), exist_ok=True)
+        os.replace(target, parked)
+        return parked
+
+    def _write_journal(self, journal):
+        os.makedirs(self.staging_dir, exist_ok=True)
+        tmp_path = self.journal_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(journal, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_file)
+
+    def _read_journal(self):
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(
+                f"Nie można wczytać dziennika wdrożenia modów '{self.game_name}': {e}"
+            )
+            return None
+
+    def _recover(self):
+        """Kończy lub wycofuje wdrożenie przerwane przez awarię launchera."""
+        if not os.path.isdir(self.staging_dir):
+            return
+        journal = self._read_journal()
+        if journal is None:
+            # Bez dziennika nic w folderze gry nie zostało ruszone - chyba że
+            # odłożone pliki zostawiła wersja sprzed dziennika.
+            if os.path.isdir(os.path.join(self.staging_dir, "old")):
+                raise ModDeploymentError(
+                    f"Folder '{self.staging_dir}' zawiera odłożone pliki gry z przerwanego "
+                    "wdrożenia; przenieś je ręcznie do folderu gry i usuń ten folder."
+                )
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            return
+        if journal.get("phase") == "commit":
+            logging.warning(f"Kończenie przerwanego wdrożenia modów '{self.game_name}'")
+            self._commit(journal)
+            return
+        logging.warning(f"Wycofywanie przerwanego wdrożenia modów '{self.game_name}'")
+        if not self._rollback(journal):
+            raise ModDeploymentError(
+                "Nie udało się wycofać przerwanego wdrożenia modów; "
+                f"pliki gry zostały w '{self.staging_dir}'."
+            )
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _commit(self, journal):
+        old_dir = os.path.join(self.staging_dir, "old")
+        for rel_path in journal["keep"]:
+            parked = os.path.join(old_dir, *rel_path.split("/"))
+            if os.path.lexists(parked):
+                kept = os.path.join(self.originals_dir, *rel_path.split("/"))
+                os.makedirs(os.path.dirname(kept), exist_ok=True)
+                os.replace(parked, kept)
+        self.state["deployed"] = journal["deployed"]
+        self.state["originals"] = journal["originals"]
+        self.state["profile"] = journal["profile"]
+        self._save_state()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _rollback(self, journal):
+        """Cofa fazę ``apply`` według stanu plików; zwraca False, jeśli coś zostało w ``old``.
+
+        Stan każdej ścieżki wynika z tego, co leży na dysku, więc wycofanie
+        działa tak samo po wyjątku, jak i po awarii w dowolnym miejscu.
+        """
+        old_dir = os.path.join(self.staging_dir, "old")
+        new_dir = os.path.join(self.staging_dir, "new")
+        originals = set(journal["originals"])
+        entries = [(rel_path, True) for rel_path in journal["removals"]]
+        entries += [(rel_path, False) for rel_path in journal["changes"]]
+        complete = True
+        for rel_path, removal in reversed(entries):
+            target = self._target(rel_path)
+            parked = os.path.join(old_dir, *rel_path.split("/"))
+            staged = os.path.join(new_dir, *rel_path.split("/"))
+            try:
+                if removal and rel_path in originals:
+                    kept = os.path.join(self.originals_dir, *rel_path.split("/"))
+                    restored = not os.path.lexists(kept) and os.path.lexists(target)
+                    if restored and os.path.lexists(parked):
+                        os.makedirs(os.path.dirname(kept), exist_ok=True)
+                        os.replace(target, kept)
+                elif not removal and not os.path.lexists(staged):
+                    if os.path.lexists(target):
+                        os.remove(target)
+                if os.path.lexists(parked):
+                    os.replace(parked, target)
+            except OSError as e:
+                complete = False
+                logging.error(f"Wycofanie wdrożenia modów: nie można przywrócić '{target}': {e}")
+        return complete
+
+
+__all__ = [
+    "ModDeployment",
+    "ModDeploymentError",
+    "list_mod_files",
+]
@@ -0,0 +1,49 @@
+"""
+Indeksy nazw gier do szybkiego sprawdzania istnienia i duplikatów.
+
+Wspólne dla skanera folderów i wyszukiwarki duplikatów - oba używają tej
+samej normalizacji (``normalize_game_name``).
+"""
+
+import re
+
+_NON_LETTERS_RE = re.compile(r"[^a-z]")
+
+
+def normalize_game_name(name):
+    """Tworzy 'klucz' do porównywania nazw gier, ignorując drobne różnice."""
+    return _NON_LETTERS_RE.sub("", name.lower())
+
+
+class GameNameIndex:
+    """Zbiór nazw gier z wyszukiwaniem O(1) po nazwie (bez wielkości liter) i kluczu duplikatów."""
+
+    def __init__(self, names=()):
+        self._lower = set()
+        self._by_key = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        self._lower.add(name.lower())
+        key = normalize_game_name(name)
+        if key:
+            self._by_key.setdefault(key, []).append(name)
+
+    def __contains__(self, name):
+        return name.lower() in self._lower
+
+    def __len__(self):
+        return len(self._lower)
+
+    def similar(self, name):
+        """Nazwy o tym samym kluczu duplikatów (np. 'Half-Life 2' i 'half life2')."""
+        key = normalize_game_name(name)
+        return list(self._by_key.get(key, ())) if key else []
+
+    def groups(self, min_size=2):
+        """Grupy nazw o wspólnym kluczu duplikatów, co najmniej ``min_size`` elementów."""
+        return {key: names for key, names in self._by_key.items() if len(names) >= min_size}
+
+
+__all__ = ["normalize_game_name", "GameNameIndex"]
@@ -0,0 +1,381 @@
+"""
+Dzienne agregaty czasu gry dla statystyk.
+
+Każda sesja z ``play_sessions`` jest raz rozbijana na dni (część sesji
+przypadająca na dany dzień kalendarzowy) i dopisywana do kubełków:
+dzień -> gra, dzień -> gatunek, dzień -> tag oraz dzień rozpoczęcia -> gra
+(liczba uruchomień i sumy do średniej długości sesji). Zapytanie o okres
+sumuje tylko kubełki z jego dni, zamiast przechodzić po wszystkich sesjach.
+
+Agregaty są aktualizowane przyrostowo: po zakończeniu sesji
+(``record_session``), przed zapytaniem, jeśli od ostatniego był
+``save_config`` (``sync_games`` na bieżącym słowniku gier), oraz po zapisie
+konfiguracji (obserwator dziennika) - przeliczana jest wtedy tylko gra,
+której sesje, gatunki lub tagi się zmieniły.
+"""
+
+import datetime
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from launcher.config_journal import get_config_journal
+from launcher.utils import CONFIG_FILE, config_generation
+
+SECONDS_PER_DAY = 86_400
+# Resztki po odejmowaniu liczb zmiennoprzecinkowych traktujemy jak zero.
+_EPSILON = 1e-6
+
+
+def _split_session(start_ts, end_ts):
+    """Rozbija sesję na dni: [(data, sekundy)] - tylko dni z dodatnim czasem."""
+    start_date = datetime.date.fromtimestamp(start_ts)
+    end_date = datetime.date.fromtimestamp(end_ts)
+    parts = []
+    day = start_date
+    while day <= end_date:
+        day_start_ts = time.mktime(day.timetuple())
+        overlap = min(end_ts, day_start_ts + SECONDS_PER_DAY) - max(start_ts, day_start_ts)
+        if overlap > 0:
+            parts.append((day, overlap))
+        day += datetime.timedelta(days=1)
+    return start_date, parts
+
+
+def _game_signature(game_data, sessions=None):
+    if sessions is None:
+        sessions = game_data.get("play_sessions") or []
+    # Skrót wszystkich par (start, end): edycja lub usunięcie wcześniejszej
+    # sesji przy jednoczesnym dopisaniu nowej też zmienia sygnaturę.
+    checksum = hash(
+        tuple(
+            (session.get("start"), session.get("end")) if isinstance(session, dict) else None
+            for session in sessions
+        )
+    )
+    return (
+        len(sessions),
+        checksum,
+        tuple(game_data.get("genres") or ()),
+        tuple(game_data.get("tags") or ()),
+    )
+
+
+class _GameRollup:
+    """Wkład jednej gry w kubełki - potrzebny, by móc go odjąć przy zmianie gry."""
+
+    __slots__ = ("signature", "genres", "tags", "days", "launches")
+
+    def __init__(self, signature, genres, tags):
+        self.signature = signature
+        self.genres = genres
+        self.tags = tags
+        self.days = defaultdict(float)  # data -> sekundy
+        self.launches = {}  # data rozpoczęcia -> [uruchomienia, sesje do średniej, suma czasu]
+
+
+def _add_to(bucket, key, value):
+    bucket[key] = bucket.get(key, 0.0) + value
+
+
+def _subtract_from(bucket, key, value):
+    remaining = bucket.get(key, 0.0) - value
+    if abs(remaining) < _EPSILON:
+        bucket.pop(key, None)
+    else:
+        bucket[key] = remaining
+
+
+class PlaytimeRollups:
+    """Magazyn dziennych agregatów czasu gry (per gra, gatunek i tag)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._games = {}
+        self._day_games = defaultdict(dict)
+        self._day_genres = defaultdict(dict)
+        self._day_tags = defaultdict(dict)
+        self._launch_days = defaultdict(dict)
+        self.synced_generation = None
+
+    @property
+    def built(self):
+        return self._built
+
+    def invalidate(self):
+        """Oznacza agregaty do pełnego przeliczenia przy najbliższym zapytaniu."""
+        with self._lock:
+            self._built = False
+
+    def rebuild(self, games):
+        """Przelicza agregaty od zera dla całej biblioteki."""
+        started = time.perf_counter()
+        with self._lock:
+            self._games.clear()
+            self._day_games.clear()
+            self._day_genres.clear()
+            self._day_tags.clear()
+            self._launch_days.clear()
+            sessions_total = 0
+            for game_name, game_data in list(games.items()):
+                if isinstance(game_data, dict):
+                    self._add_game(game_name, game_data)
+                    sessions_total += len(game_data.get("play_sessions") or [])
+            self._built = True
+        logging.info(
+            f"Przebudowano agregaty czasu gry: {len(self._games)} gier, {sessions_total} sesji "
+            f"w {time.perf_counter() - started:.3f}s"
+        )
+
+    def update_game(self, game_name, game_data):
+        """Przelicza jedną grę, jeśli zmieniły się jej sesje, gatunki lub tagi."""
+        with self._lock:
+            if not self._built:
+                return
+            current = self._games.get(game_name)
+            if current is not None and current.signature == _game_signature(game_data):
+                return
+            self._remove_game(game_name)
+            self._add_game(game_name, game_data)
+
+    def remove_game(self, game_name):
+        with self._lock:
+            if self._built:
+                self._remove_game(game_name)
+
+    def sync_games(self, games):
+        """Dogania bieżący słownik gier - przelicza tylko gry o zmienionej sygnaturze."""
+        with self._lock:
+            if not self._built:
+                return
+            for game_name in [n for n in self._games if n not in games]:
+                self._remove_game(game_name)
+            for game_name, game_data in list(games.items()):
+                if isinstance(game_data, dict):
+                    self.update_game(game_name, game_data)
+
+    def record_session(self, game_name, game_data, start_ts, end_ts):
+        """Dopisuje właśnie zakończoną sesję (już dodaną do ``game_data``)."""
+        with self._lock:
+            if not self._built:
+                return
+            current = self._games.get(game_name)
+            sessions = game_data.get("play_sessions") or []
+            if current is None or current.signature != _game_signature(game_data, sessions[:-1]):
+                # Agregaty gry nie odpowiadają stanowi sprzed sesji - przelicz całą grę.
+                self.update_game(game_name, game_data)
+                return
+            self._add_session(game_name, current, start_ts, end_ts)
+            current.signature = _game_signature(game_data, sessions)
+
+    def query(self, start_date, end_date, game_names=None, daily_games=False):
+        """Agregaty dla okresu [start_date, end_date] (opcjonalnie tylko wybranych gier).
+
+        Zwraca słownik z kluczami ``daily_seconds`` (data -> sekundy),
+        ``daily_games`` (data -> zbiór gier; tylko gdy ``daily_games=True``),
+        ``per_game``, ``per_genre``, ``per_tag`` (sekundy w okresie),
+        ``launches`` (gra -> liczba uruchomień) i ``sessions`` (gra ->
+        [liczba sesji, suma czasu] do średniej długości sesji).
+        """
+        only = set(game_names) if game_names is not None else None
+        daily_seconds = {}
+        games_per_day = {}
+        per_game = defaultdict(float)
+        per_genre = defaultdict(float)
+        per_tag = defaultdict(float)
+        launches = defaultdict(int)
+        sessions = {}
+        with self._lock:
+            days = [
+                start_date + datetime.timedelta(days=i)
+                for i in range((end_date - start_date).days + 1)
+            ]
+            for day in days:
+                games_on_day = self._day_games.get(day)
+                if games_on_day:
+                    if only is not None:
+                        games_on_day = {g: s for g, s in games_on_day.items() if g in only}
+                    if games_on_day:
+                        daily_seconds[day] = sum(games_on_day.values())
+                        if daily_games:
+                            games_per_day[day] = set(games_on_day)
+                        for game_name, seconds in games_on_day.items():
+                            per_game[game_name] += seconds
+                if only is None:
+                    for genre, seconds in self._day_genres.get(day, {}).items():
+                        per_genre[genre] += seconds
+                    for tag, seconds in self._day_tags.get(day, {}).items():
+                        per_tag[tag] += seconds
+                for game_name, (count, avg_count, avg_sum) in self._launch_days.get(
+                    day, {}
+                ).items():
+                    if only is not None and game_name not in only:
+                        continue
+                    launches[game_name] += count
+                    if avg_count:
+                        entry = sessions.setdefault(game_name, [0, 0.0])
+                        entry[0] += avg_count
+                        entry[1] += avg_sum
+            if only is not None:
+                for game_name, seconds in per_game.items():
+                    rollup = self._games.get(game_name)
+                    for genre in rollup.genres if rollup else ():
+                        per_genre[genre] += seconds
+                    for tag in rollup.tags if rollup else ():
+                        per_tag[tag] += seconds
+        return {
+            "daily_seconds": daily_seconds,
+            "daily_games": games_per_day,
+            "per_game": per_game,
+            "per_genre": per_genre,
+            "per_tag": per_tag,
+            "launches": launches,
+            "sessions": sessions,
+        }
+
+    # --- Wewnętrzne -----------------------------------------------------------
+
+    def _add_game(self, game_name, game_data):
+        rollup = _GameRollup(
+            _game_signature(game_data),
+            list(game_data.get("genres") or []),
+            list(game_data.get("tags") or []),
+        )
+        self._games[game_name] = rollup
+        for session in game_data.get("play_sessions") or []:
+            if not isinstance(session, dict):
+                continue
+            self._add_session(game_name, rollup, session.get("start"), session.get("end"))
+
+    def _add_session(self, game_name, rollup, start_ts, end_ts):
+        if not start_ts or not end_ts:
+            return
+        try:
+            start_date, parts = _split_session(start_ts, end_ts)
+        except (ValueError, OverflowError, OSError, TypeError) as e:
+            logging.warning(
+                f"Nie można przekonwertować timestamp sesji na datę dla gry {game_name}: {e}"
+            )
+            return
+
+        launch = rollup.launches.get(start_date)
+        if launch is None:
+            launch = rollup.launches[start_date] = [0, 0, 0.0]
+        launch[0] += 1
+        day_launch = self._launch_days[start_date].setdefault(game_name, [0, 0, 0.0])
+        day_launch[0] += 1
+        if parts:
+            duration = end_ts - start_ts
+            launch[1] += 1
+            launch[2] += duration
+            day_launch[1] += 1
+            day_launch[2] += duration
+
+        for day, seconds in parts:
+            rollup.days[day] += seconds
+            _add_to(self._day_games[day], game_name, seconds)
+            genres_on_day = self._day_genres[day]
+            for genre in rollup.genres:
+                _add_to(genres_on_day, genre, seconds)
+            tags_on_day = self._day_tags[day]
+            for tag in rollup.tags:
+                _add_to(tags_on_day, tag, seconds)
+
+    def _remove_game(self, game_name):
+        rollup = self._games.pop(game_name, None)
+        if rollup is None:
+            return
+        for day, seconds in rollup.days.items():
+            games_on_day = self._day_games.get(day)
+            if games_on_day is not None:
+                games_on_day.pop(game_name, None)
+                if not games_on_day:
+                    del self._day_games[day]
+            for bucket_map, keys in (
+                (self._day_genres, rollup.genres),
+                (self._day_tags, rollup.tags),
+            ):
+                bucket = bucket_map.get(day)
+                if bucket is None:
+                    continue
+                for key in keys:
+                    _subtract_from(bucket, key, seconds)
+                if not bucket:
+                    del bucket_map[day]
+        for day in rollup.launches:
+            launches_on_day = self._launch_days.get(day)
+            if launches_on_day is not None:
+                launches_on_day.pop(game_name, None)
+                if not launches_on_day:
+                    del self._launch_days[day]
+
+    def _on_games_changed(self, changed_games, full):
+        """Obserwator dziennika konfiguracji (wątek zapisu)."""
+        if full:
+            self.invalidate()
+            return
+        with self._lock:
+            if not self._built:
+                return
+            for game_name, game_json in changed_games.items():
+                if game_json is None:
+                    self._remove_game(game_name)
+                    continue
+                try:
+                    game_data = json.loads(game_json)
+                except ValueError:
+                    self._built = False
+                    return
+                self.update_game(game_name, game_data)
+
+
+_rollups = None
+_rollups_lock = threading.Lock()
+
+
+def get_playtime_rollups():
+    """Wspólny magazyn agregatów, zsynchronizowany z dziennikiem konfiguracji."""
+    global _rollups
+    with _rollups_lock:
+        if _rollups is None:
+            _rollups = PlaytimeRollups()
+            get_config_journal(CONFIG_FILE).add_listener(_rollups._on_games_changed)
+        return _rollups
+
+
+def query_playtime_rollups(self, start_date, end_date, game_names=None, daily_games=False):
+    """Agregaty okresu dla biblioteki launchera; przy pierwszym użyciu buduje magazyn."""
+    rollups = get_playtime_rollups()
+    # Po save_config agregaty doganiają bieżące dane od razu, bez czekania na zapis w tle.
+    generation = config_generation()
+    if not rollups.built:
+        rollups.rebuild(self.games)
+    elif rollups.synced_generation != generation:
+        rollups.sync_games(self.games)
+    rollups.synced_generation = generation
+    return rollups.query(start_date, end_date, game_names, daily_games)
+
+
+def record_playtime_session(self, game_name, start_ts, end_ts):
+    game_data = self.games.get(game_name)
+    if game_data is not None:
+        get_playtime_rollups().record_session(game_name, game_data, start_ts, end_ts)
+
+
+def rebuild_playtime_rollups(self):
+    """Ręczne przebudowanie agregatów (przycisk na stronie statystyk)."""
+    get_playtime_rollups().rebuild(self.games)
+    if hasattr(self, "stats_page_frame") and self.stats_page_frame.winfo_exists():
+        self._on_refresh_stats_threaded()
+
+
+__all__ = [
+    "PlaytimeRollups",
+    "get_playtime_rollups",
+    "query_playtime_rollups",
+    "record_playtime_session",
+    "rebuild_playtime_rollups",
+]
@@ -0,0 +1,393 @@
+"""
+Śledzenie procesów gier.
+
+Zamiast przeglądać tablicę procesów osobno dla każdej gry, watcher robi
+jeden zrzut (``psutil.process_iter``) na takt, indeksuje go po nazwie pliku
+i ścieżce .exe, a uruchomione gry wyznacza przez przecięcie z mapą
+.exe -> gry (``exe_path``, ``launch_profiles``, konfiguracja emulatorów).
+Porównanie z poprzednim taktem daje zdarzenia startu i zakończenia gier.
+
+Mapa jest przebudowywana tylko po zmianie biblioteki (obserwator dziennika
+konfiguracji) lub konfiguracji emulatorów. ``cmdline`` procesu jest
+pobierane wyłącznie dla procesów emulatorów i zapamiętywane na czas jego
+życia.
+
+Gry uruchomione z launchera są śledzone po drzewie procesów (``LaunchSession``):
+korzeniem jest PID z ``subprocess.Popen``, potomkowie są dopisywani z
+``children(recursive=True)`` żyjącego korzenia oraz na podstawie ppid ze
+zrzutu, a zakończenie wykrywa ``poll()``/``is_running()`` na trzymanych
+uchwytach. Dopasowanie po nazwie .exe dotyczy już tylko procesów spoza tych
+drzew, czyli gier uruchomionych poza launcherem.
+
+Ograniczenie: proces, który powstał i został osierocony między dwiema
+próbkami (np. stub startowy kończący się przed pierwszym taktem), nie trafi
+do drzewa. Na Linuksie (i macOS) sierota jest przepinana do init/subreapera,
+więc jej ppid już nie prowadzi do drzewa; na Windows ppid zostaje, ale
+znaleziony zostanie tylko bezpośredni potomek znanego procesu. Taka gra jest
+wtedy wykrywana jak uruchomiona poza launcherem - po nazwie .exe.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import psutil
+
+from launcher.config_journal import get_config_journal
+from launcher.utils import CONFIG_FILE
+
+# Zrzut młodszy niż tyle sekund wystarcza do odpowiedzi is_game_running.
+SNAPSHOT_MAX_AGE = 1.0
+
+_PROCESS_ERRORS = (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, OSError)
+
+
+class GameExeMap:
+    """Mapa .exe -> gry, zbudowana raz z biblioteki i konfiguracji emulatorów."""
+
+    def __init__(self, games, emulators):
+        self.by_name = {}
+        self.by_path = {}
+        # Emulatory: nazwa/ścieżka .exe emulatora -> [(gra, znormalizowana ścieżka ROM)]
+        self.emulator_by_name = {}
+        self.emulator_by_path = {}
+
+        for game_name, game_data in list(games.items()):
+            if not isinstance(game_data, dict):
+                continue
+            game_type = game_data.get("game_type", "pc")
+            if game_type == "pc":
+                exe_paths = set()
+                if game_data.get("exe_path"):
+                    exe_paths.add(os.path.abspath(game_data["exe_path"]))
+                for profile in game_data.get("launch_profiles", []) or []:
+                    if isinstance(profile, dict) and profile.get("exe_path"):
+                        exe_paths.add(os.path.abspath(profile["exe_path"]))
+                for exe_path in exe_paths:
+                    self.by_path.setdefault(exe_path, set()).add(game_name)
+                    self.by_name.setdefault(os.path.basename(exe_path).lower(), set()).add(
+                        game_name
+                    )
+            elif game_type == "emulator":
+                emulator_config = emulators.get(game_data.get("emulator_name") or "") or {}
+                emulator_path = emulator_config.get("path")
+                if not emulator_path:
+                    continue
+                emulator_path = os.path.abspath(emulator_path)
+                rom_path = game_data.get("rom_path")
+                entry = (
+                    game_name,
+                    os.path.normcase(os.path.abspath(rom_path)) if rom_path else None,
+                )
+                self.emulator_by_path.setdefault(emulator_path, []).append(entry)
+                self.emulator_by_name.setdefault(
+                    os.path.basename(emulator_path).lower(), []
+                ).append(entry)
+
+
+class ProcessSnapshot:
+    """Jeden zrzut tablicy procesów, zindeksowany po nazwie, ścieżce .exe i rodzicu."""
+
+    def __init__(self):
+        self.taken_at = time.monotonic()
+        self.by_name = {}
+        self.by_path = {}
+        self.keys = {}
+        self.children = {}
+        for proc in psutil.process_iter(["pid", "ppid", "name", "exe", "create_time", "status"]):
+            try:
+                info = proc.info
+                if info.get("status") == psutil.STATUS_ZOMBIE:
+                    continue
+                pid = info["pid"]
+                self.keys[pid] = (pid, info.get("create_time"))
+                if info.get("ppid") is not None:
+                    self.children.setdefault(info["ppid"], []).append(pid)
+                if info.get("name"):
+                    self.by_name.setdefault(info["name"].lower(), []).append(pid)
+                if info.get("exe"):
+                    self.by_path.setdefault(os.path.abspath(info["exe"]), []).append(pid)
+            except (*_PROCESS_ERRORS, TypeError, KeyError):
+                continue
+
+
+class LaunchSession:
+    """Drzewo procesów gry uruchomionej przez launcher (korzeń: PID z Popen)."""
+
+    def __init__(self, game_name, popen):
+        self.game_name = game_name
+        self.popen = popen
+        self.started_at = time.time()
+        # Żywe procesy drzewa: pid -> uchwyt psutil.
+        self.members = {}
+        # Wszystkie procesy, które należały do drzewa: pid -> create_time.
+        # Na Windows osierocone procesy zachowują ppid zmarłego rodzica; na
+        # Linuksie nie - stąd próbki potomków, dopóki korzeń żyje.
+        self.known = {}
+        try:
+            root = psutil.Process(popen.pid)
+            self.members[popen.pid] = root
+            self.known[popen.pid] = root.create_time()
+        except _PROCESS_ERRORS:
+            pass
+        self.adopt_descendants()
+
+    @property
+    def alive(self):
+        return bool(self.members)
+
+    def prune(self):
+        """Usuwa zakończone procesy; korzeń sprawdzany przez Popen.poll()."""
+        for pid, handle in list(self.members.items()):
+            if pid == self.popen.pid:
+                alive = self.popen.poll() is None
+            else:
+                try:
+                    alive = handle.is_running() and handle.status() != psutil.STATUS_ZOMBIE
+                except _PROCESS_ERRORS:
+                    alive = False
+            if not alive:
+                del self.members[pid]
+        return self.alive
+
+    def adopt_descendants(self):
+        """Dopisuje wszystkich obecnych potomków korzenia, póki ten jeszcze żyje.
+
+        Potomkowie zapamiętani tutaj pozostają w drzewie także po zakończeniu
+        korzenia, gdy system przepnie ich do init/subreapera.
+        """
+        root = self.members.get(self.popen.pid)
+        if root is None or self.popen.poll() is not None:
+            return
+        try:
+            descendants = root.children(recursive=True)
+        except _PROCESS_ERRORS:
+            return
+        for child in descendants:
+            if child.pid in self.known:
+                continue
+            try:
+                self.known[child.pid] = child.create_time()
+            except _PROCESS_ERRORS:
+                continue
+            self.members[child.pid] = child
+
+    def update(self, snapshot):
+        """Dopisuje potomków korzenia i znanych procesów (ppid ze zrzutu)."""
+        self.adopt_descendants()
+        pending = list(self.known)
+        while pending:
+            parent_pid = pending.pop()
+            parent_created = self.known[parent_pid]
+            current = snapshot.keys.get(parent_pid)
+            if current is not None and current[1] != parent_created:
+                # PID rodzica został ponownie użyty przez inny proces.
+                continue
+            for child_pid in snapshot.children.get(parent_pid, ()):
+                if child_pid in self.known:
+                    continue
+                child_created = snapshot.keys[child_pid][1]
+                if child_created is None or child_created < parent_created:
+                    continue
+                try:
+                    self.members[child_pid] = psutil.Process(child_pid)
+                except _PROCESS_ERRORS:
+                    continue
+                self.known[child_pid] = child_created
+                pending.append(child_pid)
+        return self.prune()
+
+    def kill(self):
+        """Zabija całe drzewo (najpierw potomków). True, jeśli coś było uruchomione."""
+        self.adopt_descendants()
+        killed = False
+        for pid, handle in reversed(list(self.members.items())):
+            try:
+                if pid == self.popen.pid:
+                    self.popen.kill()
+                else:
+                    handle.kill()
+                killed = True
+            except _PROCESS_ERRORS:
+                continue
+        self.prune()
+        return killed
+
+
+class ProcessWatcher:
+    """Wyznacza uruchomione gry z jednego zrzutu procesów na takt."""
+
+    def __init__(self, launcher):
+        self.launcher = launcher
+        self._lock = threading.RLock()
+        self._exe_map = None
+        self._emulators_fingerprint = None
+        self._snapshot = None
+        self._running = frozenset()
+        self._reported = frozenset()
+        self._cmdlines = {}
+        self._sessions = {}
+        get_config_journal(CONFIG_FILE).add_listener(self._on_games_changed)
+
+    def _on_games_changed(self, changed_games, full):
+        with self._lock:
+            self._exe_map = None
+
+    def _get_exe_map(self):
+        emulators = self.launcher.config.get("emulators", {}) or {}
+        fingerprint = json.dumps(emulators, sort_keys=True, default=str)
+        if self._exe_map is None or fingerprint != self._emulators_fingerprint:
+            self._exe_map = GameExeMap(self.launcher.games, emulators)
+            self._emulators_fingerprint = fingerprint
+        return self._exe_map
+
+    def _cmdline(self, snapshot, pid):
+        key = snapshot.keys.get(pid)
+        if key in self._cmdlines:
+            return self._cmdlines[key]
+        try:
+            cmdline = psutil.Process(pid).cmdline()
+        except _PROCESS_ERRORS:
+            cmdline = []
+        self._cmdlines[key] = cmdline
+        return cmdline
+
+    def _match_emulators(self, snapshot, exe_map, running, owned_pids):
+        candidates = {}
+        for name, entries in exe_map.emulator_by_name.items():
+            for pid in snapshot.by_name.get(name, ()):
+                if pid not in owned_pids:
+                    candidates.setdefault(pid, []).extend(entries)
+        for path, entries in exe_map.emulator_by_path.items():
+            for pid in snapshot.by_path.get(path, ()):
+                if pid not in owned_pids:
+                    candidates.setdefault(pid, []).extend(entries)
+
+        for pid, entries in candidates.items():
+            cmdline = None
+            for game_name, norm_rom_path in entries:
+                if game_name in running:
+                    continue
+                if norm_rom_path is None:
+                    running.add(game_name)
+                    continue
+                if cmdline is None:
+                    cmdline = [os.path.normcase(arg) for arg in self._cmdline(snapshot, pid)]
+                if not cmdline:
+                    # Bez linii komend nie da się zweryfikować ROMu - jak dotąd: uznajemy za działającą.
+                    running.add(game_name)
+                elif any(norm_rom_path in arg for arg in cmdline):
+                    running.add(game_name)
+
+    # --- Gry uruchomione z launchera ---
+
+    def track_launch(self, game_name, popen):
+        """Zaczyna śledzić drzewo procesów gry uruchomionej przez ``subprocess.Popen``."""
+        with self._lock:
+            self._sessions[game_name] = LaunchSession(game_name, popen)
+
+    def session_started_at(self, game_name):
+        with self._lock:
+            session = self._sessions.get(game_name)
+            return session.started_at if session is not None else None
+
+    def kill_launched(self, game_name):
+        """Zamyka drzewo procesów uruchomionej gry. False, gdy gra nie była śledzona."""
+        with self._lock:
+            session = self._sessions.get(game_name)
+            if session is None or not session.prune():
+                return False
+            logging.info(
+                f"Zamykanie drzewa procesów gry '{game_name}': {sorted(session.members)}"
+            )
+            return session.kill()
+
+    def _update_sessions(self, snapshot):
+        owned_pids = set()
+        running = set()
+        for game_name, session in list(self._sessions.items()):
+            if session.update(snapshot):
+                running.add(game_name)
+                owned_pids.update(session.members)
+                continue
+            del self._sessions[game_name]
+            processes = getattr(self.launcher, "processes", None)
+            if processes is not None and processes.get(game_name) is session.popen:
+                del processes[game_name]
+            logging.debug(f"Drzewo procesów gry '{game_name}' zakończyło działanie.")
+        return running, owned_pids
+
+    def refresh(self):
+        """Robi nowy zrzut procesów i przelicza zbiór uruchomionych gier."""
+        snapshot = ProcessSnapshot()
+        with self._lock:
+            exe_map = self._get_exe_map()
+            running, owned_pids = self._update_sessions(snapshot)
+            # Dopasowanie po .exe tylko dla procesów spoza drzew uruchomionych gier.
+            for name, pids in snapshot.by_name.items():
+                games = exe_map.by_name.get(name)
+                if games and not owned_pids.issuperset(pids):
+                    running.update(games)
+            for path, pids in snapshot.by_path.items():
+                games = exe_map.by_path.get(path)
+                if games and not owned_pids.issuperset(pids):
+                    running.update(games)
+            if exe_map.emulator_by_name:
+                self._match_emulators(snapshot, exe_map, running, owned_pids)
+
+            live_keys = set(snapshot.keys.values())
+            for key in [k for k in self._cmdlines if k not in live_keys]:
+                del self._cmdlines[key]
+            self._snapshot = snapshot
+            self._running = frozenset(running)
+            return self._running
+
+    def running_games(self, max_age=SNAPSHOT_MAX_AGE):
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - snapshot.taken_at <= max_age:
+                return self._running
+        return self.refresh()
+
+    def is_running(self, game_name, max_age=SNAPSHOT_MAX_AGE):
+        with self._lock:
+            session = self._sessions.get(game_name)
+            if session is not None and session.prune():
+                return True
+        return game_name in self.running_games(max_age)
+
+    def tick(self):
+        """Nowy zrzut i zdarzenia od poprzedniego taktu: (uruchomione, zakończone)."""
+        running = self.refresh()
+        with self._lock:
+            started = running - self._reported
+            stopped = self._reported - running
+            self._reported = running
+        if started or stopped:
+            logging.debug(f"Procesy gier: uruchomione {sorted(started)}, zakończone {sorted(stopped)}")
+        return started, stopped
+
+
+_watcher_lock = threading.Lock()
+
+
+def get_process_watcher(self):
+    """Watcher procesów powiązany z launcherem (tworzony leniwie)."""
+    with _watcher_lock:
+        watcher = getattr(self, "_process_watcher", None)
+        if watcher is None:
+            watcher = ProcessWatcher(self)
+            self._process_watcher = watcher
+        return watcher
+
+
+__all__ = [
+    "SNAPSHOT_MAX_AGE",
+    "GameExeMap",
+    "ProcessSnapshot",
+    "LaunchSession",
+    "ProcessWatcher",
+    "get_process_watcher",
+]
@@ -0,0 +1,119 @@
+"""
+Podział plików zapisów na kawałki wyznaczane treścią (content-defined chunking).
+
+Granica kawałka wypada tam, gdzie suma wartości z tablicy ``_GEAR`` dla
+ostatnich ``WINDOW_SIZE`` bajtów ma wyzerowane dolne bity (``_BOUNDARY_MASK``).
+Granice zależą więc tylko od lokalnej treści: wstawienie lub usunięcie bajtów
+w środku pliku zmienia jeden-dwa kawałki, a nie wszystkie następne, jak przy
+kawałkach o stałym rozmiarze. Suma okna liczona jest wektorowo (NumPy,
+``cumsum``), po ``SEGMENT_SIZE`` bajtów naraz.
+
+Kawałki są zapisywane skompresowane (zlib) z jednobajtowym nagłówkiem:
+``z`` - dane skompresowane, ``r`` - dane surowe (gdy kompresja nic nie daje).
+"""
+
+import hashlib
+import zlib
+
+import numpy as np
+
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+WINDOW_SIZE = 48
+SEGMENT_SIZE = 4 * 1024 * 1024
+# Poziom 1: ~8x szybciej niż 6 przy kilku procentach większych kawałkach.
+COMPRESSION_LEVEL = 1
+# Średni kawałek ~64 KiB (16 bitów maski) ponad minimalny rozmiar.
+_BOUNDARY_MASK = (1 << 16) - 1
+
+# Stała tablica - inne wartości przesunęłyby granice i zepsuły deduplikację,
+# dlatego pochodzi z SHA-256, a nie z generatora NumPy (jego strumień może się
+# zmienić między wersjami). Sumy liczone modulo 2**32 - maska patrzy tylko na
+# dolne bity.
+_GEAR = np.array(
+    [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "little") for i in range(256)],
+    dtype=np.uint32,
+)
+
+_RAW = b"r"
+_ZLIB = b"z"
+
+
+def _candidate_cuts(buffer):
+    """Pozycje (końce kawałków) w ``buffer``, w których okno spełnia warunek granicy."""
+    if len(buffer) <= WINDOW_SIZE:
+        return np.empty(0, dtype=np.int64)
+    values = _GEAR[np.frombuffer(buffer, dtype=np.uint8)]
+    sums = np.cumsum(values, dtype=np.uint32)
+    window_sums = sums[WINDOW_SIZE:] - sums[:-WINDOW_SIZE]
+    return np.flatnonzero((window_sums & _BOUNDARY_MASK) == 0) + WINDOW_SIZE + 1
+
+
+def _cut_points(buffer, final):
+    """Końce kawałków w ``buffer`` zaczynającym się na granicy kawałka.
+
+    Gdy ``final`` jest fałszem, ostatni niedomknięty fragment zostaje na
+    następny segment (granica może wypaść dopiero w nim).
+    """
+    length = len(buffer)
+    candidates = _candidate_cuts(buffer)
+    cuts = []
+    position = 0
+    while length - position > MAX_CHUNK_SIZE or (final and position < length):
+        idx = np.searchsorted(candidates, position + MIN_CHUNK_SIZE)
+        if idx < len(candidates) and candidates[idx] <= position + MAX_CHUNK_SIZE:
+            position = int(candidates[idx])
+        else:
+            position = min(position + MAX_CHUNK_SIZE, length)
+            if position == length and not final:
+                break
+        cuts.append(position)
+    return cuts
+
+
+def iter_file_chunks(path):
+    """Zwraca kolejne kawałki pliku (bytes)."""
+    with open(path, "rb") as f:
+        pending = b""
+        while True:
+            block = f.read(SEGMENT_SIZE)
+            final = not block
+            buffer = pending + block
+            if not buffer:
+                return
+            start = 0
+            for end in _cut_points(buffer, final):
+                yield buffer[start:end]
+                start = end
+            if final:
+                return
+            pending = buffer[start:]
+
+
+def chunk_digest(chunk):
+    return hashlib.sha256(chunk).hexdigest()
+
+
+def encode_chunk(chunk):
+    compressed = zlib.compress(chunk, COMPRESSION_LEVEL)
+    if len(compressed) < len(chunk):
+        return _ZLIB + compressed
+    return _RAW + chunk
+
+
+def decode_chunk(data):
+    if data[:1] == _ZLIB:
+        return zlib.decompress(data[1:])
+    if data[:1] == _RAW:
+        return data[1:]
+    raise ValueError("Nieznany format kawałka zapisu")
+
+
+__all__ = [
+    "MIN_CHUNK_SIZE",
+    "MAX_CHUNK_SIZE",
+    "iter_file_chunks",
+    "chunk_digest",
+    "encode_chunk",
+    "decode_chunk",
+]
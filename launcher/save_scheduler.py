@@ -0,0 +1,201 @@
+"""
+Zbiorczy, opóźniony zapis konfiguracji.
+
+``save_config`` tylko oznacza konfigurację jako zmienioną. Wątek zapisujący
+czeka, aż seria zmian ucichnie (``delay``, ale nie dłużej niż ``max_delay``),
+i wykonuje jeden zapis za całą serię - poza wątkiem Tk.
+
+Nieudany zapis nie gubi danych: wracają jako oczekujące (o ile w międzyczasie
+nie przyszły nowsze), a wątek ponawia zapis z rosnącym odstępem
+(``retry_delay`` podwajany do ``max_retry_delay``).
+"""
+
+import logging
+import threading
+import time
+
+DEFAULT_SAVE_DELAY = 0.5
+DEFAULT_MAX_SAVE_DELAY = 3.0
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_MAX_RETRY_DELAY = 60.0
+
+
+class SaveScheduler:
+    """Łączy serie żądań zapisu w pojedyncze zapisy na wątku w tle."""
+
+    def __init__(
+        self,
+        writer,
+        delay: float = DEFAULT_SAVE_DELAY,
+        max_delay: float = DEFAULT_MAX_SAVE_DELAY,
+        name: str = "ConfigSaveWriter",
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+    ):
+        self._writer = writer
+        self.delay = delay
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._name = name
+        self._cond = threading.Condition()
+        self._pending = None
+        self._dirty = False
+        self._writing = False
+        self._flush_requested = False
+        self._first_request_at = 0.0
+        self._last_request_at = 0.0
+        self._retry_at = 0.0
+        self._current_retry_delay = 0.0
+        self._attempts = 0
+        self._last_write_failed = False
+        self._thread = None
+        self._stopped = False
+        self.requests = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def request(self, data):
+        """Oznacza dane jako zmienione; zapis nastąpi po ucichnięciu serii."""
+        with self._cond:
+            now = time.monotonic()
+            self.requests += 1
+            if self._dirty:
+                self.coalesced += 1
+            else:
+                self._first_request_at = now
+            self._pending = data
+            self._dirty = True
+            self._last_request_at = now
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self):
+        """Prosi o natychmiastowy zapis bez czekania na jego zakończenie."""
+        with self._cond:
+            if self._dirty:
+                self._flush_requested = True
+                self._cond.notify_all()
+
+    def flush_sync(self, timeout: float | None = None) -> bool:
+        """Zapisuje oczekujące zmiany i czeka na koniec zapisu.
+
+        False przy timeoucie albo gdy zapis się nie powiódł (dane zostają
+        wtedy oczekujące i wątek ponowi zapis).
+        """
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                if self._dirty:
+                    data = self._take_pending()
+                    self._cond.release()
+                    ok = False
+                    try:
+                        ok = self._write(data)
+                    finally:
+                        self._cond.acquire()
+                        self._finish_write(data, ok)
+                    return ok
+                return True
+
+            if not self._dirty and not self._writing:
+                return True
+            # Trwający zapis nie zawiera danych oczekujących - te pójdą w następnym.
+            needed = self._attempts + self._writing + self._dirty
+            self._flush_requested = self._dirty
+            self._cond.notify_all()
+            if not self._cond.wait_for(lambda: self._attempts >= needed, timeout):
+                return False
+            return not self._last_write_failed
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "requests": self.requests,
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "pending": self._dirty,
+                "last_write_failed": self._last_write_failed,
+            }
+
+    def stop(self, timeout: float | None = None):
+        """Zapisuje zaległe zmiany i kończy wątek zapisujący."""
+        self.flush_sync(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _ensure_thread(self):
+        if self._stopped or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def _take_pending(self):
+        data = self._pending
+        self._pending = None
+        self._dirty = False
+        self._flush_requested = False
+        self._writing = True
+        return data
+
+    def _run(self):
+        with self._cond:
+            while not self._stopped:
+                if not self._dirty:
+                    self._cond.wait()
+                    continue
+                if not self._flush_requested:
+                    now = time.monotonic()
+                    due = min(
+                        self._last_request_at + self.delay,
+                        self._first_request_at + self.max_delay,
+                    )
+                    due = max(due, self._retry_at)
+                    if now < due:
+                        self._cond.wait(due - now)
+                        continue
+
+                data = self._take_pending()
+                self._cond.release()
+                ok = False
+                try:
+                    ok = self._write(data)
+                finally:
+                    self._cond.acquire()
+                    self._finish_write(data, ok)
+
+    def _write(self, data):
+        try:
+            self._writer(data)
+            self.writes += 1
+            return True
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Błąd zapisu konfiguracji w tle: {e}")
+            return False
+
+    def _finish_write(self, data, ok):
+        """Wywoływane pod ``_cond`` po każdej próbie zapisu."""
+        self._writing = False
+        self._attempts += 1
+        self._last_write_failed = not ok
+        if ok:
+            self._current_retry_delay = 0.0
+            self._retry_at = 0.0
+        else:
+            now = time.monotonic()
+            if not self._dirty:
+                self._pending = data
+                self._dirty = True
+                self._first_request_at = self._last_request_at = now
+            self._current_retry_delay = min(
+                max(self._current_retry_delay * 2, self.retry_delay), self.max_retry_delay
+            )
+            self._retry_at = now + self._current_retry_delay
+            logging.warning(f"Ponowienie zapisu za {self._current_retry_delay:.1f} s")
+        self._cond.notify_all()
+
+
+__all__ = ["SaveScheduler"]
@@ -0,0 +1,463 @@
+"""
+Przyrostowy magazyn zapisów gier z deduplikacją kawałków.
+
+Każda gra ma w ``GAMES_FOLDER/<gra>/save_store`` wspólny magazyn dla
+auto-zapisu i zapisów ręcznych:
+
+* ``chunks/<2 znaki>/<sha256>`` - skompresowane kawałki plików, wyznaczane
+  treścią (``launcher.save_chunks``); kawałek o tej samej treści jest
+  zapisany raz dla wszystkich migawek gry;
+* ``snapshots/<nazwa>.json`` - manifest migawki: ścieżka względna ->
+  [rozmiar, mtime_ns, sha256 pliku, [sha256 kawałków]];
+* ``index.json`` - metadane migawek (data, procent, rozmiar) dla listy
+  zapisów, bez czytania manifestów i folderów.
+
+Plik o tym samym rozmiarze i mtime co w poprzedniej migawce nie jest
+czytany - wystarcza wpis z manifestu. Zmieniony plik jest dzielony na
+kawałki i zapisywane są tylko te, których jeszcze nie ma, więc kolejny
+zapis kosztuje zmienione fragmenty, a nie całe pliki.
+
+Przywracanie składa pliki z kawałków i pomija pliki, które w folderze gry
+mają już rozmiar i mtime z migawki. Po usunięciu lub nadpisaniu migawki
+nieużywane kawałki są usuwane (``collect_garbage``). Migawki w formacie 1
+(całe pliki w ``objects/``) można nadal przywracać.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from tkinter import messagebox
+
+from launcher.save_chunks import chunk_digest, decode_chunk, encode_chunk, iter_file_chunks
+from launcher.utils import GAMES_FOLDER
+
+SAVE_STORE_DIRNAME = "save_store"
+SAVE_STORE_VERSION = 2
+_READABLE_VERSIONS = (1, SAVE_STORE_VERSION)
+AUTOSAVE_SNAPSHOT = "_autosave"
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+_store_locks = {}
+_store_locks_guard = threading.Lock()
+
+
+def _store_lock(root):
+    with _store_locks_guard:
+        lock = _store_locks.get(root)
+        if lock is None:
+            lock = _store_locks[root] = threading.RLock()
+        return lock
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_COPY_BUFFER_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class SaveStore:
+    """Migawki folderu zapisów jednej gry we wspólnym magazynie kawałków."""
+
+    def __init__(self, game_name, games_folder=GAMES_FOLDER):
+        self.game_name = game_name
+        self.root = os.path.join(games_folder, game_name, SAVE_STORE_DIRNAME)
+        self.chunks_dir = os.path.join(self.root, "chunks")
+        self.objects_dir = os.path.join(self.root, "objects")  # format 1
+        self.snapshots_dir = os.path.join(self.root, "snapshots")
+        self.index_file = os.path.join(self.root, "index.json")
+        self.lock = _store_lock(os.path.abspath(self.root))
+        self._index = None
+        self._index_signature = None
+
+    # --- Manifesty i indeks ---
+
+    def _manifest_path(self, name):
+        return os.path.join(self.snapshots_dir, name + ".json")
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def has_snapshot(self, name):
+        return os.path.isfile(self._manifest_path(name))
+
+    def load_manifest(self, name):
+        try:
+            with open(self._manifest_path(name), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.error(f"Nie można wczytać manifestu zapisu '{name}' ({self.game_name}): {e}")
+            return None
+        if manifest.get("version") not in _READABLE_VERSIONS:
+            return None
+        return manifest
+
+    def _write_manifest(self, name, manifest):
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        _write_atomic(
+            self._manifest_path(name),
+            json.dumps(manifest, separators=(",", ":")).encode("utf-8"),
+        )
+
+    @staticmethod
+    def _index_entry(manifest):
+        return {
+            "created": manifest.get("created", 0),
+            "percent": manifest.get("percent"),
+            "files": len(manifest.get("files", {})),
+            "size": manifest.get("size", 0),
+        }
+
+    def _index_file_signature(self):
+        try:
+            st = os.stat(self.index_file)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _load_index(self):
+        """Indeks migawek; przebudowywany z manifestów, gdy go brak lub jest nieaktualny.
+
+        Kopia w pamięci jest ważna tylko dopóki ``index.json`` się nie zmienił -
+        inna instancja (np. auto-zapis po wyjściu z gry) mogła go nadpisać.
+        """
+        signature = self._index_file_signature()
+        if self._index is not None and signature == self._index_signature:
+            return self._index
+        self._index_signature = signature
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SAVE_STORE_VERSION:
+                self._index = data.get("snapshots", {})
+                return self._index
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Indeks zapisów '{self.game_name}' uszkodzony, przebudowa: {e}")
+
+        snapshots = {}
+        try:
+            file_names = os.listdir(self.snapshots_dir)
+        except FileNotFoundError:
+            file_names = []
+        for file_name in file_names:
+            if not file_name.endswith(".json"):
+                continue
+            manifest = self.load_manifest(file_name[: -len(".json")])
+            if manifest is not None:
+                snapshots[manifest["name"]] = self._index_entry(manifest)
+        self._index = snapshots
+        if snapshots:
+            self._save_index()
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        _write_atomic(
+            self.index_file,
+            json.dumps(
+                {"version": SAVE_STORE_VERSION, "snapshots": self._index},
+                separators=(",", ":"),
+            ).encode("utf-8"),
+        )
+        self._index_signature = self._index_file_signature()
+
+    def list_snapshots(self):
+        """Metadane migawek z indeksu: [{'name', 'created', 'percent', 'files', 'size'}]."""
+        with self.lock:
+            return [dict(meta, name=name) for name, meta in self._load_index().items()]
+
+    def _latest_manifest(self):
+        index = self._load_index()
+        if not index:
+            return None
+        return self.load_manifest(max(index, key=lambda name: index[name]["created"]))
+
+    # --- Migawki ---
+
+    def _store_file(self, path, stats):
+        """Dzieli plik na kawałki i zapisuje brakujące; zwraca (sha256 pliku, [sha256 kawałków])."""
+        file_digest = hashlib.sha256()
+        chunk_digests = []
+        for chunk in iter_file_chunks(path):
+            file_digest.update(chunk)
+            digest = chunk_digest(chunk)
+            chunk_digests.append(digest)
+            chunk_path = self._chunk_path(digest)
+            if os.path.exists(chunk_path):
+                continue
+            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+            encoded = encode_chunk(chunk)
+            _write_atomic(chunk_path, encoded)
+            stats["new_chunks"] += 1
+            stats["new_bytes"] += len(encoded)
+        return file_digest.hexdigest(), chunk_digests
+
+    def snapshot(self, name, source_dir, percent=None, verify_hash=False, progress=None):
+        """Zapisuje migawkę ``source_dir`` pod nazwą ``name`` (nadpisuje istniejącą).
+
+        Bazą do pomijania niezmienionych plików jest poprzednia migawka o tej
+        nazwie albo najnowsza migawka gry. ``verify_hash=True`` liczy skrót
+        także plików o niezmienionym rozmiarze i mtime.
+        """
+        source_dir = os.path.abspath(source_dir)
+        entries, dirs = [], []
+        for dir_path, dir_names, file_names in os.walk(source_dir):
+            rel_dir = os.path.relpath(dir_path, source_dir)
+            if rel_dir != "." and not dir_names and not file_names:
+                dirs.append(rel_dir.replace(os.sep, "/"))
+            for file_name in file_names:
+                full_path = os.path.join(dir_path, file_name)
+                entries.append(
+                    (os.path.relpath(full_path, source_dir).replace(os.sep, "/"), full_path)
+                )
+
+        stats = {"files": len(entries), "reused": 0, "chunked": 0, "new_chunks": 0, "new_bytes": 0}
+        with self.lock:
+            base = self.load_manifest(name) or self._latest_manifest()
+            base_files = base.get("files", {}) if base else {}
+            files = {}
+            total_size = 0
+            for done, (rel_path, full_path) in enumerate(entries, 1):
+                st = os.stat(full_path)
+                previous = base_files.get(rel_path)
+                # Wpisy formatu 1 (bez listy kawałków) są dzielone od nowa.
+                reusable = (
+                    previous is not None
+                    and len(previous) == 4
+                    and previous[0] == st.st_size
+                    and previous[1] == st.st_mtime_ns
+                )
+                if reusable and not (verify_hash and _hash_file(full_path) != previous[2]):
+                    files[rel_path] = previous
+                    stats["reused"] += 1
+                else:
+                    file_digest, chunk_digests = self._store_file(full_path, stats)
+                    files[rel_path] = [st.st_size, st.st_mtime_ns, file_digest, chunk_digests]
+                    stats["chunked"] += 1
+                total_size += st.st_size
+                if progress is not None:
+                    progress(done, len(entries))
+
+            manifest = {
+                "version": SAVE_STORE_VERSION,
+                "name": name,
+                "created": time.time(),
+                "percent": percent,
+                "size": total_size,
+                "files": files,
+                "dirs": dirs,
+            }
+            self._write_manifest(name, manifest)
+            self._load_index()[name] = self._index_entry(manifest)
+            self._save_index()
+            if base is not None and base.get("name") == name:
+                # Nadpisana migawka mogła być jedynym właścicielem części kawałków.
+                self.collect_garbage()
+        logging.info(
+            f"Migawka zapisu '{name}' ({self.game_name}): {stats['files']} plików, "
+            f"bez zmian {stats['reused']}, nowe kawałki {stats['new_chunks']} "
+            f"({stats['new_bytes']} B po kompresji)."
+        )
+        return stats
+
+    def _write_file_from_store(self, entry, dest_path):
+        tmp_path = dest_path + ".restore_tmp"
+        with open(tmp_path, "wb") as dst:
+            if len(entry) == 4:
+                for digest in entry[3]:
+                    with open(self._chunk_path(digest), "rb") as f:
+                        dst.write(decode_chunk(f.read()))
+            else:
+                with open(self._object_path(entry[2]), "rb") as src:
+                    while True:
+                        block = src.read(_COPY_BUFFER_SIZE)
+                        if not block:
+                            break
+                        dst.write(block)
+        os.utime(tmp_path, ns=(entry[1], entry[1]))
+        os.replace(tmp_path, dest_path)
+
+    def restore(self, name, dest_dir, progress=None):
+        """Przywraca migawkę do ``dest_dir``; pliki zgodne z migawką nie są kopiowane."""
+        with self.lock:
+            manifest = self.load_manifest(name)
+            if manifest is None:
+                raise FileNotFoundError(f"Brak migawki zapisu '{name}' dla '{self.game_name}'")
+            for rel_dir in manifest.get("dirs", []):
+                os.makedirs(os.path.join(dest_dir, *rel_dir.split("/")), exist_ok=True)
+            files = manifest.get("files", {})
+            copied = 0
+            for done, (rel_path, entry) in enumerate(files.items(), 1):
+                dest_path = os.path.join(dest_dir, *rel_path.split("/"))
+                try:
+                    st = os.stat(dest_path)
+                    unchanged = st.st_size == entry[0] and st.st_mtime_ns == entry[1]
+                except OSError:
+                    unchanged = False
+                if not unchanged:
+                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                    self._write_file_from_store(entry, dest_path)
+                    copied += 1
+                if progress is not None:
+                    progress(done, len(files))
+        logging.info(
+            f"Przywrócono migawkę '{name}' ({self.game_name}): "
+            f"skopiowano {copied} z {len(files)} plików."
+        )
+        return {"files": len(files), "copied": copied}
+
+    def rename(self, old_name, new_name, percent=None):
+        with self.lock:
+            if self.has_snapshot(new_name):
+                raise FileExistsError(new_name)
+            manifest = self.load_manifest(old_name)
+            if manifest is None:
+                raise FileNotFoundError(old_name)
+            manifest["name"] = new_name
+            if percent is not None:
+                manifest["percent"] = percent
+            self._write_manifest(new_name, manifest)
+            os.remove(self._manifest_path(old_name))
+            index = self._load_index()
+            index.pop(old_name, None)
+            index[new_name] = self._index_entry(manifest)
+            self._save_index()
+
+    def delete(self, name):
+        with self.lock:
+            try:
+                os.remove(self._manifest_path(name))
+            except FileNotFoundError:
+                return
+            self._load_index().pop(name, None)
+            self._save_index()
+            self.collect_garbage()
+
+    def collect_garbage(self):
+        """Usuwa kawałki (i obiekty formatu 1), do których nie odwołuje się żadna migawka."""
+        with self.lock:
+            # Odwołania z manifestów na dysku, nie z indeksu - indeks mógł nie
+            # zdążyć z migawką zapisaną przez inną instancję.
+            referenced = set()
+            try:
+                file_names = os.listdir(self.snapshots_dir)
+            except FileNotFoundError:
+                file_names = []
+            for file_name in file_names:
+                if not file_name.endswith(".json"):
+                    continue
+                manifest = self.load_manifest(file_name[: -len(".json")])
+                if manifest is None:
+                    logging.warning(
+                        f"Magazyn zapisów '{self.game_name}': nieczytelny manifest "
+                        f"'{file_name}', pomijam usuwanie kawałków."
+                    )
+                    return 0
+                for entry in manifest.get("files", {}).values():
+                    if len(entry) == 4:
+                        referenced.update(entry[3])
+                    else:
+                        referenced.add(entry[2])
+            removed = freed = 0
+            for store_dir in (self.chunks_dir, self.objects_dir):
+                try:
+                    prefixes = os.listdir(store_dir)
+                except FileNotFoundError:
+                    continue
+                for prefix in prefixes:
+                    prefix_dir = os.path.join(store_dir, prefix)
+                    if not os.path.isdir(prefix_dir):
+                        continue
+                    for file_name in os.listdir(prefix_dir):
+                        if file_name in referenced:
+                            continue
+                        path = os.path.join(prefix_dir, file_name)
+                        try:
+                            freed += os.path.getsize(path)
+                            os.remove(path)
+                            removed += 1
+                        except OSError as e:
+                            logging.warning(f"Nie można usunąć pliku magazynu '{path}': {e}")
+        if removed:
+            logging.info(
+                f"Magazyn zapisów '{self.game_name}': usunięto {removed} kawałków ({freed} B)."
+            )
+        return removed
+
+
+def run_save_store_operation(
+    self, operation_title, work, callback_on_success=None, parent_window=None
+):
+    """Wykonuje ``work(progress)`` w tle z oknem postępu launchera.
+
+    ``progress(done, total)`` jest wywoływane z wątku roboczego; aktualizacje
+    okna są ograniczane do ~10 na sekundę.
+    """
+    if parent_window is None:
+        parent_window = self.root
+    self.show_progress_window(operation_title)
+    self.progress_bar["maximum"] = 100
+    self.progress_bar["value"] = 0
+    self.progress_bar["mode"] = "determinate"
+    self.progress_label.config(text="Rozpoczynanie...")
+
+    last_update = [0.0]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last_update[0] > 0.1 or done == total:
+            last_update[0] = now
+            percent = int(done * 100 / total) if total else 100
+            self.root.after(0, self._update_copy_progress_ui, percent, f"{done} / {total}")
+
+    def worker():
+        try:
+            work(progress)
+        except Exception as e:
+            logging.exception(f"Błąd operacji na zapisach: {operation_title}")
+            self.root.after(
+                0,
+                lambda err=e: (
+                    self._destroy_progress_window(),
+                    messagebox.showerror(
+                        "Błąd Zapisu",
+                        f"{operation_title}\nWystąpił błąd: {err}",
+                        parent=parent_window if parent_window.winfo_exists() else self.root,
+                    ),
+                ),
+            )
+            return
+        self.root.after(100, self._destroy_progress_window)
+        if callback_on_success:
+            self.root.after(150, callback_on_success)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+
+__all__ = [
+    "SAVE_STORE_DIRNAME",
+    "AUTOSAVE_SNAPSHOT",
+    "SaveStore",
+    "run_save_store_operation",
+]
@@ -0,0 +1,320 @@
+"""
+Silnik skanowania folderów gier.
+
+Foldery są przeglądane równolegle (``os.scandir``, kilka wątków), a dla
+każdego odwiedzonego folderu zapamiętywane są jego mtime, podfoldery i pliki
+.exe. Przy kolejnym skanowaniu folder o niezmienionym mtime nie jest listowany
+ponownie - wystarcza ``os.stat``. Kandydaci na gry są przekazywani do
+wywołującego od razu po znalezieniu, bez czekania na koniec skanowania.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+
+from launcher.utils import CONFIG_DIR
+
+SCAN_INDEX_FILE = os.path.join(CONFIG_DIR, "scan_index.json")
+SCAN_INDEX_VERSION = 1
+DEFAULT_SCAN_WORKERS = 6
+
+# Podfoldery, w których szukamy .exe gry (oprócz samego folderu gry).
+BIN_FOLDER_NAMES = ("bin", "Binaries", "Win32", "Win64", "x64", "x86")
+
+
+class DirectoryIndex:
+    """Trwały indeks folderów: ścieżka -> (mtime_ns, podfoldery, pliki .exe z rozmiarem).
+
+    ``index_file=None`` - indeks tylko w pamięci (bez odczytu i zapisu pliku).
+    """
+
+    def __init__(self, index_file=SCAN_INDEX_FILE):
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._dirs = {}
+        self._visited = set()
+        self._load()
+
+    def _load(self):
+        if self.index_file is None:
+            return
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SCAN_INDEX_VERSION:
+                self._dirs = data.get("dirs", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Nie można wczytać indeksu skanowania '{self.index_file}': {e}")
+            self._dirs = {}
+
+    def lookup(self, path, mtime_ns):
+        """Zapisany listing folderu albo None, jeśli folder się zmienił."""
+        with self._lock:
+            self._visited.add(path)
+            entry = self._dirs.get(path)
+            if entry is not None and entry.get("m") == mtime_ns:
+                return entry
+            return None
+
+    def store(self, path, mtime_ns, subdirs, exes):
+        with self._lock:
+            self._visited.add(path)
+            self._dirs[path] = {"m": mtime_ns, "sub": subdirs, "exe": exes}
+
+    def prune(self, roots):
+        """Usuwa wpisy spod ``roots``, których nie odwiedzono (foldery usunięte)."""
+        prefixes = tuple(os.path.join(os.path.abspath(r), "") for r in roots)
+        root_set = {os.path.abspath(r) for r in roots}
+        with self._lock:
+            stale = [
+                path
+                for path in self._dirs
+                if path not in self._visited and (path in root_set or path.startswith(prefixes))
+            ]
+            for path in stale:
+                del self._dirs[path]
+            self._visited.clear()
+        return len(stale)
+
+    def save(self):
+        if self.index_file is None:
+            return
+        with self._lock:
+            data = {"version": SCAN_INDEX_VERSION, "dirs": dict(self._dirs)}
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+            tmp_path = self.index_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            logging.error(f"Nie można zapisać indeksu skanowania: {e}")
+
+
+class ScanEngine:
+    """Równoległy, przyrostowy skaner folderów z gry.
+
+    ``root_depth`` to głębokość, na której leżą ``roots`` względem folderu
+    skanowania z ustawień - 0 dla samych folderów skanowania, 1 dla
+    pojedynczego folderu gry sprawdzanego przez obserwowanie folderów.
+    """
+
+    def __init__(
+        self,
+        roots,
+        recursive=True,
+        ignored_folder_names=(),
+        ignored_exe_names=(),
+        index=None,
+        workers=DEFAULT_SCAN_WORKERS,
+        root_depth=0,
+    ):
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.root_depth = root_depth
+        self.recursive = recursive
+        self.ignored_folder_names = {n.lower() for n in ignored_folder_names}
+        self.ignored_exe_names = {n.lower() for n in ignored_exe_names}
+        self.index = index if index is not None else DirectoryIndex()
+        self.workers = max(1, workers)
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._listings = {}
+        self._listings_lock = threading.Lock()
+        self.dirs_listed = 0
+        self.dirs_from_index = 0
+
+    # --- Listowanie folderów ---
+
+    def _list_dir(self, path, mtime_ns=None):
+        """Zwraca (subdirs, exes) folderu; subdirs: [[nazwa, mtime_ns, symlink]], exes: [[nazwa, rozmiar]]."""
+        with self._listings_lock:
+            cached = self._listings.get(path)
+        if cached is not None:
+            return cached
+
+        if mtime_ns is None:
+            mtime_ns = os.stat(path).st_mtime_ns
+        entry = self.index.lookup(path, mtime_ns)
+        if entry is not None:
+            # Folder się nie zmienił - odświeżamy tylko mtime podfolderów.
+            subdirs = []
+            for name, _old_mtime, is_link in entry["sub"]:
+                try:
+                    subdirs.append([name, os.stat(os.path.join(path, name)).st_mtime_ns, is_link])
+                except OSError:
+                    continue
+            listing = (subdirs, entry["exe"])
+            with self._pending_lock:
+                self.dirs_from_index += 1
+        else:
+            subdirs, exes = [], []
+            with os.scandir(path) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_dir():
+                            subdirs.append(
+                                [dir_entry.name, dir_entry.stat().st_mtime_ns, dir_entry.is_symlink()]
+                            )
+                        elif dir_entry.name.lower().endswith(".exe") and dir_entry.is_file():
+                            exes.append([dir_entry.name, dir_entry.stat().st_size])
+                    except OSError:
+                        continue
+            self.index.store(path, mtime_ns, subdirs, exes)
+            listing = (subdirs, exes)
+            with self._pending_lock:
+                self.dirs_listed += 1
+
+        with self._listings_lock:
+            self._listings[path] = listing
+        return listing
+
+    def _collect_exes(self, path, subdirs, exes):
+        """Pliki .exe folderu i jego podfolderów bin - w formacie find_likely_executable."""
+        found = [
+            {"path": os.path.join(path, name), "size": size, "name": name.lower(), "depth": 0}
+            for name, size in exes
+            if name.lower() not in self.ignored_exe_names
+        ]
+        bin_names = {n.lower() for n in BIN_FOLDER_NAMES}
+        for name, mtime_ns, _is_link in subdirs:
+            if name.lower() not in bin_names:
+                continue
+            bin_path = os.path.join(path, name)
+            try:
+                _bin_subdirs, bin_exes = self._list_dir(bin_path, mtime_ns)
+            except OSError:
+                continue
+            found.extend(
+                {
+                    "path": os.path.join(bin_path, exe_name),
+                    "size": size,
+                    "name": exe_name.lower(),
+                    "depth": 1,
+                }
+                for exe_name, size in bin_exes
+                if exe_name.lower() not in self.ignored_exe_names
+            )
+        return found
+
+    # --- Wątki robocze ---
+
+    def _push(self, task):
+        with self._pending_lock:
+            self._pending += 1
+        self._tasks.put(task)
+
+    def _task_done(self):
+        with self._pending_lock:
+            self._pending -= 1
+            finished = self._pending == 0
+        if finished:
+            self._results.put(None)
+
+    def _worker(self, cancel_event):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            path, depth, mtime_ns, descend = task
+            try:
+                if cancel_event is not None and cancel_event.is_set():
+                    continue
+                try:
+                    subdirs, exes = self._list_dir(path, mtime_ns)
+                except OSError as e:
+                    logging.warning(f"Nie można odczytać zawartości folderu '{path}': {e}")
+                    continue
+
+                if descend and (self.recursive or depth < 1):
+                    for name, sub_mtime, is_link in subdirs:
+                        if name.lower() in self.ignored_folder_names:
+                            continue
+                        # Jak os.walk: dowiązania są kandydatami, ale nie wchodzimy w nie głębiej.
+                        self._push((os.path.join(path, name), depth + 1, sub_mtime, not is_link))
+
+                potential_exes = self._collect_exes(path, subdirs, exes)
+                # Folder główny jest kandydatem tylko, gdy sam zawiera .exe.
+                if depth == 0 and not any(e["depth"] == 0 for e in potential_exes):
+                    continue
+                if os.path.basename(path).lower() in self.ignored_folder_names:
+                    continue
+                self._results.put((path, potential_exes))
+            except Exception:
+                logging.exception(f"Nieoczekiwany błąd skanowania folderu '{path}'")
+            finally:
+                self._task_done()
+
+    def run(self, on_folder, cancel_event=None):
+        """Skanuje foldery; ``on_folder(ścieżka, kandydaci_exe)`` wołane w bieżącym wątku.
+
+        Zwraca słownik ze statystykami skanowania.
+        """
+        roots = []
+        for root in self.roots:
+            if not os.path.isdir(root):
+                logging.warning(f"Folder skanowania '{root}' nie istnieje lub nie jest folderem.")
+                continue
+            roots.append(root)
+        roots_queued = len(roots)
+        # Wszystkie foldery główne w kolejce, zanim ruszą wątki - inaczej licznik
+        # mógłby spaść do zera po pierwszym drzewie i zakończyć skanowanie za wcześnie.
+        with self._pending_lock:
+            self._pending += roots_queued
+        for root in roots:
+            self._tasks.put((root, self.root_depth, None, True))
+
+        threads = [
+            threading.Thread(
+                target=self._worker, args=(cancel_event,), name=f"ScanWorker-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        folders_seen = 0
+        try:
+            if roots_queued:
+                while True:
+                    item = self._results.get()
+                    if item is None:
+                        break
+                    folders_seen += 1
+                    if cancel_event is not None and cancel_event.is_set():
+                        continue
+                    on_folder(*item)
+        finally:
+            for _ in threads:
+                self._tasks.put(None)
+
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if not cancelled:
+            pruned = self.index.prune(self.roots)
+            if pruned:
+                logging.info(f"Usunięto {pruned} nieistniejących folderów z indeksu skanowania.")
+        self.index.save()
+        stats = {
+            "folders": folders_seen,
+            "listed": self.dirs_listed,
+            "from_index": self.dirs_from_index,
+            "cancelled": cancelled,
+        }
+        logging.info(
+            f"Skanowanie: {folders_seen} folderów-kandydatów, listowane {self.dirs_listed}, "
+            f"z indeksu {self.dirs_from_index}{' (anulowane)' if cancelled else ''}."
+        )
+        return stats
+
+
+__all__ = [
+    "SCAN_INDEX_FILE",
+    "BIN_FOLDER_NAMES",
+    "DirectoryIndex",
+    "ScanEngine",
+]
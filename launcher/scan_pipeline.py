@@ -2,12 +2,18 @@ import logging
 import os
 import re
 import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
 from ui.dialogs import ScanVerificationWindow
+from launcher.name_index import GameNameIndex
+from launcher.scan_engine import BIN_FOLDER_NAMES, ScanEngine
 from launcher.utils import save_config
 
+# Co ile sekund wysyłamy nowo znalezione gry do okna weryfikacji.
+STREAM_BATCH_INTERVAL = 0.5
+
 
 def load_scan_folders_list(self):
     """Ładuje listę folderów do skanowania do listboxa w ustawieniach."""
@@ -75,13 +81,11 @@ def guess_game_name_from_folder(self, folder_name):
 def find_likely_executable(self, game_folder_path, guessed_name=""):
     """Próbuje znaleźć najbardziej prawdopodobny plik .exe gry."""
     potential_exes = []
-    guessed_name_lower = guessed_name.lower()
-    game_folder_name_lower = os.path.basename(game_folder_path).lower()
 
     search_order = [game_folder_path]
     bin_folders = [
         os.path.join(game_folder_path, d)
-        for d in ["bin", "Binaries", "Win32", "Win64", "x64", "x86"]
+        for d in BIN_FOLDER_NAMES
         if os.path.isdir(os.path.join(game_folder_path, d))
     ]
     search_order.extend(bin_folders)
@@ -110,12 +114,20 @@ def find_likely_executable(self, game_folder_path, guessed_name=""):
         except OSError:
             continue
 
+    return choose_likely_executable(self, game_folder_path, guessed_name, potential_exes)
+
+
+def choose_likely_executable(self, game_folder_path, guessed_name, potential_exes):
+    """Wybiera najbardziej prawdopodobny .exe gry spośród znalezionych kandydatów."""
     if not potential_exes:
         logging.debug(
             f"Nie znaleziono żadnych plików .exe (poza ignorowanymi) w '{game_folder_path}' i jego podfolderach bin."
         )
         return None
 
+    guessed_name_lower = guessed_name.lower()
+    game_folder_name_lower = os.path.basename(game_folder_path).lower()
+
     def sort_key(exe_info):
         name = exe_info["name"]
         size = exe_info["size"]
@@ -175,8 +187,36 @@ def start_scan_thread(self):
     scan_thread.start()
 
 
+def build_game_candidate(self, folder_path, potential_exes, library_names, candidate_names):
+    """Kandydat na grę dla folderu z plikami .exe.
+
+    Zwraca słownik dla okna weryfikacji, ``{}`` gdy nie wybrano pliku .exe,
+    albo None, gdy gra o tej nazwie już jest w bibliotece lub na liście.
+    """
+    guessed_name = self.guess_game_name_from_folder(os.path.basename(folder_path))
+
+    if guessed_name in library_names or guessed_name in candidate_names:
+        return None
+
+    executable_path = choose_likely_executable(self, folder_path, guessed_name, potential_exes)
+    if not executable_path:
+        return {}
+    candidate_names.add(guessed_name)
+    return {
+        "guessed_name": guessed_name,
+        "folder_path": folder_path,
+        "suggested_exe_path": executable_path,
+        "import": True,
+        "profiles": [{"name": "Default", "exe_path": None, "arguments": ""}],
+    }
+
+
 def scan_folders_for_games(self):
-    """Skanuje zdefiniowane foldery w poszukiwaniu gier i prezentuje wyniki do weryfikacji."""
+    """Skanuje zdefiniowane foldery w poszukiwaniu gier.
+
+    Znalezione gry trafiają do okna weryfikacji na bieżąco, w paczkach,
+    jeszcze w trakcie skanowania.
+    """
     scan_folders_config = self.settings.get("scan_folders", [])
     scan_recursively = self.settings.get("scan_recursively", True)
     ignored_folder_names = set(
@@ -186,112 +226,65 @@ def scan_folders_for_games(self):
         f"Rozpoczynanie skanowania. Foldery: {scan_folders_config}, Rekursywnie: {scan_recursively}, Ignorowane: {ignored_folder_names}"
     )
 
+    cancel_event = threading.Event()
+    self._scan_cancel_event = cancel_event
     potential_new_games = []
-
-    try:
-        all_potential_folders = set()
-
-        for base_folder in scan_folders_config:
-            self.root.after(
-                0,
-                lambda bf=base_folder: self.progress_label.config(text=f"Analiza: {bf}"),
-            )
-            if not os.path.isdir(base_folder):
-                logging.warning(
-                    f"Folder skanowania '{base_folder}' nie istnieje lub nie jest folderem."
-                )
-                continue
-
-            contains_exe = False
-            try:
-                for item in os.listdir(base_folder):
-                    if (
-                        item.lower().endswith(".exe")
-                        and item.lower() not in self.find_likely_executable.ignore_files
-                    ):
-                        contains_exe = True
-                        break
-            except OSError as e:
-                logging.warning(
-                    f"Nie można odczytać zawartości folderu '{base_folder}': {e}"
-                )
-
-            if (
-                contains_exe
-                and os.path.basename(base_folder).lower() not in ignored_folder_names
-            ):
-                all_potential_folders.add(os.path.abspath(base_folder))
-
-            if scan_recursively:
-                for root, dirs, files in os.walk(base_folder, topdown=True):
-                    dirs[:] = [d for d in dirs if d.lower() not in ignored_folder_names]
-                    for d in dirs:
-                        folder_path = os.path.abspath(os.path.join(root, d))
-                        all_potential_folders.add(folder_path)
-            else:
-                try:
-                    for item in os.listdir(base_folder):
-                        item_path = os.path.abspath(os.path.join(base_folder, item))
-                        if (
-                            os.path.isdir(item_path)
-                            and item.lower() not in ignored_folder_names
-                        ):
-                            all_potential_folders.add(item_path)
-                except OSError as e:
-                    logging.warning(
-                        f"Nie można odczytać zawartości folderu '{base_folder}': {e}"
-                    )
-
-        sorted_potential_folders = sorted(list(all_potential_folders))
-        logging.info(
-            f"Znaleziono {len(sorted_potential_folders)} unikalnych potencjalnych folderów do sprawdzenia."
+    pending_batch = []
+    last_flush = [time.monotonic()]
+    progress_state = {"folders": 0}
+
+    def flush_batch(force=False):
+        now = time.monotonic()
+        if pending_batch and (force or now - last_flush[0] >= STREAM_BATCH_INTERVAL):
+            batch = list(pending_batch)
+            pending_batch.clear()
+            last_flush[0] = now
+            self.root.after(0, lambda b=batch: self.show_scan_verification_window(b))
+
+    # Indeksy nazw budowane raz na skanowanie - sprawdzenia w O(1) zamiast liniowych.
+    library_names = GameNameIndex(list(self.games.keys()))
+    candidate_names = GameNameIndex()
+
+    def on_folder(folder_path, potential_exes):
+        game_info = build_game_candidate(
+            self, folder_path, potential_exes, library_names, candidate_names
         )
-        total_folders = len(sorted_potential_folders)
-
-        for i, folder_path in enumerate(sorted_potential_folders):
-            if os.path.basename(folder_path).lower() in ignored_folder_names:
-                continue
-
-            self.root.after(
-                0,
-                lambda p=folder_path: self.progress_label.config(
-                    text=f"Sprawdzanie: {os.path.basename(p)} ({i+1}/{total_folders})"
-                ),
+        if game_info is None:
+            return
+        if game_info:
+            potential_new_games.append(game_info)
+            pending_batch.append(game_info)
+
+        progress_state["folders"] += 1
+        if progress_state["folders"] % 50 == 0:
+            text = (
+                f"Sprawdzono {progress_state['folders']} folderów, "
+                f"znaleziono {len(potential_new_games)} gier..."
             )
+            self.root.after(0, lambda t=text: _set_scan_status(self, t))
+        flush_batch()
 
-            guessed_name = self.guess_game_name_from_folder(os.path.basename(folder_path))
-
-            if guessed_name.lower() in (name.lower() for name in self.games.keys()):
-                continue
-            if any(
-                g["guessed_name"].lower() == guessed_name.lower()
-                for g in potential_new_games
-            ):
-                continue
-
-            executable_path = self.find_likely_executable(folder_path, guessed_name)
-
-            if executable_path:
-                potential_new_games.append(
-                    {
-                        "guessed_name": guessed_name,
-                        "folder_path": folder_path,
-                        "suggested_exe_path": executable_path,
-                        "import": True,
-                        "profiles": [
-                            {"name": "Default", "exe_path": None, "arguments": ""}
-                        ],
-                    }
-                )
-
-        self.root.after(0, self.stop_scan_progress)
-
+    try:
+        self.root.after(0, lambda: _set_scan_status(self, "Analiza folderów..."))
+        engine = ScanEngine(
+            scan_folders_config,
+            recursive=scan_recursively,
+            ignored_folder_names=ignored_folder_names,
+            ignored_exe_names=self.find_likely_executable.ignore_files,
+        )
+        stats = engine.run(on_folder, cancel_event=cancel_event)
+        flush_batch(force=True)
+
+        if stats["cancelled"]:
+            return
+        summary = (
+            f"Skanowanie zakończone: {len(potential_new_games)} nowych gier "
+            f"({stats['listed']} folderów odczytanych, {stats['from_index']} z indeksu)."
+        )
         if potential_new_games:
-            self.root.after(
-                100,
-                lambda games=potential_new_games: self.show_scan_verification_window(games),
-            )
+            self.root.after(0, lambda: _finish_scan_verification(self, summary))
         else:
+            self.root.after(0, self.stop_scan_progress)
             self.root.after(
                 0,
                 lambda: messagebox.showinfo(
@@ -311,10 +304,62 @@ def scan_folders_for_games(self):
         )
 
 
+def _set_scan_status(self, text):
+    window = getattr(self, "scan_verification_window", None)
+    if window is not None and window.winfo_exists():
+        window.set_scan_status(text)
+    elif hasattr(self, "progress_window") and self.progress_window.winfo_exists():
+        self.progress_label.config(text=text)
+
+
+def _finish_scan_verification(self, summary):
+    window = getattr(self, "scan_verification_window", None)
+    if window is not None and window.winfo_exists():
+        window.finish_scan(summary)
+    self.stop_scan_progress()
+
+
+def cancel_scan(self):
+    """Przerywa trwające skanowanie (np. po zamknięciu okna weryfikacji)."""
+    cancel_event = getattr(self, "_scan_cancel_event", None)
+    if cancel_event is not None:
+        cancel_event.set()
+
+
 def show_scan_verification_window(self, potential_games):
-    """Otwiera okno weryfikacji znalezionych gier."""
-    verification_window = ScanVerificationWindow(self.root, self, potential_games)
-    _ = verification_window
+    """Pokazuje znalezione gry w oknie weryfikacji (otwiera je przy pierwszej paczce)."""
+    window = getattr(self, "scan_verification_window", None)
+    if window is not None and window.winfo_exists():
+        window.append_games(potential_games)
+        return
+    self.stop_scan_progress()
+    self.scan_verification_window = ScanVerificationWindow(
+        self.root,
+        self,
+        potential_games,
+        scanning=True,
+        on_cancel=lambda: cancel_scan(self),
+    )
+
+
+def offer_watched_game_candidates(self, potential_games):
+    """Gry z nowych folderów wykrytych przez obserwowanie folderów (wątek Tk)."""
+    window = getattr(self, "scan_verification_window", None)
+    if window is not None and window.winfo_exists():
+        known_folders = {g.get("folder_path") for g in window.potential_games_data}
+        new_games = [g for g in potential_games if g["folder_path"] not in known_folders]
+        if not new_games:
+            return
+        window.append_games(new_games)
+        if not window.scanning:
+            window.set_scan_status(f"Wykryto nowe foldery gier: {len(new_games)}.")
+        return
+    self.scan_verification_window = ScanVerificationWindow(
+        self.root, self, potential_games, scanning=False
+    )
+    self.scan_verification_window.set_scan_status(
+        f"Wykryto nowe foldery gier: {len(potential_games)}."
+    )
 
 
 def update_scan_progress(self, percent, current_folder):
@@ -496,9 +541,13 @@ __all__ = [
     "save_scan_settings",
     "guess_game_name_from_folder",
     "find_likely_executable",
+    "choose_likely_executable",
+    "build_game_candidate",
     "start_scan_thread",
     "scan_folders_for_games",
+    "cancel_scan",
     "show_scan_verification_window",
+    "offer_watched_game_candidates",
     "update_scan_progress",
     "stop_scan_progress",
     "parse_folder_name_metadata",
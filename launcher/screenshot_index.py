@@ -0,0 +1,196 @@
+"""
+Indeks screenshotów do automatycznego przypisywania ich do gier.
+
+Nazwy plików są dopasowywane do nazw gier jednym przejściem po drzewie
+prefiksów (``GamePrefixTrie``) - wygrywa najdłuższa nazwa gry będąca
+prefiksem nazwy pliku. Listy screenshotów gier są sprawdzane przez zbiory.
+
+Manifest (``SCREENSHOT_MANIFEST_FILE``) pamięta dla każdego odwiedzonego
+folderu jego mtime, podfoldery i pliki obrazów. Folder o niezmienionym
+mtime nie jest listowany ponownie, a do dopasowania trafiają tylko pliki,
+których wcześniej nie widziano. Po zmianie listy gier wszystkie znane pliki
+są dopasowywane ponownie - z manifestu, bez odczytu dysku.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from launcher.utils import CONFIG_DIR
+
+SCREENSHOT_MANIFEST_FILE = os.path.join(CONFIG_DIR, "screenshot_manifest.json")
+SCREENSHOT_MANIFEST_VERSION = 1
+SCREENSHOT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".gif")
+
+_END = "\0"
+
+
+class GamePrefixTrie:
+    """Drzewo prefiksów nazw gier (bez rozróżniania wielkości liter)."""
+
+    def __init__(self, game_names=()):
+        self._root = {}
+        for game_name in game_names:
+            self.add(game_name)
+
+    def add(self, game_name):
+        node = self._root
+        for char in game_name.lower():
+            node = node.setdefault(char, {})
+        # Przy dwóch grach o tej samej nazwie (bez wielkości liter) wygrywa pierwsza.
+        node.setdefault(_END, game_name)
+
+    def match(self, filename_lower):
+        """Najdłuższa nazwa gry będąca prefiksem ``filename_lower`` albo None."""
+        node = self._root
+        found = None
+        for char in filename_lower:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        return found
+
+
+def games_fingerprint(game_names):
+    digest = hashlib.sha1()
+    for name in sorted(n.lower() for n in game_names):
+        digest.update(name.encode("utf-8", "surrogatepass"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class ScreenshotManifest:
+    """Trwały manifest folderów screenshotów: ścieżka -> (mtime_ns, podfoldery, obrazy)."""
+
+    def __init__(self, manifest_file=SCREENSHOT_MANIFEST_FILE):
+        self.manifest_file = manifest_file
+        self.games_fingerprint = None
+        self._dirs = {}
+        self._visited = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == SCREENSHOT_MANIFEST_VERSION:
+                self._dirs = data.get("dirs", {})
+                self.games_fingerprint = data.get("games")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(
+                f"Nie można wczytać manifestu screenshotów '{self.manifest_file}': {e}"
+            )
+            self._dirs = {}
+
+    def collect(self, folder_path, ignored_folder_names=()):
+        """Zwraca (wszystkie_obrazy, nowe_obrazy) folderu i jego podfolderów.
+
+        Foldery o niezmienionym mtime są brane z manifestu; listowane są tylko
+        zmienione. ``nowe_obrazy`` to pliki nieobecne w poprzednim manifeście.
+        """
+        all_images, new_images = [], []
+        stack = [os.path.abspath(folder_path)]
+        while stack:
+            dir_path = stack.pop()
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError as e:
+                logging.warning(f"Nie można odczytać folderu screenshotów '{dir_path}': {e}")
+                continue
+
+            entry = self._dirs.get(dir_path)
+            if entry is not None and entry.get("m") == mtime_ns:
+                subdirs, images, new_names = entry["sub"], entry["img"], ()
+            else:
+                subdirs, images = [], []
+                try:
+                    with os.scandir(dir_path) as it:
+                        for dir_entry in it:
+                            try:
+                                if dir_entry.is_dir():
+                                    # Jak os.walk: w dowiązania do folderów nie wchodzimy.
+                                    if not dir_entry.is_symlink():
+                                        subdirs.append(dir_entry.name)
+                                elif dir_entry.name.lower().endswith(SCREENSHOT_EXTENSIONS):
+                                    images.append(dir_entry.name)
+                            except OSError:
+                                continue
+                except OSError as e:
+                    logging.warning(f"Nie można odczytać folderu screenshotów '{dir_path}': {e}")
+                    continue
+                known = set(entry["img"]) if entry is not None else set()
+                new_names = [name for name in images if name not in known]
+
+            self._visited[dir_path] = {"m": mtime_ns, "sub": subdirs, "img": images}
+            all_images.extend(os.path.join(dir_path, name) for name in images)
+            new_images.extend(os.path.join(dir_path, name) for name in new_names)
+            stack.extend(
+                os.path.join(dir_path, name)
+                for name in subdirs
+                if name.lower() not in ignored_folder_names
+            )
+        return all_images, new_images
+
+    def save(self, games_fingerprint):
+        """Zapisuje foldery odwiedzone w tym skanowaniu (pozostałe są usuwane)."""
+        data = {
+            "version": SCREENSHOT_MANIFEST_VERSION,
+            "games": games_fingerprint,
+            "dirs": self._visited,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.manifest_file) or ".", exist_ok=True)
+            tmp_path = self.manifest_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.manifest_file)
+        except OSError as e:
+            logging.error(f"Nie można zapisać manifestu screenshotów: {e}")
+        self._dirs, self._visited = self._visited, {}
+        self.games_fingerprint = games_fingerprint
+
+
+class ScreenshotMatcher:
+    """Przypisuje pliki obrazów do gier (trie nazw + zbiory już znanych ścieżek)."""
+
+    def __init__(self, games):
+        self.games = games
+        self.trie = GamePrefixTrie(games.keys())
+        self._known = {}
+
+    def _known_paths(self, game_name):
+        known = self._known.get(game_name)
+        if known is None:
+            game_data = self.games[game_name]
+            known = set(game_data.get("autoscan_screenshots", []))
+            known.update(game_data.get("screenshots", []))
+            self._known[game_name] = known
+        return known
+
+    def match(self, file_path):
+        """Dopisuje plik do ``autoscan_screenshots`` pasującej gry; zwraca nazwę gry albo None."""
+        game_name = self.trie.match(os.path.basename(file_path).lower())
+        if game_name is None:
+            return None
+        abs_file_path = os.path.abspath(file_path)
+        known = self._known_paths(game_name)
+        if abs_file_path in known:
+            return None
+        known.add(abs_file_path)
+        self.games[game_name].setdefault("autoscan_screenshots", []).append(abs_file_path)
+        logging.info(f"Znaleziono nowy screenshot dla '{game_name}': {abs_file_path}")
+        return game_name
+
+
+__all__ = [
+    "SCREENSHOT_MANIFEST_FILE",
+    "SCREENSHOT_EXTENSIONS",
+    "GamePrefixTrie",
+    "ScreenshotManifest",
+    "ScreenshotMatcher",
+    "games_fingerprint",
+]
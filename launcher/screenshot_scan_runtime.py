@@ -5,6 +5,7 @@ import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+from launcher.screenshot_index import ScreenshotManifest, ScreenshotMatcher, games_fingerprint
 from launcher.utils import save_config
 from ui.game_details import GameDetailsWindow
 
@@ -141,9 +142,7 @@ def _scan_for_screenshots_thread(self, game_to_scan=None):
         name.lower() for name in self.settings.get("screenshot_scan_ignore_folders", [])
     )
     logging.info(f"Ignorowane foldery screenshotów: {ignored_folder_names}")
-    supported_extensions = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".gif")
     found_new_count_total = 0
-    processed_files_count = 0
     scan_start_time = time.time()
 
     try:
@@ -192,7 +191,14 @@ def _scan_for_screenshots_thread(self, game_to_scan=None):
         )
         time.sleep(0.1)
 
+        manifest = ScreenshotManifest()
+        fingerprint = games_fingerprint(self.games.keys())
+        # Skan dla jednej gry albo zmieniona lista gier - dopasowujemy wszystkie znane
+        # pliki (z manifestu), w przeciwnym razie tylko nowe.
+        match_all_files = bool(game_to_scan) or manifest.games_fingerprint != fingerprint
+        matcher = ScreenshotMatcher(games_to_check)
         something_changed = False
+        files_seen = 0
 
         for folder_path in scan_folders:
             current_folder_index += 1
@@ -200,10 +206,12 @@ def _scan_for_screenshots_thread(self, game_to_scan=None):
             logging.info(
                 f"Skanowanie folderu: {folder_path} ({current_folder_index}/{total_folders_to_scan})"
             )
+            percent_overall = int((current_folder_index - 1) / total_folders_to_scan * 100)
             self.root.after(
                 0,
-                lambda f=folder_name, i=current_folder_index, t=total_folders_to_scan: self.progress_label.config(
-                    text=f"Folder {i}/{t}: {f}"
+                lambda f=folder_name, i=current_folder_index, t=total_folders_to_scan, p=percent_overall: (
+                    self.progress_bar.config(value=p),
+                    self.progress_label.config(text=f"Folder {i}/{t}: {f} ({p}%)"),
                 ),
             )
 
@@ -211,65 +219,26 @@ def _scan_for_screenshots_thread(self, game_to_scan=None):
                 logging.warning(f"Folder '{folder_path}' nie istnieje. Pomijanie.")
                 continue
 
-            files_in_folder = []
-            for root, dirs, files in os.walk(folder_path):
-                dirs[:] = [d for d in dirs if d.lower() not in ignored_folder_names]
-                for filename in files:
-                    files_in_folder.append(os.path.join(root, filename))
-
-            total_files_in_folder = len(files_in_folder)
-            processed_files_in_folder = 0
-
-            for file_path in files_in_folder:
-                processed_files_count += 1
-                processed_files_in_folder += 1
-
-                now = time.time()
-                if processed_files_count % 50 == 0 or now - scan_start_time > 1:
-                    percent_overall = int((current_folder_index / total_folders_to_scan) * 100)
-                    self.root.after(
-                        0,
-                        lambda p=percent_overall, fn=os.path.basename(file_path): (
-                            self.progress_bar.config(value=p),
-                            self.progress_label.config(
-                                text=f"Folder {current_folder_index}/{total_folders_to_scan}: {fn} ({p}%)"
-                            ),
-                        ),
-                    )
-                    scan_start_time = now
-
-                if not file_path.lower().endswith(supported_extensions):
-                    continue
-
-                filename_lower = os.path.basename(file_path).lower()
-
-                for game_name, game_data in games_to_check.items():
-                    game_name_lower = game_name.lower()
-                    if filename_lower.startswith(game_name_lower):
-                        autoscan_list = game_data.setdefault("autoscan_screenshots", [])
-                        abs_file_path = os.path.abspath(file_path)
-
-                        if abs_file_path not in autoscan_list:
-                            manual_list = game_data.get("screenshots", [])
-                            if abs_file_path not in manual_list:
-                                autoscan_list.append(abs_file_path)
-                                found_new_count_total += 1
-                                something_changed = True
-                                logging.info(
-                                    f"Znaleziono nowy screenshot dla '{game_name}': {abs_file_path}"
-                                )
-                            else:
-                                logging.debug(
-                                    f"Screenshot '{abs_file_path}' już istnieje w liście ręcznej dla '{game_name}'."
-                                )
-                        break
+            all_images, new_images = manifest.collect(folder_path, ignored_folder_names)
+            files_seen += len(all_images)
+            for file_path in all_images if match_all_files else new_images:
+                if matcher.match(file_path) is not None:
+                    found_new_count_total += 1
+                    something_changed = True
+
+        if not game_to_scan:
+            # Przy skanie jednej gry pozostałe gry nie dostały szansy na dopasowanie
+            # nowych plików - taki manifest nie może być zapisany.
+            manifest.save(fingerprint)
 
         if something_changed:
             save_config(self.config)
 
         scan_duration = time.time() - scan_start_time
         logging.info(
-            f"Skanowanie screenshotów zakończone w {scan_duration:.2f}s. Znaleziono {found_new_count_total} nowych screenshotów."
+            f"Skanowanie screenshotów zakończone w {scan_duration:.2f}s ({files_seen} obrazów"
+            f"{'' if match_all_files else ', dopasowano tylko nowe'}). "
+            f"Znaleziono {found_new_count_total} nowych screenshotów."
         )
 
         self.root.after(0, self._destroy_progress_window)
@@ -312,6 +281,16 @@ def _refresh_details_window_if_open(self, game_name):
                 break
 
 
+def _refresh_details_screenshots(self, game_name):
+    """Przeładowuje screenshoty w otwartym oknie szczegółów gry, bez zmiany zakładki."""
+    details_title = f"Szczegóły Gry - {game_name}"
+    for widget in self.root.winfo_children():
+        if isinstance(widget, GameDetailsWindow) and widget.winfo_exists():
+            if widget.title() == details_title:
+                widget.load_screenshots()
+                break
+
+
 __all__ = [
     "load_autoscan_folders_list",
     "load_screenshot_ignored_folders",
@@ -322,4 +301,5 @@ __all__ = [
     "start_scan_screenshots_thread",
     "_scan_for_screenshots_thread",
     "_refresh_details_window_if_open",
+    "_refresh_details_screenshots",
 ]
@@ -347,6 +347,37 @@ def _create_settings_page_content(self):
     )
     auto_backup_check.pack(anchor="w", pady=2)
 
+    self.library_sqlite_index_var = tk.BooleanVar(
+        value=self.settings.get("library_sqlite_index", False)
+    )
+    library_index_check = ttk.Checkbutton(
+        system_frame,
+        text="Indeks SQLite biblioteki (szybsze filtrowanie i sortowanie dużych bibliotek)",
+        variable=self.library_sqlite_index_var,
+        command=self._save_library_index_setting,
+    )
+    library_index_check.pack(anchor="w", pady=2)
+
+    self.virtual_grid_var = tk.BooleanVar(value=self.local_settings.get("virtual_grid", False))
+    virtual_grid_check = ttk.Checkbutton(
+        system_frame,
+        text="Wirtualna siatka biblioteki (bez stron, stała liczba kafelków w pamięci)",
+        variable=self.virtual_grid_var,
+        command=self._save_virtual_grid_setting,
+    )
+    virtual_grid_check.pack(anchor="w", pady=2)
+
+    self.numpy_stats_var = tk.BooleanVar(
+        value=self.local_settings.get("stats_backend", "rollups") == "numpy"
+    )
+    numpy_stats_check = ttk.Checkbutton(
+        system_frame,
+        text="Wektorowe statystyki NumPy (bardzo długa historia sesji)",
+        variable=self.numpy_stats_var,
+        command=self._save_stats_backend_setting,
+    )
+    numpy_stats_check.pack(anchor="w", pady=2)
+
     ttk.Button(
         system_frame,
         text="Resetuj licznik Launchera",
@@ -584,6 +615,15 @@ def _create_settings_page_content(self):
     )
     autoscan_startup_check.grid(row=1, column=0, sticky="w", padx=5, pady=5)
 
+    self.folder_watch_var = tk.BooleanVar(value=self.settings.get("folder_watch_enabled", False))
+    folder_watch_check = ttk.Checkbutton(
+        screenshot_scan_frame,
+        text="Obserwuj foldery screenshotów i gier (nowe pliki wykrywane na bieżąco)",
+        variable=self.folder_watch_var,
+        command=self._save_folder_watch_setting,
+    )
+    folder_watch_check.grid(row=5, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+
     start_screenshot_scan_btn = ttk.Button(
         screenshot_scan_frame,
         text="Skanuj Screenshoty Teraz (Wszystkie Gry)",
@@ -4,6 +4,14 @@ import time
 from collections import defaultdict
 from tkinter import messagebox
 
+from launcher.playtime_rollups import query_playtime_rollups
+from launcher.stats_numpy import is_numpy_stats_enabled, query_session_arrays
+
+
+def _in_library_order(self, per_game):
+    """Wartości per gra w kolejności biblioteki - remisy w rankingach jak dotąd."""
+    return {name: per_game[name] for name in self.games if name in per_game}
+
 
 def _prepare_chart_data(self):
     start_date, end_date = self._get_time_period_dates()
@@ -28,17 +36,6 @@ def _prepare_chart_data(self):
         dates_in_period.append(today)
         dates_in_period.sort()
 
-    daily_playtime_seconds = defaultdict(float)
-    daily_games_set = defaultdict(set)
-    per_game_playtime_seconds = defaultdict(float)
-    selected_game_daily_playtime = defaultdict(float)
-    genre_playtime_seconds = defaultdict(float)
-    tag_playtime_seconds = defaultdict(float)
-    game_launch_counts = defaultdict(int)
-    game_session_durations = defaultdict(list)
-    total_sessions_count = 0
-    total_sessions_duration = 0.0
-
     selected_game_name = None
     if view_type == "Playtime per Game (Selected)":
         selected_game_name = self.stats_game_var.get()
@@ -50,66 +47,23 @@ def _prepare_chart_data(self):
             )
             return None
 
-    for game_name, game_data in self.games.items():
-        if view_type == "Playtime per Game (Selected)" and game_name != selected_game_name:
-            continue
-
-        game_genres = game_data.get("genres", [])
-        game_tags = game_data.get("tags", [])
-
-        for session in game_data.get("play_sessions", []):
-            session_start_ts = session.get("start")
-            session_end_ts = session.get("end")
-            if not session_start_ts or not session_end_ts:
-                continue
-
-            session_duration = session_end_ts - session_start_ts
-            try:
-                session_start_date = datetime.date.fromtimestamp(session_start_ts)
-                session_date_end = datetime.date.fromtimestamp(session_end_ts)
-            except ValueError as e_date:
-                logging.warning(
-                    f"Nie można przekonwertować timestamp sesji na datę "
-                    f"dla gry {game_name}: {e_date}"
-                )
-                continue
-
-            if start_date <= session_start_date <= end_date:
-                game_launch_counts[game_name] += 1
-
-            current_check_date = start_date
-            session_counted_for_avg = False
-            while current_check_date <= end_date:
-                if session_start_date <= current_check_date <= session_date_end:
-                    day_start_ts = time.mktime(current_check_date.timetuple())
-                    day_end_ts = day_start_ts + 86_400
-
-                    overlap_start = max(session_start_ts, day_start_ts)
-                    overlap_end = min(session_end_ts, day_end_ts)
-                    duration_on_day = max(0, overlap_end - overlap_start)
-
-                    if duration_on_day > 0:
-                        daily_playtime_seconds[current_check_date] += duration_on_day
-                        daily_games_set[current_check_date].add(game_name)
-                        per_game_playtime_seconds[game_name] += duration_on_day
-                        for genre in game_genres:
-                            genre_playtime_seconds[genre] += duration_on_day
-                        for tag in game_tags:
-                            tag_playtime_seconds[tag] += duration_on_day
-
-                        if game_name == selected_game_name:
-                            selected_game_daily_playtime[current_check_date] += duration_on_day
-
-                        if (
-                            not session_counted_for_avg
-                            and start_date <= session_start_date <= end_date
-                        ):
-                            game_session_durations[game_name].append(session_duration)
-                            total_sessions_duration += session_duration
-                            total_sessions_count += 1
-                            session_counted_for_avg = True
-
-                current_check_date += datetime.timedelta(days=1)
+    query_backend = (
+        query_session_arrays if is_numpy_stats_enabled(self) else query_playtime_rollups
+    )
+    rollup = query_backend(
+        self,
+        start_date,
+        end_date,
+        game_names=[selected_game_name] if selected_game_name else None,
+        daily_games=view_type == "Games Played per Day",
+    )
+    daily_playtime_seconds = defaultdict(float, rollup["daily_seconds"])
+    daily_games_set = defaultdict(set, rollup["daily_games"])
+    per_game_playtime_seconds = _in_library_order(self, rollup["per_game"])
+    selected_game_daily_playtime = daily_playtime_seconds if selected_game_name else {}
+    genre_playtime_seconds = rollup["per_genre"]
+    game_launch_counts = _in_library_order(self, rollup["launches"])
+    game_session_sums = _in_library_order(self, rollup["sessions"])
 
     launcher_usage_seconds = defaultdict(float)
     for iso_date, secs in self.local_settings.get(
@@ -234,9 +188,9 @@ def _prepare_chart_data(self):
         )
         chart_data["y_label"] = "Średni czas (minuty)"
         avg_session_times = {
-            g: (sum(durs) / len(durs)) / 60
-            for g, durs in game_session_durations.items()
-            if durs
+            g: (total / count) / 60
+            for g, (count, total) in game_session_sums.items()
+            if count
         }
         sorted_avg = sorted(
             avg_session_times.items(), key=lambda item: item[1], reverse=True
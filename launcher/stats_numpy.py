@@ -0,0 +1,257 @@
+"""
+Wektorowy backend statystyk czasu gry (NumPy).
+
+Wszystkie ``play_sessions`` biblioteki są spłaszczane do tablic kolumnowych
+(indeks gry, start, koniec), a sesje - jednorazowo, wektorowo - rozbijane na
+kawałki dzienne (indeks dnia, indeks gry, sekundy). Zapytanie o okres to
+maska na tablicach i kilka wywołań ``np.bincount``; rankingi gatunków i tagów
+liczone są z tych samych tablic przez pary (gra, gatunek).
+
+Tablice są budowane leniwie z bieżącego słownika gier i budowane od nowa po
+każdym ``save_config`` (licznik ``config_generation``). Wynik ``query`` ma
+ten sam kształt co ``PlaytimeRollups.query``.
+"""
+
+import datetime
+import logging
+import threading
+import time
+
+import numpy as np
+
+from launcher.config_store import save_local_settings
+from launcher.utils import config_generation
+
+SECONDS_PER_DAY = 86_400
+STATS_BACKEND_ROLLUPS = "rollups"
+STATS_BACKEND_NUMPY = "numpy"
+
+
+def _pairs(names_per_game):
+    """Pary (indeks gry, indeks etykiety) dla gatunków/tagów."""
+    labels, label_index = [], {}
+    pair_games, pair_labels = [], []
+    for game_idx, names in enumerate(names_per_game):
+        for name in names:
+            idx = label_index.get(name)
+            if idx is None:
+                idx = label_index[name] = len(labels)
+                labels.append(name)
+            pair_games.append(game_idx)
+            pair_labels.append(idx)
+    return (
+        labels,
+        np.asarray(pair_games, dtype=np.int64),
+        np.asarray(pair_labels, dtype=np.int64),
+    )
+
+
+class SessionArrays:
+    """Kolumnowy zapis sesji całej biblioteki z podziałem na dni."""
+
+    def __init__(self, games):
+        started = time.perf_counter()
+        self.game_names = []
+        game_genres, game_tags = [], []
+        game_col, start_col, end_col = [], [], []
+        for game_name, game_data in list(games.items()):
+            if not isinstance(game_data, dict):
+                continue
+            game_idx = len(self.game_names)
+            self.game_names.append(game_name)
+            game_genres.append(list(game_data.get("genres") or []))
+            game_tags.append(list(game_data.get("tags") or []))
+            for session in game_data.get("play_sessions") or []:
+                if not isinstance(session, dict):
+                    continue
+                start_ts, end_ts = session.get("start"), session.get("end")
+                if not start_ts or not end_ts:
+                    continue
+                game_col.append(game_idx)
+                start_col.append(start_ts)
+                end_col.append(end_ts)
+
+        self.game_index = {name: idx for idx, name in enumerate(self.game_names)}
+        self.genres, self.genre_pair_game, self.genre_pair_label = _pairs(game_genres)
+        self.tags, self.tag_pair_game, self.tag_pair_label = _pairs(game_tags)
+
+        self.session_game = np.asarray(game_col, dtype=np.int64)
+        self.session_start = np.asarray(start_col, dtype=np.float64)
+        self.session_end = np.asarray(end_col, dtype=np.float64)
+        self._split_into_days()
+        logging.info(
+            f"Zbudowano tablice sesji: {len(self.session_game)} sesji, "
+            f"{len(self.piece_day)} kawałków dziennych w {time.perf_counter() - started:.3f}s"
+        )
+
+    def _split_into_days(self):
+        if not len(self.session_start):
+            self.first_day = None
+            self.day_starts = np.empty(0, dtype=np.float64)
+            self.session_start_day = np.empty(0, dtype=np.int64)
+            self.piece_day = np.empty(0, dtype=np.int64)
+            self.piece_game = np.empty(0, dtype=np.int64)
+            self.piece_seconds = np.empty(0, dtype=np.float64)
+            return
+
+        self.first_day = datetime.date.fromtimestamp(float(self.session_start.min()))
+        last_day = datetime.date.fromtimestamp(
+            float(max(self.session_start.max(), self.session_end.max()))
+        )
+        # Północ lokalna każdego dnia - time.mktime uwzględnia zmianę czasu.
+        day_count = (last_day - self.first_day).days + 1
+        self.day_starts = np.fromiter(
+            (
+                time.mktime((self.first_day + datetime.timedelta(days=i)).timetuple())
+                for i in range(day_count)
+            ),
+            dtype=np.float64,
+            count=day_count,
+        )
+
+        start_day = np.searchsorted(self.day_starts, self.session_start, side="right") - 1
+        end_day = np.searchsorted(self.day_starts, self.session_end, side="right") - 1
+        self.session_start_day = start_day
+
+        day_spans = np.maximum(end_day - start_day + 1, 0)
+        piece_session = np.repeat(np.arange(len(start_day)), day_spans)
+        piece_offset = np.arange(len(piece_session)) - np.repeat(
+            np.cumsum(day_spans) - day_spans, day_spans
+        )
+        piece_day = start_day[piece_session] + piece_offset
+        day_start_ts = self.day_starts[piece_day]
+        overlap = np.minimum(self.session_end[piece_session], day_start_ts + SECONDS_PER_DAY) - (
+            np.maximum(self.session_start[piece_session], day_start_ts)
+        )
+        positive = overlap > 0
+        self.piece_day = piece_day[positive]
+        self.piece_game = self.session_game[piece_session[positive]]
+        self.piece_seconds = overlap[positive]
+
+    def query(self, start_date, end_date, game_names=None, daily_games=False):
+        """Agregaty okresu [start_date, end_date] - format jak ``PlaytimeRollups.query``."""
+        result = {
+            "daily_seconds": {},
+            "daily_games": {},
+            "per_game": {},
+            "per_genre": {},
+            "per_tag": {},
+            "launches": {},
+            "sessions": {},
+        }
+        if self.first_day is None:
+            return result
+
+        game_count = len(self.game_names)
+        first_idx = (start_date - self.first_day).days
+        last_idx = (end_date - self.first_day).days
+
+        piece_mask = (self.piece_day >= first_idx) & (self.piece_day <= last_idx)
+        session_mask = (self.session_start_day >= first_idx) & (
+            self.session_start_day <= last_idx
+        )
+        if game_names is not None:
+            selected = np.asarray(
+                [self.game_index[n] for n in game_names if n in self.game_index],
+                dtype=np.int64,
+            )
+            piece_mask &= np.isin(self.piece_game, selected)
+            session_mask &= np.isin(self.session_game, selected)
+
+        piece_day = self.piece_day[piece_mask]
+        piece_game = self.piece_game[piece_mask]
+        piece_seconds = self.piece_seconds[piece_mask]
+
+        day_seconds = np.bincount(piece_day - first_idx, weights=piece_seconds)
+        day_seconds_list = day_seconds.tolist()
+        result["daily_seconds"] = {
+            start_date + datetime.timedelta(days=i): day_seconds_list[i]
+            for i in np.flatnonzero(day_seconds > 0).tolist()
+        }
+        if daily_games:
+            # Unikalne pary dzień x gra, posortowane po dniu - jeden zbiór na grupę.
+            day_game_keys = np.unique(piece_day * game_count + piece_game)
+        if daily_games and day_game_keys.size:
+            key_days, key_games = np.divmod(day_game_keys, game_count)
+            names = np.asarray(self.game_names, dtype=object)[key_games]
+            bounds = np.flatnonzero(np.diff(key_days)) + 1
+            games_per_day = result["daily_games"]
+            for day_idx, day_names in zip(
+                key_days[np.r_[0, bounds]].tolist(), np.split(names, bounds)
+            ):
+                day = self.first_day + datetime.timedelta(days=day_idx)
+                games_per_day[day] = set(day_names.tolist())
+
+        per_game = np.bincount(piece_game, weights=piece_seconds, minlength=game_count)
+        per_game_list = per_game.tolist()
+        result["per_game"] = {
+            self.game_names[i]: per_game_list[i] for i in np.flatnonzero(per_game > 0).tolist()
+        }
+        for key, labels, pair_game, pair_label in (
+            ("per_genre", self.genres, self.genre_pair_game, self.genre_pair_label),
+            ("per_tag", self.tags, self.tag_pair_game, self.tag_pair_label),
+        ):
+            totals = np.bincount(pair_label, weights=per_game[pair_game], minlength=len(labels))
+            totals_list = totals.tolist()
+            result[key] = {
+                labels[i]: totals_list[i] for i in np.flatnonzero(totals > 0).tolist()
+            }
+
+        session_game = self.session_game[session_mask]
+        launches = np.bincount(session_game, minlength=game_count)
+        result["launches"] = {
+            self.game_names[i]: int(launches[i]) for i in np.flatnonzero(launches).tolist()
+        }
+
+        # Do średniej liczą się sesje z dodatnim czasem gry.
+        played = self.session_end[session_mask] > self.session_start[session_mask]
+        durations = (self.session_end[session_mask] - self.session_start[session_mask])[played]
+        counts = np.bincount(session_game[played], minlength=game_count)
+        sums = np.bincount(session_game[played], weights=durations, minlength=game_count)
+        result["sessions"] = {
+            self.game_names[i]: [int(counts[i]), float(sums[i])]
+            for i in np.flatnonzero(counts).tolist()
+        }
+        return result
+
+
+_arrays = None
+_arrays_key = None
+_arrays_lock = threading.Lock()
+
+
+def query_session_arrays(self, start_date, end_date, game_names=None, daily_games=False):
+    """Agregaty okresu z tablic sesji; tablice są budowane przy pierwszym użyciu."""
+    global _arrays, _arrays_key
+    # Nowa generacja (save_config) albo podmieniony słownik gier - przebudowa.
+    key = (id(self.games), config_generation())
+    with _arrays_lock:
+        arrays = _arrays
+        if arrays is None or _arrays_key != key:
+            arrays = _arrays = SessionArrays(self.games)
+            _arrays_key = key
+    return arrays.query(start_date, end_date, game_names, daily_games)
+
+
+def is_numpy_stats_enabled(self):
+    return self.local_settings.get("stats_backend", STATS_BACKEND_ROLLUPS) == STATS_BACKEND_NUMPY
+
+
+def _save_stats_backend_setting(self):
+    """Przełącza backend statystyk (agregaty dzienne / tablice NumPy) z poziomu ustawień."""
+    backend = STATS_BACKEND_NUMPY if self.numpy_stats_var.get() else STATS_BACKEND_ROLLUPS
+    if self.local_settings.get("stats_backend", STATS_BACKEND_ROLLUPS) == backend:
+        return
+    self.local_settings["stats_backend"] = backend
+    save_local_settings(self.local_settings)
+    logging.info(f"Ustawienie stats_backend zmienione na: {backend}")
+
+
+__all__ = [
+    "STATS_BACKEND_ROLLUPS",
+    "STATS_BACKEND_NUMPY",
+    "SessionArrays",
+    "query_session_arrays",
+    "is_numpy_stats_enabled",
+    "_save_stats_backend_setting",
+]
@@ -119,6 +119,12 @@ def create_statistics_page(self):
     refresh_btn.grid(row=0, column=col_idx, padx=(5, 0), pady=5, sticky="e")
     col_idx += 1
 
+    rebuild_btn = ttk.Button(
+        controls_frame, text="Przelicz", command=self.rebuild_playtime_rollups
+    )
+    rebuild_btn.grid(row=0, column=col_idx, padx=(5, 0), pady=5, sticky="e")
+    col_idx += 1
+
     self.launcher_usage_label = ttk.Label(
         controls_frame,
         text="Łączny czas w launcherze: Ładowanie...",
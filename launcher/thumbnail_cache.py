@@ -0,0 +1,342 @@
+"""
+Trwały cache miniatur okładek.
+
+Miniatury są kluczowane hashem zawartości oryginału i docelowym rozmiarem
+(``<sha1>_<szer>x<wys>.png``), więc dwie okładki o tej samej nazwie pliku nie
+kolidują, a kilka rozmiarów kafelków może istnieć obok siebie. Manifest
+(``manifest.json``) pamięta dla każdej ścieżki źródłowej (rozmiar, mtime, hash)
+oraz dla każdego wariantu (bajty, ostatni dostęp) - trafienie w cache wymaga
+tylko ``os.stat`` oryginału, bez dekodowania obrazu. Łączny rozmiar na dysku
+jest ograniczony; najdawniej używane warianty są usuwane (LRU).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from PIL import Image, UnidentifiedImageError
+
+from launcher.save_scheduler import SaveScheduler
+from launcher.utils import RESAMPLING, THUMBNAIL_CACHE_DIR
+
+MANIFEST_NAME = "manifest.json"
+# Wersja 2: miniatury z zachowaniem proporcji (w wersji 1 były rozciągane do rozmiaru).
+MANIFEST_VERSION = 2
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Po przekroczeniu limitu sprzątamy do tej części limitu, żeby nie usuwać po jednym pliku.
+EVICT_TARGET_RATIO = 0.9
+_HASH_CHUNK = 1024 * 1024
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _variant_key(content_hash, size):
+    return f"{content_hash}_{int(size[0])}x{int(size[1])}"
+
+
+class ThumbnailCache:
+    """Cache miniatur na dysku z manifestem i limitem rozmiaru (LRU)."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self._lock = threading.RLock()
+        self._sources = {}
+        self._variants = {}
+        self._total_bytes = 0
+        self._loaded = False
+        self._manifest_saver = SaveScheduler(
+            self._write_manifest,
+            delay=2.0,
+            max_delay=10.0,
+            name="ThumbnailManifestWriter",
+        )
+        self._warm_queue = queue.Queue()
+        self._warm_generation = 0
+        self._warm_thread = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Manifest ---
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == MANIFEST_VERSION:
+                    self._sources = {
+                        path: tuple(entry) for path, entry in manifest.get("sources", {}).items()
+                    }
+                    self._variants = {
+                        key: list(entry) for key, entry in manifest.get("variants", {}).items()
+                    }
+                else:
+                    # Miniatury ze starszej wersji są nieaktualne - zostaną utworzone ponownie.
+                    for key in manifest.get("variants", {}):
+                        try:
+                            os.remove(os.path.join(self.cache_dir, key + ".png"))
+                        except OSError:
+                            pass
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                logging.warning(f"Uszkodzony manifest miniatur '{self.manifest_path}': {e}. Odbudowa.")
+                self._sources = {}
+                self._variants = {}
+            self._total_bytes = sum(entry[0] for entry in self._variants.values())
+            self._loaded = True
+
+    def _mark_dirty(self):
+        self._manifest_saver.request(None)
+
+    def _write_manifest(self, _data=None):
+        with self._lock:
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "sources": {path: list(entry) for path, entry in self._sources.items()},
+                "variants": {key: list(entry) for key, entry in self._variants.items()},
+            }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, self.manifest_path)
+
+    def flush(self, timeout=None):
+        """Zapisuje manifest na dysk (np. przy zamykaniu aplikacji); False, gdy się nie udało."""
+        return self._manifest_saver.flush_sync(timeout)
+
+    # --- Wyszukiwanie i tworzenie ---
+
+    def _content_hash(self, source_path):
+        """Hash zawartości oryginału; liczony ponownie tylko po zmianie (rozmiar, mtime)."""
+        abs_path = os.path.abspath(source_path)
+        st = os.stat(abs_path)
+        with self._lock:
+            entry = self._sources.get(abs_path)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                return entry[2]
+        content_hash = _file_sha1(abs_path)
+        with self._lock:
+            self._sources[abs_path] = (st.st_size, st.st_mtime_ns, content_hash)
+        self._mark_dirty()
+        return content_hash
+
+    def variant_path(self, content_hash, size):
+        return os.path.join(self.cache_dir, _variant_key(content_hash, size) + ".png")
+
+    def lookup(self, source_path, size):
+        """Zwraca ścieżkę istniejącej miniatury albo None - bez tworzenia i dekodowania."""
+        self._ensure_loaded()
+        try:
+            content_hash = self._content_hash(source_path)
+        except OSError:
+            return None
+        key = _variant_key(content_hash, size)
+        with self._lock:
+            entry = self._variants.get(key)
+            if entry is None:
+                return None
+            entry[1] = time.time()
+        self._mark_dirty()
+        return self.variant_path(content_hash, size)
+
+    def get(self, source_path, size):
+        """Zwraca ścieżkę miniatury ``source_path`` w rozmiarze ``size``, tworząc ją w razie potrzeby.
+
+        None, gdy oryginału nie da się odczytać jako obrazu.
+        """
+        if not source_path:
+            return None
+        size = (int(size[0]), int(size[1]))
+        self._ensure_loaded()
+        try:
+            content_hash = self._content_hash(source_path)
+        except OSError as e:
+            logging.warning(f"Nie można odczytać okładki '{source_path}': {e}")
+            return None
+
+        key = _variant_key(content_hash, size)
+        thumb_path = self.variant_path(content_hash, size)
+        with self._lock:
+            entry = self._variants.get(key)
+            if entry is not None:
+                entry[1] = time.time()
+                self.hits += 1
+        if entry is not None:
+            if os.path.exists(thumb_path):
+                self._mark_dirty()
+                return thumb_path
+            # Plik usunięty spoza cache - zapomnij wpis i utwórz ponownie.
+            self._forget(key)
+
+        with self._lock:
+            self.misses += 1
+        return self._create_variant(source_path, key, thumb_path, size)
+
+    def _create_variant(self, source_path, key, thumb_path, size):
+        tmp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+        try:
+            with Image.open(source_path) as img:
+                mode = "RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB"
+                img = img.convert(mode)
+                img.thumbnail(size, RESAMPLING)  # zachowuje proporcje, mieści w 'size'
+                img.save(tmp_path, format="PNG")
+            os.replace(tmp_path, thumb_path)
+            byte_size = os.path.getsize(thumb_path)
+        except (UnidentifiedImageError, OSError, ValueError, SyntaxError) as e:
+            logging.error(f"Nie można utworzyć miniatury dla '{source_path}': {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return None
+
+        with self._lock:
+            previous = self._variants.get(key)
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._variants[key] = [byte_size, time.time()]
+            self._total_bytes += byte_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict(keep=key)
+        self._mark_dirty()
+        return thumb_path
+
+    def _forget(self, key):
+        with self._lock:
+            entry = self._variants.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry[0]
+
+    def evict(self, keep=None):
+        """Usuwa najdawniej używane warianty, aż rozmiar cache spadnie poniżej progu."""
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return 0
+            victims = []
+            for key, (byte_size, last_access) in sorted(
+                self._variants.items(), key=lambda item: item[1][1]
+            ):
+                if self._total_bytes <= target:
+                    break
+                if key == keep:
+                    continue
+                del self._variants[key]
+                self._total_bytes -= byte_size
+                victims.append(key)
+            self.evictions += len(victims)
+            live_hashes = {key.rsplit("_", 1)[0] for key in self._variants}
+            self._sources = {
+                path: entry for path, entry in self._sources.items() if entry[2] in live_hashes
+            }
+
+        for key in victims:
+            try:
+                os.remove(os.path.join(self.cache_dir, key + ".png"))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Nie można usunąć miniatury '{key}': {e}")
+        if victims:
+            logging.info(f"Usunięto {len(victims)} miniatur z cache (limit {self.max_bytes} B).")
+            self._mark_dirty()
+        return len(victims)
+
+    # --- Rozgrzewanie w tle ---
+
+    def warm(self, source_paths, size):
+        """Tworzy w tle brakujące miniatury; nowe wywołanie porzuca poprzednią kolejkę."""
+        with self._lock:
+            self._warm_generation += 1
+            generation = self._warm_generation
+        self._warm_queue.put((generation, list(source_paths), (int(size[0]), int(size[1]))))
+        if self._warm_thread is None or not self._warm_thread.is_alive():
+            self._warm_thread = threading.Thread(
+                target=self._warm_worker, name="ThumbnailWarmer", daemon=True
+            )
+            self._warm_thread.start()
+
+    def _warm_worker(self):
+        while True:
+            generation, source_paths, size = self._warm_queue.get()
+            created = 0
+            for source_path in source_paths:
+                if generation != self._warm_generation:
+                    break
+                try:
+                    if not os.path.isfile(source_path):
+                        continue
+                    if self.lookup(source_path, size) is None and self.get(source_path, size):
+                        created += 1
+                except Exception:
+                    logging.exception(f"Błąd rozgrzewania miniatury '{source_path}'")
+            if created:
+                logging.debug(f"Rozgrzano {created} miniatur {size[0]}x{size[1]}.")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "variants": len(self._variants),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    """Wspólna instancja cache miniatur."""
+    global _thumbnail_cache
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache is None:
+            _thumbnail_cache = ThumbnailCache(THUMBNAIL_CACHE_DIR)
+        return _thumbnail_cache
+
+
+def get_cover_thumbnail(self, cover_path, size):
+    """Ścieżka miniatury okładki w rozmiarze kafelka; oryginał, gdy miniatura się nie uda."""
+    return get_thumbnail_cache().get(cover_path, size) or cover_path
+
+
+def warm_grid_thumbnails(self, game_names, size):
+    """Rozgrzewa w tle miniatury okładek dla przefiltrowanej listy gier."""
+    cover_paths = []
+    for game_name in game_names:
+        cover_path = (self.games.get(game_name) or {}).get("cover_image")
+        if cover_path:
+            cover_paths.append(cover_path)
+    if cover_paths:
+        get_thumbnail_cache().warm(cover_paths, size)
+
+
+__all__ = [
+    "ThumbnailCache",
+    "get_thumbnail_cache",
+    "get_cover_thumbnail",
+    "warm_grid_thumbnails",
+]
@@ -0,0 +1,226 @@
+"""
+Dekodowanie okładek kafelków w tle.
+
+Wątki robocze (ograniczona pula) pobierają miniaturę z cache, dekodują ją
+i skalują przez PIL. Do wątku Tk trafia gotowy obraz PIL - tam, w pętli
+``root.after``, tworzony jest tylko ``ImageTk.PhotoImage`` i wywoływany
+callback kafelka. Zlecenia dla kafelków, które wyjechały poza widok, są
+anulowane, zanim wątek roboczy się nimi zajmie.
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+
+from PIL import Image, ImageTk, UnidentifiedImageError
+
+from launcher.thumbnail_cache import get_thumbnail_cache
+from launcher.utils import RESAMPLING
+
+DEFAULT_WORKERS = 3
+POLL_INTERVAL_MS = 15
+# Ile gotowych obrazów zamieniamy na PhotoImage w jednym przebiegu pętli Tk.
+MAX_RESULTS_PER_TICK = 6
+
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH = 1
+
+
+class _TileJob:
+    __slots__ = ("key", "cover_path", "size", "on_ready", "priority", "cancelled")
+
+    def __init__(self, key, cover_path, size, on_ready, priority):
+        self.key = key
+        self.cover_path = cover_path
+        self.size = size
+        self.on_ready = on_ready
+        self.priority = priority
+        self.cancelled = False
+
+
+def decode_tile_image(cover_path, size):
+    """Zwraca obraz PIL okładki w rozmiarze ``size`` (wywoływane w wątku roboczym)."""
+    source_path = get_thumbnail_cache().get(cover_path, size) or cover_path
+    with Image.open(source_path) as img:
+        img = img.convert("RGBA")
+        if img.size != tuple(size):
+            img = img.resize(size, RESAMPLING)
+        img.load()
+        return img
+
+
+class TileImagePipeline:
+    """Kolejka priorytetowa zleceń dekodowania okładek z pulą wątków roboczych."""
+
+    def __init__(self, root, workers=DEFAULT_WORKERS):
+        self.root = root
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._heap = []
+        self._jobs = {}
+        self._counter = itertools.count()
+        self._results = queue.Queue()
+        self._threads = []
+        self._poll_id = None
+        self._stopped = False
+        self.decoded = 0
+        self.cancelled = 0
+
+    def submit(self, key, cover_path, size, on_ready, priority=PRIORITY_VISIBLE):
+        """Zleca dekodowanie; ``on_ready(photo)`` zostanie wywołane w wątku Tk.
+
+        Ponowne zlecenie tego samego kafelka tylko podnosi priorytet.
+        """
+        size = (int(size[0]), int(size[1]))
+        with self._cond:
+            job = self._jobs.get(key)
+            if job is not None and not job.cancelled:
+                if job.cover_path == cover_path and job.size == size:
+                    if priority < job.priority:
+                        job.priority = priority
+                        heapq.heappush(self._heap, (priority, next(self._counter), job))
+                    job.on_ready = on_ready
+                    return
+                job.cancelled = True
+            job = _TileJob(key, cover_path, size, on_ready, priority)
+            self._jobs[key] = job
+            heapq.heappush(self._heap, (priority, next(self._counter), job))
+            self._ensure_workers()
+            self._cond.notify()
+        self._schedule_poll()
+
+    def retain(self, keys):
+        """Anuluje oczekujące zlecenia dla kafelków spoza ``keys``."""
+        keys = set(keys)
+        with self._cond:
+            for key in [k for k in self._jobs if k not in keys]:
+                job = self._jobs.pop(key)
+                job.cancelled = True
+                self.cancelled += 1
+
+    def is_pending(self, key):
+        with self._cond:
+            return key in self._jobs
+
+    def cancel_all(self):
+        self.retain(())
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            for job in self._jobs.values():
+                job.cancelled = True
+            self._jobs.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker, name=f"TileDecoder-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                while self._heap:
+                    priority, _, job = heapq.heappop(self._heap)
+                    # Stare wpisy po podniesieniu priorytetu lub anulowaniu pomijamy.
+                    if job.cancelled or priority != job.priority:
+                        continue
+                    return job
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            image, error = None, None
+            try:
+                image = decode_tile_image(job.cover_path, job.size)
+            except (UnidentifiedImageError, OSError, ValueError, SyntaxError) as e:
+                error = e
+            except Exception as e:
+                logging.exception(f"Nieoczekiwany błąd dekodowania okładki '{job.cover_path}'")
+                error = e
+            self._results.put((job, image, error))
+
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._stopped:
+            try:
+                self._poll_id = self.root.after(POLL_INTERVAL_MS, self._drain_results)
+            except RuntimeError:
+                # Wywołanie spoza wątku Tk - pętla ruszy przy następnym submit z UI.
+                self._poll_id = None
+
+    def _drain_results(self):
+        """Wątek Tk: tworzy PhotoImage z gotowych obrazów i przekazuje je kafelkom."""
+        self._poll_id = None
+        for _ in range(MAX_RESULTS_PER_TICK):
+            try:
+                job, image, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._cond:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            if job.cancelled:
+                continue
+            photo = None
+            if error is not None:
+                logging.error(f"Błąd ładowania okładki '{job.cover_path}': {error}")
+            else:
+                try:
+                    photo = ImageTk.PhotoImage(image)
+                    self.decoded += 1
+                except Exception as e:
+                    logging.error(f"Nie można utworzyć PhotoImage dla '{job.cover_path}': {e}")
+            try:
+                job.on_ready(photo)
+            except Exception:
+                logging.exception(f"Błąd wypełniania kafelka '{job.key}'")
+
+        with self._cond:
+            busy = bool(self._jobs)
+        if busy or not self._results.empty():
+            self._schedule_poll()
+
+
+def get_tile_pipeline(self):
+    """Pipeline dekodowania kafelków powiązany z oknem launchera (tworzony leniwie)."""
+    pipeline = getattr(self, "_tile_image_pipeline", None)
+    if pipeline is None:
+        pipeline = TileImagePipeline(self.root)
+        self._tile_image_pipeline = pipeline
+    return pipeline
+
+
+def stop_tile_pipeline(self):
+    pipeline = getattr(self, "_tile_image_pipeline", None)
+    if pipeline is not None:
+        pipeline.stop()
+        self._tile_image_pipeline = None
+
+
+__all__ = [
+    "PRIORITY_VISIBLE",
+    "PRIORITY_PREFETCH",
+    "TileImagePipeline",
+    "decode_tile_image",
+    "get_tile_pipeline",
+    "stop_tile_pipeline",
+]
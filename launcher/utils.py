@@ -4,12 +4,17 @@ Narzędzia i stałe dla Game Launchera.
 
 PROGRAM_VERSION = "1.6.0"
 
-import functools
+import atexit
 import logging
 import json
 import os
+import threading
 from PIL import Image, ImageTk, ImageDraw, ImageFont, ImageColor, UnidentifiedImageError
 
+from launcher.config_journal import get_config_journal
+from launcher.image_cache import ImageCache
+from launcher.save_scheduler import SaveScheduler
+
 
 # Ścieżki plików i folderów
 DATA_DIR = os.path.join("data")
@@ -20,11 +25,14 @@ EXTERNAL_DIR = os.path.join("external")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 GAMES_FOLDER = os.path.join(DATA_DIR, "games_saves")
 IMAGES_FOLDER = "images"
+THUMBNAIL_CACHE_DIR = os.path.join(IMAGES_FOLDER, "thumbnails")
 INTERNAL_MUSIC_DIR = "internal_music"
 CUSTOM_THEMES_DIR = "custom_themes"
 LOCAL_SETTINGS_FILE = os.path.join(CONFIG_DIR, "local_settings.json")
 ACHIEVEMENTS_DEFINITIONS_FILE = os.path.join(CONFIG_DIR, "achievements_def.json")
 CHAT_DB_FILE = os.path.join(CHAT_DATA_DIR, "chat.db")
+LIBRARY_DB_FILE = os.path.join(CONFIG_DIR, "library.db")
+PHOTO_CACHE_MAX_BYTES = 128 * 1024 * 1024
 SCRIPTHOOK_CONFIG_FILE = os.path.join(EXTERNAL_DIR, "ScriptHookConfig.ini")
 
 # MONTH_COLORS - kolory dla miesięcy (używane w statystykach)
@@ -260,14 +268,53 @@ def _load_theme_from_file(filepath: str) -> dict | None:
         return None
 
 
+# Generacja konfiguracji: zwiekszana przez kazde save_config, a po zapisie w tle
+# zapamietywana jako utrwalona. Cache zasilane z dziennika konfiguracji sa
+# aktualne tylko wtedy, gdy obie wartosci sa rowne.
+_config_generation = 0
+_persisted_config_generation = 0
+_config_generation_lock = threading.Lock()
+
+
+def _write_config(job):
+    global _persisted_config_generation
+    generation, data = job
+    get_config_journal(CONFIG_FILE).save(data)
+    with _config_generation_lock:
+        _persisted_config_generation = max(_persisted_config_generation, generation)
+
+
+config_save_scheduler = SaveScheduler(_write_config)
+
+
 def save_config(data):
+    """Zleca zapis konfiguracji; serie zmian sa laczone w jeden zapis w tle."""
+    global _config_generation
     data_copy = data.copy()
     data_copy.get("settings", {}).pop("github_token", None)
-    config_dir = os.path.dirname(CONFIG_FILE)
-    if config_dir:
-        os.makedirs(config_dir, exist_ok=True)
-    with open(CONFIG_FILE, "w", encoding="utf-8") as file:
-        json.dump(data_copy, file, indent=4, ensure_ascii=False)
+    with _config_generation_lock:
+        _config_generation += 1
+        generation = _config_generation
+    config_save_scheduler.request((generation, data_copy))
+
+
+def config_generation():
+    """Licznik wywolan save_config - zmienia sie przy kazdej zmianie konfiguracji."""
+    return _config_generation
+
+
+def config_changes_pending():
+    """True, gdy obserwatorzy dziennika nie dostali jeszcze ostatnich zmian z save_config."""
+    with _config_generation_lock:
+        return _persisted_config_generation != _config_generation
+
+
+def flush_config(timeout=None):
+    """Czeka na zapis oczekujacych zmian konfiguracji. False przy timeoucie lub bledzie zapisu."""
+    return config_save_scheduler.flush_sync(timeout)
+
+
+atexit.register(flush_config, 10)
 
 
 def create_default_cover(game_name, size=(200, 300)):
@@ -329,8 +376,27 @@ def create_default_cover(game_name, size=(200, 300)):
     return image_path
 
 
-@functools.lru_cache(maxsize=256)
-def load_photoimage_from_path(image_path, size):
+# Wspólny cache PhotoImage (grid, szczegóły gry, czat) z budżetem bajtów.
+photo_cache = ImageCache(max_bytes=PHOTO_CACHE_MAX_BYTES)
+# Miniatury z czatu nie mogą wypchnąć okładek biblioteki.
+photo_cache.set_namespace_budget("chat", 16 * 1024 * 1024)
+
+
+def load_photoimage_from_path(image_path, size, namespace="default"):
+    """PhotoImage z pliku przeskalowany do ``size``, z cache walidowanego mtime pliku."""
+    return photo_cache.get_file(namespace, image_path, tuple(size), _load_photoimage_uncached)
+
+
+def invalidate_photoimage(image_path):
+    """Usuwa z cache wszystkie warianty obrazu z podanego pliku."""
+    return photo_cache.invalidate_path(image_path)
+
+
+# Zgodność ze starym API opartym o functools.lru_cache.
+load_photoimage_from_path.cache_clear = photo_cache.clear
+
+
+def _load_photoimage_uncached(image_path, size):
     try:
         with Image.open(image_path) as img:
             img = img.resize(size, RESAMPLING)
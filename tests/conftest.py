@@ -0,0 +1,24 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def chat_server(tmp_path_factory):
+    """Moduł chat_server z bazą w folderze tymczasowym (ścieżki liczone od cwd przy imporcie)."""
+    pytest.importorskip("flask_socketio")
+    pytest.importorskip("flask_sqlalchemy")
+    previous_cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("chat"))
+    try:
+        cs = importlib.import_module("chat_server")
+        with cs.app.app_context():
+            cs.db.create_all()
+            cs.ensure_message_indexes()
+        yield cs
+    finally:
+        os.chdir(previous_cwd)
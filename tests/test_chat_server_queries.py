@@ -0,0 +1,132 @@
+import datetime
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+
+@pytest.fixture(scope="module")
+def chat(chat_server):
+    with chat_server.app.app_context():
+        _seed(chat_server)
+    return chat_server
+
+
+def _seed(cs):
+    users = [
+        cs.User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x")
+        for i in range(12)
+    ]
+    cs.db.session.add_all(users)
+    cs.db.session.commit()
+
+    rooms = [cs.ChatRoom(name=f"room{i}", creator_id=users[i].id) for i in range(10)]
+    cs.db.session.add_all(rooms)
+    cs.db.session.commit()
+    for room in rooms:
+        for user in users[:6]:
+            cs.db.session.add(cs.RoomMembership(user_id=user.id, room_id=room.id))
+
+    start = datetime.datetime(2024, 1, 1)
+    first, second = users[0].id, users[1].id
+    messages = []
+    for i in range(120):
+        sender, receiver = (first, second) if i % 2 else (second, first)
+        messages.append(
+            cs.Message(
+                sender_id=sender,
+                receiver_id=receiver,
+                content=f"dm {i}",
+                timestamp=start + datetime.timedelta(seconds=i),
+                conversation_key=cs.Message.make_conversation_key(sender, receiver),
+            )
+        )
+        messages.append(
+            cs.Message(
+                sender_id=users[i % 6].id,
+                room_id=rooms[0].id,
+                content=f"room {i}",
+                timestamp=start + datetime.timedelta(seconds=i),
+            )
+        )
+    cs.db.session.add_all(messages)
+    cs.db.session.commit()
+    # Każda wiadomość cytuje inną wiadomość spoza stronicowanych rozmów.
+    quoted = [
+        cs.Message(
+            sender_id=users[2 + i % 2].id,
+            receiver_id=users[3 - i % 2].id,
+            content=f"quoted {i}",
+            timestamp=start,
+            conversation_key=cs.Message.make_conversation_key(users[2].id, users[3].id),
+        )
+        for i in range(len(messages))
+    ]
+    cs.db.session.add_all(quoted)
+    cs.db.session.commit()
+    for message, quoted_message in zip(messages, quoted):
+        message.replied_to_message_id = quoted_message.id
+    cs.db.session.commit()
+
+
+def _count_queries(cs, url, **params):
+    counter = {"statements": 0}
+
+    def before_cursor_execute(*_args):
+        counter["statements"] += 1
+
+    # Zimny katalog nazw użytkowników - liczymy najgorszy przypadek.
+    cs._user_directory.clear()
+    with cs.app.app_context():
+        engine = cs.db.engine
+    sqlalchemy.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = cs.app.test_client().get(url, query_string=params)
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    return counter["statements"], response.get_json()
+
+
+def _user_ids(cs):
+    with cs.app.app_context():
+        return [cs.User.query.filter_by(username=name).one().id for name in ("user0", "user1")]
+
+
+def test_private_history_query_count_is_independent_of_page_size(chat):
+    first, second = _user_ids(chat)
+    url = f"/messages/{first}/{second}"
+    small, small_page = _count_queries(chat, url, limit=5)
+    large, large_page = _count_queries(chat, url, limit=100)
+    assert len(small_page["messages"]) == 5
+    assert len(large_page["messages"]) == 100
+    assert small == large
+    assert large_page["messages"][-1]["sender_username"]
+
+
+def test_room_history_query_count_is_independent_of_page_size(chat):
+    first, _second = _user_ids(chat)
+    with chat.app.app_context():
+        room_id = chat.ChatRoom.query.filter_by(name="room0").one().id
+    url = f"/rooms/{room_id}/messages"
+    small, small_page = _count_queries(chat, url, user_id=first, limit=5)
+    large, large_page = _count_queries(chat, url, user_id=first, limit=100)
+    assert len(small_page["messages"]) == 5
+    assert len(large_page["messages"]) == 100
+    assert small == large
+
+
+def test_rooms_query_count_is_independent_of_room_count(chat):
+    before, rooms = _count_queries(chat, "/rooms")
+    assert len(rooms) == 10
+    with chat.app.app_context():
+        creator = chat.User.query.filter_by(username="user0").one()
+        for i in range(10, 40):
+            room = chat.ChatRoom(name=f"room{i}", creator_id=creator.id)
+            chat.db.session.add(room)
+            chat.db.session.flush()
+            chat.db.session.add(chat.RoomMembership(user_id=creator.id, room_id=room.id))
+        chat.db.session.commit()
+    after, rooms = _count_queries(chat, "/rooms")
+    assert len(rooms) == 40
+    assert before == after
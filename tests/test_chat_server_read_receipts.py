@@ -0,0 +1,74 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def chat(chat_server):
+    cs = chat_server
+    with cs.app.app_context():
+        users = [
+            cs.User(username=name, email=f"{name}@example.com", password_hash="x")
+            for name in ("reader", "batch_sender", "legacy_sender")
+        ]
+        cs.db.session.add_all(users)
+        cs.db.session.commit()
+        reader, batch_sender, legacy_sender = (user.id for user in users)
+        for sender in (batch_sender, legacy_sender):
+            cs.db.session.add_all(
+                cs.Message(
+                    sender_id=sender,
+                    receiver_id=reader,
+                    content=f"message {i}",
+                    conversation_key=cs.Message.make_conversation_key(sender, reader),
+                )
+                for i in range(5)
+            )
+        cs.db.session.commit()
+    return cs, reader, batch_sender, legacy_sender
+
+
+def _client(cs, user_id, batched):
+    client = cs.socketio.test_client(cs.app)
+    payload = {"user_id": user_id}
+    if batched:
+        payload["batched_read_receipts"] = True
+    client.emit("authenticate", payload)
+    client.get_received()
+    return client
+
+
+def _read_updates(client):
+    return [e["args"][0] for e in client.get_received() if e["name"] == "message_read_update"]
+
+
+def _message_ids(cs, sender_id):
+    with cs.app.app_context():
+        messages = cs.Message.query.filter_by(sender_id=sender_id).order_by(cs.Message.id)
+        return [message.id for message in messages]
+
+
+def test_batched_client_gets_one_event_per_sender(chat):
+    cs, reader, batch_sender, _legacy_sender = chat
+    sender_client = _client(cs, batch_sender, batched=True)
+    reader_client = _client(cs, reader, batched=True)
+    reader_client.emit(
+        "mark_messages_as_read", {"conversation_partner_id": batch_sender, "reader_id": reader}
+    )
+    updates = _read_updates(sender_client)
+    expected = {
+        "up_to_message_id": _message_ids(cs, batch_sender)[-1],
+        "read_by_user_id": reader,
+        "is_read": True,
+    }
+    assert updates == [expected]
+
+
+def test_legacy_client_gets_one_event_per_message(chat):
+    cs, reader, _batch_sender, legacy_sender = chat
+    sender_client = _client(cs, legacy_sender, batched=False)
+    reader_client = _client(cs, reader, batched=True)
+    reader_client.emit(
+        "mark_messages_as_read", {"conversation_partner_id": legacy_sender, "reader_id": reader}
+    )
+    updates = _read_updates(sender_client)
+    assert [update["message_id"] for update in updates] == _message_ids(cs, legacy_sender)
+    assert all(update["is_read"] and update["read_by_user_id"] == reader for update in updates)
@@ -0,0 +1,46 @@
+import json
+import os
+import threading
+
+from launcher import config_journal
+from launcher.config_journal import ConfigJournal
+
+
+def test_compaction_does_not_share_temp_file_with_full_snapshot(tmp_path, monkeypatch):
+    config_file = str(tmp_path / "config.json")
+    journal = ConfigJournal(config_file, fsync=False)
+    journal.save({"settings": {"theme": "dark"}, "games": {"Alpha": {"exe": "a.exe"}}})
+    journal.save({"settings": {"theme": "dark"}, "games": {"Alpha": {"exe": "b.exe"}}})
+
+    real_write = config_journal._fsync_write
+    paused, resume = threading.Event(), threading.Event()
+
+    def write(path, payload):
+        if threading.current_thread() is threading.main_thread():
+            return real_write(path, payload)
+        # Kompaktacja w tle zatrzymana w połowie zapisu snapshotu.
+        with open(path, "wb") as file:
+            file.write(payload[:10])
+            file.flush()
+            paused.set()
+            resume.wait(5)
+            file.write(payload[10:])
+
+    monkeypatch.setattr(config_journal, "_fsync_write", write)
+    compaction = threading.Thread(target=journal._compact_safely)
+    compaction.start()
+    assert paused.wait(5)
+
+    # Zmiana config.json z zewnątrz wymusza pełny zapis snapshotu.
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    final = {"settings": {"theme": "light"}, "games": {"Alpha": {"exe": "c.exe"}}}
+    journal.save(final)
+    resume.set()
+    compaction.join(5)
+    journal.close()
+
+    with open(config_file, encoding="utf-8") as file:
+        assert json.load(file) == final
+    assert ConfigJournal(config_file, fsync=False).load() == final
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
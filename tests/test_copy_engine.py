@@ -0,0 +1,74 @@
+import os
+import threading
+
+import pytest
+
+from launcher import copy_engine
+from launcher.copy_engine import CopyCancelled, CopyEngine, estimate_copy
+
+LARGE = 64 * 1024
+
+
+@pytest.fixture(autouse=True)
+def small_pieces(monkeypatch):
+    # Mniejsze progi, żeby "duże" pliki i kopiowanie kawałkami działały na małych danych.
+    monkeypatch.setattr(copy_engine, "LARGE_FILE_THRESHOLD", LARGE)
+    monkeypatch.setattr(copy_engine, "_PIECE_SIZE", 4096)
+    monkeypatch.setattr(copy_engine, "_BUFFER_SIZE", 4096)
+
+
+def _make_tree(root):
+    (root / "sub" / "empty").mkdir(parents=True)
+    files = {
+        "small.txt": b"maly plik",
+        "sub/big.bin": os.urandom(5 * LARGE + 123),
+        "sub/other.bin": os.urandom(2 * LARGE),
+    }
+    for rel_path, data in files.items():
+        (root / rel_path).write_bytes(data)
+    return files
+
+
+def _no_kernel_copy(monkeypatch, *names):
+    def fail(*_args):
+        raise OSError("niedostępne")
+
+    for name in names:
+        monkeypatch.setattr(os, name, fail, raising=False)
+
+
+@pytest.mark.parametrize(
+    "disabled", [(), ("copy_file_range",), ("copy_file_range", "sendfile")]
+)
+def test_copy_tree_copies_all_bytes(tmp_path, monkeypatch, disabled):
+    _no_kernel_copy(monkeypatch, *disabled)
+    files = _make_tree(tmp_path / "src")
+    stats = CopyEngine(workers=2).copy_tree(str(tmp_path / "src"), str(tmp_path / "dst"))
+
+    for rel_path, data in files.items():
+        assert (tmp_path / "dst" / rel_path).read_bytes() == data
+    assert (tmp_path / "dst" / "sub" / "empty").is_dir()
+    assert stats.files_done == len(files)
+    assert stats.bytes_done == sum(len(data) for data in files.values())
+    assert estimate_copy(str(tmp_path / "src")) == (stats.total_files, stats.total_bytes)
+
+
+def test_cancel_leaves_no_partial_file(tmp_path):
+    source = tmp_path / "big.bin"
+    source.write_bytes(os.urandom(20 * LARGE))
+    dest = tmp_path / "dst" / "big.bin"
+    dest.parent.mkdir()
+    dest.write_bytes(b"poprzednia wersja")
+
+    cancel_event = threading.Event()
+
+    def progress(state):
+        if state.bytes_done:
+            cancel_event.set()
+
+    engine = CopyEngine(workers=1, progress=progress, cancel_event=cancel_event)
+    with pytest.raises(CopyCancelled):
+        engine.copy_files([(str(source), str(dest), source.stat().st_size)])
+
+    assert dest.read_bytes() == b"poprzednia wersja"
+    assert os.listdir(dest.parent) == ["big.bin"]
@@ -0,0 +1,72 @@
+import os
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from launcher import scan_pipeline  # noqa: E402
+from launcher.fs_watcher import FolderWatcher  # noqa: E402
+from launcher.scan_engine import DirectoryIndex, ScanEngine  # noqa: E402
+
+
+def _nested_game(root):
+    game_dir = root / "MyGame"
+    (game_dir / "bin").mkdir(parents=True)
+    (game_dir / "bin" / "mygame.exe").write_bytes(b"MZ")
+    return game_dir
+
+
+def _watcher(root, recursive):
+    launcher = types.SimpleNamespace(
+        settings={"scan_recursively": recursive, "scan_ignore_folders": []},
+        games={},
+        find_likely_executable=types.SimpleNamespace(ignore_files=[]),
+        root=types.SimpleNamespace(after=lambda _ms, callback: callback()),
+    )
+    watcher = FolderWatcher(launcher)
+    watcher._scan_roots = (str(root),)
+    return watcher
+
+
+def _offer(monkeypatch, watcher, folders):
+    reported = {}
+
+    def build_game_candidate(_launcher, folder_path, potential_exes, *_names):
+        reported[folder_path] = [e["path"] for e in potential_exes]
+        return None
+
+    monkeypatch.setattr(scan_pipeline, "build_game_candidate", build_game_candidate)
+    monkeypatch.setattr(scan_pipeline, "offer_watched_game_candidates", lambda *a: None)
+    watcher._offer_game_candidates(folders)
+    return reported
+
+
+def _full_scan(root, recursive):
+    found = {}
+    ScanEngine(
+        [str(root)], recursive=recursive, index=DirectoryIndex(index_file=None)
+    ).run(lambda path, exes: found.setdefault(path, [e["path"] for e in exes]))
+    return found
+
+
+@pytest.mark.parametrize("recursive", [True, False])
+def test_new_folder_with_exe_in_bin_is_checked_like_a_full_scan(
+    tmp_path, monkeypatch, recursive
+):
+    root = tmp_path / "games"
+    game_dir = _nested_game(root)
+
+    reported = _offer(monkeypatch, _watcher(root, recursive), [str(game_dir)])
+
+    assert reported == _full_scan(root, recursive)
+    assert reported[str(game_dir)] == [str(game_dir / "bin" / "mygame.exe")]
+
+
+def test_folder_below_first_level_is_skipped_without_recursion(tmp_path, monkeypatch):
+    root = tmp_path / "games"
+    game_dir = _nested_game(root / "Kolekcja")
+
+    reported = _offer(monkeypatch, _watcher(root, False), [str(game_dir)])
+
+    assert reported == {}
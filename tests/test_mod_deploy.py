@@ -0,0 +1,100 @@
+import os
+import stat
+
+import pytest
+
+from launcher.mod_deploy import ModDeployment
+
+
+def _setup(tmp_path):
+    game_folder = tmp_path / "game"
+    game_folder.mkdir()
+    mod_dir = tmp_path / "mods" / "Better Textures"
+    (mod_dir / "data").mkdir(parents=True)
+    (mod_dir / "data" / "textures.pak").write_bytes(b"mod textures")
+    profile = {
+        "mods": {"Better Textures": {"active": True, "managed": True, "location": str(mod_dir)}},
+        "load_order": ["Better Textures"],
+    }
+    return game_folder, mod_dir, profile
+
+
+def test_deployed_file_does_not_share_inode_with_mod_source(tmp_path):
+    game_folder, mod_dir, profile = _setup(tmp_path)
+    deployment = ModDeployment("Game", str(game_folder), games_folder=str(tmp_path / "saves"))
+    stats = deployment.deploy("Default", profile)
+    assert stats["hardlink"] == 0
+
+    target = game_folder / "data" / "textures.pak"
+    source = mod_dir / "data" / "textures.pak"
+    assert not os.path.samefile(target, source)
+    # Zapis w miejscu w folderze gry nie zmienia źródła moda.
+    with open(target, "r+b") as f:
+        f.write(b"patched")
+    assert source.read_bytes() == b"mod textures"
+
+    deployment.undeploy()
+    assert not target.exists()
+    assert source.read_bytes() == b"mod textures"
+
+
+def test_hardlinks_only_for_read_only_mods_with_opt_in(tmp_path):
+    game_folder, mod_dir, profile = _setup(tmp_path)
+    source = mod_dir / "data" / "textures.pak"
+    deployment = ModDeployment(
+        "Game", str(game_folder), games_folder=str(tmp_path / "saves"), allow_hardlinks=True
+    )
+    assert deployment.deploy("Default", profile)["hardlink"] == 0
+    deployment.undeploy()
+
+    os.chmod(source, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    stats = deployment.deploy("Default", profile)
+    # Reflink ma pierwszeństwo; bez niego plik tylko do odczytu jest linkowany.
+    assert stats["copy"] == 0
+    assert stats["reflink"] + stats["hardlink"] == 1
+    deployment.undeploy()
+    assert source.read_bytes() == b"mod textures"
+
+
+class _Crash(BaseException):
+    """Awaria procesu - nie łapie jej ``except Exception`` w ``deploy``."""
+
+
+def _crash_on_replace(monkeypatch, call_number):
+    real_replace = os.replace
+    calls = []
+
+    def replace(src, dst):
+        calls.append(src)
+        if len(calls) == call_number:
+            raise _Crash()
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    return calls
+
+
+@pytest.mark.parametrize("crash_at", range(1, 7))
+def test_interrupted_deploy_keeps_game_originals(tmp_path, monkeypatch, crash_at):
+    game_folder, mod_dir, profile = _setup(tmp_path)
+    target = game_folder / "data" / "textures.pak"
+    target.parent.mkdir()
+    target.write_bytes(b"original textures")
+    games_folder = str(tmp_path / "saves")
+
+    _crash_on_replace(monkeypatch, crash_at)
+    with pytest.raises(_Crash):
+        ModDeployment("Game", str(game_folder), games_folder=games_folder).deploy(
+            "Default", profile
+        )
+    monkeypatch.undo()
+
+    # Następne uruchomienie launchera kończy albo wycofuje wdrożenie.
+    deployment = ModDeployment("Game", str(game_folder), games_folder=games_folder)
+    assert not (game_folder / "_mod_staging").exists()
+    assert target.read_bytes() in (b"original textures", b"mod textures")
+
+    deployment.deploy("Default", profile)
+    assert target.read_bytes() == b"mod textures"
+    deployment.undeploy()
+    assert target.read_bytes() == b"original textures"
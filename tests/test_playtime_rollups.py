@@ -0,0 +1,44 @@
+import datetime
+import time
+
+from launcher.playtime_rollups import PlaytimeRollups
+
+
+def test_sync_games_follows_live_library():
+    day = datetime.date(2024, 3, 10)
+    start = time.mktime(day.timetuple()) + 12 * 3600
+    games = {"Alpha": {"genres": ["RPG"], "play_sessions": [{"start": start, "end": start + 600}]}}
+    rollups = PlaytimeRollups()
+    rollups.rebuild(games)
+
+    games["Alpha"]["play_sessions"].append({"start": start + 1000, "end": start + 1300})
+    games["Beta"] = {"play_sessions": [{"start": start, "end": start + 60}]}
+    rollups.sync_games(games)
+    result = rollups.query(day, day)
+    assert dict(result["per_game"]) == {"Alpha": 900.0, "Beta": 60.0}
+    assert dict(result["per_genre"]) == {"RPG": 900.0}
+
+    del games["Alpha"]
+    rollups.sync_games(games)
+    assert dict(rollups.query(day, day)["per_game"]) == {"Beta": 60.0}
+
+
+def test_edit_of_earlier_session_with_new_session_is_detected():
+    day = datetime.date(2024, 3, 10)
+    start = time.mktime(day.timetuple()) + 12 * 3600
+    sessions = [{"start": start, "end": start + 600}, {"start": start + 1000, "end": start + 1300}]
+    games = {"Alpha": {"play_sessions": sessions}}
+    rollups = PlaytimeRollups()
+    rollups.rebuild(games)
+
+    # Skrócenie pierwszej sesji i dopisanie nowej - liczba sesji rośnie o jeden.
+    sessions[0] = {"start": start, "end": start + 60}
+    sessions.append({"start": start + 2000, "end": start + 2100})
+    rollups.record_session("Alpha", games["Alpha"], start + 2000, start + 2100)
+    assert dict(rollups.query(day, day)["per_game"]) == {"Alpha": 460.0}
+
+    # Usunięcie wcześniejszej sesji i dopisanie nowej - liczba sesji bez zmian.
+    del sessions[1]
+    sessions.append({"start": start + 3000, "end": start + 3050})
+    rollups.sync_games(games)
+    assert dict(rollups.query(day, day)["per_game"]) == {"Alpha": 210.0}
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+psutil = pytest.importorskip("psutil")
+from launcher.process_watcher import LaunchSession, ProcessSnapshot  # noqa: E402
+
+# Stub startowy: uruchamia "grę" i kończy się po chwili, osierocając ją.
+_STUB = (
+    "import subprocess, sys, time;"
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']);"
+    "time.sleep(1.0)"
+)
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_orphaned_children_stay_in_launch_tree():
+    popen = subprocess.Popen([sys.executable, "-c", _STUB])
+    session = LaunchSession("Game", popen)
+    try:
+        assert _wait_for(lambda: psutil.Process(popen.pid).children())
+        session.adopt_descendants()
+        assert len(session.members) == 2
+
+        popen.wait(timeout=10)
+        assert session.update(ProcessSnapshot())
+        assert popen.pid not in session.members
+        assert len(session.members) == 1
+    finally:
+        assert session.kill()
+    assert _wait_for(lambda: not session.prune())
@@ -0,0 +1,46 @@
+import hashlib
+
+from launcher.save_chunks import (
+    MAX_CHUNK_SIZE,
+    MIN_CHUNK_SIZE,
+    _cut_points,
+    decode_chunk,
+    encode_chunk,
+)
+
+
+def _sample(size_kib=1024):
+    return b"".join(
+        hashlib.sha256(i.to_bytes(4, "little")).digest() for i in range(size_kib * 32)
+    )
+
+
+def test_chunk_boundaries_are_stable():
+    # Zmiana granic psuje deduplikację wszystkich istniejących magazynów zapisów.
+    cuts = _cut_points(_sample(), True)
+    assert cuts[:6] == [56370, 74204, 111737, 204775, 229372, 257038]
+    assert cuts[-1] == 1024 * 1024
+
+
+def test_chunk_sizes_within_limits():
+    cuts = _cut_points(_sample(), True)
+    sizes = [end - start for start, end in zip([0] + cuts, cuts)]
+    assert all(size <= MAX_CHUNK_SIZE for size in sizes)
+    assert all(size >= MIN_CHUNK_SIZE for size in sizes[:-1])
+
+
+def test_insert_changes_only_nearby_chunks():
+    data = _sample()
+    edited = data[:300_000] + b"inserted bytes" + data[300_000:]
+
+    def chunks(buffer):
+        cuts = _cut_points(buffer, True)
+        return {buffer[start:end] for start, end in zip([0] + cuts, cuts)}
+
+    assert len(chunks(edited) - chunks(data)) <= 2
+
+
+def test_encode_round_trip():
+    data = _sample(64)
+    for chunk in (data, b"\0" * 100_000, b""):
+        assert decode_chunk(encode_chunk(chunk)) == chunk
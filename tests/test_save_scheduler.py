@@ -0,0 +1,56 @@
+import threading
+
+from launcher.save_scheduler import SaveScheduler
+
+
+class _FlakyWriter:
+    def __init__(self, failures):
+        self.failures = failures
+        self.written = []
+        self.done = threading.Event()
+
+    def __call__(self, data):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("dysk pełny")
+        self.written.append(data)
+        self.done.set()
+
+
+def test_failed_write_is_retried_in_background():
+    writer = _FlakyWriter(failures=2)
+    scheduler = SaveScheduler(writer, delay=0.01, max_delay=0.05, retry_delay=0.01)
+    scheduler.request({"v": 1})
+
+    assert writer.done.wait(5)
+    assert writer.written == [{"v": 1}]
+    stats = scheduler.stats()
+    assert stats["errors"] == 2
+    assert not stats["pending"]
+    scheduler.stop(5)
+
+
+def test_flush_sync_reports_failed_write_and_keeps_data():
+    writer = _FlakyWriter(failures=1)
+    scheduler = SaveScheduler(writer, delay=60, max_delay=60, retry_delay=60)
+    scheduler.request({"v": 1})
+
+    assert scheduler.flush_sync(5) is False
+    assert scheduler.stats()["pending"]
+    assert writer.written == []
+
+    assert scheduler.flush_sync(5) is True
+    assert writer.written == [{"v": 1}]
+    scheduler.stop(5)
+
+
+def test_newer_request_wins_over_failed_data():
+    writer = _FlakyWriter(failures=1)
+    scheduler = SaveScheduler(writer, delay=60, max_delay=60, retry_delay=60)
+    scheduler.request({"v": 1})
+    assert scheduler.flush_sync(5) is False
+
+    scheduler.request({"v": 2})
+    assert scheduler.flush_sync(5) is True
+    assert writer.written == [{"v": 2}]
+    scheduler.stop(5)
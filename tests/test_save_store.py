@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from launcher.save_store import AUTOSAVE_SNAPSHOT, SaveStore  # noqa: E402
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_second_instance_snapshot_survives_delete_in_first(tmp_path):
+    saves = tmp_path / "saves"
+    games = tmp_path / "games"
+    _write(saves / "slot.sav", b"pierwszy stan " * 4096)
+
+    # Okno menedżera zapisów trzyma jedną instancję przez cały czas.
+    manager_store = SaveStore("Gra", games_folder=str(games))
+    manager_store.snapshot("named1", str(saves))
+
+    # Auto-zapis po wyjściu z gry idzie przez nową instancję.
+    _write(saves / "slot.sav", b"stan po sesji " * 4096)
+    SaveStore("Gra", games_folder=str(games)).snapshot(AUTOSAVE_SNAPSHOT, str(saves))
+
+    manager_store.delete("named1")
+
+    fresh = SaveStore("Gra", games_folder=str(games))
+    assert [s["name"] for s in fresh.list_snapshots()] == [AUTOSAVE_SNAPSHOT]
+    restored = tmp_path / "restored"
+    fresh.restore(AUTOSAVE_SNAPSHOT, str(restored))
+    assert (restored / "slot.sav").read_bytes() == b"stan po sesji " * 4096
+
+
+def test_garbage_collection_keeps_chunks_of_snapshots_missing_from_index(tmp_path):
+    saves = tmp_path / "saves"
+    games = tmp_path / "games"
+    _write(saves / "slot.sav", b"a" * 100_000)
+    store = SaveStore("Gra", games_folder=str(games))
+    store.snapshot("first", str(saves))
+    _write(saves / "slot.sav", b"b" * 100_000)
+    store.snapshot("second", str(saves))
+
+    # Indeks bez jednej z migawek (np. zapis przerwany przed aktualizacją indeksu).
+    index_file = games / "Gra" / "save_store" / "index.json"
+    index = json.loads(index_file.read_text(encoding="utf-8"))
+    del index["snapshots"]["first"]
+    index_file.write_text(json.dumps(index), encoding="utf-8")
+    SaveStore("Gra", games_folder=str(games)).collect_garbage()
+
+    restored = tmp_path / "restored"
+    SaveStore("Gra", games_folder=str(games)).restore("first", str(restored))
+    assert (restored / "slot.sav").read_bytes() == b"a" * 100_000
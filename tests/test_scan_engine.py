@@ -0,0 +1,41 @@
+import os
+
+from launcher.scan_engine import DirectoryIndex, ScanEngine
+
+
+def _make_game(root, name):
+    game_dir = os.path.join(root, name)
+    os.makedirs(game_dir)
+    with open(os.path.join(game_dir, f"{name}.exe"), "wb") as f:
+        f.write(b"MZ")
+    return game_dir
+
+
+def test_scan_reports_folders_from_every_root(tmp_path):
+    roots, expected = [], set()
+    for i in range(8):
+        root = tmp_path / f"root{i}"
+        root.mkdir()
+        roots.append(str(root))
+        expected.add(_make_game(str(root), f"game{i}"))
+
+    for _ in range(50):
+        index = DirectoryIndex(str(tmp_path / "scan_index.json"))
+        found = set()
+        ScanEngine(roots, index=index).run(lambda path, exes: found.add(path))
+        assert found == expected
+
+
+def test_scan_index_keeps_entries_of_all_roots(tmp_path):
+    roots = []
+    for i in range(4):
+        root = tmp_path / f"root{i}"
+        root.mkdir()
+        roots.append(str(root))
+        _make_game(str(root), f"game{i}")
+
+    index_file = str(tmp_path / "scan_index.json")
+    ScanEngine(roots, index=DirectoryIndex(index_file)).run(lambda path, exes: None)
+    stats = ScanEngine(roots, index=DirectoryIndex(index_file)).run(lambda path, exes: None)
+    assert stats["folders"] == 4
+    assert stats["listed"] == 0
@@ -0,0 +1,46 @@
+import datetime
+import time
+import types
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from launcher import stats_data  # noqa: E402
+from launcher.playtime_rollups import PlaytimeRollups  # noqa: E402
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def test_most_launched_ties_keep_library_order(monkeypatch):
+    day = datetime.date(2024, 3, 10)
+    start = time.mktime(day.timetuple()) + 3600
+    session = {"start": start, "end": start + 600}
+    # Agregaty dzienne widzą gry w innej kolejności niż biblioteka.
+    games = {name: {"play_sessions": [dict(session)]} for name in ("Zeta", "Alpha", "Mu")}
+    rollups = PlaytimeRollups()
+    rollups.rebuild(dict(reversed(list(games.items()))))
+    monkeypatch.setattr(
+        stats_data,
+        "query_playtime_rollups",
+        lambda _self, *args, **kwargs: rollups.query(*args, **kwargs),
+    )
+    launcher = types.SimpleNamespace(
+        games=games,
+        local_settings={},
+        launcher_start_time=time.time(),
+        stats_view_var=_Var("Most Launched Games"),
+        TRANSLATED_TO_STATS_VIEW={"Most Launched Games": "Most Launched Games"},
+        _get_time_period_dates=lambda: (day, day),
+    )
+
+    chart = stats_data._prepare_chart_data(launcher)
+
+    assert chart["x_labels"] == ["Zeta", "Alpha", "Mu"]
+    assert chart["y_values"] == [1, 1, 1]
@@ -0,0 +1,59 @@
+import datetime
+import time
+
+from launcher.playtime_rollups import PlaytimeRollups
+from launcher.stats_numpy import SessionArrays
+
+
+def _games():
+    start = time.mktime(datetime.date(2024, 3, 10).timetuple()) + 20 * 3600
+    return {
+        "Alpha": {
+            "genres": ["RPG"],
+            "tags": ["Solo"],
+            "play_sessions": [
+                {"start": start, "end": start + 6 * 3600},  # przez północ
+                {"start": start + 86_400, "end": start + 86_400 + 1800},
+            ],
+        },
+        "Beta": {
+            "genres": ["RPG", "Akcja"],
+            "play_sessions": [{"start": start + 3600, "end": start + 7200}],
+        },
+        "Gamma": {"play_sessions": []},
+    }
+
+
+def _rollups(games):
+    rollups = PlaytimeRollups()
+    rollups.rebuild(games)
+    return rollups
+
+
+def test_daily_games_empty_period_matches_rollups():
+    games = _games()
+    arrays = SessionArrays(games)
+    start, end = datetime.date(2024, 5, 1), datetime.date(2024, 5, 31)
+    result = arrays.query(start, end, daily_games=True)
+    assert result["daily_games"] == {}
+    assert result == _rollups(games).query(start, end, daily_games=True)
+
+
+def test_daily_games_without_selected_games_sessions():
+    arrays = SessionArrays(_games())
+    start, end = datetime.date(2024, 3, 1), datetime.date(2024, 3, 31)
+    assert arrays.query(start, end, game_names=["Gamma"], daily_games=True)["daily_games"] == {}
+
+
+def test_query_matches_rollups():
+    games = _games()
+    arrays = SessionArrays(games)
+    start, end = datetime.date(2024, 3, 1), datetime.date(2024, 3, 31)
+    expected = _rollups(games).query(start, end, daily_games=True)
+    result = arrays.query(start, end, daily_games=True)
+    assert result["daily_games"] == expected["daily_games"]
+    assert result["launches"] == expected["launches"]
+    for key in ("daily_seconds", "per_game", "per_genre"):
+        assert result[key].keys() == expected[key].keys()
+        for name, seconds in expected[key].items():
+            assert abs(result[key][name] - seconds) < 1e-6
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from PIL import Image  # noqa: E402
+
+from launcher.thumbnail_cache import ThumbnailCache  # noqa: E402
+
+
+def test_thumbnail_keeps_cover_aspect_ratio(tmp_path):
+    cover = tmp_path / "cover.png"
+    Image.new("RGB", (400, 200), "red").save(cover)
+    cache = ThumbnailCache(str(tmp_path / "thumbs"))
+
+    with Image.open(cache.get(str(cover), (100, 100))) as thumb:
+        assert thumb.size == (100, 50)
+
+
+def test_variants_from_older_manifest_are_rebuilt(tmp_path):
+    cover = tmp_path / "cover.png"
+    Image.new("RGB", (400, 200), "red").save(cover)
+    thumbs = tmp_path / "thumbs"
+    cache = ThumbnailCache(str(thumbs))
+    thumb_path = cache.get(str(cover), (100, 100))
+    assert cache.flush(5)
+    Image.new("RGB", (100, 100), "red").save(thumb_path)  # rozciągnięta miniatura
+
+    manifest_path = thumbs / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["version"] = 1
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    with Image.open(ThumbnailCache(str(thumbs)).get(str(cover), (100, 100))) as thumb:
+        assert thumb.size == (100, 50)
@@ -120,10 +120,14 @@ class AddProfileDialog(tk.Toplevel):
 class ScanVerificationWindow(tk.Toplevel):
     """Okno do weryfikacji gier znalezionych podczas skanowania."""
 
-    def __init__(self, parent, launcher_instance, potential_games):
+    def __init__(
+        self, parent, launcher_instance, potential_games, scanning=False, on_cancel=None
+    ):
         super().__init__(parent)
         self.launcher = launcher_instance
-        self.potential_games_data = potential_games  # Przechowuje dane {'guessed_name', 'folder_path', 'suggested_exe_path', 'import', 'profiles'}
+        self.scanning = scanning  # True - skanowanie trwa, gry będą dopisywane (append_games)
+        self.on_cancel = on_cancel
+        self.potential_games_data = list(potential_games)  # Przechowuje dane {'guessed_name', 'folder_path', 'suggested_exe_path', 'import', 'profiles'}
         self.row_widgets = (
             {}
         )  # Słownik do przechowywania widgetów dla każdego wiersza {iid: {var_import, name_entry, exe_label, profiles_data}}
@@ -133,6 +137,7 @@ class ScanVerificationWindow(tk.Toplevel):
         self.geometry("900x600")
         self.minsize(700, 400)
         self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
 
         # Nagłówek
         ttk.Label(
@@ -145,6 +150,12 @@ class ScanVerificationWindow(tk.Toplevel):
             text="Możesz edytować nazwę, zmienić główny plik .exe lub dodać dodatkowe profile uruchomieniowe.",
             font=("Helvetica", 9),
         ).pack(pady=(0, 10))
+        self.scan_status_label = ttk.Label(
+            self,
+            text="Skanowanie w toku..." if scanning else "",
+            font=("Helvetica", 9),
+        )
+        self.scan_status_label.pack(pady=(0, 5))
 
         # Ramka dla Treeview i Scrollbara
         tree_frame = ttk.Frame(self)
@@ -212,12 +223,14 @@ class ScanVerificationWindow(tk.Toplevel):
         # Przyciski importu i anulowania
         import_cancel_frame = ttk.Frame(action_frame)
         import_cancel_frame.pack(side=tk.RIGHT)
-        ttk.Button(
+        self.import_button = ttk.Button(
             import_cancel_frame,
             text="Importuj Zaznaczone",
             style="Green.TButton",
             command=self.import_selected,
-        ).pack(side=tk.LEFT, padx=10)
+            state=tk.DISABLED if scanning else tk.NORMAL,
+        )
+        self.import_button.pack(side=tk.LEFT, padx=10)
         ttk.Button(import_cancel_frame, text="Anuluj", command=self.destroy).pack(
             side=tk.LEFT
         )
@@ -235,34 +248,62 @@ class ScanVerificationWindow(tk.Toplevel):
         self.row_widgets.clear()  # Wyczyść powiązane dane
 
         for idx, game_info in enumerate(self.potential_games_data):
-            iid = f"game_{idx}"  # Unikalny identyfikator wiersza
-            import_status = "✔" if game_info.get("import", True) else "✖"
-            tag = "checked" if game_info.get("import", True) else "unchecked"
-            profiles_str = (
-                ", ".join(
-                    [
-                        p["name"]
-                        for p in game_info["profiles"]
-                        if p["name"].lower() != "default"
-                    ]
-                )
-                or "-"
-            )
+            self._insert_game_row(idx, game_info)
+
+    def append_games(self, games):
+        """Dopisuje gry znalezione w trakcie trwającego skanowania."""
+        for game_info in games:
+            self.potential_games_data.append(game_info)
+            self._insert_game_row(len(self.potential_games_data) - 1, game_info)
+        self.set_scan_status(
+            f"Skanowanie w toku... znaleziono {len(self.potential_games_data)} gier."
+        )
 
-            values = (
-                import_status,
-                game_info["guessed_name"],
-                game_info["suggested_exe_path"],
-                game_info["folder_path"],
-                profiles_str,
+    def set_scan_status(self, text):
+        self.scan_status_label.config(text=text)
+
+    def finish_scan(self, summary=""):
+        """Kończy tryb skanowania - od teraz można importować."""
+        self.scanning = False
+        self.import_button.config(state=tk.NORMAL)
+        self.set_scan_status(summary)
+
+    def destroy(self):
+        if self.scanning and self.on_cancel:
+            self.scanning = False
+            self.on_cancel()
+        super().destroy()
+
+    def _insert_game_row(self, idx, game_info):
+        """Dodaje do Treeview wiersz dla jednej potencjalnej gry."""
+        iid = f"game_{idx}"  # Unikalny identyfikator wiersza
+        import_status = "✔" if game_info.get("import", True) else "✖"
+        tag = "checked" if game_info.get("import", True) else "unchecked"
+        profiles_str = (
+            ", ".join(
+                [
+                    p["name"]
+                    for p in game_info["profiles"]
+                    if p["name"].lower() != "default"
+                ]
             )
-            self.tree.insert("", "end", iid=iid, values=values, tags=(tag,))
+            or "-"
+        )
 
-            # Zapisz dane powiązane z wierszem (na razie tylko stan importu)
-            self.row_widgets[iid] = {
-                "import": tk.BooleanVar(value=game_info.get("import", True))
-            }
-            # W przyszłości można tu trzymać referencje do Entry itp. jeśli zmienimy UI
+        values = (
+            import_status,
+            game_info["guessed_name"],
+            game_info["suggested_exe_path"],
+            game_info["folder_path"],
+            profiles_str,
+        )
+        self.tree.insert("", "end", iid=iid, values=values, tags=(tag,))
+
+        # Zapisz dane powiązane z wierszem (na razie tylko stan importu)
+        self.row_widgets[iid] = {
+            "import": tk.BooleanVar(value=game_info.get("import", True))
+        }
+        # W przyszłości można tu trzymać referencje do Entry itp. jeśli zmienimy UI
 
     def toggle_import_selected(self, event=None):
         """Przełącza status importu dla zaznaczonego wiersza."""
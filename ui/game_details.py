@@ -11,7 +11,13 @@ from tkinter import filedialog, messagebox, simpledialog, ttk
 from PIL import Image, ImageTk
 
 from ui.components import ToolTip
-from launcher.utils import IMAGES_FOLDER, RESAMPLING, load_photoimage_from_path, save_config
+from launcher.utils import (
+    IMAGES_FOLDER,
+    RESAMPLING,
+    invalidate_photoimage,
+    load_photoimage_from_path,
+    save_config,
+)
 
 
 class GameDetailsWindow(tk.Toplevel):
@@ -553,7 +559,8 @@ class GameDetailsWindow(tk.Toplevel):
                     self.game_data.pop("_auto_cover", None)  # Usuń flagę auto
                     save_config(self.launcher.config)
                     if cover_changed:
-                        load_photoimage_from_path.cache_clear()
+                        invalidate_photoimage(original_cover_path)
+                        invalidate_photoimage(dest_path)
                     self.refresh_details_data()  # Odśwież widok szczegółów
                     # Wymuś odświeżenie kafelka w tle
                     self.launcher.root.after(
@@ -594,7 +601,7 @@ class GameDetailsWindow(tk.Toplevel):
         """Ładuje okładkę gry w odpowiednim rozmiarze (bez miniaturek)."""
         original_path = self.game_data.get("cover_image")
 
-        self.cover_photo = load_photoimage_from_path(original_path, size)
+        self.cover_photo = load_photoimage_from_path(original_path, size, namespace="details")
 
         if self.cover_photo:
             self.cover_label.config(image=self.cover_photo)
@@ -1643,9 +1650,9 @@ class GameDetailsWindow(tk.Toplevel):
             # --- WYCZYSZCZENIE CACHE (jeśli ustawiono nową okładkę) ---
             if cover_set_from_rawg:
                 try:
-                    load_photoimage_from_path.cache_clear()
+                    invalidate_photoimage(self.game_data.get("cover_image"))
                     logging.info(
-                        "Wyczyszczono cache load_photoimage_from_path z powodu ustawienia okładki z RAWG."
+                        "Unieważniono cache PhotoImage okładki z powodu ustawienia okładki z RAWG."
                     )
                     self.launcher.root.after(
                         150,
@@ -1703,7 +1710,7 @@ class GameDetailsWindow(tk.Toplevel):
             self.game_data.pop("cover_rawg", None)  # Usuń ścieżkę rawg
             save_config(self.launcher.config)
             if cover_changed:
-                load_photoimage_from_path.cache_clear()
+                invalidate_photoimage(original_cover_path)
             self.refresh_details_data()  # Odśwież widok szczegółów
             self.launcher.root.after(
                 150, lambda gn=self.game_name: self.launcher._force_refresh_tile(gn)
@@ -1721,7 +1728,7 @@ class GameDetailsWindow(tk.Toplevel):
                 self.game_data["cover_image"] = rawg_cover_path
                 self.game_data.pop("_auto_cover", None)
                 save_config(self.launcher.config)
-                load_photoimage_from_path.cache_clear()
+                invalidate_photoimage(rawg_cover_path)
                 self.refresh_details_data()
                 self.launcher.root.after(
                     150, lambda gn=self.game_name: self.launcher._force_refresh_tile(gn)
@@ -1773,7 +1780,7 @@ class GameDetailsWindow(tk.Toplevel):
             self.game_data["cover_image"] = ""
             self.game_data["_auto_cover"] = True
         save_config(self.launcher.config)
-        load_photoimage_from_path.cache_clear()
+        invalidate_photoimage(curr)
         self.launcher.update_game_grid()
         self.refresh_details_data()
 
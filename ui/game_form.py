@@ -3,7 +3,7 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
-from launcher.utils import IMAGES_FOLDER, load_photoimage_from_path
+from launcher.utils import IMAGES_FOLDER, invalidate_photoimage
 
 
 class GameForm:
@@ -686,10 +686,9 @@ class GameForm:
         # Wyczyszczenie cache, jeśli okładka się zmieniła
         if cover_changed:
             try:
-                load_photoimage_from_path.cache_clear()
-                logging.info(
-                    "Wyczyszczono cache load_photoimage_from_path z powodu zmiany okładki."
-                )
+                invalidate_photoimage(original_cover_path)
+                invalidate_photoimage(final_cover_image)
+                logging.info("Unieważniono cache PhotoImage okładki z powodu jej zmiany.")
             except Exception as e:
                 logging.error(f"Nie udało się wyczyścić cache PhotoImage: {e}")
 
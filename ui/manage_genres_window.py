@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox
 import logging
-from utils import config_manager  # Potrzebne do zapisu konfiguracji
+from launcher.utils import save_config
 
 
 class ManageGenresWindow:
@@ -111,9 +111,7 @@ class ManageGenresWindow:
                     # Mimo wszystko dodajemy go do custom, aby można było go wybrać
                     # jeśli nie ma gier z tym gatunkiem.
                 custom_genres.append(new_genre)
-                config_manager.save_config(
-                    self.launcher.config
-                )  # Używamy funkcji z modułu
+                save_config(self.launcher.config)
                 self.load_custom_genres()  # Odśwież listę w tym oknie
                 self.launcher.update_genre_menu()  # Odśwież menu w głównym oknie
                 logging.info(f"Dodano niestandardowy gatunek: {new_genre}")
@@ -142,9 +140,7 @@ class ManageGenresWindow:
                 custom_genres = self.launcher.settings.get("custom_genres", [])
                 if genre_to_remove in custom_genres:
                     custom_genres.remove(genre_to_remove)
-                    config_manager.save_config(
-                        self.launcher.config
-                    )  # Używamy funkcji z modułu
+                    save_config(self.launcher.config)
                     self.load_custom_genres()  # Odśwież listę w tym oknie
                     self.launcher.update_genre_menu()  # Odśwież menu w głównym oknie
                     logging.info(f"Usunięto niestandardowy gatunek: {genre_to_remove}")
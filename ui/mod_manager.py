@@ -1,11 +1,11 @@
 import logging
 import os
 import shutil
-import time
 import zipfile
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
 
+from launcher.mod_deploy import ModDeployment, ModDeploymentError
 from launcher.utils import save_config
 
 
@@ -80,7 +80,7 @@ class ExtendedModManager:
         right_panel.rowconfigure(0, weight=1)  # Tabela zajmuje całą dostępną przestrzeń
 
         # Tabela modów - większa i z lepszym rozciąganiem
-        columns = ("Nazwa", "Aktywny", "Priorytet")
+        columns = ("Nazwa", "Aktywny", "Priorytet", "Pliki")
         self.mods_tree = ttk.Treeview(
             right_panel,
             columns=columns,
@@ -110,7 +110,7 @@ class ExtendedModManager:
         buttons = [
             ("Zainstaluj Mod", self.install_mod),
             ("Zainstaluj z ZIP", self.install_mod_zip_flow),
-            ("Dezaktywuj Mod", self.deactivate_mod),
+            ("Aktywuj/Dezaktywuj", self.deactivate_mod),
             ("Odinstaluj Mod", self.uninstall_mod),
             ("Zwiększ Priorytet", self.increase_priority),
             ("Zmniejsz Priorytet", self.decrease_priority),
@@ -201,7 +201,7 @@ class ExtendedModManager:
             pass  # Usuwamy starą logikę
 
     def deactivate_mod(self):
-        """Dezaktywuje wybrany mod - przywraca oryginalne pliki"""
+        """Przełącza aktywność moda zarządzanego przez wdrożenie; stary mod (z backupem) dezaktywuje"""
         game = self.game_var.get()
         profile = self.profile_var.get()
         selection = self.mods_tree.selection()
@@ -216,6 +216,16 @@ class ExtendedModManager:
         if not mod_info:
             return
 
+        if mod_info.get("managed"):
+            was_active = mod_info.get("active", False)
+            mod_info["active"] = not was_active
+            if not self.deploy_profile(game, profile):
+                mod_info["active"] = was_active
+                return
+            self.save_mods_data()
+            self.load_current_game_profile()
+            return
+
         # Sprawdź czy mod jest aktywny
         if not mod_info.get("active", False):
             messagebox.showinfo(
@@ -268,16 +278,54 @@ class ExtendedModManager:
             self.save_mods_data()
             profiles.append("default")
 
-        # Odtwórz menu profili
+        # Odtwórz menu profili (wybór profilu wdraża go do folderu gry)
         menu = self.profile_menu["menu"]
         menu.delete(0, "end")
         for p in profiles:
-            menu.add_command(label=p, command=lambda val=p: self.profile_var.set(val))
+            menu.add_command(label=p, command=lambda val=p: self.on_profile_change(val))
 
         # Ustaw jako default, jeśli istnieje, w innym razie pierwszy
         self.profile_var.set("default")
         self.load_current_game_profile()
 
+    def on_profile_change(self, profile):
+        """Przełącza profil i wdraża go - zmieniane są tylko pliki różniące się od obecnych"""
+        previous = self.profile_var.get()
+        self.profile_var.set(profile)
+        game = self.game_var.get()
+        if profile != previous and game in self.mods_data:
+            if not self.deploy_profile(game, profile):
+                self.profile_var.set(previous)
+        self.load_current_game_profile()
+
+    def _mod_deployment(self, game):
+        exe_path = self.launcher.games.get(game, {}).get("exe_path", "")
+        game_folder = os.path.dirname(exe_path)
+        if not game_folder or not os.path.isdir(game_folder):
+            return None
+        return ModDeployment(
+            game,
+            game_folder,
+            allow_hardlinks=self.launcher.local_settings.get("mod_deploy_hardlinks", False),
+        )
+
+    def deploy_profile(self, game, profile):
+        """Wdraża pliki aktywnych modów profilu do folderu gry; False przy błędzie"""
+        profile_data = self.mods_data.get(game, {}).get("profiles", {}).get(profile)
+        deployment = self._mod_deployment(game)
+        if profile_data is None or deployment is None:
+            messagebox.showerror(
+                "Błąd", "Folder gry nie istnieje - sprawdź ścieżkę exe_path."
+            )
+            return False
+        try:
+            deployment.deploy(profile, profile_data)
+        except (ModDeploymentError, OSError) as e:
+            logging.error(f"Wdrożenie modów '{game}' (profil {profile}) nieudane: {e}")
+            messagebox.showerror("Błąd", f"Nie udało się wdrożyć modów:\n{e}")
+            return False
+        return True
+
     def load_current_game_profile(self):
         """Ładuje listę modów i priorytety dla wybranego profilu"""
         game = self.game_var.get()
@@ -293,10 +341,18 @@ class ExtendedModManager:
 
         self.clear_tree()
 
+        # Pliki wygrane / dostarczane przez mod według indeksu właścicieli
+        file_summary = {}
+        deployment = self._mod_deployment(game)
+        if deployment is not None:
+            deployment.build_owners(profile, profile_data)
+            file_summary = deployment.file_summary(profile)
+
         # Załaduj mody w kolejności load_order
         load_order = profile_data["load_order"]
         for mod_name in load_order:
             mod_info = profile_data["mods"].get(mod_name, {})
+            won, total = file_summary.get(mod_name, (0, 0))
             self.mods_tree.insert(
                 "",
                 "end",
@@ -304,6 +360,7 @@ class ExtendedModManager:
                     mod_name,
                     "Tak" if mod_info.get("active", False) else "Nie",
                     mod_info.get("priority", 0),
+                    f"{won}/{total}" if mod_info.get("managed") else "-",
                 ),
             )
 
@@ -586,46 +643,20 @@ class ExtendedModManager:
             "Aktywować od razu?", "Czy chcesz od razu aktywować ten mod?"
         )
 
-        # Tworzymy listę plików do skopiowania
-        files_to_copy = []
-        for root, dirs, filenames in os.walk(mod_dir):
-            for f in filenames:
-                full_path = os.path.join(root, f)
-                rel_path = os.path.relpath(full_path, mod_dir)
-                destination_path = os.path.join(game_folder, rel_path)
-                files_to_copy.append((full_path, destination_path))
-
-        # Tworzymy backup oryginalnych plików
-        backup_folder = os.path.join(
-            game_folder, f"_backup_{mod_name}_{int(time.time())}"
-        )
-        os.makedirs(backup_folder, exist_ok=True)
-
-        files_changed = []
-        for src, dst in files_to_copy:
-            if os.path.exists(dst):
-                # zrób backup
-                rel_in_game = os.path.relpath(dst, game_folder)
-                backup_dst = os.path.join(backup_folder, rel_in_game)
-                os.makedirs(os.path.dirname(backup_dst), exist_ok=True)
-                shutil.copy2(dst, backup_dst)
-                files_changed.append(rel_in_game)
-
-        # Skopiuj pliki moda do gry
-        for src, dst in files_to_copy:
-            os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copy2(src, dst)
-
-        # Zapisz informacje w configu
+        # Pliki moda zostają w jego folderze - do gry trafiają przy wdrożeniu profilu
+        files = ModDeployment(game, game_folder).register_source(mod_dir)
         profile_data["mods"][mod_name] = {
             "active": make_active,
             "priority": 0,
-            "files_changed": files_changed,
-            "backup_folder": backup_folder,
+            "managed": True,
             "location": mod_dir,
         }
         if mod_name not in profile_data["load_order"]:
             profile_data["load_order"].append(mod_name)
+        if make_active and not self.deploy_profile(game, profile):
+            profile_data["mods"][mod_name]["active"] = False
+            make_active = False
+        logging.info(f"Zainstalowano mod '{mod_name}' ({len(files)} plików) w profilu {profile}")
 
         self.save_mods_data()
 
@@ -668,6 +699,21 @@ class ExtendedModManager:
         if not confirm:
             return
 
+        if mod_info.get("managed"):
+            # Wdrożenie bez moda przywraca oryginały i pliki modów niższych w kolejności
+            load_order = list(profile_data["load_order"])
+            if mod_name in profile_data["load_order"]:
+                profile_data["load_order"].remove(mod_name)
+            del profile_data["mods"][mod_name]
+            if not self.deploy_profile(game, profile):
+                profile_data["mods"][mod_name] = mod_info
+                profile_data["load_order"] = load_order
+                return
+            self.save_mods_data()
+            self.load_current_game_profile()
+            messagebox.showinfo("Sukces", f"Mod '{mod_name}' został odinstalowany.")
+            return
+
         # Pobierz ścieżkę do folderu gry
         exe_path = self.launcher.games[game].get("exe_path", "")
         game_folder = os.path.dirname(exe_path)
@@ -718,6 +764,7 @@ class ExtendedModManager:
 
         mod_info["priority"] += 1
         self.reorder_load_list(game, profile)
+        self._redeploy_after_reorder(game, profile)
         self.save_mods_data()
         self.load_current_game_profile()
 
@@ -734,6 +781,7 @@ class ExtendedModManager:
 
         mod_info["priority"] -= 1
         self.reorder_load_list(game, profile)
+        self._redeploy_after_reorder(game, profile)
         self.save_mods_data()
         self.load_current_game_profile()
 
@@ -747,6 +795,12 @@ class ExtendedModManager:
         new_load_order = [m[0] for m in sorted_mods]
         profile_data["load_order"] = new_load_order
 
+    def _redeploy_after_reorder(self, game, profile):
+        """Nowa kolejność zmienia zwycięzców konfliktów - wdraża różnice"""
+        profile_data = self.mods_data[game]["profiles"][profile]
+        if any(m.get("managed") and m.get("active") for m in profile_data["mods"].values()):
+            self.deploy_profile(game, profile)
+
     def save_mods_data(self):
         """Zapisuje `self.mods_data` do configu launchera"""
         self.launcher.config["mods_data"] = self.mods_data
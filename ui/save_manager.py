@@ -7,6 +7,7 @@ import time
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 
+from launcher.save_store import AUTOSAVE_SNAPSHOT, SaveStore, run_save_store_operation
 from launcher.utils import GAMES_FOLDER
 
 
@@ -26,6 +27,9 @@ class SaveManager:
         self.game_name = game_name
         self.save_path = game_data.get("save_path")
         self.backup_path = os.path.join(GAMES_FOLDER, game_name)
+        # Zapisy jako migawki w magazynie gry; stare zapisy (pełne foldery) nadal są obsługiwane.
+        self.store = SaveStore(game_name)
+        self._save_entries = {}  # iid -> {"kind": "store"/"folder", "name", "path", "label"}
 
         # Sprawdź poprawność ścieżki do zapisów gry
         self.is_save_path_valid = self.save_path and os.path.isdir(self.save_path)
@@ -127,75 +131,98 @@ class SaveManager:
             return
         for item in self.saves_tree.get_children():
             self.saves_tree.delete(item)
+        self._save_entries = {}
 
+        snapshots = {snapshot["name"]: snapshot for snapshot in self.store.list_snapshots()}
+        autosave_snapshot = snapshots.pop(AUTOSAVE_SNAPSHOT, None)
         autosave_path = os.path.join(self.backup_path, "_autosave")
-        if os.path.isdir(autosave_path):
-            try:
-                mtime = os.path.getmtime(autosave_path)
-                autosave_date = datetime.datetime.fromtimestamp(mtime)
-                self.saves_tree.insert(
-                    "",
-                    0,
-                    iid="_autosave_",
-                    values=(
-                        "AUTO",
-                        autosave_date.strftime("%Y-%m-%d"),
-                        autosave_date.strftime("%H:%M:%S"),
-                        "Automatyczny Zapis",
-                    ),
-                    tags=("autosave",),
-                )
-                self.saves_tree.tag_configure(
-                    "autosave", foreground="lightblue", font=("Segoe UI", 9, "italic")
-                )  # Dodano font dla lepszej czytelności
-            except Exception as e:
-                logging.error(f"Błąd odczytu daty modyfikacji dla auto-zapisu: {e}")
+        autosave_entry = None
+        try:
+            if autosave_snapshot is not None:
+                autosave_mtime = autosave_snapshot["created"]
+                autosave_entry = {"kind": "store", "name": AUTOSAVE_SNAPSHOT}
+            elif os.path.isdir(autosave_path):
+                autosave_mtime = os.path.getmtime(autosave_path)
+                autosave_entry = {"kind": "folder", "path": autosave_path}
+        except Exception as e:
+            logging.error(f"Błąd odczytu daty modyfikacji dla auto-zapisu: {e}")
+        if autosave_entry is not None:
+            autosave_entry["label"] = "Automatyczny Zapis"
+            autosave_date = datetime.datetime.fromtimestamp(autosave_mtime)
+            self._save_entries["_autosave_"] = autosave_entry
+            self.saves_tree.insert(
+                "",
+                0,
+                iid="_autosave_",
+                values=(
+                    "AUTO",
+                    autosave_date.strftime("%Y-%m-%d"),
+                    autosave_date.strftime("%H:%M:%S"),
+                    "Automatyczny Zapis",
+                ),
+                tags=("autosave",),
+            )
+            self.saves_tree.tag_configure(
+                "autosave", foreground="lightblue", font=("Segoe UI", 9, "italic")
+            )  # Dodano font dla lepszej czytelności
 
-        saves_folder = os.path.join(self.backup_path, "saves")
         manual_saves_data = []
+        for snapshot in snapshots.values():
+            percent = snapshot["percent"]
+            if percent is None:
+                percent = _percent_from_name(snapshot["name"])
+            manual_saves_data.append(
+                {
+                    "name": snapshot["name"],
+                    "mtime": snapshot["created"],
+                    "percent": percent,
+                    "kind": "store",
+                }
+            )
+
+        saves_folder = os.path.join(self.backup_path, "saves")
         if os.path.exists(saves_folder):
             for save_name_folder in os.listdir(saves_folder):
                 save_full_path = os.path.join(saves_folder, save_name_folder)
                 if os.path.isdir(save_full_path):
                     try:
                         mtime = os.path.getmtime(save_full_path)
-                        percent = 0
-                        match = re.search(
-                            r"Save_(\d+)%", save_name_folder
-                        )  # Szukaj procentu w nazwie folderu
-                        if match:
-                            percent = int(match.group(1))
-                        manual_saves_data.append(
-                            {
-                                "name": save_name_folder,
-                                "mtime": mtime,
-                                "percent": percent,
-                            }
-                        )
                     except OSError:
-                        manual_saves_data.append(
-                            {"name": save_name_folder, "mtime": 0, "percent": 0}
-                        )  # Fallback
+                        mtime = 0  # Fallback
+                    manual_saves_data.append(
+                        {
+                            "name": save_name_folder,
+                            "mtime": mtime,
+                            "percent": _percent_from_name(save_name_folder),
+                            "kind": "folder",
+                            "path": save_full_path,
+                        }
+                    )
 
-            manual_saves_data.sort(
-                key=lambda item: (item["mtime"], item["percent"]), reverse=True
-            )
+        manual_saves_data.sort(
+            key=lambda item: (item["mtime"], item["percent"]), reverse=True
+        )
 
-            for save_data_item in manual_saves_data:
-                save_date_item = datetime.datetime.fromtimestamp(
-                    save_data_item["mtime"]
-                )
-                self.saves_tree.insert(
-                    "",
-                    "end",
-                    iid=save_data_item["name"],
-                    values=(
-                        f"{save_data_item['percent']}%",
-                        save_date_item.strftime("%Y-%m-%d"),
-                        save_date_item.strftime("%H:%M:%S"),
-                        save_data_item["name"],
-                    ),
-                )
+        for save_data_item in manual_saves_data:
+            iid = f"{save_data_item['kind']}:{save_data_item['name']}"
+            self._save_entries[iid] = {
+                "kind": save_data_item["kind"],
+                "name": save_data_item["name"],
+                "path": save_data_item.get("path"),
+                "label": save_data_item["name"],
+            }
+            save_date_item = datetime.datetime.fromtimestamp(save_data_item["mtime"])
+            self.saves_tree.insert(
+                "",
+                "end",
+                iid=iid,
+                values=(
+                    f"{save_data_item['percent']}%",
+                    save_date_item.strftime("%Y-%m-%d"),
+                    save_date_item.strftime("%H:%M:%S"),
+                    save_data_item["name"],
+                ),
+            )
 
         children_items = self.saves_tree.get_children()
         if children_items:
@@ -203,7 +230,7 @@ class SaveManager:
             self.saves_tree.selection_set(children_items[0])
 
     def create_save(self):
-        """Tworzy nowy nazwany zapis (z paskiem postępu)."""
+        """Tworzy nowy nazwany zapis - migawkę w magazynie (z paskiem postępu)."""
         if not self.is_save_path_valid:  # Użyj flagi sprawdzonej w __init__
             messagebox.showwarning(
                 "Błąd",
@@ -219,10 +246,11 @@ class SaveManager:
         )
         if percent is not None:
             save_name = f"Save_{percent}%_{time.strftime('%Y%m%d_%H%M%S')}"
-            destination = os.path.join(self.backup_path, "saves", save_name)
 
             # Sprawdź, czy zapis o tej nazwie już istnieje (na wszelki wypadek)
-            if os.path.exists(destination):
+            if self.store.has_snapshot(save_name) or os.path.exists(
+                os.path.join(self.backup_path, "saves", save_name)
+            ):
                 messagebox.showerror(
                     "Błąd",
                     f"Zapis o nazwie '{save_name}' już istnieje.",
@@ -230,64 +258,49 @@ class SaveManager:
                 )
                 return
 
-            # Wywołaj kopiowanie z postępem
-            success = self.launcher._copy_or_delete_with_progress(
-                operation_type="copy",
-                source_path=self.save_path,
-                dest_path=destination,
-                operation_title=f"Tworzenie zapisu '{save_name}'",
+            save_path = self.save_path
+            verify_hash = self.launcher.settings.get("save_snapshot_verify_hash", False)
+            run_save_store_operation(
+                self.launcher,
+                f"Tworzenie zapisu '{save_name}'",
+                lambda progress: self.store.snapshot(
+                    save_name,
+                    save_path,
+                    percent=percent,
+                    verify_hash=verify_hash,
+                    progress=progress,
+                ),
+                callback_on_success=self._refresh_if_open,
                 parent_window=self.top,
             )
 
-            if success:
-                # Informuj użytkownika, że proces się rozpoczął
-                messagebox.showinfo(
-                    "Rozpoczęto",
-                    f"Rozpoczęto tworzenie zapisu '{save_name}'.",
-                    parent=self.top,
-                )
-                # Odśwież listę zapisów od razu, aby pokazać nowy wpis (nawet jeśli kopiowanie trwa)
-                # LUB lepiej - dodaj callback do wątku, który odświeży listę PO zakończeniu.
-                # Na razie odświeżamy od razu:
-                self.update_saves_list()
-            # Jeśli success == False, błąd został już pokazany w _copy_or_delete_with_progress
+    def _refresh_if_open(self):
+        if self.top.winfo_exists():
+            self.update_saves_list()
 
     def _get_selected_save_info(self):
         """Pomocnicza funkcja do pobierania informacji o zaznaczonym zapisie."""
         selection = self.saves_tree.selection()
         if not selection:
-            return None, None, False  # Zwraca (ścieżka, nazwa dla logu, czy_autosave)
-
+            return None, False  # Zwraca (wpis zapisu, czy_autosave)
         selected_iid = selection[0]
-        is_autosave = selected_iid == "_autosave_"
-
-        if is_autosave:
-            source_path = os.path.join(self.backup_path, "_autosave")
-            save_name_for_log = "Automatyczny Zapis"
-        else:
-            # iid to teraz nazwa folderu
-            save_folder_name = selected_iid
-            source_path = os.path.join(self.backup_path, "saves", save_folder_name)
-            save_name_for_log = save_folder_name
-
-        return source_path, save_name_for_log, is_autosave
+        return self._save_entries.get(selected_iid), selected_iid == "_autosave_"
 
     def load_save(self):
         """Wczytuje zaznaczony zapis (ręczny lub automatyczny) z Treeview z paskiem postępu."""
-        source_path, save_name_for_log, _ = (
-            self._get_selected_save_info()
-        )  # Nie potrzebujemy tu is_autosave osobno
+        entry, _ = self._get_selected_save_info()  # Nie potrzebujemy tu is_autosave osobno
 
-        if not source_path:  # Jeśli nic nie zaznaczono
+        if not entry:  # Jeśli nic nie zaznaczono
             messagebox.showwarning(
                 "Błąd", "Nie wybrano żadnego zapisu.", parent=self.top
             )
             return
+        save_name_for_log = entry["label"]
 
-        if not os.path.isdir(source_path):
+        if entry["kind"] == "folder" and not os.path.isdir(entry["path"]):
             messagebox.showerror(
                 "Błąd",
-                f"Ścieżka źródłowa zapisu '{source_path}' nie istnieje lub nie jest folderem.",
+                f"Ścieżka źródłowa zapisu '{entry['path']}' nie istnieje lub nie jest folderem.",
                 parent=self.top,
             )
             self.update_saves_list()
@@ -306,9 +319,22 @@ class SaveManager:
             f"Czy na pewno chcesz wczytać zapis '{save_name_for_log}'?\nSpowoduje to nadpisanie aktualnych zapisów gry!",
             parent=self.top,
         ):
+            if entry["kind"] == "store":
+                # Kopiowane są tylko pliki różniące się od migawki.
+                snapshot_name, save_path = entry["name"], self.save_path
+                run_save_store_operation(
+                    self.launcher,
+                    f"Wczytywanie zapisu '{save_name_for_log}'",
+                    lambda progress: self.store.restore(
+                        snapshot_name, save_path, progress=progress
+                    ),
+                    parent_window=self.top,
+                )
+                return
+
             success = self.launcher._copy_or_delete_with_progress(
                 operation_type="copy",
-                source_path=source_path,
+                source_path=entry["path"],
                 dest_path=self.save_path,
                 operation_title=f"Wczytywanie zapisu '{save_name_for_log}'",
                 parent_window=self.top,
@@ -327,11 +353,9 @@ class SaveManager:
     # Metoda edit_save - powinna działać tylko dla zapisów ręcznych
     def edit_save(self):
         """Edytuje nazwę/procent zaznaczonego zapisu RĘCZNEGO."""
-        selected_save_path, old_save_name_folder, is_autosave = (
-            self._get_selected_save_info()
-        )
+        entry, is_autosave = self._get_selected_save_info()
 
-        if not selected_save_path:  # Nic nie zaznaczono
+        if not entry:  # Nic nie zaznaczono
             messagebox.showwarning(
                 "Błąd", "Nie wybrano zapisu do edycji.", parent=self.top
             )
@@ -345,7 +369,7 @@ class SaveManager:
             )
             return
 
-        # old_save_name_folder to teraz bezpośrednio nazwa folderu zapisu (bez 'saves/')
+        old_save_name_folder = entry["name"]
 
         percent = simpledialog.askinteger(
             "Edytuj Procent Ukończenia",
@@ -370,7 +394,9 @@ class SaveManager:
                     saves_base_folder, new_save_folder_name
                 )
 
-                if os.path.exists(new_full_path_check):
+                if os.path.exists(new_full_path_check) or self.store.has_snapshot(
+                    new_save_folder_name
+                ):
                     messagebox.showerror(
                         "Błąd",
                         f"Zapis o nazwie '{new_save_folder_name}' już istnieje.",
@@ -378,11 +404,10 @@ class SaveManager:
                     )
                     return
 
-                old_full_path = os.path.join(
-                    saves_base_folder, old_save_name_folder
-                )  # To samo co selected_save_path
-
-                os.rename(old_full_path, new_full_path_check)
+                if entry["kind"] == "store":
+                    self.store.rename(old_save_name_folder, new_save_folder_name, percent)
+                else:
+                    os.rename(entry["path"], new_full_path_check)
                 messagebox.showinfo(
                     "Sukces", "Nazwa zapisu została zaktualizowana.", parent=self.top
                 )
@@ -405,18 +430,19 @@ class SaveManager:
 
     def delete_save(self):
         """Usuwa zaznaczony zapis (ręczny lub automatyczny) z Treeview z paskiem postępu."""
-        path_to_delete, save_name_for_log, _ = self._get_selected_save_info()
+        entry, _ = self._get_selected_save_info()
 
-        if not path_to_delete:
+        if not entry:
             messagebox.showwarning(
                 "Błąd", "Nie wybrano zapisu do usunięcia.", parent=self.top
             )
             return
+        save_name_for_log = entry["label"]
 
-        if not os.path.isdir(path_to_delete):
+        if entry["kind"] == "folder" and not os.path.isdir(entry["path"]):
             messagebox.showerror(
                 "Błąd",
-                f"Folder zapisu '{save_name_for_log}' nie istnieje:\n{path_to_delete}",
+                f"Folder zapisu '{save_name_for_log}' nie istnieje:\n{entry['path']}",
                 parent=self.top,
             )
             self.update_saves_list()
@@ -427,9 +453,21 @@ class SaveManager:
             f"Czy na pewno chcesz trwale usunąć zapis '{save_name_for_log}'?",
             parent=self.top,
         ):
+            if entry["kind"] == "store":
+                # Usuwany jest manifest; obiekty tylko wtedy, gdy nie używa ich inna migawka.
+                snapshot_name = entry["name"]
+                run_save_store_operation(
+                    self.launcher,
+                    f"Usuwanie zapisu '{save_name_for_log}'",
+                    lambda progress: self.store.delete(snapshot_name),
+                    callback_on_success=self._refresh_if_open,
+                    parent_window=self.top,
+                )
+                return
+
             success = self.launcher._copy_or_delete_with_progress(
                 operation_type="delete",
-                source_path=path_to_delete,
+                source_path=entry["path"],
                 dest_path=None,
                 operation_title=f"Usuwanie zapisu '{save_name_for_log}'",
                 parent_window=self.top,
@@ -445,4 +483,10 @@ class SaveManager:
                     parent=self.top,
                 )
 
+
+def _percent_from_name(save_name):
+    match = re.search(r"Save_(\d+)%", save_name)  # Szukaj procentu w nazwie zapisu
+    return int(match.group(1)) if match else 0
+
+
 __all__ = ["SaveManager"]
@@ -2,9 +2,9 @@ import os
 import logging
 import functools
 from PIL import Image, ImageTk, ImageDraw, ImageFont, UnidentifiedImageError
+from launcher.thumbnail_cache import get_thumbnail_cache
 from .constants import (
     IMAGES_FOLDER,
-    THUMBNAIL_FOLDER,
     RESAMPLING,
     DEFAULT_TILE_WIDTH,
     DEFAULT_TILE_HEIGHT,
@@ -188,8 +188,9 @@ def get_or_create_thumbnail(
     original_image_path, game_name, size=(DEFAULT_TILE_WIDTH, DEFAULT_TILE_HEIGHT)
 ):
     """
-    Sprawdza, czy istnieje miniatura dla danego obrazu. Jeśli nie, tworzy ją.
-    Zwraca ścieżkę do miniatury.
+    Zwraca ścieżkę do miniatury obrazu w podanym rozmiarze (z trwałego cache miniatur).
+    Cache jest kluczowany hashem zawartości i rozmiarem, więc sprawdzenie istniejącej
+    miniatury nie wymaga otwierania jej przez PIL.
     Jeśli oryginalny obraz nie istnieje lub jest nieprawidłowy, próbuje utworzyć domyślną okładkę.
     """
     if not original_image_path or not os.path.exists(original_image_path):
@@ -207,55 +208,12 @@ def get_or_create_thumbnail(
             )
             return None  # Nie udało się uzyskać żadnego obrazu
 
-    base_name = os.path.basename(original_image_path)
-    name, ext = os.path.splitext(base_name)
-    thumbnail_filename = f"{name}_thumb{ext}"
-    thumbnail_path = os.path.join(THUMBNAIL_FOLDER, thumbnail_filename)
-
-    # Sprawdź, czy miniatura istnieje i czy jest nowsza niż oryginał
-    if os.path.exists(thumbnail_path) and os.path.getmtime(
-        thumbnail_path
-    ) >= os.path.getmtime(original_image_path):
-        # Sprawdźmy jeszcze rozmiar miniatury - czy pasuje do oczekiwanego
-        try:
-            with Image.open(thumbnail_path) as thumb_img:
-                if thumb_img.size == size:
-                    # logging.debug(f"Używanie istniejącej miniatury: {thumbnail_path}")
-                    return thumbnail_path
-                else:
-                    logging.info(
-                        f"Rozmiar istniejącej miniatury {thumb_img.size} dla '{game_name}' różni się od oczekiwanego {size}. Tworzenie nowej."
-                    )
-        except (UnidentifiedImageError, OSError) as e:
-            logging.warning(
-                f"Istniejąca miniatura '{thumbnail_path}' jest uszkodzona: {e}. Tworzenie nowej."
-            )
-
-    logging.info(f"Tworzenie miniatury dla: {original_image_path} -> {thumbnail_path}")
-    try:
-        with Image.open(original_image_path) as img:
-            img.thumbnail(size, RESAMPLING)  # Zachowuje proporcje, mieści w 'size'
-            # Można dodać tło, jeśli chcemy mieć stały rozmiar miniatury
-            # final_thumb = Image.new('RGBA', size, (0, 0, 0, 0)) # Przezroczyste tło
-            # paste_x = (size[0] - img.width) // 2
-            # paste_y = (size[1] - img.height) // 2
-            # final_thumb.paste(img, (paste_x, paste_y))
-            # final_thumb.save(thumbnail_path)
-
-            # Lub po prostu zapisz przeskalowany obraz (może mieć inny rozmiar niż 'size', jeśli proporcje się różnią)
-            img.convert("RGBA").save(thumbnail_path)  # Zapisz jako RGBA dla spójności
-
+    thumbnail_path = get_thumbnail_cache().get(original_image_path, size)
+    if thumbnail_path:
         return thumbnail_path
-    except (UnidentifiedImageError, FileNotFoundError, OSError, ValueError) as e:
-        logging.error(f"Nie można utworzyć miniatury dla '{original_image_path}': {e}")
-        # Jeśli tworzenie miniatury zawiedzie, spróbuj zwrócić ścieżkę do domyślnej okładki
-        default_cover = create_default_cover(game_name, size)
-        if default_cover and os.path.exists(default_cover):
-            # Spróbuj utworzyć miniaturę z domyślnej okładki
-            return get_or_create_thumbnail(default_cover, game_name, size)
-        return None  # Zwróć None, jeśli wszystko inne zawiedzie
-    except Exception as e:
-        logging.exception(
-            f"Nieoczekiwany błąd podczas tworzenia miniatury dla '{original_image_path}': {e}"
-        )
-        return None
+
+    # Jeśli tworzenie miniatury zawiedzie, spróbuj miniatury domyślnej okładki
+    default_cover = create_default_cover(game_name, size)
+    if default_cover and os.path.exists(default_cover) and default_cover != original_image_path:
+        return get_thumbnail_cache().get(default_cover, size)
+    return None  # Zwróć None, jeśli wszystko inne zawiedzie